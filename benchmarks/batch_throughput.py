@@ -0,0 +1,53 @@
+# benchmarks/batch_throughput.py
+"""
+Đo thông lượng (truy vấn/giây) của `solve_batch` theo số worker trên một lưới ngẫu nhiên.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.batch_throughput --size 300 --queries 5000 --workers 1 2 4 8
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_manhattan
+from src.batch import solve_batch
+from src.fast_search import a_star_search_flat
+from src.grid_model import CELL_OBSTACLE
+
+
+def random_queries(model, num_queries, seed):
+    """Sinh ngẫu nhiên các cặp (start, goal) trên các ô đi được."""
+    free_cells = [tuple(cell) for cell in np.argwhere(model.cell_types != CELL_OBSTACLE).tolist()]
+    rng = random.Random(seed)
+    return [(rng.choice(free_cells), rng.choice(free_cells)) for _ in range(num_queries)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark solve_batch throughput vs worker count.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--obstacle-density", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.05, args.seed)
+    queries = random_queries(model, args.queries, args.seed)
+    print(f"{args.size}x{args.size} grid, {len(queries)} A* queries")
+    print(f"{'workers':>8} {'time s':>9} {'queries/s':>10} {'speedup':>8}")
+    baseline_s = None
+    for workers in args.workers:
+        start_time = time.perf_counter()
+        found = sum(1 for path, _, _ in solve_batch(model, queries, a_star_search_flat, workers=workers,
+                                                    heuristic=heuristic_manhattan) if path)
+        elapsed_s = time.perf_counter() - start_time
+        baseline_s = baseline_s or elapsed_s
+        print(f"{workers:>8} {elapsed_s:>9.2f} {len(queries) / elapsed_s:>10.0f} {baseline_s / elapsed_s:>8.2f}x"
+              f"  ({found} paths)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/components.py
+"""
+Đo chỉ mục thành phần liên thông (src/components.py): thời gian gán nhãn toàn bộ lưới, thời gian một truy vấn A*
+tới đích bị tường bao kín (trả về ngay nhờ chỉ mục) so với việc duyệt hết vùng đến được từ start (điều A*
+phải làm khi không có chỉ mục), và chi phí cập nhật tăng dần khi vẽ / xóa tường.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.components --size 2000 --repeat 5
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.graph_build import make_random_grid
+from src.components import components_for, label_components
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat, single_source_distances_flat
+from src.grid_model import CELL_OBSTACLE
+
+
+def median_ms(function, repeat):
+    """Thời gian chạy trung vị (ms) của `function()` qua `repeat` lần."""
+    samples = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start_time) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the connected-component index.")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=1000, help="Random wall edits for the incremental update")
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    # Đích ở giữa lưới, bị bao kín bởi 8 ô tường; start là ô đi được đầu tiên (thuộc vùng lớn nhất).
+    goal_rc = (args.size // 2, args.size // 2)
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            model.set_cell_type(goal_rc[0] + dr, goal_rc[1] + dc, "obstacle" if dr or dc else "normal")
+    start_rc = tuple(int(v) for v in np.argwhere(model.walkable_mask())[0])
+    graph = create_csr_graph_from_grid(model)
+    walkable = model.walkable_mask()
+    print(f"Random {args.size}x{args.size}, obstacle density {args.obstacle_density}, median of {args.repeat}")
+
+    for corner_cutting in (False, True):
+        label_ms = median_ms(lambda: label_components(walkable, corner_cutting), args.repeat)
+        _, count = label_components(walkable, corner_cutting)
+        print(f"  label ({'8' if corner_cutting else '4'}-connected): {label_ms:>9.1f} ms, {count} components")
+
+    components_for(model) # Dựng chỉ mục một lần (như lần tìm kiếm đầu tiên trên lưới)
+    query_ms = median_ms(lambda: a_star_search_flat(graph, start_rc, goal_rc), args.repeat)
+    exhaust_ms = median_ms(lambda: single_source_distances_flat(graph, start_rc), max(1, args.repeat // 2))
+    print(f"  unreachable A* query with index:  {query_ms * 1000:>9.1f} us")
+    print(f"  exhausting the start region:      {exhaust_ms:>9.1f} ms")
+
+    # Cập nhật tăng dần: sửa từng ô rồi truy vấn (mỗi lần vẽ trong giao diện kèm một lần tìm đường).
+    rng = np.random.default_rng(args.seed)
+    cells = rng.integers(0, args.size, size=(args.edits, 2)).tolist()
+    start_time = time.perf_counter()
+    for r, c in cells:
+        is_wall = model.cell_types[r, c] == CELL_OBSTACLE
+        model.set_cell_type(r, c, "normal" if is_wall else "obstacle")
+        components_for(model).connected(start_rc, goal_rc)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    print(f"  incremental edit + query:         {elapsed_ms / args.edits * 1000:>9.1f} us per edit "
+          f"({args.edits} edits, {elapsed_ms:.1f} ms total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/flat_kernels.py
+"""
+So sánh các hàm tìm đường gốc (đồ thị dict, mang theo `path + [neighbor]`)
+với các kernel chỉ số phẳng trong src/fast_search.py (đồ thị CSR, mảng node cha).
+Bản đồ là maze "Spiral Trap" được phóng to (mỗi ô thành một khối scale x scale ô).
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.flat_kernels --scale 40     # 25x25 -> 1000x1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.algorithms import (create_graph_from_grid, a_star_search, dijkstra_search,
+                            bfs_search, greedy_bfs_search)
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import (a_star_search_flat, dijkstra_search_flat,
+                             bfs_search_flat, greedy_bfs_search_flat)
+from src.game_grid import create_grid
+from src.grid_model import GridModel
+from src.maze_loader import apply_maze_to_grid
+
+KERNEL_PAIRS = [
+    ("A*", a_star_search, a_star_search_flat),
+    ("Dijkstra", dijkstra_search, dijkstra_search_flat),
+    ("BFS", bfs_search, bfs_search_flat),
+    ("Greedy BFS", greedy_bfs_search, greedy_bfs_search_flat),
+]
+
+
+def scaled_maze(maze_name, scale):
+    """
+    Phóng to một maze mẫu: mỗi ô trở thành một khối scale x scale ô cùng loại.
+
+    Returns:
+        tuple: (GridModel, start_rc, goal_rc)
+    """
+    base_grid = create_grid()
+    start_rc, goal_rc = apply_maze_to_grid(base_grid, maze_name)
+    cell_types = np.kron(base_grid.model.cell_types, np.ones((scale, scale), dtype=np.uint8))
+    model = GridModel(*cell_types.shape)
+    model.set_types(cell_types)
+    return model, (start_rc[0] * scale, start_rc[1] * scale), (goal_rc[0] * scale, goal_rc[1] * scale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark path-copying searches vs flat-index kernels.")
+    parser.add_argument("--maze", default="Spiral Trap")
+    parser.add_argument("--scale", type=int, default=40)
+    parser.add_argument("--skip-original", action="store_true", help="Chỉ đo các kernel chỉ số phẳng.")
+    args = parser.parse_args(argv)
+
+    model, start_rc, goal_rc = scaled_maze(args.maze, args.scale)
+    print(f"Maze '{args.maze}' scaled to {model.rows}x{model.cols}, start={start_rc}, goal={goal_rc}")
+
+    csr_graph = create_csr_graph_from_grid(model)
+    dict_graph = None if args.skip_original else create_graph_from_grid(model)
+
+    print(f"{'algorithm':>12} {'variant':>9} {'time ms':>10} {'cost':>10} {'explored':>10}")
+    for name, original_func, flat_func in KERNEL_PAIRS:
+        variants = [("flat", flat_func, csr_graph)]
+        if dict_graph is not None:
+            variants.insert(0, ("original", original_func, dict_graph))
+        for variant, func, graph in variants:
+            start_time = time.perf_counter()
+            _, cost, explored = func(graph, start_rc, goal_rc)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(f"{name:>12} {variant:>9} {elapsed_ms:>10.1f} {cost:>10.1f} {len(explored):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/flow_field.py
+"""
+So sánh chi phí đưa N agent (xuất phát ngẫu nhiên) về CÙNG một đích:
+- mỗi agent một lần A* riêng (chi phí tăng theo N),
+- một trường hướng (flow field) dùng chung: một lần Dijkstra ngược + N lần đi theo bảng.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.flow_field --size 200 --agents 10 100 500
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_octile
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat
+from src.flow_field import FlowField
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-agent A* against one shared flow field.")
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--agents", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    graph = create_csr_graph_from_grid(model)
+    walkable = np.flatnonzero(graph.node_mask).tolist()
+    rng = random.Random(args.seed)
+    goal_rc = divmod(rng.choice(walkable), model.cols)
+    print(f"Random {args.size}x{args.size}, goal {goal_rc}")
+
+    for num_agents in args.agents:
+        starts = [divmod(rng.choice(walkable), model.cols) for _ in range(num_agents)]
+
+        start_time = time.perf_counter()
+        a_star_costs = [a_star_search_flat(graph, start_rc, goal_rc, heuristic_octile)[1] for start_rc in starts]
+        a_star_ms = (time.perf_counter() - start_time) * 1000
+
+        start_time = time.perf_counter()
+        field = FlowField(model, goal_rc)
+        paths = [field.path_from(start_rc) for start_rc in starts]
+        field_ms = (time.perf_counter() - start_time) * 1000
+        field_costs = [field.distance(start_rc) for start_rc in starts]
+
+        mismatches = sum(1 for a, b in zip(a_star_costs, field_costs) if abs(a - b) > 1e-6)
+        print(f"  {num_agents:>5} agents: per-agent A* {a_star_ms:>9.1f} ms | flow field {field_ms:>8.1f} ms "
+              f"({sum(1 for p in paths if p)} reachable, {mismatches} cost mismatches)")
+
+
+if __name__ == "__main__":
+    main()
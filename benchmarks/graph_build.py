@@ -0,0 +1,125 @@
+# benchmarks/graph_build.py
+"""
+So sánh thời gian xây dựng và bộ nhớ (RSS) giữa đồ thị dict (`create_graph_from_grid`)
+và đồ thị CSR (`create_csr_graph_from_grid`) trên các lưới ngẫu nhiên.
+Builder `csr_patch` đo thời gian vá đồ thị CSR (`update_csr_graph`) sau `--edits` lần sửa ô.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.graph_build --sizes 100 250 500 --obstacle-density 0.25
+
+Mỗi phép đo chạy trong một tiến trình con riêng để RSS của các lần đo không ảnh hưởng lẫn nhau.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+BUILDERS = ("dict", "csr", "csr_patch")
+
+
+def _current_rss_kb():
+    """Đọc RSS hiện tại của tiến trình (KB) từ /proc/self/statm (Linux)."""
+    with open("/proc/self/statm") as statm_file:
+        resident_pages = int(statm_file.read().split()[1])
+    return resident_pages * resource.getpagesize() // 1024
+
+
+def make_random_grid(size, obstacle_density, trap_density, seed):
+    """
+    Tạo một GridModel size x size với tường và bẫy ngẫu nhiên (tái lập được theo seed).
+
+    Args:
+        size (int): Số hàng/cột.
+        obstacle_density (float): Tỉ lệ ô là tường.
+        trap_density (float): Tỉ lệ ô là bẫy.
+        seed (int): Seed cho bộ sinh số ngẫu nhiên.
+
+    Returns:
+        GridModel: Lưới đã được điền.
+    """
+    import numpy as np
+    from src.grid_model import GridModel, CELL_NORMAL, CELL_OBSTACLE, CELL_TRAP
+    rng = np.random.default_rng(seed)
+    draws = rng.random((size, size))
+    cell_types = np.full((size, size), CELL_NORMAL, dtype=np.uint8)
+    cell_types[draws < obstacle_density] = CELL_OBSTACLE
+    cell_types[(draws >= obstacle_density) & (draws < obstacle_density + trap_density)] = CELL_TRAP
+    model = GridModel(size, size)
+    model.set_types(cell_types)
+    return model
+
+
+def _patch_after_edits(model, num_edits, seed):
+    """Dựng đồ thị CSR, sửa `num_edits` ô ngẫu nhiên rồi trả về hàm vá (để đo riêng bước vá)."""
+    import random
+    from src.csr_graph import create_csr_graph_from_grid, update_csr_graph
+    graph = create_csr_graph_from_grid(model)
+    rng = random.Random(seed)
+    # Một lần sửa + vá khởi động trước (lần gọi đầu phải nạp thêm module của NumPy).
+    model.set_cell_type(0, 0, "obstacle")
+    update_csr_graph(graph, model)
+    for _ in range(num_edits):
+        model.set_cell_type(rng.randrange(model.rows), rng.randrange(model.cols), rng.choice(("obstacle", "trap", "normal")))
+    return lambda _model: update_csr_graph(graph, _model)
+
+
+def _run_worker(builder, size, obstacle_density, trap_density, seed, num_edits):
+    """Đo một lần xây dựng đồ thị trong tiến trình hiện tại và in kết quả dạng JSON."""
+    from src.algorithms import create_graph_from_grid
+    from src.csr_graph import create_csr_graph_from_grid
+    model = make_random_grid(size, obstacle_density, trap_density, seed)
+    if builder == "csr_patch":
+        build_func = _patch_after_edits(model, num_edits, seed)
+    else:
+        build_func = create_graph_from_grid if builder == "dict" else create_csr_graph_from_grid
+
+    rss_before_kb = _current_rss_kb()
+    start_time = time.perf_counter()
+    graph = build_func(model)
+    build_ms = (time.perf_counter() - start_time) * 1000
+    rss_after_kb = _current_rss_kb()
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # Linux: KB
+
+    if builder == "dict":
+        num_edges = sum(len(edges) for edges in graph.edges.values())
+    else:
+        num_edges = graph.num_edges
+    print(json.dumps({
+        "builder": builder, "size": size, "edges": num_edges, "build_ms": build_ms,
+        "graph_rss_mb": (rss_after_kb - rss_before_kb) / 1024, "peak_rss_mb": peak_rss_kb / 1024,
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dict graph vs CSR graph construction.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500])
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--trap-density", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--edits", type=int, default=10, help="Số ô bị sửa trước khi đo csr_patch.")
+    parser.add_argument("--worker", choices=BUILDERS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker: # Chế độ tiến trình con: đo một builder với một kích thước.
+        _run_worker(args.worker, args.sizes[0], args.obstacle_density, args.trap_density, args.seed, args.edits)
+        return
+
+    print(f"{'size':>6} {'builder':>8} {'edges':>10} {'build ms':>10} {'graph RSS MB':>13} {'peak RSS MB':>12}")
+    for size in args.sizes:
+        for builder in BUILDERS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.graph_build", "--worker", builder,
+                 "--sizes", str(size), "--obstacle-density", str(args.obstacle_density),
+                 "--trap-density", str(args.trap_density), "--seed", str(args.seed),
+                 "--edits", str(args.edits)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{size:>6} {builder:>8} {result['edges']:>10} {result['build_ms']:>10.1f} "
+                  f"{result['graph_rss_mb']:>13.1f} {result['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# benchmarks/harness.py
+"""
+Bộ đo hiệu năng không giao diện cho mọi thuật toán trong src/registry.py, trên các kịch bản tái lập được:
+- các mê cung có sẵn (MAZE_PATTERNS, truy vấn = cặp start/end của mê cung),
+- các lưới ngẫu nhiên theo kích thước (truy vấn ngẫu nhiên theo seed),
+- các bộ sinh mê cung / địa hình (MAZE_GENERATORS) ở từng kích thước `--sizes` (truy vấn = start/end của bộ sinh
+  cộng các truy vấn ngẫu nhiên),
+- các file kịch bản JSON hoặc MovingAI '.scen' (xem src/map_io.py).
+
+Mỗi thuật toán chạy `--warmup` lượt khởi động (không đo; các bảng tiền xử lý gắn với lưới như JPS+, HPA*,
+Flow Field được dựng ở đây) rồi `--repeat` lượt đo, mỗi truy vấn một mẫu thời gian. Mặc định bộ gom rác
+được chạy trước và tắt trong lúc đo (`--gc disabled`). Bộ nhớ cao nhất (tracemalloc) được đo ở một lượt
+riêng để không làm chậm các lượt đo thời gian.
+Kết quả: bảng trên stdout (median / p95 thời gian mỗi truy vấn, số node mở rộng, chi phí, bộ nhớ) và JSON.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.harness --sizes 50 100 --queries 20 --repeat 5 --json results.json
+    python -m benchmarks.harness --no-mazes --scenarios my_map.json --algorithms "A*" JPS "HPA*"
+    python -m benchmarks.harness --no-mazes --generators "Prim's Maze" Caves --sizes 200 --algorithms "A*" JPS
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from config import GRID_ROWS, GRID_COLS
+from src.csr_graph import create_csr_graph_from_grid
+from src.grid_model import GridModel
+from src.map_io import load_scenario
+from src.maze_loader import MAZE_NAMES, MAZE_GENERATORS, apply_maze_to_grid, generate_maze
+from src.registry import ALGORITHM_NAMES, run_algorithm
+
+GC_MODES = ("disabled", "enabled")
+
+
+def build_scenarios(args):
+    """
+    Các kịch bản cần đo theo tham số dòng lệnh.
+
+    Returns:
+        list: Các dict {"name", "kind", "model", "queries"}.
+    """
+    scenarios = []
+    for maze_name in ([] if args.no_mazes else args.mazes or MAZE_NAMES):
+        model = GridModel(GRID_ROWS, GRID_COLS)
+        start_rc, end_rc = apply_maze_to_grid(model, maze_name)
+        if start_rc and end_rc:
+            scenarios.append({"name": maze_name, "kind": "maze", "model": model, "queries": [(start_rc, end_rc)]})
+    for size in ([] if args.no_random else args.sizes):
+        model = make_random_grid(size, args.obstacle_density, args.trap_density, args.seed)
+        scenarios.append({"name": f"random {size}x{size}", "kind": "generated", "model": model,
+                          "queries": random_queries(model, args.queries, args.seed)})
+    for generator_name in args.generators:
+        for size in args.sizes:
+            model, start_rc, end_rc = generate_maze(generator_name, size, size, args.seed)
+            scenarios.append({"name": f"{generator_name} {size}x{size}", "kind": "generator", "model": model,
+                              "queries": [(start_rc, end_rc)] + random_queries(model, args.queries, args.seed)})
+    for path in args.scenarios:
+        scenario = load_scenario(path)
+        scenarios.append({**scenario, "kind": "file"})
+    return scenarios
+
+
+def measure_algorithm(name, model, graph, queries, warmup, repeat, gc_mode):
+    """
+    Đo một thuật toán trên mọi truy vấn của một kịch bản.
+
+    Returns:
+        dict: Thống kê thời gian (ms mỗi truy vấn), số node mở rộng, chi phí và bộ nhớ cao nhất.
+    """
+    for _ in range(warmup):
+        for start_rc, goal_rc in queries:
+            run_algorithm(name, model, graph, start_rc, goal_rc)
+
+    samples_ms = []
+    results = []
+    if gc_mode == "disabled":
+        gc.collect()
+        gc.disable()
+    try:
+        for _ in range(repeat):
+            for start_rc, goal_rc in queries:
+                start_time = time.perf_counter()
+                result = run_algorithm(name, model, graph, start_rc, goal_rc)
+                samples_ms.append((time.perf_counter() - start_time) * 1000)
+                results.append(result)
+    finally:
+        if gc_mode == "disabled":
+            gc.enable()
+
+    # Bộ nhớ: một lượt riêng, lấy đỉnh lớn nhất trong các truy vấn.
+    peak_bytes = 0
+    for start_rc, goal_rc in queries:
+        gc.collect()
+        tracemalloc.start()
+        run_algorithm(name, model, graph, start_rc, goal_rc)
+        peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    last_round = results[-len(queries):] if results else []
+    costs = [cost for path, cost, _ in last_round if path]
+    return {
+        "algorithm": name,
+        "samples": len(samples_ms),
+        "median_ms": float(np.median(samples_ms)) if samples_ms else None,
+        "p95_ms": float(np.percentile(samples_ms, 95)) if samples_ms else None,
+        "mean_expansions": float(np.mean([len(explored) for _, _, explored in last_round])) if last_round else None,
+        "paths_found": len(costs),
+        "mean_cost": float(np.mean(costs)) if costs else None,
+        "peak_memory_kib": peak_bytes / 1024,
+    }
+
+
+def print_table(report):
+    """In kết quả dạng bảng."""
+    header = (f"{'map':<24} {'size':>9} {'algorithm':<13} {'median ms':>10} {'p95 ms':>9} "
+              f"{'expanded':>9} {'found':>7} {'mean cost':>10} {'peak KiB':>9}")
+    print(header)
+    print("-" * len(header))
+    for scenario in report["scenarios"]:
+        size = f"{scenario['rows']}x{scenario['cols']}"
+        for row in scenario["results"]:
+            cost = f"{row['mean_cost']:.2f}" if row["mean_cost"] is not None else "-"
+            print(f"{scenario['name'][:24]:<24} {size:>9} {row['algorithm']:<13} {row['median_ms']:>10.3f} "
+                  f"{row['p95_ms']:>9.3f} {row['mean_expansions']:>9.1f} "
+                  f"{row['paths_found']:>3}/{len(scenario['queries']):<3} {cost:>10} {row['peak_memory_kib']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless, reproducible benchmark of every registered algorithm.")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHM_NAMES, choices=ALGORITHM_NAMES, metavar="NAME",
+                        help=f"Algorithms to run (default: all of {', '.join(ALGORITHM_NAMES)})")
+    parser.add_argument("--mazes", nargs="+", choices=MAZE_NAMES, metavar="MAZE", help="Built-in mazes (default: all)")
+    parser.add_argument("--no-mazes", action="store_true", help="Skip the built-in mazes")
+    parser.add_argument("--generators", nargs="*", default=[], choices=list(MAZE_GENERATORS), metavar="GENERATOR",
+                        help=f"Maze generators to run at each --sizes size ({', '.join(MAZE_GENERATORS)})")
+    parser.add_argument("--no-random", action="store_true", help="Skip the uniform random grids")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[50, 100], help="Generated grid sizes")
+    parser.add_argument("--scenarios", nargs="*", default=[], help="Scenario files: JSON or MovingAI .scen (see src/map_io.py)")
+    parser.add_argument("--queries", type=int, default=10, help="Random queries per generated grid")
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--trap-density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds (one sample per query per round)")
+    parser.add_argument("--gc", choices=GC_MODES, default="disabled",
+                        help="'disabled': collect, then disable the GC while timing")
+    parser.add_argument("--json", metavar="PATH", help="Write the full report as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                        "platform": platform.platform(), "numpy": np.__version__, "cpu_count": os.cpu_count()},
+        "settings": {"warmup": args.warmup, "repeat": args.repeat, "gc": args.gc, "seed": args.seed,
+                     "obstacle_density": args.obstacle_density, "trap_density": args.trap_density},
+        "scenarios": [],
+    }
+    for scenario in build_scenarios(args):
+        model = scenario["model"]
+        start_time = time.perf_counter()
+        graph = create_csr_graph_from_grid(model)
+        graph_build_ms = (time.perf_counter() - start_time) * 1000
+        print(f"{scenario['name']}: {model.rows}x{model.cols}, {len(scenario['queries'])} queries, "
+              f"graph built in {graph_build_ms:.2f} ms", file=sys.stderr)
+        results = []
+        for name in args.algorithms:
+            results.append(measure_algorithm(name, model, graph, scenario["queries"], args.warmup, args.repeat, args.gc))
+        report["scenarios"].append({
+            "name": scenario["name"], "kind": scenario["kind"], "rows": model.rows, "cols": model.cols,
+            "queries": [[list(start_rc), list(goal_rc)] for start_rc, goal_rc in scenario["queries"]],
+            "graph_build_ms": graph_build_ms, "results": results,
+        })
+
+    print_table(report)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2)
+        print(f"Report written to {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/heuristics.py
+"""
+Kiểm tra tính chấp nhận được / nhất quán của các heuristic theo mô hình chi phí cạnh (có đường chéo
+chi phí sqrt(2)) và đo lợi ích của việc tính heuristic tại chỗ từ |dr|, |dc| (src/heuristic_tables.py) so với
+gọi hàm cho mỗi lần push. Mỗi truy vấn có đích riêng, nên thời gian gồm cả chi phí chuẩn bị theo đích.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.heuristics --size 300 --queries 20 --goals 5
+"""
+import argparse
+import time
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_manhattan, heuristic_euclidean, heuristic_octile
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat
+from src.game_grid import create_grid
+from src.heuristic_check import check_heuristic
+from src.maze_loader import MAZE_NAMES, apply_maze_to_grid
+
+HEURISTICS = (("Manhattan", heuristic_manhattan), ("Euclidean", heuristic_euclidean), ("Octile", heuristic_octile))
+
+
+def report_checks(label, graph, goals):
+    """In kết quả kiểm tra của từng heuristic trên một bản đồ."""
+    print(f"{label}:")
+    for name, heuristic in HEURISTICS:
+        report = check_heuristic(graph, heuristic, goals)
+        print(f"  {name:>10}: admissible={report['admissible']!s:<5} "
+              f"({report['admissibility_violations']} violations, max overestimate "
+              f"{report['max_overestimate']:.3f}), consistent={report['consistent']!s:<5} "
+              f"({report['consistency_violations']} violations)")
+
+
+def time_lookups(graph, queries):
+    """So sánh A* tính heuristic tại chỗ với A* gọi hàm heuristic (cùng công thức octile)."""
+    # Hàm bọc: kernel không nhận ra heuristic octile nên phải gọi hàm cho mỗi lần push.
+    def octile_call(node_rc, goal_rc):
+        return heuristic_octile(node_rc, goal_rc)
+
+    for name, heuristic in (("inline deltas", heuristic_octile), ("function call", octile_call)):
+        start_time = time.perf_counter()
+        results = [a_star_search_flat(graph, start_rc, goal_rc, heuristic) for start_rc, goal_rc in queries]
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        expanded = sum(len(explored) for _, _, explored in results)
+        print(f"  {name:>14}: {elapsed_ms:>8.1f} ms, {expanded} expanded")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check heuristic admissibility and benchmark inline heuristics.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--goals", type=int, default=5, help="Number of goals checked per map")
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    game_grid = create_grid()
+    for maze_name in MAZE_NAMES:
+        apply_maze_to_grid(game_grid, maze_name)
+        model = game_grid.model
+        goals = [goal_rc for _, goal_rc in random_queries(model, args.goals, args.seed)]
+        report_checks(f"Maze '{maze_name}'", create_csr_graph_from_grid(model), goals)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    graph = create_csr_graph_from_grid(model)
+    goals = [goal_rc for _, goal_rc in random_queries(model, args.goals, args.seed)]
+    report_checks(f"Random {args.size}x{args.size}", graph, goals)
+    print(f"A* with octile heuristic, {args.queries} queries on the random map:")
+    time_lookups(graph, random_queries(model, args.queries, args.seed))
+
+
+if __name__ == "__main__":
+    main()
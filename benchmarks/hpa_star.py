@@ -0,0 +1,66 @@
+# benchmarks/hpa_star.py
+"""
+So sánh HPA* với A* (a_star_search_flat) trên một lưới lớn: thời gian dựng đồ thị trừu tượng,
+thời gian cập nhật sau khi sửa vài ô, thời gian truy vấn và độ dài đường đi so với tối ưu.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.hpa_star --size 500 --cluster-size 16 --queries 20 --edits 10
+"""
+import argparse
+import random
+import time
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_euclidean
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat
+from src.hpa_star import HPAStar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark HPA* vs flat A*.")
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--cluster-size", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--obstacle-density", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.05, args.seed)
+    queries = random_queries(model, args.queries, args.seed)
+
+    start_time = time.perf_counter()
+    planner = HPAStar(model, args.cluster_size)
+    print(f"{args.size}x{args.size} grid, {args.cluster_size}x{args.cluster_size} clusters: "
+          f"abstract graph built in {time.perf_counter() - start_time:.2f} s")
+
+    rng = random.Random(args.seed)
+    for _ in range(args.edits):
+        model.set_cell_type(rng.randrange(args.size), rng.randrange(args.size), "obstacle")
+    start_time = time.perf_counter()
+    planner.sync()
+    print(f"{args.edits} cell edits: clusters rebuilt in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    graph = create_csr_graph_from_grid(model)
+    astar_s = hpa_s = 0.0
+    ratios = []
+    for start_rc, goal_rc in queries:
+        start_time = time.perf_counter()
+        _, optimal_cost, _ = a_star_search_flat(graph, start_rc, goal_rc, heuristic_euclidean)
+        astar_s += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        path, cost, _ = planner.find_path(start_rc, goal_rc, heuristic_euclidean)
+        hpa_s += time.perf_counter() - start_time
+        if path and optimal_cost > 0:
+            ratios.append(cost / optimal_cost)
+    print(f"{'A*':>5}: {astar_s * 1000 / len(queries):>8.1f} ms/query")
+    print(f"{'HPA*':>5}: {hpa_s * 1000 / len(queries):>8.1f} ms/query ({astar_s / hpa_s:.2f}x)")
+    if ratios:
+        print(f"path cost vs optimal: mean +{(sum(ratios) / len(ratios) - 1) * 100:.1f}%, "
+              f"max +{(max(ratios) - 1) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/import_time.py
+"""
+Đo thời gian import phần lõi tìm đường (không giao diện) trong các tiến trình Python mới, như một worker
+chạy theo lô vừa khởi động, và kiểm tra rằng phần lõi không kéo theo pygame / SDL.
+Thoát với mã 1 nếu một module import pygame hoặc vượt ngân sách CORE_IMPORT_BUDGET_MS (config.py),
+nên có thể dùng làm bước kiểm tra tự động.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.import_time --repeat 7
+    python -m benchmarks.import_time --modules src.registry solve --budget-ms 120
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from config import CORE_IMPORT_BUDGET_MS
+
+# Các module của phần lõi (main.py, ui_panel, sprite_manager, agent là phần giao diện, không nằm ở đây).
+CORE_MODULES = [
+    "src.grid_model", "src.csr_graph", "src.components", "src.algorithms", "src.fast_search", "src.maze_loader", "src.map_io",
+    "src.registry", "src.stepper", "src.batch", "src.background", "src.path_cache", "src.game_grid", "solve",
+]
+
+# Chạy trong tiến trình con: thời gian import một module và các module nặng bị kéo theo.
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed_ms, "pygame": "pygame" in sys.modules}}))
+"""
+
+
+def measure_import(module, repeat):
+    """
+    Import `module` trong `repeat` tiến trình mới.
+
+    Returns:
+        tuple: (median ms, có kéo theo pygame hay không).
+    """
+    samples, pulls_pygame = [], False
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                                capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe["ms"])
+        pulls_pygame |= probe["pygame"]
+    return statistics.median(samples), pulls_pygame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of the headless pathfinding core.")
+    parser.add_argument("--modules", nargs="+", default=CORE_MODULES)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--budget-ms", type=float, default=CORE_IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module in args.modules:
+        median_ms, pulls_pygame = measure_import(module, args.repeat)
+        problems = []
+        if pulls_pygame:
+            problems.append("imports pygame")
+        if median_ms > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:.0f} ms budget")
+        failures += bool(problems)
+        print(f"  {module:>18}: {median_ms:>7.1f} ms  {'; '.join(problems) or 'ok'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
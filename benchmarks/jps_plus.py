@@ -0,0 +1,56 @@
+# benchmarks/jps_plus.py
+"""
+So sánh JPS (quét từng ô) với JPS+ (tra bảng khoảng cách nhảy) trên một lưới lớn, nhiều khoảng trống.
+Đồng thời đo thời gian dựng bảng lần đầu và thời gian cập nhật bảng theo vùng sau khi sửa vài ô.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.jps_plus --size 1000 --queries 20 --edits 10
+"""
+import argparse
+import random
+import time
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_manhattan, jps_search, jps_plus_search
+from src.jps_plus import jump_tables_for
+
+
+def _time_queries(search_func, model, queries):
+    """Chạy mọi truy vấn, trả về (thời gian ms, list chi phí)."""
+    start_time = time.perf_counter()
+    costs = [search_func(model, start_rc, goal_rc, heuristic_manhattan)[1] for start_rc, goal_rc in queries]
+    return (time.perf_counter() - start_time) * 1000, costs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JPS vs JPS+ (precomputed jump tables).")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--obstacle-density", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.0, args.seed)
+    queries = random_queries(model, args.queries, args.seed)
+
+    start_time = time.perf_counter()
+    jump_tables_for(model)
+    print(f"{args.size}x{args.size} grid: jump tables built in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    for _ in range(args.edits):
+        model.set_cell_type(rng.randrange(args.size), rng.randrange(args.size), "obstacle")
+    start_time = time.perf_counter()
+    jump_tables_for(model)
+    print(f"{args.edits} cell edits: tables updated in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    jps_ms, jps_costs = _time_queries(jps_search, model, queries)
+    plus_ms, plus_costs = _time_queries(jps_plus_search, model, queries)
+    print(f"{'JPS':>5}: {jps_ms:>9.1f} ms for {len(queries)} queries")
+    print(f"{'JPS+':>5}: {plus_ms:>9.1f} ms ({jps_ms / plus_ms:.2f}x), same costs: {jps_costs == plus_costs}")
+
+
+if __name__ == "__main__":
+    main()
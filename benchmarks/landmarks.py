@@ -0,0 +1,62 @@
+# benchmarks/landmarks.py
+"""
+So sánh số node A* mở rộng khi dùng heuristic Manhattan, Euclidean và ALT (landmark),
+trên các maze có sẵn (ví dụ "Spiral Trap") và trên một lưới ngẫu nhiên lớn có tường và bẫy.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.landmarks --size 300 --landmarks 8 --queries 20
+"""
+import argparse
+import time
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_manhattan, heuristic_euclidean
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat
+from src.game_grid import create_grid
+from src.landmarks import LandmarkHeuristic
+from src.maze_loader import MAZE_NAMES, apply_maze_to_grid
+
+
+def compare(label, graph, queries, num_landmarks):
+    """In số node mở rộng (tổng trên mọi truy vấn) và thời gian của từng heuristic trên một bản đồ."""
+    start_time = time.perf_counter()
+    alt = LandmarkHeuristic(graph, num_landmarks)
+    preprocess_ms = (time.perf_counter() - start_time) * 1000
+    print(f"{label}: {len(alt.landmarks)} landmarks preprocessed in {preprocess_ms:.0f} ms")
+    baseline = None
+    for name, heuristic in (("Manhattan", heuristic_manhattan), ("Euclidean", heuristic_euclidean), ("ALT", alt)):
+        start_time = time.perf_counter()
+        results = [a_star_search_flat(graph, start_rc, goal_rc, heuristic) for start_rc, goal_rc in queries]
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        expanded = sum(len(explored) for _, _, explored in results)
+        total_cost = sum(cost for path, cost, _ in results if path)
+        baseline = baseline or expanded
+        print(f"  {name:>10}: {expanded:>9} expanded ({expanded / baseline:>6.1%} of Manhattan), "
+              f"{elapsed_ms:>8.1f} ms, total cost {total_cost:.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark A* expansions with Manhattan vs ALT heuristics.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    game_grid = create_grid()
+    for maze_name in MAZE_NAMES:
+        apply_maze_to_grid(game_grid, maze_name)
+        model = game_grid.model
+        compare(f"Maze '{maze_name}'", create_csr_graph_from_grid(model),
+                random_queries(model, args.queries, args.seed), args.landmarks)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    compare(f"Random {args.size}x{args.size}", create_csr_graph_from_grid(model),
+            random_queries(model, args.queries, args.seed), args.landmarks)
+
+
+if __name__ == "__main__":
+    main()
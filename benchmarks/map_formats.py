@@ -0,0 +1,49 @@
+# benchmarks/map_formats.py
+"""
+So sánh các định dạng bản đồ trên đĩa (src/map_io.py): kích thước file và thời gian đọc của bản đồ văn bản
+của project, bản đồ MovingAI '.map' và định dạng nén bit '.gridpack' (có / không có mặt phẳng chi phí).
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.map_formats --size 4096 --repeat 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.graph_build import make_random_grid
+from src.map_io import load_map, save_map, save_movingai_map, save_packed_map
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark on-disk map formats (size and load time).")
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    writers = [
+        ("text (.txt)", "grid.txt", save_map),
+        ("MovingAI (.map)", "grid.map", save_movingai_map),
+        ("packed + costs", "grid.gridpack", save_packed_map),
+        ("packed, bits only", "bits.gridpack", lambda path, grid: save_packed_map(path, grid, include_costs=False)),
+    ]
+    print(f"Random {args.size}x{args.size}, median of {args.repeat} loads")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, file_name, save in writers:
+            path = os.path.join(tmp_dir, file_name)
+            save(path, model)
+            samples = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                loaded, _, _ = load_map(path)
+                samples.append((time.perf_counter() - start_time) * 1000)
+                del loaded # Giải phóng memory map trước khi xóa thư mục tạm
+            print(f"  {label:>18}: {os.path.getsize(path) / 1024:>10.0f} KiB, load {statistics.median(samples):>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/memory_bounded.py
+"""
+So sánh A* (mảng trạng thái theo số ô) với IDA* và SMA* (bộ nhớ bị chặn): thời gian, số node mở rộng,
+số node lưu trữ cao nhất (kể cả mục bảng chuyển vị) và bộ nhớ Python cấp phát cao nhất (tracemalloc) cho mỗi truy vấn.
+
+Chế độ --verify kiểm tra hồi quy: chạy IDA* và SMA* (giới hạn node nhỏ, nên bộ nhớ đầy liên tục) trên nhiều lưới
+ngẫu nhiên nhỏ, so chi phí với Dijkstra; trả mã thoát 1 nếu có truy vấn sai chi phí hoặc chạy quá lâu.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.memory_bounded --size 120 --queries 5 --sma-nodes 2000 500
+    python -m benchmarks.memory_bounded --verify --size 14 --queries 10 --maps 20 --sma-nodes 40 20
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_octile
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat, dijkstra_search_flat
+from src.memory_bounded import ida_star_search, sma_star_search
+
+
+def measure(label, search, queries, optimal):
+    """Chạy `search(start_rc, goal_rc, stats)` trên mọi truy vấn và in thời gian / bộ nhớ cao nhất."""
+    elapsed_ms, peak_bytes, peak_nodes, expansions, mismatches = 0.0, 0, None, 0, 0
+    for (start_rc, goal_rc), optimal_cost in zip(queries, optimal):
+        stats = {}
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        _, cost, explored = search(start_rc, goal_rc, stats)
+        elapsed_ms += (time.perf_counter() - start_time) * 1000
+        peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if "peak_stored_entries" in stats: # A* không báo số mục lưu trữ (mảng trạng thái theo số ô)
+            peak_nodes = max(peak_nodes or 0, stats["peak_stored_entries"])
+        expansions += stats.get("expansions", len(explored))
+        mismatches += abs(cost - optimal_cost) > 1e-6
+    print(f"  {label:>18}: {elapsed_ms:>9.1f} ms, {expansions:>8} expanded, peak {peak_nodes if peak_nodes is not None else '-':>7} stored entries, "
+          f"peak {peak_bytes / 1024:>8.1f} KiB allocated, {mismatches} non-optimal")
+
+
+def verify(args):
+    """
+    So chi phí IDA* / SMA* với Dijkstra trên `args.maps` lưới ngẫu nhiên (seed liên tiếp từ args.seed).
+    SMA* chỉ được kiểm tra khi đường tối ưu có ít hơn `max_nodes` node (nếu không, không tìm thấy là đúng).
+
+    Returns:
+        int: Số truy vấn sai chi phí hoặc chạy quá `args.time_limit_s` giây.
+    """
+    failures = checked = 0
+    for seed in range(args.seed, args.seed + args.maps):
+        model = make_random_grid(args.size, args.obstacle_density, 0.1, seed)
+        graph = create_csr_graph_from_grid(model)
+        for start_rc, goal_rc in random_queries(model, args.queries, seed):
+            path, optimal_cost, _ = dijkstra_search_flat(graph, start_rc, goal_rc)
+            searches = [("IDA*", lambda: ida_star_search(graph, start_rc, goal_rc, record_explored=False))]
+            for max_nodes in args.sma_nodes:
+                if path is None or len(path) < max_nodes:
+                    searches.append((f"SMA* ({max_nodes} nodes)", lambda max_nodes=max_nodes: sma_star_search(
+                        graph, start_rc, goal_rc, max_nodes=max_nodes, record_explored=False)))
+            for label, search in searches:
+                start_time = time.perf_counter()
+                _, cost, _ = search()
+                elapsed_s = time.perf_counter() - start_time
+                checked += 1
+                wrong = cost != optimal_cost and abs(cost - optimal_cost) > 1e-6
+                if wrong or elapsed_s > args.time_limit_s:
+                    failures += 1
+                    print(f"  FAIL {label}: seed {seed}, {start_rc} -> {goal_rc}: cost {cost:.4f} "
+                          f"(Dijkstra {optimal_cost:.4f}), {elapsed_s:.2f} s")
+    print(f"Verified {checked} searches on {args.maps} random {args.size}x{args.size} grids: {failures} failures")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory-bounded IDA* and SMA* against A*.")
+    parser.add_argument("--size", type=int, default=120)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--sma-nodes", type=int, nargs="+", default=[2000, 500], help="SMA* node caps")
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true", help="Check IDA* / SMA* costs against Dijkstra")
+    parser.add_argument("--maps", type=int, default=20, help="Random grids checked by --verify")
+    parser.add_argument("--time-limit-s", type=float, default=3.0, help="Slowest search accepted by --verify")
+    args = parser.parse_args(argv)
+    if args.verify:
+        return 1 if verify(args) else 0
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    graph = create_csr_graph_from_grid(model)
+    queries = random_queries(model, args.queries, args.seed)
+    optimal = [a_star_search_flat(graph, start_rc, goal_rc, heuristic_octile)[1] for start_rc, goal_rc in queries]
+    print(f"Random {args.size}x{args.size}, {args.queries} queries")
+
+    measure("A*", lambda start_rc, goal_rc, stats: a_star_search_flat(graph, start_rc, goal_rc, heuristic_octile),
+            queries, optimal)
+    measure("IDA*", lambda start_rc, goal_rc, stats: ida_star_search(
+        graph, start_rc, goal_rc, heuristic_octile, record_explored=False, stats=stats), queries, optimal)
+    for max_nodes in args.sma_nodes:
+        measure(f"SMA* ({max_nodes} nodes)", lambda start_rc, goal_rc, stats: sma_star_search(
+            graph, start_rc, goal_rc, heuristic_octile, max_nodes=max_nodes, record_explored=False, stats=stats),
+            queries, optimal)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# benchmarks/open_list.py
+"""
+So sánh các backend OPEN list (src/open_list.py) của A* / Dijkstra trên CSRGraph: thời gian mỗi truy vấn, số lần
+push, pop và pop phải bỏ entry cũ (stale), cùng sai lệch chi phí của các backend khóa nguyên so với heapq.
+Mỗi bản đồ được sinh theo seed (lưới ngẫu nhiên và các bộ sinh trong src/maze_generators.py), cùng một bộ
+truy vấn cho mọi backend; "inline" là heapq viết liền trong kernel (mặc định, không đếm).
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.open_list --size 300 --queries 10
+    python -m benchmarks.open_list --maps random Caves --algorithm Dijkstra --backends heap bucket radix
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_octile, heuristic_zero
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat
+from src.maze_loader import MAZE_GENERATORS, generate_maze
+from src.open_list import OPEN_LIST_NAMES
+
+MAP_KINDS = ["random"] + list(MAZE_GENERATORS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare open-list backends for A* / Dijkstra.")
+    parser.add_argument("--maps", nargs="+", default=["random", "Prim's Maze", "Caves", "Trap Field"],
+                        choices=MAP_KINDS, metavar="MAP", help=f"Map kinds ({', '.join(MAP_KINDS)})")
+    parser.add_argument("--backends", nargs="+", default=["inline"] + OPEN_LIST_NAMES,
+                        choices=["inline"] + OPEN_LIST_NAMES)
+    parser.add_argument("--algorithm", choices=("A*", "Dijkstra"), default="A*")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    heuristic = heuristic_octile if args.algorithm == "A*" else heuristic_zero
+
+    print(f"{'map':<14} {'backend':<8} {'median ms':>10} {'pushes':>9} {'pops':>9} {'stale':>9} {'max cost err':>13}")
+    for map_kind in args.maps:
+        if map_kind == "random":
+            model = make_random_grid(args.size, 0.25, 0.1, args.seed)
+        else:
+            model = generate_maze(map_kind, args.size, args.size, args.seed)[0]
+        graph = create_csr_graph_from_grid(model)
+        queries = random_queries(model, args.queries, args.seed)
+        reference = [a_star_search_flat(graph, start_rc, goal_rc, heuristic)[1] for start_rc, goal_rc in queries]
+        for backend in args.backends:
+            open_list = None if backend == "inline" else backend
+            samples, counters, costs = [], {"pushes": 0, "pops": 0, "stale_pops": 0}, []
+            for round_index in range(args.repeat):
+                for start_rc, goal_rc in queries:
+                    stats = {} if open_list else None
+                    start_time = time.perf_counter()
+                    _, cost, _ = a_star_search_flat(graph, start_rc, goal_rc, heuristic, open_list, stats)
+                    samples.append((time.perf_counter() - start_time) * 1000)
+                    if round_index == 0:
+                        costs.append(cost)
+                        for key in counters:
+                            counters[key] += stats[key] if stats else 0
+            # Sai lệch chi phí so với heapq (chỉ các truy vấn có đường đi).
+            error = max((cost - best for cost, best in zip(costs, reference) if best != float("inf")), default=0.0)
+            counts = [f"{counters[key] / len(queries):>9.0f}" if open_list else f"{'-':>9}" for key in counters]
+            print(f"{map_kind[:14]:<14} {backend:<8} {statistics.median(samples):>10.2f} {' '.join(counts)} "
+                  f"{error:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
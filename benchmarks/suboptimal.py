@@ -0,0 +1,65 @@
+# benchmarks/suboptimal.py
+"""
+Đánh đổi thời gian / chất lượng đường đi của tìm kiếm dưới tối ưu có giới hạn:
+- Weighted A* với nhiều epsilon: thời gian, số node mở rộng, tỉ lệ chi phí so với A* tối ưu (và giới hạn thực tế),
+- ARA*: thời điểm có đường đi đầu tiên và các đường đi được sửa dần trong ngân sách thời gian.
+
+Cách chạy (từ thư mục gốc của project):
+    python -m benchmarks.suboptimal --size 300 --queries 20 --epsilons 1 1.2 1.5 2 3
+"""
+import argparse
+import time
+
+from benchmarks.batch_throughput import random_queries
+from benchmarks.graph_build import make_random_grid
+from src.algorithms import heuristic_octile
+from src.csr_graph import create_csr_graph_from_grid
+from src.fast_search import a_star_search_flat
+from src.suboptimal import weighted_a_star_search, ara_star_search
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark weighted A* and anytime ARA* against optimal A*.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--epsilons", type=float, nargs="+", default=[1.0, 1.2, 1.5, 2.0, 3.0])
+    parser.add_argument("--budget-ms", type=float, default=200, help="ARA* time budget per query")
+    parser.add_argument("--obstacle-density", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = make_random_grid(args.size, args.obstacle_density, 0.1, args.seed)
+    graph = create_csr_graph_from_grid(model)
+    queries = random_queries(model, args.queries, args.seed)
+    optimal = [a_star_search_flat(graph, start_rc, goal_rc, heuristic_octile)[1] for start_rc, goal_rc in queries]
+    solved = [i for i, cost in enumerate(optimal) if cost != float("inf")]
+    print(f"Random {args.size}x{args.size}, {len(solved)}/{len(queries)} solvable queries")
+
+    for epsilon in args.epsilons:
+        start_time = time.perf_counter()
+        runs = []
+        for start_rc, goal_rc in queries:
+            stats = {}
+            runs.append((weighted_a_star_search(graph, start_rc, goal_rc, heuristic_octile, epsilon, stats), stats))
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        expanded = sum(len(result[2]) for result, _ in runs)
+        ratios = [runs[i][0][1] / optimal[i] for i in solved if optimal[i] > 0]
+        bounds = [runs[i][1]["suboptimality_bound"] for i in solved]
+        print(f"  weighted A* eps={epsilon:<4}: {elapsed_ms:>8.1f} ms, {expanded:>8} expanded, "
+              f"cost ratio max {max(ratios, default=1.0):.3f}, reported bound max {max(bounds, default=1.0):.3f}")
+
+    first_ms, final_ms, final_ratios = [], [], []
+    for i in solved:
+        stats = {}
+        _, cost, _ = ara_star_search(graph, *queries[i], heuristic_octile, time_budget_ms=args.budget_ms, stats=stats)
+        first_ms.append(stats["solutions"][0][3])
+        final_ms.append(stats["solutions"][-1][3])
+        final_ratios.append(cost / optimal[i] if optimal[i] > 0 else 1.0)
+    if solved:
+        print(f"  ARA* (budget {args.budget_ms:.0f} ms): first path after {sum(first_ms) / len(solved):.2f} ms (avg), "
+              f"last improvement after {sum(final_ms) / len(solved):.2f} ms (avg), "
+              f"final cost ratio max {max(final_ratios):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-import pygame
-
 # --- KÍCH THƯỚC ---
 # Các hằng số định nghĩa kích thước của các thành phần trong game.
 
@@ -58,7 +56,15 @@ COLOR_DIJKSTRA_PATH = (80, 180, 255) # Xanh dương nhạt cho Dijkstra.
 COLOR_BFS_PATH = (180, 80, 220)      # Tím cho BFS.
 COLOR_GREEDY_PATH = (100, 220, 100)  # Xanh lá cây nhạt cho Greedy BFS.
 COLOR_JPS_PATH = (0, 200, 200)       # Xanh cyan cho JPS (Jump Point Search).
+COLOR_JPS_PLUS_PATH = (0, 140, 160)  # Xanh cyan đậm cho JPS+ (bảng nhảy tính trước).
+COLOR_WEIGHTED_JPS_PATH = (230, 120, 160) # Hồng cho Weighted JPS (JPS có tính chi phí ô).
+COLOR_HPA_PATH = (200, 160, 60)      # Vàng đất cho HPA* (tìm đường phân cấp).
 COLOR_BIDIR_PATH = (120, 80, 220)    # Tím đậm hơn / Indigo cho Bi-directional A*.
+COLOR_FLOW_FIELD_PATH = (90, 160, 90) # Xanh rêu cho Flow Field (trường hướng dùng chung).
+COLOR_WEIGHTED_ASTAR_PATH = (240, 140, 60) # Cam đậm cho Weighted A* (A* có trọng số heuristic).
+COLOR_ARA_STAR_PATH = (200, 100, 40)  # Nâu cam cho ARA* (Anytime Repairing A*).
+COLOR_IDA_STAR_PATH = (150, 150, 220) # Xanh lavender cho IDA* (A* sâu dần lặp).
+COLOR_SMA_STAR_PATH = (110, 110, 180) # Xanh chàm nhạt cho SMA* (A* giới hạn bộ nhớ).
 
 # --- CHI PHÍ Ô ---
 # Các hằng số định nghĩa chi phí để di chuyển qua các loại ô khác nhau.
@@ -78,6 +84,57 @@ FONTS_DIR = f"{ASSETS_DIR}/fonts"   # Thư mục con chứa các file font tùy
 
 FPS = 60 # Số khung hình mỗi giây (Frames Per Second) mà game cố gắng duy trì.
 
+# --- THỰC THI THUẬT TOÁN ---
+# Cách nút "Run" chạy các thuật toán đã đăng ký:
+# - "sequential": chạy lần lượt ngay trên luồng UI (cửa sổ đứng yên cho tới khi tất cả chạy xong).
+# - "parallel": mỗi thuật toán là một tác vụ trong pool tiến trình; kết quả được hiển thị ngay khi
+#   từng thuật toán xong, nên thời gian chờ xấp xỉ thuật toán chậm nhất thay vì tổng thời gian.
+# - "stepped": chạy lần lượt trên luồng UI nhưng mỗi frame chỉ dành SEARCH_STEP_BUDGET_MS cho tìm kiếm;
+#   các node vừa mở rộng của thuật toán đang xem chi tiết được vẽ ngay, cửa sổ giữ nguyên FPS.
+# - "background": chạy lần lượt trên một luồng nền, trên bản chụp copy-on-write của lưới (người dùng vẫn
+#   vẽ tường được trong lúc tìm); nhấn "Run" lần nữa sẽ hủy lần chạy cũ, kết quả về qua hàng đợi mỗi frame.
+ALGORITHM_EXECUTION_MODE = "background"
+# Số tiến trình worker cho chế độ "parallel" (None = min(số thuật toán, số CPU)).
+ALGORITHM_WORKERS = None
+# Thời gian tìm kiếm tối đa mỗi frame ở chế độ "stepped" (mili giây; một frame ở 60 FPS dài ~16.7 ms).
+SEARCH_STEP_BUDGET_MS = 8
+# Độ dài mỗi lát tìm kiếm của luồng nền ở chế độ "background" (mili giây): giữa hai lát, luồng nền kiểm tra
+# yêu cầu hủy. Thuật toán không có bản "*_steps" chỉ hủy được trước khi bắt đầu.
+BACKGROUND_SLICE_MS = 5
+# Kích thước cụm (số ô mỗi cạnh) của HPA*: cụm nhỏ => đồ thị trừu tượng lớn hơn nhưng tinh chỉnh rẻ hơn.
+HPA_CLUSTER_SIZE = 8
+# Tìm kiếm dưới tối ưu có giới hạn: Weighted A* mở rộng theo g + epsilon * h và đảm bảo chi phí <= epsilon * tối ưu
+# (với heuristic nhất quán). ARA* bắt đầu từ ARA_STAR_INITIAL_EPSILON, giảm dần ARA_STAR_EPSILON_STEP sau mỗi
+# đường đi tìm được cho tới 1 (tối ưu) hoặc tới khi hết ARA_STAR_TIME_BUDGET_MS.
+WEIGHTED_ASTAR_EPSILON = 1.5
+ARA_STAR_INITIAL_EPSILON = 2.5
+ARA_STAR_EPSILON_STEP = 0.5
+ARA_STAR_TIME_BUDGET_MS = 50
+# Tìm kiếm tối ưu với bộ nhớ bị chặn: số node tìm kiếm tối đa SMA* giữ cùng lúc, và số mục tối đa của bảng
+# chuyển vị (ô -> chi phí tốt nhất đã gặp) dùng bởi IDA* / SMA* để cắt đường lặp; 0 = không dùng bảng.
+SMA_STAR_MAX_NODES = 5000
+TRANSPOSITION_TABLE_MAX_ENTRIES = 100_000
+# Hệ số tăng ngưỡng f tối thiểu giữa hai lần lặp của IDA* (1 = IDA* cổ điển: tăng tới f nhỏ nhất vượt ngưỡng,
+# rất nhiều lần lặp khi chi phí là số thực). Đường đi vẫn tối ưu với mọi hệ số >= 1.
+IDA_STAR_THRESHOLD_GROWTH = 1.1
+# Bộ nhớ đệm kết quả tìm đường (khóa = hash nội dung lưới + start + goal + thuật toán + heuristic):
+# số kết quả tối đa và tổng dung lượng ước tính tối đa; vượt ngưỡng thì bỏ kết quả dùng lâu nhất (LRU).
+PATH_CACHE_MAX_ENTRIES = 256
+PATH_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Ngân sách thời gian import (ms, trong một tiến trình Python mới) của phần lõi tìm đường không giao diện
+# (lưới, đồ thị, thuật toán, mê cung, đọc bản đồ). Phần lõi không được kéo theo pygame; xem
+# benchmarks/import_time.py.
+CORE_IMPORT_BUDGET_MS = 150
+# Seed mặc định của các bộ sinh mê cung / địa hình (src/maze_generators.py): cùng seed => cùng bản đồ.
+MAZE_GENERATOR_SEED = 0
+# Chỉ mục thành phần liên thông (src/components.py): khi một ô thành tường có thể tách vùng, số ô tối đa
+# được duyệt cục bộ để kiểm tra (hoặc gán nhãn riêng cho phần bị tách); vượt ngưỡng thì gán nhãn lại cả lưới.
+COMPONENT_SPLIT_SEARCH_CELLS = 4096
+# Hệ số đổi khóa f (số thực) sang khóa nguyên cho các OPEN list "bucket" và "radix" (src/open_list.py): chi phí
+# ô là 1 / 10 và đường chéo nhân căn 2, nên khóa được làm tròn xuống theo bước 1 / OPEN_LIST_KEY_SCALE; chi phí
+# đường đi A* tìm được với hai backend này lớn hơn tối ưu không quá một bước đó.
+OPEN_LIST_KEY_SCALE = 1024
+
 # --- ANIMATION VISUALIZATION ---
 # Các hằng số liên quan đến cài đặt tốc độ của animation hiển thị quá trình tìm đường.
 # Những giá trị này có thể được điều chỉnh bởi người dùng thông qua slider trên UI.
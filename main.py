@@ -2,7 +2,10 @@
 import pygame
 import pygame_gui
 import sys
+import os
 import time
+import multiprocessing # Context "spawn" cho pool tiến trình chạy thuật toán song song
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Import các cấu hình và module từ thư mục src ---
 from config import (
@@ -10,24 +13,89 @@ from config import (
     GRID_WIDTH, GRID_HEIGHT, UI_PANEL_WIDTH, GRID_ROWS, GRID_COLS, CELL_SIZE,
     WHITE, LIGHT_BLUE_BG, # DARK_GREY, GREY sẽ được xử lý bởi theme hoặc draw_grid_lines
     COLOR_ASTAR_PATH, COLOR_DIJKSTRA_PATH, COLOR_BFS_PATH, COLOR_GREEDY_PATH,
-    COLOR_JPS_PATH, COLOR_BIDIR_PATH,
+    COLOR_JPS_PATH, COLOR_JPS_PLUS_PATH, COLOR_WEIGHTED_JPS_PATH, COLOR_HPA_PATH, COLOR_BIDIR_PATH, COLOR_FLOW_FIELD_PATH,
+    COLOR_WEIGHTED_ASTAR_PATH, COLOR_ARA_STAR_PATH, COLOR_IDA_STAR_PATH, COLOR_SMA_STAR_PATH,
     # Các hằng số cho tốc độ animation từ config.py
-    ANIM_VIZ_MIN_DELAY, ANIM_VIZ_MAX_DELAY
+    ANIM_VIZ_MIN_DELAY, ANIM_VIZ_MAX_DELAY,
+    ALGORITHM_EXECUTION_MODE, ALGORITHM_WORKERS, # Chế độ chạy thuật toán (tuần tự / song song / từng bước)
+    SEARCH_STEP_BUDGET_MS
     # ANIM_SLIDER_MIN_VAL, ANIM_SLIDER_MAX_VAL, ANIM_SLIDER_DEFAULT_VAL # Nếu bạn dùng chúng để tính toán
 )
 from src.ui_panel import UIPanelManager
 from src.sprite_manager import load_game_assets, get_background
 from src.game_grid import create_grid, draw_grid_lines, get_clicked_grid_pos # GridNode không cần import trực tiếp
-from src.algorithms import (
-    create_graph_from_grid, a_star_search, dijkstra_search,
-    bfs_search, greedy_bfs_search, heuristic_manhattan,
-    jps_search,
-    bidirectional_a_star_search
-)
+from src.csr_graph import update_csr_graph
+from src.registry import ALGORITHMS, search_stats_for, suboptimality_bound # Danh sách thuật toán dùng chung với công cụ benchmark / dòng lệnh
+from src.flow_field import flow_field_for # Trường hướng dùng chung cho agent cùng đích
 from src.maze_loader import MAZE_NAMES, apply_maze_to_grid
 from src.agent import Agent
+from src.dstar_lite import DStarLite # Lập lại đường đi tăng dần cho agent khi bản đồ thay đổi
+from src.batch import SharedGrid, run_search_task # Chia sẻ lưới cho các worker của chế độ song song
+from src.stepper import SearchStepper # Chạy tìm kiếm theo lát thời gian mỗi frame (chế độ "stepped")
+from src.background import BackgroundSearchRunner # Luồng nền chạy tìm kiếm (chế độ "background")
+from src.path_cache import PathCache # Bộ nhớ đệm kết quả theo nội dung bản đồ (Run lại trên bản đồ chưa sửa)
 from pygame_gui.windows import UIMessageWindow # Để hiển thị hộp thoại thông báo
 
+def record_algorithm_result(path_results, active_agents, algo_config, result, start_node_pos, agent_speed, game_grid=None):
+    """
+    Lưu kết quả của một thuật toán vào `path_results` và cập nhật Agent tương ứng.
+
+    Args:
+        path_results (dict): Kết quả theo tên thuật toán (được cập nhật tại chỗ).
+        active_agents (dict): Agent theo tên thuật toán (được cập nhật tại chỗ).
+        algo_config (dict): Cấu hình thuật toán trong `defined_algorithms`.
+        result (tuple): (path, cost, explored_coords, time_ms, cpu_ms, search_stats) - search_stats là số liệu
+                        của lần chạy (ví dụ giới hạn dưới tối ưu thực tế của ARA*), {} nếu không có.
+                        Lần chạy không giữ danh sách explored (chế độ "stepped"/"background") ghi số node
+                        đã mở rộng vào search_stats["explored_count"].
+        start_node_pos (tuple): Điểm bắt đầu hiện tại.
+        agent_speed (float): Tốc độ của Agent mới tạo.
+        game_grid (GameGrid, optional): Lưới hiện tại (cho các thuật toán có `follows_flow_field`:
+                                        Agent đi theo trường hướng dùng chung thay vì đường đi riêng).
+
+    Returns:
+        bool: True nếu thuật toán tìm được đường đi.
+    """
+    algo_name = algo_config["name"]
+    path, cost, explored_coords, time_taken_ms, cpu_time_ms, search_stats = result
+    explored_count = search_stats.get("explored_count", len(explored_coords))
+    bound = suboptimality_bound(algo_config, search_stats) # Chỉ có ở các thuật toán dưới tối ưu có giới hạn
+    bound_text = f", Bound<={bound:.2f}x optimal" if bound is not None and path else ""
+    if bound is None and not algo_config.get("optimal", True) and path: bound_text = ", Not optimal"
+    print(f"  {algo_name}: Cost={cost if cost != float('inf') else 'N/A'}{bound_text}, Path={'Yes' if path else 'No'}, Explored={explored_count}, Time={time_taken_ms:.2f} ms, CPU={cpu_time_ms:.2f} ms")
+
+    # Lưu kết quả của thuật toán
+    path_results[algo_name] = {
+        "path": path, "cost": cost, "explored": explored_coords, "explored_count": explored_count,
+        "color": algo_config["path_color"], "time_ms": time_taken_ms, "cpu_ms": cpu_time_ms,
+        "line_thickness": algo_config.get("line_thickness", 3), "suboptimality_bound": bound,
+        "optimal": algo_config.get("optimal", True)
+    }
+
+    # Tạo hoặc cập nhật Agent nếu tìm thấy đường đi và có điểm bắt đầu
+    if path and start_node_pos:
+        if algo_name not in active_agents: # Nếu chưa có Agent cho thuật toán này
+            # Tạo key cho sprite dựa trên tên thuật toán
+            sprite_key = f"car_{algo_name.lower().replace(' ', '_').replace('*','star')}"
+            active_agents[algo_name] = Agent(start_node_pos, sprite_key, algo_name, speed=agent_speed)
+        if algo_config.get("follows_flow_field") and game_grid is not None:
+            active_agents[algo_name].follow_field(flow_field_for(game_grid, path[-1]), start_node_pos)
+        else:
+            active_agents[algo_name].set_path(path) # Gán đường đi cho Agent
+    elif algo_name in active_agents: # Nếu không tìm thấy đường, xóa đường đi của Agent
+        active_agents[algo_name].set_path(None)
+    return bool(path)
+
+
+def cancel_pending_runs(pending_algorithm_runs, shared_grid_snapshot):
+    """Bỏ các thuật toán đang chạy song song (kết quả về sau sẽ bị bỏ qua) và giải phóng bản chụp lưới."""
+    for _, future, _ in pending_algorithm_runs.values():
+        future.cancel() # Chỉ hủy được tác vụ chưa bắt đầu; tác vụ đang chạy sẽ tự kết thúc
+    pending_algorithm_runs.clear()
+    if shared_grid_snapshot:
+        shared_grid_snapshot.close()
+
+
 def main():
     """Hàm chính khởi chạy và quản lý vòng lặp của game Pathfinding Visualization."""
     # --- Khởi tạo Pygame và các module cơ bản ---
@@ -54,13 +122,18 @@ def main():
 
     # --- Định nghĩa các thuật toán tìm đường sẽ được sử dụng ---
     # Mỗi thuật toán là một dictionary chứa thông tin cần thiết để chạy và hiển thị.
+    # Thuật toán lấy từ src/registry.py; ở đây chỉ thêm màu và độ dày nét vẽ đường đi.
+    algorithm_styles = {
+        "A*": (COLOR_ASTAR_PATH, 4), "Dijkstra": (COLOR_DIJKSTRA_PATH, 3), "BFS": (COLOR_BFS_PATH, 3),
+        "Greedy BFS": (COLOR_GREEDY_PATH, 3), "JPS": (COLOR_JPS_PATH, 4), "JPS+": (COLOR_JPS_PLUS_PATH, 4),
+        "Weighted JPS": (COLOR_WEIGHTED_JPS_PATH, 4), "HPA*": (COLOR_HPA_PATH, 4),
+        "Weighted A*": (COLOR_WEIGHTED_ASTAR_PATH, 3), "ARA*": (COLOR_ARA_STAR_PATH, 3),
+        "IDA*": (COLOR_IDA_STAR_PATH, 3), "SMA*": (COLOR_SMA_STAR_PATH, 3),
+        "Bi-A*": (COLOR_BIDIR_PATH, 4), "Flow Field": (COLOR_FLOW_FIELD_PATH, 3),
+    }
     defined_algorithms = [
-        {"name": "A*", "func": a_star_search, "is_graph_based": True, "heuristic": heuristic_manhattan, "path_color": COLOR_ASTAR_PATH, "line_thickness": 4},
-        {"name": "Dijkstra", "func": dijkstra_search, "is_graph_based": True, "heuristic": None, "path_color": COLOR_DIJKSTRA_PATH, "line_thickness": 3},
-        {"name": "BFS", "func": bfs_search, "is_graph_based": True, "heuristic": None, "path_color": COLOR_BFS_PATH, "line_thickness": 3},
-        {"name": "Greedy BFS", "func": greedy_bfs_search, "is_graph_based": True, "heuristic": heuristic_manhattan, "path_color": COLOR_GREEDY_PATH, "line_thickness": 3},
-        {"name": "JPS", "func": jps_search, "is_graph_based": False, "heuristic": heuristic_manhattan, "path_color": COLOR_JPS_PATH, "line_thickness": 4},
-        {"name": "Bi-A*", "func": bidirectional_a_star_search, "is_graph_based": True, "heuristic": heuristic_manhattan, "path_color": COLOR_BIDIR_PATH, "line_thickness": 4}
+        {"name": name, **spec, "path_color": algorithm_styles[name][0], "line_thickness": algorithm_styles[name][1]}
+        for name, spec in ALGORITHMS.items()
     ]
     algorithm_names_for_ui = [algo["name"] for algo in defined_algorithms] # Lấy danh sách tên cho UI
     maze_names_for_ui = MAZE_NAMES # Lấy danh sách tên maze từ maze_loader
@@ -75,6 +148,18 @@ def main():
     current_build_mode = "set_wall" # Chế độ xây dựng mặc định là "đặt tường"
     ui_panel_manager.update_build_mode_display(current_build_mode) # Đồng bộ hóa hiển thị chế độ xây dựng với UI
 
+    current_graph_repr = None # Đồ thị CSR giữ lại giữa các lần chạy, chỉ vá các ô người dùng đã sửa
+    algorithm_pool = None # Pool tiến trình cho chế độ "parallel" (tạo ở lần chạy đầu tiên)
+    shared_grid_snapshot = None # Bản chụp lưới trong shared memory cho lần chạy song song hiện tại
+    pending_algorithm_runs = {} # Tên thuật toán -> (algo_config, future, cache_key) đang chờ kết quả
+    path_cache = PathCache() # Kết quả theo (hash lưới, start, goal, thuật toán, heuristic), giữ qua các lần reset/tải mê cung
+    stepping_runs = [] # (algo_config, cache_key, SearchStepper) còn đang chạy từng bước, theo thứ tự
+    background_runner = None # Luồng nền cho chế độ "background" (tạo ở lần chạy đầu tiên)
+    background_pending = set() # Tên các thuật toán của lần chạy nền hiện tại chưa có kết quả
+    live_streamed_algo = None # Thuật toán có các node explored đang được hiển thị trực tiếp (từ node đầu tiên)
+    run_results_ready = False # True khi mọi thuật toán của lần chạy hiện tại đã có kết quả
+    any_path_found_this_run = False # Cờ kiểm tra có thuật toán nào tìm được đường không
+    run_start_time = 0.0 # Thời điểm bắt đầu lần chạy (để in tổng thời gian chờ)
     path_results = {} # Dictionary để lưu trữ kết quả (đường đi, chi phí,...) của các thuật toán
     detailed_view_algo_name = "Overview / All Paths" # Thuật toán đang được xem chi tiết trên UI
     if ui_panel_manager.algo_dropdown: # Đảm bảo dropdown đã được tạo trước khi set giá trị
@@ -82,6 +167,8 @@ def main():
 
     active_agents = {} # Dictionary để lưu trữ các đối tượng Agent (xe)
     agent_speed = 2.5  # Tốc độ di chuyển của Agent (ô/giây)
+    agent_planners = {} # Đích -> bộ lập kế hoạch D* Lite dùng chung cho mọi Agent (tạo khi cần replan lần đầu)
+    map_edited_while_moving = False # True nếu người dùng sửa ô trong khi agent đang di chuyển
 
     # --- Biến trạng thái cho Visualization Animation (hiển thị quá trình tìm đường) ---
     visualization_active = False  # True nếu animation đang chạy
@@ -145,13 +232,16 @@ def main():
                             current_viz_explored_idx = 0; current_viz_path_idx = 0
                             nodes_to_visualize_explored.clear(); nodes_to_visualize_path.clear()
                             
-                            # Tạo biểu diễn đồ thị từ lưới (nếu có thuật toán cần)
-                            current_graph_repr = None
-                            if any(algo.get("is_graph_based", True) for algo in defined_algorithms):
-                                current_graph_repr = create_graph_from_grid(game_grid)
+                            # Đồng bộ đồ thị CSR với lưới (nếu có thuật toán cần): chỉ vá các ô đã sửa
+                            # kể từ lần chạy trước; dựng lại toàn bộ khi lưới mới hoặc vừa tải mê cung.
+                            # Chế độ "background" bỏ qua bước này: luồng nền tự vá đồ thị riêng theo bản chụp.
+                            if ALGORITHM_EXECUTION_MODE != "background" and any(algo.get("is_graph_based", True) for algo in defined_algorithms):
+                                current_graph_repr = update_csr_graph(current_graph_repr, game_grid)
                             
                             # Xóa kết quả cũ và reset agent về điểm bắt đầu
-                            path_results.clear()
+                            cancel_pending_runs(pending_algorithm_runs, shared_grid_snapshot); shared_grid_snapshot = None; stepping_runs.clear()
+                            if background_runner: background_runner.cancel(); background_pending.clear()
+                            path_results.clear(); agent_planners.clear()
                             for agent in active_agents.values():
                                 if start_node_pos: agent.reset_to_start(start_node_pos)
 
@@ -161,70 +251,98 @@ def main():
                                     node.is_explored = False; node.is_path = False; node.path_color = None
                             
                             any_path_found_this_run = False # Cờ kiểm tra có thuật toán nào tìm được đường không
-                            # Chạy lần lượt các thuật toán đã định nghĩa
+                            live_streamed_algo = None
+                            run_start_time = time.perf_counter()
+                            # Khóa bộ nhớ đệm của từng thuật toán (tính trước khi chạy: kết quả song song có thể
+                            # về sau khi người dùng đã sửa lưới). Thuật toán đã có kết quả được hiển thị ngay.
+                            algorithms_to_run = []
                             for algo_config in defined_algorithms:
-                                algo_name = algo_config["name"]; algo_func = algo_config["func"]
-                                heuristic = algo_config.get("heuristic")
-                                is_graph_based = algo_config.get("is_graph_based", True)
-                                
-                                start_time = time.perf_counter() # Bắt đầu đo thời gian
-                                path, cost, explored_coords = (None, float('inf'), []) # Kết quả mặc định
-                                try:
-                                    if is_graph_based: # Thuật toán dựa trên đồ thị
-                                        if not current_graph_repr: continue # Bỏ qua nếu không có đồ thị
-                                        if heuristic: path, cost, explored_coords = algo_func(current_graph_repr, start_node_pos, end_node_pos, heuristic)
-                                        else: path, cost, explored_coords = algo_func(current_graph_repr, start_node_pos, end_node_pos)
-                                    else: # Thuật toán dựa trên lưới (ví dụ: JPS)
-                                        if heuristic: path, cost, explored_coords = algo_func(game_grid, start_node_pos, end_node_pos, heuristic)
-                                        else: path, cost, explored_coords = algo_func(game_grid, start_node_pos, end_node_pos)
-                                except Exception as e: print(f"  Error running {algo_name}: {e}") # In lỗi nếu có
-                                
-                                time_taken_ms = (time.perf_counter() - start_time) * 1000 # Tính thời gian (ms)
-                                print(f"  {algo_name}: Cost={cost if cost != float('inf') else 'N/A'}, Path={'Yes' if path else 'No'}, Explored={len(explored_coords)}, Time={time_taken_ms:.2f} ms")
-                                
-                                # Lưu kết quả của thuật toán
-                                path_results[algo_name] = {
-                                    "path": path, "cost": cost, "explored": explored_coords,
-                                    "color": algo_config["path_color"], "time_ms": time_taken_ms,
-                                    "line_thickness": algo_config.get("line_thickness", 3)
-                                }
-                                if path: any_path_found_this_run = True # Đánh dấu đã tìm thấy đường đi
-                                
-                                # Tạo hoặc cập nhật Agent nếu tìm thấy đường đi và có điểm bắt đầu
-                                if path and start_node_pos:
-                                    if algo_name not in active_agents: # Nếu chưa có Agent cho thuật toán này
-                                        # Tạo key cho sprite dựa trên tên thuật toán
-                                        sprite_key = f"car_{algo_name.lower().replace(' ', '_').replace('*','star')}"
-                                        active_agents[algo_name] = Agent(start_node_pos, sprite_key, algo_name, speed=agent_speed)
-                                    active_agents[algo_name].set_path(path) # Gán đường đi cho Agent
-                                elif algo_name in active_agents: # Nếu không tìm thấy đường, xóa đường đi của Agent
-                                    active_agents[algo_name].set_path(None)
-                            
-                            # --- Cập nhật UI và chuẩn bị cho animation ---
-                            if detailed_view_algo_name != "Overview / All Paths": # Nếu đang xem chi tiết một thuật toán
-                                if detailed_view_algo_name in path_results: # Nếu thuật toán đó có kết quả
-                                    res = path_results[detailed_view_algo_name]
-                                    ui_panel_manager.update_selected_algorithm_info(detailed_view_algo_name, res["cost"], len(res["explored"]), res["time_ms"])
-                                    # Chuẩn bị dữ liệu cho animation
-                                    if res["explored"]: nodes_to_visualize_explored = list(res["explored"])
-                                    if res["path"]: nodes_to_visualize_path = list(res["path"])
-                                    current_visualizing_algo_color = res["color"] # Màu cho visualization
-                                    if nodes_to_visualize_explored or nodes_to_visualize_path: visualization_active = True # Kích hoạt animation
-                                else: # Thuật toán đang xem không có kết quả (ví dụ: lỗi hoặc chưa chạy)
-                                    ui_panel_manager.update_selected_algorithm_info(detailed_view_algo_name, "N/A", "N/A", "N/A")
-                            else: # Nếu đang ở chế độ "Overview / All Paths"
-                                ui_panel_manager.update_overview_summary(path_results, True) # Hiển thị bảng tóm tắt
-                                ui_panel_manager.update_selected_algorithm_info(None, None, None) # Ẩn/reset phần chi tiết
-
-                            # Hiển thị thông báo nếu không có thuật toán nào tìm được đường đi
-                            if not any_path_found_this_run and not visualization_active:
-                                UIMessageWindow(rect=pygame.Rect((TOTAL_SCREEN_WIDTH // 2 - 150, TOTAL_SCREEN_HEIGHT // 2 - 75), (300, 150)),
-                                    html_message="No path found by any algorithm.", manager=ui_manager, window_title="Search Result")
+                                cache_key = PathCache.make_key(game_grid, start_node_pos, end_node_pos,
+                                                               algo_config["func"], algo_config.get("heuristic"))
+                                lookup_start_time = time.perf_counter()
+                                cached_result = path_cache.get(cache_key)
+                                if cached_result is None:
+                                    algorithms_to_run.append((algo_config, cache_key))
+                                    continue
+                                lookup_ms = (time.perf_counter() - lookup_start_time) * 1000
+                                print(f"  {algo_config['name']}: cached result")
+                                if record_algorithm_result(path_results, active_agents, algo_config,
+                                                           (*cached_result, lookup_ms, lookup_ms, path_cache.search_stats(cache_key)),
+                                                           start_node_pos, agent_speed, game_grid):
+                                    any_path_found_this_run = True
+                            if ALGORITHM_EXECUTION_MODE == "parallel" and algorithms_to_run:
+                                # Mỗi thuật toán là một tác vụ trong pool; kết quả được thu ở mỗi frame (xem phần CẬP NHẬT).
+                                if algorithm_pool is None:
+                                    pool_workers = ALGORITHM_WORKERS or min(len(defined_algorithms), os.cpu_count() or 1)
+                                    algorithm_pool = ProcessPoolExecutor(max_workers=pool_workers, mp_context=multiprocessing.get_context("spawn"))
+                                # Lưới và đồ thị được đặt vào shared memory một lần cho cả lần chạy.
+                                shared_grid_snapshot = SharedGrid(game_grid, include_graph=current_graph_repr is not None, graph=current_graph_repr)
+                                for algo_config, cache_key in algorithms_to_run:
+                                    is_graph_based = algo_config.get("is_graph_based", True)
+                                    if is_graph_based and not current_graph_repr: continue # Bỏ qua nếu không có đồ thị
+                                    future = algorithm_pool.submit(run_search_task, shared_grid_snapshot.name, shared_grid_snapshot.specs,
+                                                                   algo_config["func"], algo_config.get("heuristic"), is_graph_based,
+                                                                   start_node_pos, end_node_pos, algo_config.get("reports_bound", False))
+                                    pending_algorithm_runs[algo_config["name"]] = (algo_config, future, cache_key)
+                            elif ALGORITHM_EXECUTION_MODE == "background" and algorithms_to_run:
+                                # Luồng nền chạy trên bản chụp copy-on-write của lưới (và vá đồ thị riêng của nó theo bản chụp);
+                                # kết quả được thu ở mỗi frame (xem phần CẬP NHẬT).
+                                if background_runner is None:
+                                    background_runner = BackgroundSearchRunner()
+                                # Chỉ thuật toán đang xem cần danh sách explored (để chạy animation khi có kết quả).
+                                background_runner.submit(game_grid.model.snapshot(), algorithms_to_run, start_node_pos, end_node_pos,
+                                                         keep_explored_for={detailed_view_algo_name})
+                                background_pending.update(algo_config["name"] for algo_config, _ in algorithms_to_run)
+                            elif ALGORITHM_EXECUTION_MODE == "stepped":
+                                # Mỗi frame chỉ dành SEARCH_STEP_BUDGET_MS cho tìm kiếm (xem phần CẬP NHẬT).
+                                # Thuật toán trên lưới chạy trên bản chụp copy-on-write, để người dùng sửa ô
+                                # trong lúc tìm không làm hỏng kết quả. Các node explored được vẽ trực tiếp khi
+                                # stream nên không giữ danh sách đầy đủ (chỉ giữ số lượng).
+                                grid_snapshot = game_grid.model.snapshot()
+                                for algo_config, cache_key in algorithms_to_run:
+                                    is_graph_based = algo_config.get("is_graph_based", True)
+                                    if is_graph_based and not current_graph_repr: continue # Bỏ qua nếu không có đồ thị
+                                    stepper = SearchStepper(algo_config["func"], current_graph_repr if is_graph_based else grid_snapshot,
+                                                            start_node_pos, end_node_pos, algo_config.get("heuristic"),
+                                                            keep_explored=False, stats=search_stats_for(algo_config))
+                                    stepping_runs.append((algo_config, cache_key, stepper))
+                            else:
+                                # Chạy lần lượt các thuật toán đã định nghĩa
+                                for algo_config, cache_key in algorithms_to_run:
+                                    algo_name = algo_config["name"]; algo_func = algo_config["func"]
+                                    heuristic = algo_config.get("heuristic")
+                                    is_graph_based = algo_config.get("is_graph_based", True)
+                                    
+                                    start_time = time.perf_counter(); cpu_start_time = time.process_time() # Bắt đầu đo thời gian
+                                    path, cost, explored_coords = (None, float('inf'), []) # Kết quả mặc định
+                                    search_stats = search_stats_for(algo_config) # Số liệu của lần chạy (nếu thuật toán ghi được)
+                                    stats_kwargs = {"stats": search_stats} if search_stats is not None else {}
+                                    try:
+                                        if is_graph_based: # Thuật toán dựa trên đồ thị
+                                            if not current_graph_repr: continue # Bỏ qua nếu không có đồ thị
+                                            if heuristic: path, cost, explored_coords = algo_func(current_graph_repr, start_node_pos, end_node_pos, heuristic, **stats_kwargs)
+                                            else: path, cost, explored_coords = algo_func(current_graph_repr, start_node_pos, end_node_pos, **stats_kwargs)
+                                        else: # Thuật toán dựa trên lưới (ví dụ: JPS)
+                                            if heuristic: path, cost, explored_coords = algo_func(game_grid, start_node_pos, end_node_pos, heuristic, **stats_kwargs)
+                                            else: path, cost, explored_coords = algo_func(game_grid, start_node_pos, end_node_pos, **stats_kwargs)
+                                        path_cache.put(cache_key, (path, cost, explored_coords), search_stats)
+                                    except Exception as e: print(f"  Error running {algo_name}: {e}") # In lỗi nếu có
+                                    
+                                    time_taken_ms = (time.perf_counter() - start_time) * 1000 # Tính thời gian (ms)
+                                    cpu_time_ms = (time.process_time() - cpu_start_time) * 1000
+                                    if record_algorithm_result(path_results, active_agents, algo_config,
+                                                               (path, cost, explored_coords, time_taken_ms, cpu_time_ms, search_stats or {}),
+                                                               start_node_pos, agent_speed, game_grid):
+                                        any_path_found_this_run = True # Đánh dấu đã tìm thấy đường đi
+                            if not pending_algorithm_runs and not stepping_runs and not background_pending:
+                                run_results_ready = True # Cập nhật UI ở phần CẬP NHẬT của frame này
 
                     elif ui_action == "reset_grid":
                         # Reset lưới, điểm bắt đầu/kết thúc, kết quả, agent
                         game_grid = create_grid(); start_node_pos = None; end_node_pos = None
-                        path_results.clear(); active_agents.clear()
+                        cancel_pending_runs(pending_algorithm_runs, shared_grid_snapshot); shared_grid_snapshot = None; stepping_runs.clear()
+                        if background_runner: background_runner.cancel(); background_pending.clear()
+                        path_results.clear(); active_agents.clear(); agent_planners.clear()
                         # Reset trạng thái animation và UI liên quan
                         visualization_active = False; animation_paused = False
                         if ui_panel_manager.pause_resume_button: ui_panel_manager.update_pause_button_text(animation_paused)
@@ -263,6 +381,7 @@ def main():
                     elif action_type == "algo_view_changed":
                         # Thay đổi thuật toán đang được xem chi tiết trên UI
                         detailed_view_algo_name = action_value
+                        live_streamed_algo = None # Các node đã hiển thị trực tiếp bị xóa cùng visualization cũ
                         # Reset animation và trạng thái explored/path trên lưới
                         visualization_active = False; animation_paused = False
                         if ui_panel_manager.pause_resume_button: ui_panel_manager.update_pause_button_text(animation_paused)
@@ -278,7 +397,7 @@ def main():
                             if detailed_view_algo_name in path_results: # Nếu thuật toán này đã có kết quả
                                 res = path_results[detailed_view_algo_name]
                                 # Cập nhật thông tin và chuẩn bị animation cho thuật toán mới
-                                ui_panel_manager.update_selected_algorithm_info(detailed_view_algo_name, res["cost"], len(res["explored"]), res["time_ms"])
+                                ui_panel_manager.update_selected_algorithm_info(detailed_view_algo_name, res["cost"], res["explored_count"], res["time_ms"])
                                 if res["explored"]: nodes_to_visualize_explored = list(res["explored"])
                                 if res["path"]: nodes_to_visualize_path = list(res["path"])
                                 current_visualizing_algo_color = res["color"]
@@ -299,7 +418,9 @@ def main():
                             new_start, new_end = apply_maze_to_grid(game_grid, selected_maze_name)
                             if new_start and new_end: # Nếu mê cung được tải thành công
                                 start_node_pos = new_start; end_node_pos = new_end
-                                path_results.clear(); active_agents.clear() # Xóa dữ liệu cũ
+                                cancel_pending_runs(pending_algorithm_runs, shared_grid_snapshot); shared_grid_snapshot = None; stepping_runs.clear()
+                                if background_runner: background_runner.cancel(); background_pending.clear()
+                                path_results.clear(); active_agents.clear(); agent_planners.clear() # Xóa dữ liệu cũ
                                 # Reset UI về chế độ overview
                                 detailed_view_algo_name = "Overview / All Paths"
                                 if ui_panel_manager.algo_dropdown: ui_panel_manager.algo_dropdown.selected_option = "Overview / All Paths"
@@ -335,18 +456,118 @@ def main():
                             elif current_build_mode == "set_end":
                                 if end_node_pos: game_grid[end_node_pos[0]][end_node_pos[1]].reset() # Xóa điểm kết thúc cũ
                                 if not node.is_start_type(): node.make_end(); end_node_pos = (r_clicked, c_clicked)
+                                agent_planners.clear() # Đích thay đổi => trạng thái D* Lite cũ không còn dùng được
                             elif current_build_mode == "set_wall":
-                                if not node.is_start_type() and not node.is_end_type(): node.make_obstacle()
+                                if not node.is_start_type() and not node.is_end_type(): node.make_obstacle(); map_edited_while_moving = True
                             elif current_build_mode == "set_trap":
-                                if not node.is_start_type() and not node.is_end_type(): node.make_trap()
+                                if not node.is_start_type() and not node.is_end_type(): node.make_trap(); map_edited_while_moving = True
                         elif event.button == 3: # Right Click (Chuột phải) - Xóa ô
                             if node.is_start_type(): start_node_pos = None
-                            elif node.is_end_type(): end_node_pos = None
+                            elif node.is_end_type(): end_node_pos = None; agent_planners.clear()
                             node.reset() # Reset ô về trạng thái mặc định (trống)
+                            map_edited_while_moving = True
 
         # --- CẬP NHẬT TRẠNG THÁI GAME ---
         ui_manager.update(time_delta) # Cập nhật UIManager của pygame_gui
         
+        # --- Thu kết quả của các thuật toán đang chạy song song ---
+        if pending_algorithm_runs:
+            finished_names = [name for name, (_, future, _) in pending_algorithm_runs.items() if future.done()]
+            for algo_name in finished_names:
+                algo_config, future, cache_key = pending_algorithm_runs.pop(algo_name)
+                try:
+                    result = future.result()
+                    path_cache.put(cache_key, result[:3], result[5])
+                except Exception as e:
+                    print(f"  Error running {algo_name}: {e}") # In lỗi nếu có
+                    result = (None, float('inf'), [], 0.0, 0.0, {})
+                if record_algorithm_result(path_results, active_agents, algo_config, result, start_node_pos, agent_speed, game_grid):
+                    any_path_found_this_run = True
+                if detailed_view_algo_name == "Overview / All Paths": # Hiển thị ngay kết quả vừa đến
+                    ui_panel_manager.update_overview_summary(path_results, True)
+            if not pending_algorithm_runs: # Thuật toán cuối cùng đã xong
+                shared_grid_snapshot.close(); shared_grid_snapshot = None
+                run_results_ready = True
+
+        # --- Thu kết quả của luồng nền (không chờ) ---
+        if background_pending:
+            for algo_config, cache_key, result, error in background_runner.drain():
+                if error is None:
+                    path_cache.put(cache_key, result[:3], result[5])
+                else:
+                    print(f"  Error running {algo_config['name']}: {error}") # In lỗi nếu có
+                background_pending.discard(algo_config["name"])
+                if record_algorithm_result(path_results, active_agents, algo_config, result, start_node_pos, agent_speed, game_grid):
+                    any_path_found_this_run = True
+                if detailed_view_algo_name == "Overview / All Paths": # Hiển thị ngay kết quả vừa đến
+                    ui_panel_manager.update_overview_summary(path_results, True)
+            if not background_pending: # Thuật toán cuối cùng đã xong
+                run_results_ready = True
+
+        # --- Chạy tiếp các tìm kiếm từng bước trong ngân sách thời gian của frame ---
+        search_deadline = time.perf_counter() + SEARCH_STEP_BUDGET_MS / 1000
+        while stepping_runs:
+            remaining_ms = (search_deadline - time.perf_counter()) * 1000
+            if remaining_ms <= 0:
+                break
+            algo_config, cache_key, stepper = stepping_runs[0]
+            if stepper.elapsed_ms == 0 and algo_config["name"] == detailed_view_algo_name:
+                live_streamed_algo = algo_config["name"] # Hiển thị trực tiếp từ node đầu tiên
+            try:
+                new_nodes, done = stepper.step(remaining_ms)
+            except Exception as e:
+                print(f"  Error running {algo_config['name']}: {e}") # In lỗi nếu có
+                new_nodes, done = [], True
+                stepper.result = (None, float('inf'), [])
+                run_stats = {}
+            else:
+                run_stats = {**(stepper.stats or {}), "explored_count": stepper.explored_count}
+                if done: path_cache.put(cache_key, stepper.result, run_stats)
+            if algo_config["name"] == live_streamed_algo == detailed_view_algo_name: # Vẽ ngay các node vừa mở rộng
+                for r_ex, c_ex in new_nodes:
+                    if 0 <= r_ex < GRID_ROWS and 0 <= c_ex < GRID_COLS:
+                        node_to_mark = game_grid[r_ex][c_ex]
+                        if not (node_to_mark.is_start_type() or node_to_mark.is_end_type() or node_to_mark.is_path):
+                            node_to_mark.is_explored = True
+            if done:
+                stepping_runs.pop(0)
+                if record_algorithm_result(path_results, active_agents, algo_config,
+                                           (*stepper.result, stepper.elapsed_ms, stepper.cpu_ms, run_stats),
+                                           start_node_pos, agent_speed, game_grid):
+                    any_path_found_this_run = True
+                if detailed_view_algo_name == "Overview / All Paths":
+                    ui_panel_manager.update_overview_summary(path_results, True)
+                if not stepping_runs:
+                    run_results_ready = True
+
+        if run_results_ready:
+            run_results_ready = False
+            # --- Cập nhật UI và chuẩn bị cho animation ---
+            print(f"  Total wait: {(time.perf_counter() - run_start_time) * 1000:.2f} ms ({ALGORITHM_EXECUTION_MODE})")
+            cache_stats = path_cache.stats()
+            print(f"  Path cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                  f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024:.0f} KiB)")
+            if detailed_view_algo_name != "Overview / All Paths": # Nếu đang xem chi tiết một thuật toán
+                if detailed_view_algo_name in path_results: # Nếu thuật toán đó có kết quả
+                    res = path_results[detailed_view_algo_name]
+                    ui_panel_manager.update_selected_algorithm_info(detailed_view_algo_name, res["cost"], res["explored_count"], res["time_ms"])
+                    # Chuẩn bị dữ liệu cho animation (các node explored đã được vẽ trực tiếp thì chỉ còn đường đi)
+                    if res["explored"] and live_streamed_algo != detailed_view_algo_name:
+                        nodes_to_visualize_explored = list(res["explored"])
+                    if res["path"]: nodes_to_visualize_path = list(res["path"])
+                    current_visualizing_algo_color = res["color"] # Màu cho visualization
+                    if nodes_to_visualize_explored or nodes_to_visualize_path: visualization_active = True # Kích hoạt animation
+                else: # Thuật toán đang xem không có kết quả (ví dụ: lỗi hoặc chưa chạy)
+                    ui_panel_manager.update_selected_algorithm_info(detailed_view_algo_name, "N/A", "N/A", "N/A")
+            else: # Nếu đang ở chế độ "Overview / All Paths"
+                ui_panel_manager.update_overview_summary(path_results, True) # Hiển thị bảng tóm tắt
+                ui_panel_manager.update_selected_algorithm_info(None, None, None) # Ẩn/reset phần chi tiết
+
+            # Hiển thị thông báo nếu không có thuật toán nào tìm được đường đi
+            if not any_path_found_this_run and not visualization_active:
+                UIMessageWindow(rect=pygame.Rect((TOTAL_SCREEN_WIDTH // 2 - 150, TOTAL_SCREEN_HEIGHT // 2 - 75), (300, 150)),
+                    html_message="No path found by any algorithm.", manager=ui_manager, window_title="Search Result")
+
         # Cập nhật animation của từng ô trên lưới (ví dụ: hiệu ứng trap nhấp nháy)
         for r_nodes in game_grid:
             for node_obj in r_nodes:
@@ -384,6 +605,20 @@ def main():
                     if ui_panel_manager.pause_resume_button: ui_panel_manager.update_pause_button_text(animation_paused)
                     break # Thoát khỏi vòng lặp while của viz_delay_timer
 
+        # Bản đồ bị sửa trong khi agent đang chạy: lập lại đường đi từ vị trí hiện tại của từng agent.
+        # D* Lite giữ trạng thái giữa các lần replan nên chỉ phần cây tìm kiếm bị ảnh hưởng được tính lại.
+        # Mọi agent cùng đích nên dùng chung MỘT bộ lập kế hoạch (tìm ngược từ đích): agent đầu tiên sửa cây,
+        # các agent sau chỉ mở rộng thêm phần còn thiếu quanh vị trí của mình.
+        if map_edited_while_moving:
+            map_edited_while_moving = False
+            for algo_name, agent_obj in active_agents.items():
+                if agent_obj.finished_path or not end_node_pos or agent_obj.flow_field is not None:
+                    continue # Agent theo trường hướng: trường tự tính lại ở lần tra kế tiếp
+                if end_node_pos not in agent_planners:
+                    agent_planners[end_node_pos] = DStarLite(game_grid, (agent_obj.row, agent_obj.col), end_node_pos)
+                path, cost, repaired = agent_obj.replan(agent_planners[end_node_pos])
+                print(f"  {algo_name} agent replanned from {(agent_obj.row, agent_obj.col)}: Cost={cost if path else 'N/A'}, Repaired={len(repaired)}")
+
         # Cập nhật vị trí các Agent (nếu có và đang di chuyển)
         for agent_obj in active_agents.values():
             if not agent_obj.finished_path: # Nếu agent chưa đi hết đường
@@ -428,6 +663,9 @@ def main():
         pygame.display.flip() # Cập nhật toàn bộ nội dung màn hình để hiển thị
 
     # --- Kết thúc Pygame khi vòng lặp chính dừng ---
+    cancel_pending_runs(pending_algorithm_runs, shared_grid_snapshot)
+    if background_runner: background_runner.close() # Dừng luồng nền
+    if algorithm_pool: algorithm_pool.shutdown(wait=False, cancel_futures=True) # Dừng các worker
     pygame.quit()
     sys.exit() # Thoát chương trình
 
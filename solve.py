@@ -0,0 +1,173 @@
+# solve.py
+"""
+Công cụ giải đường đi theo lô trên dòng lệnh, không mở giao diện (không gọi pygame.display.set_mode).
+Đọc một bản đồ (văn bản, MovingAI '.map', nén bit '.gridpack', hoặc file kịch bản JSON / MovingAI '.scen',
+xem src/map_io.py) và một dòng truy vấn
+start/goal từ stdin hoặc file; ghi kết quả ra stdout dạng NDJSON (mỗi truy vấn một dòng JSON) ngay trong
+lúc giải. Đồ thị CSR được dựng một lần và dùng lại cho mọi truy vấn; đầu ra được flush theo từng lô
+(`--batch-size`, dùng 1 khi cần trả lời ngay từng truy vấn, ví dụ khi chạy qua pipe hai chiều).
+
+Định dạng truy vấn (mỗi dòng một truy vấn, dòng trống và dòng bắt đầu bằng '#' được bỏ qua):
+    sr sc gr gc                                  (4 số nguyên, cách nhau bởi khoảng trắng hoặc dấu phẩy)
+    {"id": ..., "start": [sr, sc], "goal": [gr, gc]}   ("id" tùy chọn, được chép sang kết quả)
+Kết quả: {"query": số thứ tự, "id"?, "start", "goal", "algorithm", "found", "cost", "path", "expanded",
+"time_ms", "suboptimality_bound"?}; "suboptimality_bound" chỉ có với thuật toán ghi được giới hạn thực tế của
+lần chạy (Weighted A*, ARA*). Truy vấn lỗi cho {"query", "error"} và công cụ tiếp tục với truy vấn sau.
+
+Cách chạy (từ thư mục gốc của project):
+    python solve.py maps/level1.txt --algorithm "A*" < queries.txt > paths.ndjson
+    python solve.py scenario.json                     (dùng các truy vấn trong file kịch bản)
+    echo "0 0 20 20" | python solve.py maps/level1.txt --batch-size 1
+"""
+import argparse
+import json
+import sys
+import time
+
+from src.csr_graph import create_csr_graph_from_grid
+from src.grid_model import CELL_OBSTACLE
+from src.map_io import load_map, load_scenario
+from src.registry import ALGORITHM_NAMES, run_algorithm
+
+
+def parse_query(line):
+    """
+    Đọc một dòng truy vấn.
+
+    Returns:
+        tuple: (start_rc, goal_rc, query_id hoặc None), hoặc None nếu dòng trống / chú thích.
+
+    Raises:
+        ValueError: Dòng không đúng định dạng.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        query = json.loads(line)
+        start, goal = query["start"], query["goal"]
+        if len(start) != 2 or len(goal) != 2:
+            raise ValueError("'start' and 'goal' must be [row, col]")
+        return (int(start[0]), int(start[1])), (int(goal[0]), int(goal[1])), query.get("id")
+    values = [int(value) for value in line.replace(",", " ").split()]
+    if len(values) != 4:
+        raise ValueError(f"Expected 4 integers 'sr sc gr gc', got {len(values)}")
+    return (values[0], values[1]), (values[2], values[3]), None
+
+
+def check_endpoint(grid_model, rc, label):
+    """Báo lỗi nếu ô `rc` nằm ngoài lưới hoặc là tường."""
+    r, c = rc
+    if not (0 <= r < grid_model.rows and 0 <= c < grid_model.cols):
+        raise ValueError(f"{label} {list(rc)} is outside the {grid_model.rows}x{grid_model.cols} grid")
+    if grid_model.cell_types[r, c] == CELL_OBSTACLE:
+        raise ValueError(f"{label} {list(rc)} is an obstacle")
+
+
+def solve_stream(grid_model, graph, queries, algorithm, output, batch_size, include_path=True):
+    """
+    Giải lần lượt các truy vấn và ghi kết quả NDJSON, flush sau mỗi `batch_size` dòng.
+
+    Args:
+        grid_model (GridModel): Lưới.
+        graph (CSRGraph): Đồ thị CSR đã dựng sẵn của lưới (dùng lại cho mọi truy vấn).
+        queries (iterable): Các dòng truy vấn (str) hoặc các bộ (start_rc, goal_rc) đã tách sẵn.
+        algorithm (str): Tên thuật toán trong src.registry.ALGORITHMS.
+        output (file): Luồng ghi kết quả.
+        batch_size (int): Số kết quả mỗi lần flush.
+        include_path (bool): Ghi cả danh sách ô của đường đi.
+
+    Returns:
+        tuple: (số truy vấn đã giải, số truy vấn lỗi).
+    """
+    pending = []
+    solved = failed = 0
+    for query in queries:
+        record = {"query": solved + failed} # Số thứ tự truy vấn (không tính dòng trống / chú thích)
+        try:
+            if isinstance(query, str):
+                parsed = parse_query(query)
+                if parsed is None:
+                    continue
+                start_rc, goal_rc, query_id = parsed
+            else:
+                (start_rc, goal_rc), query_id = query, None
+            if query_id is not None:
+                record["id"] = query_id
+            check_endpoint(grid_model, start_rc, "start")
+            check_endpoint(grid_model, goal_rc, "goal")
+            search_stats = {}
+            start_time = time.perf_counter()
+            path, cost, explored = run_algorithm(algorithm, grid_model, graph, start_rc, goal_rc, search_stats)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            record.update(start=list(start_rc), goal=list(goal_rc), algorithm=algorithm, found=bool(path),
+                          cost=float(cost) if path else None, expanded=len(explored), time_ms=round(elapsed_ms, 3))
+            if search_stats.get("suboptimality_bound") is not None:
+                record["suboptimality_bound"] = round(search_stats["suboptimality_bound"], 6)
+            if include_path:
+                record["path"] = [list(rc) for rc in path] if path else None
+            solved += 1
+        except (ValueError, KeyError, TypeError) as error: # Truy vấn hỏng không dừng cả luồng
+            record["error"] = str(error)
+            failed += 1
+        pending.append(json.dumps(record))
+        if len(pending) >= batch_size:
+            output.write("\n".join(pending) + "\n")
+            output.flush()
+            pending.clear()
+    if pending:
+        output.write("\n".join(pending) + "\n")
+        output.flush()
+    return solved, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve start/goal queries on a map without starting the GUI; "
+                                                 "writes newline-delimited JSON to stdout.")
+    parser.add_argument("map", help="Map file (.txt, MovingAI .map, .gridpack) or scenario file (.json, MovingAI .scen)")
+    parser.add_argument("--queries", metavar="FILE",
+                        help="Query file ('-' for stdin). Default: stdin, or the scenario's own queries")
+    parser.add_argument("--algorithm", default="A*", choices=ALGORITHM_NAMES, metavar="NAME",
+                        help=f"One of: {', '.join(ALGORITHM_NAMES)} (default: A*)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Results per output flush (default: 64)")
+    parser.add_argument("--no-path", action="store_true", help="Omit the path cells from each result")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    try:
+        if args.map.lower().endswith((".json", ".scen")):
+            scenario = load_scenario(args.map)
+            grid_model, scenario_queries = scenario["model"], scenario["queries"]
+        else:
+            grid_model, _, _ = load_map(args.map)
+            scenario_queries = None
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Cannot load map {args.map}: {error}", file=sys.stderr)
+        return 2
+
+    start_time = time.perf_counter()
+    graph = create_csr_graph_from_grid(grid_model)
+    print(f"Loaded {grid_model.rows}x{grid_model.cols} map, graph built in "
+          f"{(time.perf_counter() - start_time) * 1000:.2f} ms", file=sys.stderr)
+
+    query_file = None
+    if args.queries and args.queries != "-":
+        query_file = open(args.queries, encoding="utf-8")
+        queries = query_file
+    elif args.queries is None and scenario_queries is not None:
+        queries = scenario_queries
+    else:
+        queries = sys.stdin
+    try:
+        solved, failed = solve_stream(grid_model, graph, queries, args.algorithm, sys.stdout,
+                                      args.batch_size, include_path=not args.no_path)
+    finally:
+        if query_file:
+            query_file.close()
+    print(f"{solved} queries solved, {failed} rejected", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,6 +28,7 @@ class Agent:
         
         self.name = name # Tên của agent
         self.path_nodes = [] # Danh sách các tuple (row, col) tạo thành đường đi
+        self.flow_field = None # Trường hướng dùng chung (src/flow_field.py) thay cho path_nodes, nếu có
         self.current_path_index = 0 # Chỉ số của node tiếp theo trên đường đi cần đến
         self.speed = speed # Tốc độ di chuyển (ô/giây)
         self.finished_path = True # Cờ cho biết agent đã hoàn thành đường đi chưa (ban đầu là True)
@@ -61,6 +62,7 @@ class Agent:
                                                      Nếu là None hoặc list rỗng, agent sẽ không có đường đi.
         """
         self.path_nodes = new_path_nodes if new_path_nodes else [] # Gán đường đi mới
+        self.flow_field = None # Đi theo đường đi riêng, không theo trường hướng
         self.current_path_index = 0 # Reset chỉ số về node đầu tiên
         self.finished_path = not bool(self.path_nodes) # True nếu path rỗng, False nếu có path
         self.dust_particles.clear() # Xóa các hạt bụi cũ
@@ -80,14 +82,68 @@ class Agent:
             self.is_moving_for_dust = False # Không di chuyển, không tạo bụi
 
 
+    def follow_field(self, flow_field, start_node_rc=None):
+        """
+        Cho agent đi theo một trường hướng dùng chung thay vì đường đi riêng: ở mỗi ô, ô kế tiếp
+        được tra trong trường (trường tự tính lại khi bản đồ đổi, nên không cần replan).
+
+        Args:
+            flow_field (FlowField): Trường hướng đến đích.
+            start_node_rc (tuple, optional): Đặt agent về ô này trước khi đi (mặc định: vị trí hiện tại).
+        """
+        self.path_nodes = []
+        self.current_path_index = 0
+        self.flow_field = flow_field
+        self.dust_particles.clear()
+        if start_node_rc is not None:
+            self.row, self.col = start_node_rc
+            self.x_center = self.col * CELL_SIZE + CELL_SIZE // 2
+            self.y_center = self.row * CELL_SIZE + CELL_SIZE // 2
+            self.angle = 0
+        self.finished_path = flow_field.next_cell((self.row, self.col)) is None # Đã ở đích / không đến được
+        if not self.finished_path:
+            self._update_angle_to_next_node()
+        if self.original_image:
+            self.image_to_draw = pygame.transform.rotate(self.original_image, self.angle)
+
+    def _next_node(self):
+        """Ô kế tiếp cần đến: tra trong trường hướng, hoặc phần tử kế tiếp của path_nodes. None nếu không còn."""
+        if self.flow_field is not None:
+            return self.flow_field.next_cell((self.row, self.col))
+        if self.current_path_index + 1 < len(self.path_nodes):
+            return self.path_nodes[self.current_path_index + 1]
+        return None
+
+    def replan(self, planner):
+        """
+        Lập lại đường đi từ vị trí hiện tại (self.row, self.col) khi bản đồ thay đổi giữa chừng.
+        Khác với `set_path`, agent không bị đưa về đầu đường đi: nó tiếp tục từ vị trí pixel hiện tại.
+
+        Args:
+            planner (DStarLite): Bộ lập kế hoạch tăng dần giữ trạng thái giữa các lần replan.
+
+        Returns:
+            tuple: (path, cost, explored_nodes) của lần replan.
+        """
+        planner.move_start((self.row, self.col))
+        path, cost, explored = planner.replan()
+        self.path_nodes = path if path else []
+        self.flow_field = None
+        self.current_path_index = 0
+        self.finished_path = len(self.path_nodes) < 2 # Không còn đường đi (hoặc đã ở đích) => dừng
+        if self.finished_path:
+            self.is_moving_for_dust = False
+        return path, cost, explored
+
     def _update_angle_to_next_node(self):
         """
         Hàm nội bộ để tính toán và cập nhật góc xoay của agent
         sao cho nó hướng về node tiếp theo trên đường đi.
         """
         # Kiểm tra xem có node tiếp theo không
-        if self.current_path_index + 1 < len(self.path_nodes):
-            next_r, next_c = self.path_nodes[self.current_path_index + 1] # Lấy tọa độ node tiếp theo
+        next_node = self._next_node()
+        if next_node is not None:
+            next_r, next_c = next_node # Lấy tọa độ node tiếp theo
             # Tính tọa độ pixel trung tâm của node tiếp theo
             target_x = next_c * CELL_SIZE + CELL_SIZE // 2
             target_y = next_r * CELL_SIZE + CELL_SIZE // 2
@@ -167,13 +223,16 @@ class Agent:
         """
         self.is_moving_for_dust = False # Reset cờ di chuyển cho hiệu ứng bụi
         # Kiểm tra xem agent có đang trên đường đi và chưa đến node cuối cùng không
-        if not self.finished_path and self.path_nodes and self.current_path_index < len(self.path_nodes) - 1:
+        next_node = self._next_node() if not self.finished_path else None
+        if next_node is None and self.flow_field is not None:
+            self.finished_path = True # Đã đến đích (hoặc bản đồ đổi khiến đích không còn đến được)
+        if next_node is not None:
             self._update_angle_to_next_node() # Cập nhật góc xoay trước khi di chuyển
             if self.original_image: # Xoay sprite nếu có
                 self.image_to_draw = pygame.transform.rotate(self.original_image, self.angle)
 
             # Lấy tọa độ (hàng, cột) của node đích tiếp theo
-            target_r, target_c = self.path_nodes[self.current_path_index + 1]
+            target_r, target_c = next_node
             # Tính tọa độ pixel trung tâm của node đích
             target_x_center = target_c * CELL_SIZE + CELL_SIZE // 2
             target_y_center = target_r * CELL_SIZE + CELL_SIZE // 2
@@ -194,7 +253,9 @@ class Agent:
                 self.row, self.col = target_r, target_c # Cập nhật vị trí lưới của agent
                 self.current_path_index += 1 # Chuyển sang node tiếp theo trên đường đi
                 # Kiểm tra xem đã đến node cuối cùng của đường đi chưa
-                if self.current_path_index >= len(self.path_nodes) - 1:
+                if self.flow_field is not None:
+                    self.finished_path = self.flow_field.next_cell((self.row, self.col)) is None
+                elif self.current_path_index >= len(self.path_nodes) - 1:
                     self.finished_path = True # Đánh dấu hoàn thành đường đi
                 self.is_moving_for_dust = True # Vẫn coi là di chuyển khi snap tới điểm để tạo bụi
             else:
@@ -271,6 +332,7 @@ class Agent:
         self.x_center = self.col * CELL_SIZE + CELL_SIZE // 2
         self.y_center = self.row * CELL_SIZE + CELL_SIZE // 2
         self.path_nodes = [] # Xóa đường đi
+        self.flow_field = None # Bỏ trường hướng (nếu có)
         self.current_path_index = 0 # Reset chỉ số
         self.finished_path = True # Đánh dấu đã hoàn thành (vì không có path)
         self.angle = 0 # Reset góc
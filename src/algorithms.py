@@ -2,6 +2,9 @@
 import heapq  # Dùng cho hàng đợi ưu tiên (priority queue) trong A*, Greedy BFS, JPS, Bi-A*
 import collections # Dùng cho hàng đợi (queue) trong BFS
 import math # Cần cho sqrt trong heuristic_euclidean và chi phí đường chéo
+from src.grid_model import as_grid_model, CELL_OBSTACLE # Lưới dạng mảng (loại ô + chi phí)
+from src.jps_plus import jump_tables_for # Bảng khoảng cách nhảy cho JPS+
+from src.components import is_unreachable # Kiểm tra O(1) start/goal khác thành phần liên thông
 
 # --- HEURISTICS ---
 # Các hàm heuristic ước lượng chi phí từ một node đến node đích.
@@ -37,6 +40,23 @@ def heuristic_euclidean(node_a_rc, node_b_rc):
     dc = node_a_rc[1] - node_b_rc[1]  # Chênh lệch cột
     return math.sqrt(dr*dr + dc*dc) # Công thức Pythagoras
 
+def heuristic_octile(node_a_rc, node_b_rc):
+    """
+    Tính khoảng cách octile giữa hai node: số bước chéo (chi phí căn 2) cộng số bước thẳng còn lại.
+    Đây là chi phí chính xác trên lưới trống 8 hướng, nên là heuristic chấp nhận được và nhất quán
+    (consistent) với đồ thị có đường chéo, trong khi Manhattan đánh giá quá cao các bước chéo.
+
+    Args:
+        node_a_rc (tuple): Tọa độ (row, col) của node A.
+        node_b_rc (tuple): Tọa độ (row, col) của node B.
+
+    Returns:
+        float: Khoảng cách octile.
+    """
+    dr = abs(node_a_rc[0] - node_b_rc[0])
+    dc = abs(node_a_rc[1] - node_b_rc[1])
+    return (dr + dc) + (math.sqrt(2) - 2) * min(dr, dc) # max - min thẳng + min chéo
+
 def heuristic_zero(node_a_rc, node_b_rc):
     """
     Heuristic bằng không. Khi sử dụng heuristic này, thuật toán A* sẽ hoạt động
@@ -51,6 +71,48 @@ def heuristic_zero(node_a_rc, node_b_rc):
     """
     return 0
 
+# --- CHẠY TỪNG BƯỚC ---
+# Một số thuật toán được viết dưới dạng generator "*_steps": mỗi lần yield trả về list các node vừa
+# được mở rộng, và giá trị return (StopIteration.value) là kết quả (path, cost, explored_nodes).
+# Hàm tìm đường thông thường chỉ việc chạy generator đến hết (`run_steps`); src/stepper.py dùng
+# chính generator đó để chạy tìm kiếm theo từng lát thời gian mỗi frame.
+
+# Số node mở rộng giữa hai lần yield của các generator "*_steps" (xem src/stepper.py):
+# đủ nhỏ để một lát thời gian vài ms có thể dừng đúng hạn, đủ lớn để chi phí yield không đáng kể.
+STEP_EXPANSIONS = 128
+
+def run_steps(steps):
+    """
+    Chạy một generator "*_steps" đến hết.
+
+    Args:
+        steps (generator): Generator tìm kiếm.
+
+    Returns:
+        tuple: Kết quả (path, cost, explored_nodes) của generator.
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+def flush_explored(explored, batch, record_explored):
+    """
+    Generator dùng ngay trước `return` của các generator "*_steps": yield lô node mở rộng cuối cùng
+    (chưa đủ STEP_EXPANSIONS node, nếu có) và nối nó vào `explored` khi record_explored là True.
+    Nhờ vậy mọi node mở rộng đều được yield đúng một lần, kể cả khi người gọi không giữ danh sách đầy đủ.
+
+    Args:
+        explored (list): Danh sách explored đầy đủ (rỗng nếu không ghi).
+        batch (list): Các node mở rộng chưa được yield.
+        record_explored (bool): Có ghi vào `explored` hay không.
+    """
+    if batch:
+        yield batch
+        if record_explored:
+            explored += batch
+
 # --- GRAPH REPRESENTATION ---
 # Lớp Graph để biểu diễn lưới dưới dạng đồ thị, nơi các node là các ô
 # và các cạnh là các đường di chuyển hợp lệ giữa các ô.
@@ -121,6 +183,25 @@ class Graph:
 def a_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan):
     """
     Thực hiện thuật toán A* để tìm đường đi ngắn nhất từ start_node đến goal_node.
+    Trả về ngay (không mở rộng node nào) nếu start và goal khác thành phần liên thông.
+
+    Args:
+        graph (Graph): Đối tượng đồ thị chứa các node và cạnh.
+        start_node_rc (tuple): Tọa độ (row, col) của node bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) của node đích.
+        heuristic_func (function): Hàm heuristic để ước lượng chi phí.
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - xem `_a_star_search`.
+    """
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        return None, float("inf"), []
+    return _a_star_search(graph, start_node_rc, goal_node_rc, heuristic_func)
+
+def _a_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan):
+    """
+    Phần chính của A* (không kiểm tra thành phần liên thông trước), dùng thẳng cho các "đồ thị" con
+    như cụm / hành lang của HPA* (src/hpa_star.py), nơi nhãn thành phần của toàn lưới không áp dụng.
     A* sử dụng hàm f_cost = g_cost + h_cost, trong đó:
     - g_cost: chi phí thực tế từ node bắt đầu đến node hiện tại.
     - h_cost: chi phí ước lượng (heuristic) từ node hiện tại đến node đích.
@@ -204,7 +285,9 @@ def dijkstra_search(graph, start_node_rc, goal_node_rc):
     Returns:
         tuple: (path, cost, explored_nodes) - tương tự A*.
     """
-    return a_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_zero)
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        return None, float("inf"), []
+    return _a_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_zero)
 
 def bfs_search(graph, start_node_rc, goal_node_rc):
     """
@@ -222,6 +305,8 @@ def bfs_search(graph, start_node_rc, goal_node_rc):
         tuple: (path, cost, explored_nodes)
                - cost ở đây là tổng trọng số thực tế của các cạnh trên đường đi.
     """
+    if is_unreachable(graph, start_node_rc, goal_node_rc): # Không có đường: khỏi duyệt cả thành phần của start
+        return None, float("inf"), []
     # queue là một hàng đợi (FIFO) lưu các node cần được xem xét.
     # Mỗi phần tử: (node, path_list, accumulated_actual_cost)
     queue = collections.deque([(start_node_rc, [start_node_rc], 0)])
@@ -262,6 +347,8 @@ def greedy_bfs_search(graph, start_node_rc, goal_node_rc, heuristic_func=heurist
         tuple: (path, cost, explored_nodes)
                - cost ở đây là tổng trọng số thực tế của các cạnh trên đường đi tìm được.
     """
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        return None, float("inf"), []
     # open_set là hàng đợi ưu tiên, sắp xếp theo heuristic_to_goal.
     # (heuristic_to_goal, accumulated_g_cost, node, path_list)
     # accumulated_g_cost được mang theo để tính chi phí cuối cùng của đường đi, không dùng để sắp xếp.
@@ -301,7 +388,7 @@ def greedy_bfs_search(graph, start_node_rc, goal_node_rc, heuristic_func=heurist
 
 # --- JPS HELPER FUNCTIONS (Đã được comment chi tiết và có chỉnh sửa) ---
 # Comment này cho biết các hàm helper dưới đây đã trải qua quá trình chỉnh sửa/cải thiện.
-def _is_walkable_jps(r, c, grid_data):
+def _is_walkable_jps(r, c, grid_model):
     """
     Kiểm tra xem một ô (r, c) có thể đi qua được không trong ngữ cảnh JPS.
     Một ô có thể đi qua nếu nó nằm trong biên của lưới và không phải là chướng ngại vật.
@@ -309,18 +396,15 @@ def _is_walkable_jps(r, c, grid_data):
     Args:
         r (int): Chỉ số hàng của ô.
         c (int): Chỉ số cột của ô.
-        grid_data (list of list of GridNode): Dữ liệu lưới game, chứa thông tin về các ô.
+        grid_model (GridModel): Mô hình lưới dạng mảng (loại ô + chi phí).
 
     Returns:
         bool: True nếu ô (r, c) đi qua được, False nếu không.
     """
-    rows, cols = len(grid_data), len(grid_data[0]) # Lấy kích thước của lưới
-    # Kiểm tra xem (r, c) có nằm ngoài biên không
-    if not (0 <= r < rows and 0 <= c < cols): return False
-    # Kiểm tra xem ô đó có phải là chướng ngại vật không
-    return not grid_data[r][c].is_obstacle_type()
+    # Kích thước lưới được lưu sẵn trong GridModel, kiểm tra biên và loại ô trên mảng.
+    return grid_model.is_walkable(r, c)
 
-def _get_node_actual_cost_jps(r, c, grid_data, is_diagonal_move=False): # Thêm tham số is_diagonal_move
+def _get_node_actual_cost_jps(r, c, grid_model, is_diagonal_move=False): # Thêm tham số is_diagonal_move
     """
     Lấy chi phí thực tế của ô (r,c), có nhân với math.sqrt(2) nếu đó là một bước di chuyển chéo.
     Điều này quan trọng khi các ô trên đường đi giữa hai jump point được tính chi phí.
@@ -328,7 +412,7 @@ def _get_node_actual_cost_jps(r, c, grid_data, is_diagonal_move=False): # Thêm
     Args:
         r (int): Chỉ số hàng của ô.
         c (int): Chỉ số cột của ô.
-        grid_data (list of list of GridNode): Dữ liệu lưới game.
+        grid_model (GridModel): Mô hình lưới dạng mảng.
         is_diagonal_move (bool, optional): True nếu bước di chuyển đến ô này là một bước chéo.
                                            Mặc định là False.
 
@@ -336,87 +420,94 @@ def _get_node_actual_cost_jps(r, c, grid_data, is_diagonal_move=False): # Thêm
         float: Chi phí của ô (đã nhân với sqrt(2) nếu cần), hoặc float('inf') nếu không đi qua được.
     """
     # Nếu ô không đi qua được, chi phí là vô cực
-    if not _is_walkable_jps(r, c, grid_data): return float('inf')
-    base_cost = grid_data[r][c].cost # Lấy chi phí cơ bản của ô từ grid_data
+    if not _is_walkable_jps(r, c, grid_model): return float('inf')
+    base_cost = float(grid_model.costs[r, c]) # Lấy chi phí cơ bản của ô từ mảng chi phí
     # Nếu là di chuyển chéo, nhân chi phí cơ bản với căn bậc hai của 2
     return base_cost * math.sqrt(2) if is_diagonal_move else base_cost
 
-def _jps_jump(current_rc, dr, dc, grid_data, start_rc, goal_rc): # start_rc không được sử dụng nhưng giữ lại để duy trì signature
+def _jps_jump(current_rc, dr, dc, grid_model, start_rc, goal_rc, jump_tables=None): # start_rc không được sử dụng nhưng giữ lại để duy trì signature
     """
-    Hàm đệ quy thực hiện "bước nhảy" trong JPS.
+    Thực hiện "bước nhảy" trong JPS.
     Tìm jump point (điểm nhảy) tiếp theo theo hướng (dr, dc) từ current_rc.
     Hàm này cố gắng nhảy càng xa càng tốt theo một hướng cho đến khi gặp:
     1. Biên hoặc chướng ngại vật.
     2. Đích (goal).
     3. Một "forced neighbor" (điểm mà từ đó có thể có đường đi tốt hơn không nằm trên đường thẳng hiện tại).
+    Việc quét từng ô được thực hiện bằng vòng lặp (không đệ quy theo từng ô) nên không chạm giới hạn
+    đệ quy của Python trên các hàng/cột trống dài. Nếu có `jump_tables` (JPS+), bước nhảy chỉ là tra bảng.
 
     Args:
         current_rc (tuple): Tọa độ (row, col) của điểm bắt đầu nhảy hiện tại.
         dr (int): Hướng thay đổi hàng (-1, 0, hoặc 1).
         dc (int): Hướng thay đổi cột (-1, 0, hoặc 1).
-        grid_data (list of list of GridNode): Dữ liệu lưới game.
+        grid_model (GridModel): Mô hình lưới dạng mảng.
         start_rc (tuple): Tọa độ (row, col) của điểm bắt đầu của toàn bộ thuật toán JPS.
                           (Trong phiên bản này, start_rc không được sử dụng trực tiếp trong logic nhảy).
         goal_rc (tuple): Tọa độ (row, col) của điểm đích của toàn bộ thuật toán JPS.
+        jump_tables (JumpTables, optional): Bảng khoảng cách nhảy đã đồng bộ với lưới (xem src/jps_plus.py).
 
     Returns:
         tuple or None: Tọa độ (row, col) của jump point tìm được, hoặc None nếu không có.
     """
-    # Tính toán tọa độ của ô tiếp theo dựa trên hướng nhảy (dr, dc)
-    next_r, next_c = current_rc[0] + dr, current_rc[1] + dc
-
-    # 1. Kiểm tra xem ô tiếp theo có đi được không (trong biên và không phải obstacle)
-    if not _is_walkable_jps(next_r, next_c, grid_data): return None # Nếu không, không có jump point
-    # 2. Nếu ô tiếp theo là điểm đích, thì đó chính là jump point cần tìm
-    if (next_r, next_c) == goal_rc: return (next_r, next_c)
-
-    # 3. Kiểm tra forced neighbors: (next_r, next_c) sẽ là jump point nếu nó có forced neighbor.
-    if dr != 0 and dc == 0: # Di chuyển dọc (Cardinal)
-        # Kiểm tra forced neighbor bên trái và phải
-        if (not _is_walkable_jps(next_r, next_c - 1, grid_data) and _is_walkable_jps(next_r + dr, next_c - 1, grid_data)) or \
-           (not _is_walkable_jps(next_r, next_c + 1, grid_data) and _is_walkable_jps(next_r + dr, next_c + 1, grid_data)):
-            return (next_r, next_c) # (next_r, next_c) là jump point
-    elif dc != 0 and dr == 0: # Di chuyển ngang (Cardinal)
-        # Kiểm tra forced neighbor phía trên và dưới
-        if (not _is_walkable_jps(next_r - 1, next_c, grid_data) and _is_walkable_jps(next_r - 1, next_c + dc, grid_data)) or \
-           (not _is_walkable_jps(next_r + 1, next_c, grid_data) and _is_walkable_jps(next_r + 1, next_c + dc, grid_data)):
-            return (next_r, next_c) # (next_r, next_c) là jump point
-    elif dr != 0 and dc != 0: # Di chuyển chéo (Diagonal)
-        # (next_r, next_c) là jump point nếu việc nhảy thẳng theo một trong hai thành phần
-        # (ngang (0,dc) hoặc dọc (dr,0)) từ (next_r, next_c) tìm được một jump point.
-        # Điều này có nghĩa là (next_r, next_c) có một forced neighbor theo hướng ngang hoặc dọc đó.
-        if _jps_jump((next_r, next_c), dr, 0, grid_data, start_rc, goal_rc) or \
-           _jps_jump((next_r, next_c), 0, dc, grid_data, start_rc, goal_rc):
-            return (next_r, next_c) # (next_r, next_c) là jump point
-        # Kiểm tra forced neighbor do "cắt góc" (simplified).
-        # Nếu một trong hai ô liền kề theo đường thẳng từ current_rc (ô (current_rc[0]+dr, current_rc[1])
-        # hoặc ô (current_rc[0], current_rc[1]+dc)) bị chặn, thì (next_r, next_c) có thể là một jump point.
-        # Điều này giúp phát hiện các jump point ở góc của các cấu trúc hình chữ L hoặc U.
-        if not _is_walkable_jps(current_rc[0]+dr, current_rc[1], grid_data) or \
-           not _is_walkable_jps(current_rc[0], current_rc[1]+dc, grid_data):
-            return (next_r, next_c) # Nếu một trong các đường đi thẳng từ current_rc bị chặn.
-
-    # 4. Đệ quy nhảy tiếp nếu không có forced neighbor hoặc chưa đến đích và có di chuyển
-    if dr != 0 or dc != 0: # Đảm bảo có sự di chuyển (dr hoặc dc khác 0)
-         # Tiếp tục nhảy từ (next_r, next_c) theo cùng hướng (dr, dc).
-         return _jps_jump((next_r, next_c), dr, dc, grid_data, start_rc, goal_rc)
-    
-    # Trường hợp này không nên xảy ra nếu (dr, dc) ban đầu khác (0,0).
-    return None
+    if jump_tables is not None: # JPS+: tra bảng thay vì quét
+        return jump_tables.jump(current_rc, dr, dc, goal_rc)
+
+    r, c = current_rc
+    while True:
+        # Tính toán tọa độ của ô tiếp theo dựa trên hướng nhảy (dr, dc)
+        next_r, next_c = r + dr, c + dc
+
+        # 1. Kiểm tra xem ô tiếp theo có đi được không (trong biên và không phải obstacle)
+        if not _is_walkable_jps(next_r, next_c, grid_model): return None # Nếu không, không có jump point
+        # 2. Nếu ô tiếp theo là điểm đích, thì đó chính là jump point cần tìm
+        if (next_r, next_c) == goal_rc: return (next_r, next_c)
+
+        # 3. Kiểm tra forced neighbors: (next_r, next_c) sẽ là jump point nếu nó có forced neighbor.
+        if dr != 0 and dc == 0: # Di chuyển dọc (Cardinal)
+            # Kiểm tra forced neighbor bên trái và phải
+            if (not _is_walkable_jps(next_r, next_c - 1, grid_model) and _is_walkable_jps(next_r + dr, next_c - 1, grid_model)) or \
+               (not _is_walkable_jps(next_r, next_c + 1, grid_model) and _is_walkable_jps(next_r + dr, next_c + 1, grid_model)):
+                return (next_r, next_c) # (next_r, next_c) là jump point
+        elif dc != 0 and dr == 0: # Di chuyển ngang (Cardinal)
+            # Kiểm tra forced neighbor phía trên và dưới
+            if (not _is_walkable_jps(next_r - 1, next_c, grid_model) and _is_walkable_jps(next_r - 1, next_c + dc, grid_model)) or \
+               (not _is_walkable_jps(next_r + 1, next_c, grid_model) and _is_walkable_jps(next_r + 1, next_c + dc, grid_model)):
+                return (next_r, next_c) # (next_r, next_c) là jump point
+        elif dr != 0 and dc != 0: # Di chuyển chéo (Diagonal)
+            # (next_r, next_c) là jump point nếu việc nhảy thẳng theo một trong hai thành phần
+            # (ngang (0,dc) hoặc dọc (dr,0)) từ (next_r, next_c) tìm được một jump point.
+            # Điều này có nghĩa là (next_r, next_c) có một forced neighbor theo hướng ngang hoặc dọc đó.
+            # (Hai lần gọi này là nhảy thẳng nên chỉ lồng thêm đúng một mức gọi hàm.)
+            if _jps_jump((next_r, next_c), dr, 0, grid_model, start_rc, goal_rc) or \
+               _jps_jump((next_r, next_c), 0, dc, grid_model, start_rc, goal_rc):
+                return (next_r, next_c) # (next_r, next_c) là jump point
+            # Kiểm tra forced neighbor do "cắt góc" (simplified).
+            # Nếu một trong hai ô liền kề theo đường thẳng từ ô hiện tại (ô (r+dr, c)
+            # hoặc ô (r, c+dc)) bị chặn, thì (next_r, next_c) có thể là một jump point.
+            # Điều này giúp phát hiện các jump point ở góc của các cấu trúc hình chữ L hoặc U.
+            if not _is_walkable_jps(r + dr, c, grid_model) or \
+               not _is_walkable_jps(r, c + dc, grid_model):
+                return (next_r, next_c) # Nếu một trong các đường đi thẳng từ ô hiện tại bị chặn.
+        else: # (dr, dc) = (0, 0): không có sự di chuyển
+            return None
+
+        # 4. Nhảy tiếp từ (next_r, next_c) theo cùng hướng (dr, dc).
+        r, c = next_r, next_c
 
 
 # --- JPS SEARCH (Cải thiện cách tính cost và logic tìm successors) ---
 # Comment này chỉ ra rằng hàm jps_search dưới đây đã có những cải tiến so với phiên bản trước đó,
 # đặc biệt là về cách tính chi phí và logic xác định các jump point kế tiếp.
-def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan):
+def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan, jump_tables=None):
     """
     Thực hiện thuật toán Jump Point Search (JPS).
 
     Args:
-        grid_data (list of list of GridNode): Dữ liệu lưới game.
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới game.
         start_rc (tuple): Tọa độ (row, col) của điểm bắt đầu.
         goal_rc (tuple): Tọa độ (row, col) của điểm đích.
         heuristic_func (function): Hàm heuristic để ước lượng chi phí từ một jump point đến đích.
+        jump_tables (JumpTables, optional): Bảng nhảy JPS+ của lưới; None thì quét từng ô như JPS thường.
 
     Returns:
         tuple: (path, cost, explored_nodes)
@@ -424,6 +515,20 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
                - cost (float): Chi phí của đường đi.
                - explored_nodes (list of tuples): Danh sách các jump point đã được khám phá.
     """
+    return run_steps(jps_steps(grid_data, start_rc, goal_rc, heuristic_func, jump_tables))
+
+def jps_steps(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan, jump_tables=None,
+              record_explored=True):
+    """
+    Generator của `jps_search` (cùng tham số): yield [jump point] sau mỗi lần mở rộng,
+    return (path, cost, explored_nodes). Với record_explored=False, explored_nodes trả về là list rỗng
+    (người gọi đã nhận từng jump point qua các lần yield).
+    """
+    grid_model = as_grid_model(grid_data) # Các helper JPS đọc trực tiếp từ mảng của GridModel.
+    # Khác thành phần liên thông (8 hướng: JPS được đi chéo giữa hai bức tường) => không cần quét.
+    if is_unreachable(grid_model, start_rc, goal_rc, corner_cutting=True):
+        return None, float("inf"), []
+
     # open_set: Hàng đợi ưu tiên (min-heap) chứa các jump point cần được xem xét.
     # (f_cost, g_cost, node_rc, parent_rc_of_node)
     open_set = []
@@ -436,6 +541,7 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
     g_costs = {start_rc: 0}
     # explored_for_viz: Danh sách các jump point đã được pop ra từ open_set và xử lý (để visualize).
     explored_for_viz = []
+    explored_set = set() # Tập tương ứng để kiểm tra trùng lặp trong O(1)
 
     while open_set: # Khi còn jump point trong open_set
         # Lấy jump point có f_cost nhỏ nhất.
@@ -452,8 +558,11 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
                                           # và chỉ được pop ra khi nó là tốt nhất tại thời điểm đó.
 
         # Thêm current_jp vào danh sách explored nếu nó chưa có (để tránh trùng lặp khi append).
-        if current_jp not in explored_for_viz:
-            explored_for_viz.append(current_jp)
+        if current_jp not in explored_set:
+            explored_set.add(current_jp)
+            if record_explored:
+                explored_for_viz.append(current_jp)
+            yield [current_jp] # Trả quyền điều khiển cho người gọi (chạy từng bước)
 
         # Nếu current_jp là điểm đích, đã tìm thấy đường đi.
         if current_jp == goal_rc:
@@ -474,7 +583,7 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
             # mà chi phí sẽ là của các ô KỂ TỪ ô thứ hai trên đường đi.
             current_path_actual_cost = 0.0
             # Nếu muốn tính cả cost của ô Start:
-            # current_path_actual_cost = _get_node_actual_cost_jps(start_rc[0], start_rc[1], grid_data, False)
+            # current_path_actual_cost = _get_node_actual_cost_jps(start_rc[0], start_rc[1], grid_model, False)
             # if current_path_actual_cost == float('inf'): current_path_actual_cost = 0.0
 
             # Nội suy các ô giữa các cặp jump point liên tiếp.
@@ -495,7 +604,7 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
                     # Xác định xem bước đi này có phải là bước chéo không.
                     is_diag_step_interp = (dr_step != 0 and dc_step != 0)
                     # Lấy chi phí của ô (curr_r, curr_c) vừa bước vào, có nhân với sqrt(2) nếu là chéo.
-                    cost_of_inter_cell = _get_node_actual_cost_jps(curr_r, curr_c, grid_data, is_diag_step_interp)
+                    cost_of_inter_cell = _get_node_actual_cost_jps(curr_r, curr_c, grid_model, is_diag_step_interp)
                     
                     # Nếu gặp chướng ngại vật trên đường nội suy (lỗi logic JPS).
                     if cost_of_inter_cell == float('inf'):
@@ -522,60 +631,60 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
         if parent_jp is None: # Nếu current_jp là node bắt đầu.
             # Xem xét tất cả 8 hướng nhảy nếu ô kế tiếp theo hướng đó đi được.
             for dr_init, dc_init in [(0,1), (0,-1), (1,0), (-1,0), (1,1), (1,-1), (-1,1), (-1,-1)]:
-                if _is_walkable_jps(current_jp[0] + dr_init, current_jp[1] + dc_init, grid_data):
+                if _is_walkable_jps(current_jp[0] + dr_init, current_jp[1] + dc_init, grid_model):
                     directions_to_jump.append((dr_init, dc_init))
         else: # Nếu current_jp không phải node bắt đầu (có parent_jp).
             if dr_norm != 0 and dc_norm != 0: # Nếu đến current_jp bằng cách di chuyển chéo.
                 # Natural neighbors (các hướng nhảy tự nhiên):
                 # 1. Hướng dọc (thành phần của hướng chéo cũ).
-                if _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1], grid_data):
+                if _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1], grid_model):
                     directions_to_jump.append((dr_norm, 0))
                 # 2. Hướng ngang (thành phần của hướng chéo cũ).
-                if _is_walkable_jps(current_jp[0], current_jp[1] + dc_norm, grid_data):
+                if _is_walkable_jps(current_jp[0], current_jp[1] + dc_norm, grid_model):
                     directions_to_jump.append((0, dc_norm))
                 # 3. Tiếp tục theo hướng chéo cũ.
-                if _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] + dc_norm, grid_data):
+                if _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] + dc_norm, grid_model):
                     directions_to_jump.append((dr_norm, dc_norm))
                 
                 # Forced neighbors (simplified for diagonal):
                 # Kiểm tra forced neighbor theo hướng "chéo ngược" so với thành phần ngang.
                 # Ví dụ: nếu đến từ (-1,-1) (lên-trái), dc_norm=-1. (current[0]+dr, current[1]-(-1)) -> (current[0]+dr, current[1]+1)
-                if not _is_walkable_jps(current_jp[0], current_jp[1] - dc_norm, grid_data) and \
-                   _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] - dc_norm, grid_data):
+                if not _is_walkable_jps(current_jp[0], current_jp[1] - dc_norm, grid_model) and \
+                   _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] - dc_norm, grid_model):
                     directions_to_jump.append((dr_norm, -dc_norm))
                 # Kiểm tra forced neighbor theo hướng "chéo ngược" so với thành phần dọc.
-                if not _is_walkable_jps(current_jp[0] - dr_norm, current_jp[1], grid_data) and \
-                   _is_walkable_jps(current_jp[0] - dr_norm, current_jp[1] + dc_norm, grid_data):
+                if not _is_walkable_jps(current_jp[0] - dr_norm, current_jp[1], grid_model) and \
+                   _is_walkable_jps(current_jp[0] - dr_norm, current_jp[1] + dc_norm, grid_model):
                     directions_to_jump.append((-dr_norm, dc_norm))
             else: # Nếu đến current_jp bằng cách di chuyển thẳng (dr_norm hoặc dc_norm là 0, nhưng không phải cả hai).
                 # Hướng nhảy thẳng tự nhiên.
-                if _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] + dc_norm, grid_data):
+                if _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] + dc_norm, grid_model):
                     directions_to_jump.append((dr_norm, dc_norm))
                 
                 # Kiểm tra forced neighbors cho di chuyển thẳng.
                 if dr_norm != 0: # Đang đi dọc (dc_norm là 0).
                     # Forced neighbor trái-chéo.
-                    if not _is_walkable_jps(current_jp[0], current_jp[1] - 1, grid_data) and \
-                       _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] - 1, grid_data):
+                    if not _is_walkable_jps(current_jp[0], current_jp[1] - 1, grid_model) and \
+                       _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] - 1, grid_model):
                         directions_to_jump.append((dr_norm, -1))
                     # Forced neighbor phải-chéo.
-                    if not _is_walkable_jps(current_jp[0], current_jp[1] + 1, grid_data) and \
-                       _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] + 1, grid_data):
+                    if not _is_walkable_jps(current_jp[0], current_jp[1] + 1, grid_model) and \
+                       _is_walkable_jps(current_jp[0] + dr_norm, current_jp[1] + 1, grid_model):
                         directions_to_jump.append((dr_norm, 1))
                 elif dc_norm != 0: # Đang đi ngang (dr_norm là 0).
                     # Forced neighbor lên-chéo.
-                    if not _is_walkable_jps(current_jp[0] - 1, current_jp[1], grid_data) and \
-                       _is_walkable_jps(current_jp[0] - 1, current_jp[1] + dc_norm, grid_data):
+                    if not _is_walkable_jps(current_jp[0] - 1, current_jp[1], grid_model) and \
+                       _is_walkable_jps(current_jp[0] - 1, current_jp[1] + dc_norm, grid_model):
                         directions_to_jump.append((-1, dc_norm))
                     # Forced neighbor xuống-chéo.
-                    if not _is_walkable_jps(current_jp[0] + 1, current_jp[1], grid_data) and \
-                       _is_walkable_jps(current_jp[0] + 1, current_jp[1] + dc_norm, grid_data):
+                    if not _is_walkable_jps(current_jp[0] + 1, current_jp[1], grid_model) and \
+                       _is_walkable_jps(current_jp[0] + 1, current_jp[1] + dc_norm, grid_model):
                         directions_to_jump.append((1, dc_norm))
         
         # Thực hiện các bước nhảy cho các hướng đã được xác định.
         actual_found_successors_jp = [] # Danh sách các jump point kế tiếp thực sự tìm được.
         for dr_s, dc_s in set(directions_to_jump): # Dùng set để loại bỏ các hướng trùng lặp.
-            jump_point = _jps_jump(current_jp, dr_s, dc_s, grid_data, start_rc, goal_rc)
+            jump_point = _jps_jump(current_jp, dr_s, dc_s, grid_model, start_rc, goal_rc, jump_tables)
             if jump_point: # Nếu tìm được một jump point.
                 actual_found_successors_jp.append(jump_point)
 
@@ -596,7 +705,7 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
                 # Xác định xem bước đi nhỏ này có phải là bước chéo không.
                 is_diag_seg_step = (dr_seg_step != 0 and dc_seg_step != 0)
                 # Lấy chi phí của ô (r_iter, c_iter) vừa bước vào.
-                cell_cost_in_segment = _get_node_actual_cost_jps(r_iter, c_iter, grid_data, is_diag_seg_step)
+                cell_cost_in_segment = _get_node_actual_cost_jps(r_iter, c_iter, grid_model, is_diag_seg_step)
                 
                 # Nếu gặp chướng ngại vật trên đoạn đường, chi phí là vô cực.
                 if cell_cost_in_segment == float('inf'):
@@ -620,6 +729,29 @@ def jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan)
                 
     # Nếu open_set rỗng mà chưa tìm thấy đích, nghĩa là không có đường đi.
     return None, float("inf"), explored_for_viz
+
+
+def jps_plus_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan):
+    """
+    JPS+: giống hệt `jps_search` nhưng mỗi bước nhảy được tra trong bảng khoảng cách tính trước
+    (8 hướng cho mỗi ô). Bảng được dựng ở lần chạy đầu trên một lưới và chỉ tính lại theo vùng
+    khi các ô thay đổi, nên rất nhanh trên bản đồ lớn, nhiều khoảng trống.
+
+    Args:
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới game.
+        start_rc (tuple): Tọa độ (row, col) của điểm bắt đầu.
+        goal_rc (tuple): Tọa độ (row, col) của điểm đích.
+        heuristic_func (function): Hàm heuristic để ước lượng chi phí từ một jump point đến đích.
+
+    Returns:
+        tuple: (path, cost, explored_nodes) như `jps_search`.
+    """
+    return run_steps(jps_plus_steps(grid_data, start_rc, goal_rc, heuristic_func))
+
+def jps_plus_steps(grid_data, start_rc, goal_rc, heuristic_func=heuristic_manhattan, record_explored=True):
+    """Generator của `jps_plus_search` (xem `jps_steps`)."""
+    grid_model = as_grid_model(grid_data)
+    return jps_steps(grid_model, start_rc, goal_rc, heuristic_func, jump_tables_for(grid_model), record_explored)
 # --- BIDIRECTIONAL A* SEARCH ---
 # Tìm kiếm A* từ cả điểm bắt đầu và điểm kết thúc đồng thời.
 # Hai quá trình tìm kiếm sẽ gặp nhau ở một điểm nào đó.
@@ -635,8 +767,21 @@ def bidirectional_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_fu
         heuristic_func (function): Hàm heuristic.
 
     Returns:
-        tuple: (path, cost, explored_nodes)
+        tuple: (path, cost, explored_nodes) - explored_nodes là các node đã mở rộng (ở một trong hai phía),
+               mỗi node một lần, theo thứ tự mở rộng.
+    """
+    return run_steps(bidirectional_a_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func))
+
+
+def bidirectional_a_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan,
+                               record_explored=True):
     """
+    Generator của `bidirectional_a_star_search` (cùng tham số): cứ mỗi STEP_EXPANSIONS node mới được mở rộng
+    thì yield list các node đó (lô cuối có thể ít hơn); return (path, cost, explored_nodes).
+    Với record_explored=False, explored_nodes trả về là list rỗng: chỉ giữ lô đang gom.
+    """
+    if is_unreachable(graph, start_node_rc, goal_node_rc): # Không cần mở rộng cả hai phía
+        return None, float('inf'), []
     # --- Khởi tạo cho tìm kiếm xuôi (Forward Search: start -> goal) ---
     # open_fwd: (f_approx, g_cost, node)
     # f_approx là ước lượng f_cost, dùng heuristic từ node hiện tại đến goal.
@@ -651,8 +796,9 @@ def bidirectional_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_fu
     g_bwd = {goal_node_rc: 0} # g_cost từ goal đến node trong tìm kiếm ngược.
     parent_bwd = {goal_node_rc: None} # Node cha trong tìm kiếm ngược.
     
-    # explored_..._viz: Set các node đã được pop ra từ open_set tương ứng (để visualize).
-    explored_fwd_viz = set(); explored_bwd_viz = set()
+    # explored: các node đã được pop ra từ một trong hai open_set (để visualize), mỗi node một lần.
+    explored = []; explored_set = set()
+    batch = [] # Các node mở rộng chưa yield
     
     # mu: Chi phí của đường đi tốt nhất đã tìm thấy qua một điểm gặp nhau.
     # Khởi tạo là vô cực.
@@ -681,7 +827,12 @@ def bidirectional_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_fu
 
         if expand_fwd: # --- Mở rộng tìm kiếm xuôi ---
             _, g_curr_f, u_f = heapq.heappop(open_fwd) # Lấy node u_f từ open_fwd.
-            explored_fwd_viz.add(u_f) # Thêm vào danh sách explored.
+            if u_f not in explored_set: # Thêm vào danh sách explored.
+                explored_set.add(u_f); batch.append(u_f)
+                if len(batch) == STEP_EXPANSIONS:
+                    yield batch
+                    if record_explored: explored += batch
+                    batch = []
 
             # Kiểm tra xem u_f đã được xử lý bởi tìm kiếm ngược chưa.
             if u_f in g_bwd:
@@ -706,7 +857,12 @@ def bidirectional_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_fu
                         heapq.heappush(open_fwd, (f_v_fwd, new_g_f, v_f))
         else: # --- Mở rộng tìm kiếm ngược ---
             _, g_curr_b, u_b = heapq.heappop(open_bwd) # Lấy node u_b từ open_bwd.
-            explored_bwd_viz.add(u_b)
+            if u_b not in explored_set:
+                explored_set.add(u_b); batch.append(u_b)
+                if len(batch) == STEP_EXPANSIONS:
+                    yield batch
+                    if record_explored: explored += batch
+                    batch = []
 
             # Kiểm tra xem u_b đã được xử lý bởi tìm kiếm xuôi chưa.
             if u_b in g_fwd:
@@ -729,6 +885,7 @@ def bidirectional_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_fu
                     if f_v_bwd < mu :
                         heapq.heappush(open_bwd, (f_v_bwd, new_g_b, v_b))
 
+    yield from flush_explored(explored, batch, record_explored)
     # --- Tái tạo đường đi ---
     if meeting_node: # Nếu đã tìm thấy một điểm gặp nhau tạo ra đường đi.
         path = []
@@ -743,13 +900,10 @@ def bidirectional_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_fu
         while curr is not None: path.append(curr); curr = parent_bwd.get(curr)
         
         final_path = path
-        # Kết hợp danh sách các node đã khám phá từ cả hai hướng cho visualization.
-        # Thứ tự có thể không hoàn toàn theo thời gian thực của cả hai quá trình.
-        combined_explored_viz = list(explored_fwd_viz.union(explored_bwd_viz))
-        return final_path, mu, combined_explored_viz
+        return final_path, mu, explored
         
     # Nếu không tìm thấy đường đi.
-    return None, float("inf"), list(explored_fwd_viz.union(explored_bwd_viz))
+    return None, float("inf"), explored
 
 
 # --- HÀM TIỆN ÍCH: TẠO ĐỒ THỊ TỪ LƯỚI ---
@@ -758,31 +912,36 @@ def create_graph_from_grid(grid_data):
     Tạo một đối tượng Graph từ dữ liệu lưới game (grid_data).
     Các ô không phải chướng ngại vật sẽ trở thành node trong đồ thị.
     Các cạnh được tạo giữa các node láng giềng hợp lệ.
+    Loại ô và chi phí được đọc từ mảng của GridModel (một lần chuyển sang list Python),
+    thay vì gọi `is_obstacle_type()` / `.cost` trên từng GridNode.
 
     Args:
-        grid_data (list of list of GridNode): Dữ liệu lưới.
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới.
 
     Returns:
         Graph: Đối tượng đồ thị biểu diễn lưới.
     """
     graph = Graph()
-    rows = len(grid_data)
-    cols = len(grid_data[0]) if rows > 0 else 0
+    grid_model = as_grid_model(grid_data)
+    rows, cols = grid_model.rows, grid_model.cols
+    # Chuyển mảng sang list lồng nhau một lần để truy cập từng ô nhanh trong vòng lặp Python.
+    obstacle_rows = (grid_model.cell_types == CELL_OBSTACLE).tolist()
+    cost_rows = grid_model.costs.tolist()
     allow_diagonal = True # Cho phép di chuyển chéo cho các thuật toán như A*, Dijkstra, Bi-A*.
                           # BFS và JPS có logic di chuyển riêng.
 
+    # Xác định các hướng di chuyển có thể có.
+    directions = [(0,1), (0,-1), (1,0), (-1,0)] # Hướng thẳng (Cardinal).
+    if allow_diagonal:
+        directions.extend([(1,1), (1,-1), (-1,1), (-1,-1)]) # Hướng chéo (Diagonal).
+    sqrt2 = math.sqrt(2)
+
     for r_idx in range(rows):
         for c_idx in range(cols):
-            current_grid_node_obj = grid_data[r_idx][c_idx]
             # Chỉ thêm node vào đồ thị nếu không phải là chướng ngại vật.
-            if not current_grid_node_obj.is_obstacle_type():
+            if not obstacle_rows[r_idx][c_idx]:
                 node_coord = (r_idx, c_idx)
                 graph.add_node(node_coord) # Thêm node hiện tại vào đồ thị.
-                
-                # Xác định các hướng di chuyển có thể có.
-                directions = [(0,1), (0,-1), (1,0), (-1,0)] # Hướng thẳng (Cardinal).
-                if allow_diagonal:
-                    directions.extend([(1,1), (1,-1), (-1,1), (-1,-1)]) # Hướng chéo (Diagonal).
 
                 # Duyệt qua các hướng để tìm láng giềng.
                 for dr, dc in directions:
@@ -790,26 +949,24 @@ def create_graph_from_grid(grid_data):
                     
                     # Kiểm tra xem láng giềng có nằm trong biên lưới không.
                     if 0 <= nr < rows and 0 <= nc < cols:
-                        neighbor_grid_node_obj = grid_data[nr][nc]
                         # Nếu láng giềng không phải chướng ngại vật.
-                        if not neighbor_grid_node_obj.is_obstacle_type():
+                        if not obstacle_rows[nr][nc]:
                             neighbor_coord = (nr, nc)
-                            cost_to_neighbor = neighbor_grid_node_obj.cost # Chi phí để đến láng giềng.
+                            cost_to_neighbor = cost_rows[nr][nc] # Chi phí để đến láng giềng.
                             
                             # Xử lý chi phí cho di chuyển chéo và ngăn "cắt góc" (corner cutting).
                             if dr != 0 and dc != 0 and allow_diagonal: # Nếu là di chuyển chéo.
                                 # Kiểm tra xem có đang cố gắng đi chéo qua góc của hai bức tường không.
                                 # Nếu cả hai ô liền kề theo đường thẳng (tạo thành góc) đều là chướng ngại vật,
                                 # thì không cho phép di chuyển chéo đó.
-                                if grid_data[r_idx + dr][c_idx].is_obstacle_type() and \
-                                   grid_data[r_idx][c_idx + dc].is_obstacle_type():
+                                if obstacle_rows[r_idx + dr][c_idx] and obstacle_rows[r_idx][c_idx + dc]:
                                     continue # Bỏ qua, không thêm cạnh này.
                                 
-                                cost_to_neighbor *= math.sqrt(2) # Chi phí đường chéo là cost * căn 2.
+                                cost_to_neighbor *= sqrt2 # Chi phí đường chéo là cost * căn 2.
                                 
                             # Thêm cạnh từ node hiện tại đến láng giềng.
                             graph.add_edge(node_coord, neighbor_coord, cost_to_neighbor)
                             # Ghi chú: Nếu đồ thị là vô hướng, việc thêm cạnh ngược lại (neighbor -> current)
                             # sẽ tự động được xử lý khi vòng lặp duyệt đến ô neighbor_coord.
                             # graph.add_edge(neighbor_coord, node_coord, cost_to_neighbor)
-    return graph
\ No newline at end of file
+    return graph
@@ -0,0 +1,141 @@
+# src/background.py
+# Chạy các tìm kiếm trên một luồng nền để vòng lặp pygame không bị chặn.
+# Mỗi lần chạy nhận một bản chụp chỉ đọc của lưới (GridModel.snapshot, copy-on-write) nên người dùng
+# vẫn sửa được lưới trong lúc tìm. Luồng nền chạy lần lượt từng thuật toán qua SearchStepper theo từng
+# lát ngắn và kiểm tra yêu cầu hủy giữa các lát; lần chạy mới hủy lần chạy cũ. Kết quả được đưa vào
+# hàng đợi để vòng lặp chính lấy ra mỗi frame (`drain`), không bao giờ phải chờ.
+# Các bản chụp của một lưới dùng chung nhật ký thay đổi, nên đồ thị CSR của luồng nền và các bảng tiền xử lý
+# (JPS+, HPA*, thành phần liên thông, ...) chỉ được vá các ô đã sửa giữa hai lần chạy.
+import queue
+import threading
+import time
+from config import BACKGROUND_SLICE_MS
+from src.csr_graph import update_csr_graph
+from src.registry import search_stats_for
+from src.stepper import SearchStepper
+
+_STOP = object() # Tín hiệu dừng luồng nền (xem `close`)
+
+
+class BackgroundSearchRunner:
+    """
+    Một luồng nền chạy các lần tìm kiếm được gửi qua `submit`.
+    Mỗi kết quả lấy từ `drain` là (algo_config, cache_key, result, error):
+    - result: (path, cost, explored_nodes, time_ms, cpu_time_ms, search_stats) như các chế độ chạy khác;
+      search_stats["explored_count"] là số node đã mở rộng (explored_nodes rỗng nếu không giữ danh sách),
+    - error: chuỗi mô tả lỗi nếu thuật toán ném ngoại lệ (khi đó result là kết quả rỗng).
+    """
+    def __init__(self, slice_ms=BACKGROUND_SLICE_MS):
+        """
+        Args:
+            slice_ms (float): Độ dài mỗi lát tìm kiếm giữa hai lần kiểm tra hủy (mili giây).
+        """
+        self.slice_ms = slice_ms
+        self._jobs = queue.Queue() # Các lần chạy chờ luồng nền xử lý
+        self._results = queue.Queue() # (run_id, algo_config, cache_key, result, error)
+        self._run_id = 0 # Mã của lần chạy mới nhất
+        self._cancel_event = None # Event của lần chạy đang hoạt động (None nếu không có)
+        self._graph = None # Đồ thị CSR riêng của luồng nền, giữ lại và vá tăng dần giữa các lần chạy
+        self._thread = threading.Thread(target=self._worker, name="background-search", daemon=True)
+        self._thread.start()
+
+    @property
+    def active(self):
+        """True nếu có lần chạy chưa bị hủy (có thể vẫn còn kết quả chưa lấy)."""
+        return self._cancel_event is not None
+
+    def submit(self, grid_snapshot, algorithms_to_run, start_rc, goal_rc, keep_explored_for=()):
+        """
+        Gửi một lần chạy mới; lần chạy trước (nếu còn) bị hủy và các kết quả còn lại của nó bị bỏ.
+
+        Args:
+            grid_snapshot (GridModel): Bản chụp chỉ đọc của lưới (GridModel.snapshot()).
+            algorithms_to_run (list): Các cặp (algo_config, cache_key) như trong main.py.
+            start_rc (tuple): Tọa độ (row, col) bắt đầu.
+            goal_rc (tuple): Tọa độ (row, col) đích.
+            keep_explored_for (collection): Tên các thuật toán cần danh sách explored đầy đủ trong kết quả;
+                                            các thuật toán khác chỉ trả số node đã mở rộng.
+
+        Returns:
+            int: Mã của lần chạy.
+        """
+        self.cancel()
+        self._run_id += 1
+        self._cancel_event = threading.Event()
+        self._jobs.put((self._run_id, self._cancel_event, grid_snapshot, list(algorithms_to_run), start_rc, goal_rc,
+                        frozenset(keep_explored_for)))
+        return self._run_id
+
+    def cancel(self):
+        """Hủy lần chạy hiện tại. Thuật toán đang chạy dừng ở lát kế tiếp; kết quả về sau bị bỏ qua."""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def drain(self):
+        """
+        Lấy (không chờ) mọi kết quả đã có của lần chạy hiện tại.
+
+        Returns:
+            list: Các bộ (algo_config, cache_key, result, error) theo thứ tự hoàn thành.
+        """
+        finished = []
+        while True:
+            try:
+                run_id, algo_config, cache_key, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return finished
+            if run_id == self._run_id and self._cancel_event is not None: # Bỏ kết quả của lần chạy đã hủy
+                finished.append((algo_config, cache_key, result, error))
+
+    def close(self):
+        """Hủy lần chạy hiện tại và dừng luồng nền (chờ tối đa một lát tìm kiếm)."""
+        self.cancel()
+        self._jobs.put(_STOP)
+        self._thread.join(timeout=1.0)
+
+    def _worker(self):
+        """Vòng lặp của luồng nền: lấy từng lần chạy và chạy lần lượt các thuật toán của nó."""
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            run_id, cancel_event, grid_snapshot, algorithms_to_run, start_rc, goal_rc, keep_explored_for = job
+            graph = None # Đồ thị CSR đã đồng bộ với bản chụp của lần chạy này (khi có thuật toán cần)
+            for algo_config, cache_key in algorithms_to_run:
+                if cancel_event.is_set():
+                    break
+                try:
+                    if algo_config.get("is_graph_based", True):
+                        if graph is None:
+                            graph = self._graph = update_csr_graph(self._graph, grid_snapshot)
+                        search_space = graph
+                    else:
+                        search_space = grid_snapshot
+                    result = self._run_one(algo_config, search_space, start_rc, goal_rc, cancel_event,
+                                           algo_config["name"] in keep_explored_for)
+                    error = None
+                except Exception as e:
+                    result, error = (None, float('inf'), [], 0.0, 0.0, {}), str(e)
+                if result is None: # Bị hủy giữa chừng
+                    break
+                self._results.put((run_id, algo_config, cache_key, result, error))
+
+    def _run_one(self, algo_config, search_space, start_rc, goal_rc, cancel_event, keep_explored):
+        """
+        Chạy một thuật toán theo từng lát, kiểm tra hủy giữa các lát.
+
+        Returns:
+            tuple or None: (path, cost, explored_nodes, time_ms, cpu_time_ms, search_stats), hoặc None nếu bị hủy.
+        """
+        search_stats = search_stats_for(algo_config)
+        stepper = SearchStepper(algo_config["func"], search_space, start_rc, goal_rc, algo_config.get("heuristic"),
+                                keep_explored=keep_explored, stats=search_stats)
+        cpu_start_time = time.thread_time() # CPU của riêng luồng nền (process_time tính cả luồng UI)
+        done = False
+        while not done:
+            if cancel_event.is_set():
+                return None
+            _, done = stepper.step(self.slice_ms)
+        run_stats = {**(search_stats or {}), "explored_count": stepper.explored_count}
+        return (*stepper.result, stepper.elapsed_ms, (time.thread_time() - cpu_start_time) * 1000, run_stats)
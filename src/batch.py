@@ -0,0 +1,233 @@
+# src/batch.py
+# Giải nhiều truy vấn (start, goal) trên cùng một bản đồ bằng một pool tiến trình.
+# Các mảng của lưới (và đồ thị CSR nếu thuật toán cần) được đặt MỘT lần vào
+# multiprocessing.shared_memory; mỗi worker chỉ gắn (attach) vào vùng nhớ đó theo tên,
+# không phải pickle bản đồ cho từng tác vụ. Truy vấn được chia thành từng khối (chunk)
+# và kết quả được trả về theo đúng thứ tự truy vấn ngay khi từng khối hoàn thành.
+# `SharedGrid` + `run_search_task` cho phép gửi từng truy vấn riêng lẻ (ví dụ mỗi thuật toán
+# một tác vụ trong main.py) tới một pool tồn tại lâu dài.
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from src.grid_model import GridModel, as_grid_model, CELL_OBSTACLE
+from src.csr_graph import CSRGraph, create_csr_graph_from_grid
+
+# Căn lề mỗi mảng trong vùng nhớ chung theo 64 byte (một cache line).
+_ARRAY_ALIGNMENT = 64
+
+# Trạng thái của tiến trình worker (được gán trong _init_worker, dùng lại cho mọi khối).
+_worker_state = {}
+
+
+def _publish_arrays(arrays):
+    """
+    Sao chép các mảng vào một khối shared memory mới.
+
+    Args:
+        arrays (dict): Tên -> np.ndarray.
+
+    Returns:
+        tuple: (SharedMemory, specs) - specs là list (name, dtype_str, shape, offset) để gắn lại.
+    """
+    specs = []
+    total_size = 0
+    for name, values in arrays.items():
+        total_size = -(-total_size // _ARRAY_ALIGNMENT) * _ARRAY_ALIGNMENT # Làm tròn lên bội số căn lề
+        specs.append((name, values.dtype.str, values.shape, total_size))
+        total_size += values.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(total_size, 1))
+    for (name, dtype_str, shape, offset), values in zip(specs, arrays.values()):
+        np.ndarray(shape, dtype=dtype_str, buffer=shm.buf, offset=offset)[...] = values
+    return shm, specs
+
+
+def _attach_arrays(shm_name, specs):
+    """Gắn vào khối shared memory đã có và trả về (SharedMemory, dict tên -> mảng không sao chép)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = {name: np.ndarray(shape, dtype=dtype_str, buffer=shm.buf, offset=offset)
+              for name, dtype_str, shape, offset in specs}
+    return shm, arrays
+
+
+def _grid_arrays(grid_model, include_graph, graph=None):
+    """
+    Các mảng cần chia sẻ: lưới, và các mảng CSR nếu `include_graph`. Đồ thị được dựng một lần
+    ở tiến trình cha, hoặc lấy từ `graph` nếu người gọi đã có sẵn (ví dụ đồ thị được vá tăng dần).
+    """
+    arrays = {"cell_types": grid_model.cell_types, "costs": grid_model.costs}
+    if include_graph:
+        if graph is None:
+            graph = create_csr_graph_from_grid(grid_model)
+        offsets, neighbors, weights = graph.compact_arrays()
+        arrays.update(offsets=offsets, neighbors=neighbors, weights=weights)
+    return arrays
+
+
+def _search_spaces(arrays):
+    """Dựng lại (GridModel, CSRGraph hoặc None) từ các mảng, không sao chép dữ liệu lớn."""
+    grid_model = GridModel.from_arrays(arrays["cell_types"], arrays["costs"])
+    graph = None
+    if "offsets" in arrays:
+        graph = CSRGraph(grid_model.rows, grid_model.cols, arrays["offsets"], arrays["neighbors"],
+                         arrays["weights"], arrays["cell_types"].ravel() != CELL_OBSTACLE)
+    return grid_model, graph
+
+
+def _build_search_state(arrays, algorithm, heuristic, is_graph_based, include_explored):
+    """Trạng thái tìm kiếm của worker: không gian tìm kiếm đã dựng sẵn + thuật toán và tùy chọn."""
+    grid_model, graph = _search_spaces(arrays)
+    return {"grid_model": grid_model, "graph": graph, "algorithm": algorithm, "heuristic": heuristic,
+            "is_graph_based": is_graph_based, "include_explored": include_explored}
+
+
+def _init_worker(shm_name, specs, algorithm, heuristic, is_graph_based, include_explored):
+    """Hàm khởi tạo của mỗi tiến trình worker: gắn vào shared memory một lần duy nhất."""
+    shm, arrays = _attach_arrays(shm_name, specs)
+    _worker_state.update(_build_search_state(arrays, algorithm, heuristic, is_graph_based, include_explored))
+    _worker_state["shm"] = shm # Giữ tham chiếu để vùng nhớ không bị đóng khi worker còn chạy
+
+
+def _solve_query(state, start_rc, goal_rc, stats=None):
+    """
+    Chạy thuật toán cho một truy vấn với trạng thái đã dựng sẵn (giống cách main.py gọi).
+    `stats` (nếu có) được truyền cho thuật toán dạng `stats=...`.
+    """
+    search_space = state["graph"] if state["is_graph_based"] else state["grid_model"]
+    kwargs = {"stats": stats} if stats is not None else {}
+    if state["heuristic"]:
+        path, cost, explored = state["algorithm"](search_space, start_rc, goal_rc, state["heuristic"], **kwargs)
+    else:
+        path, cost, explored = state["algorithm"](search_space, start_rc, goal_rc, **kwargs)
+    return path, cost, explored if state["include_explored"] else []
+
+
+def _solve_chunk(chunk):
+    """Giải một khối truy vấn trong worker. Trả về list kết quả theo đúng thứ tự của khối."""
+    return [_solve_query(_worker_state, start_rc, goal_rc) for start_rc, goal_rc in chunk]
+
+
+def solve_batch(grid_data, queries, algorithm, workers=None, heuristic=None, is_graph_based=True,
+                chunk_size=None, include_explored=False):
+    """
+    Giải một loạt truy vấn (start, goal) trên cùng một bản đồ, song song bằng nhiều tiến trình.
+    Đây là một generator: kết quả được trả về lần lượt theo đúng thứ tự của `queries`,
+    ngay khi khối chứa chúng được giải xong.
+
+    Args:
+        grid_data (GameGrid or GridModel or list of list of GridNode): Bản đồ.
+        queries (iterable of tuple): Các cặp (start_rc, goal_rc).
+        algorithm (function): Hàm tìm đường (ví dụ `a_star_search_flat`, `jps_search`); phải là hàm
+                              cấp module để có thể gửi sang tiến trình con.
+        workers (int, optional): Số tiến trình worker. None = số CPU; 1 = chạy ngay trong tiến trình hiện tại.
+        heuristic (function, optional): Heuristic truyền cho thuật toán (None nếu thuật toán không dùng).
+        is_graph_based (bool): True nếu thuật toán chạy trên đồ thị CSR, False nếu chạy trực tiếp trên lưới.
+        chunk_size (int, optional): Số truy vấn mỗi khối. None = tự chọn (khoảng 4 khối mỗi worker, tối đa 256).
+        include_explored (bool): Trả về danh sách node đã khám phá (tốn bộ nhớ và chi phí truyền giữa
+                                 các tiến trình); False thì phần tử thứ ba là list rỗng.
+
+    Yields:
+        tuple: (path, cost, explored_nodes) cho từng truy vấn.
+    """
+    # Chuẩn hóa tọa độ về int Python (tọa độ từ NumPy, ví dụ np.argwhere, là kiểu np.int64).
+    queries = [((int(start_rc[0]), int(start_rc[1])), (int(goal_rc[0]), int(goal_rc[1])))
+               for start_rc, goal_rc in queries]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(queries)))
+
+    arrays = _grid_arrays(as_grid_model(grid_data), is_graph_based)
+
+    if workers == 1: # Không cần pool: giải tuần tự ngay trên các mảng gốc
+        state = _build_search_state(arrays, algorithm, heuristic, is_graph_based, include_explored)
+        for start_rc, goal_rc in queries:
+            yield _solve_query(state, start_rc, goal_rc)
+        return
+
+    if chunk_size is None:
+        chunk_size = max(1, min(256, len(queries) // (workers * 4)))
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+
+    # Import muộn: concurrent.futures.process tốn ~40 ms khi import, worker một truy vấn không cần đến.
+    from concurrent.futures import ProcessPoolExecutor
+    shm, specs = _publish_arrays(arrays)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(shm.name, specs, algorithm, heuristic, is_graph_based,
+                                             include_explored))
+    try:
+        # executor.map trả kết quả theo thứ tự gửi đi, dù các khối có thể xong không theo thứ tự.
+        for chunk_results in executor.map(_solve_chunk, chunks):
+            yield from chunk_results
+    finally:
+        # Người gọi có thể dừng generator giữa chừng: hủy các khối chưa chạy rồi mới giải phóng vùng nhớ chung.
+        executor.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+
+class SharedGrid:
+    """
+    Một bản chụp của lưới (và đồ thị CSR) đặt trong shared memory, để gửi nhiều tác vụ
+    `run_search_task` tới một pool có sẵn mà không pickle bản đồ trong từng tác vụ.
+    Người tạo phải gọi `close()` khi mọi tác vụ dùng bản chụp đã xong.
+    """
+    def __init__(self, grid_data, include_graph=True, graph=None):
+        """
+        Args:
+            grid_data (GameGrid or GridModel or list of list of GridNode): Bản đồ.
+            include_graph (bool): Chia sẻ cả đồ thị CSR (cho các thuật toán dựa trên đồ thị).
+            graph (CSRGraph, optional): Đồ thị đã đồng bộ với lưới; None thì dựng mới.
+        """
+        grid_model = as_grid_model(grid_data)
+        self.shm, self.specs = _publish_arrays(_grid_arrays(grid_model, include_graph, graph))
+        self.name = self.shm.name
+
+    def close(self):
+        """Giải phóng vùng nhớ chung (worker đang gắn vẫn đọc được cho tới khi tự đóng)."""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attached_search_spaces(shm_name, specs):
+    """Gắn vào bản chụp `shm_name` (dùng lại nếu worker đã gắn vào chính bản chụp đó)."""
+    attached = _worker_state.get("attached")
+    if attached and attached["name"] == shm_name:
+        return attached["search_spaces"]
+    if attached: # Bản chụp cũ: bỏ các mảng trỏ vào nó trước rồi mới đóng
+        old_shm = attached["shm"]
+        attached.clear()
+        old_shm.close()
+    shm, arrays = _attach_arrays(shm_name, specs)
+    search_spaces = _search_spaces(arrays)
+    _worker_state["attached"] = {"name": shm_name, "shm": shm, "search_spaces": search_spaces}
+    return search_spaces
+
+
+def run_search_task(shm_name, specs, algorithm, heuristic, is_graph_based, start_rc, goal_rc, collect_stats=False):
+    """
+    Chạy một truy vấn trên một `SharedGrid` (thường được gửi qua `executor.submit`).
+    Thời gian được đo ngay trong worker nên phản ánh thời gian riêng của thuật toán.
+
+    Args:
+        shm_name (str): `SharedGrid.name`.
+        specs (list): `SharedGrid.specs`.
+        algorithm (function): Hàm tìm đường cấp module.
+        heuristic (function or None): Heuristic truyền cho thuật toán.
+        is_graph_based (bool): Chạy trên đồ thị CSR (True) hay trực tiếp trên lưới (False).
+        start_rc (tuple): Điểm bắt đầu.
+        goal_rc (tuple): Điểm đích.
+        collect_stats (bool): Truyền một dict `stats` cho thuật toán (chỉ với hàm có tham số này,
+                              xem "reports_bound" trong src/registry.py).
+
+    Returns:
+        tuple: (path, cost, explored_nodes, wall_time_ms, cpu_time_ms, search_stats) - search_stats là {}
+               khi không thu số liệu.
+    """
+    grid_model, graph = _attached_search_spaces(shm_name, specs)
+    state = {"grid_model": grid_model, "graph": graph, "algorithm": algorithm, "heuristic": heuristic,
+             "is_graph_based": is_graph_based, "include_explored": True}
+    search_stats = {} if collect_stats else None
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    path, cost, explored = _solve_query(state, start_rc, goal_rc, search_stats)
+    return (path, cost, explored,
+            (time.perf_counter() - wall_start) * 1000, (time.process_time() - cpu_start) * 1000, search_stats or {})
@@ -0,0 +1,305 @@
+# src/components.py
+# Chỉ mục thành phần liên thông của lưới: trả lời "start và goal có thông nhau không" trong O(1),
+# để truy vấn tới một đích bị tường bao kín trả về ngay thay vì duyệt hết vùng đến được.
+# Cạnh chéo chỉ tồn tại khi một trong hai ô thẳng ở góc đi được (quy tắc chống "cắt góc" của
+# csr_graph), mà ô góc đó kề thẳng với cả hai đầu cạnh; vì vậy thành phần liên thông của đồ thị
+# 8 hướng trùng với thành phần liên thông 4 hướng của các ô đi được. JPS gốc (algorithms.py) cho phép đi chéo
+# giữa hai bức tường nên dùng chỉ mục 8 hướng riêng (`corner_cutting=True`).
+import weakref # Chỉ mục theo GridModel, tự giải phóng khi lưới bị hủy
+import numpy as np
+from config import COMPONENT_SPLIT_SEARCH_CELLS
+from src.grid_model import GridModel, CELL_OBSTACLE
+
+_index_by_model = weakref.WeakKeyDictionary()
+
+
+def label_components(walkable, corner_cutting=False):
+    """
+    Gán nhãn thành phần liên thông cho các ô đi được, hoàn toàn bằng phép toán mảng.
+    Mỗi hàng được chia thành các đoạn ô đi được liên tiếp (đã liên thông sẵn); hai đoạn ở hai hàng kề nhau
+    được nối nếu chồng lên nhau, hoặc chạm nhau theo đường chéo khi `corner_cutting` (mỗi vùng chồng chỉ sinh
+    một cạnh). Union-find trên các đoạn chạy theo vòng:
+    mỗi gốc móc vào một gốc nhỏ hơn kề nó; sau đó chỉ các gốc cũ (ít dần qua mỗi vòng)
+    được nhảy con trỏ tới gốc mới, và mọi đoạn được cập nhật bằng một lượt gom parent[parent].
+
+    Args:
+        walkable (np.ndarray): Mảng bool (rows, cols).
+        corner_cutting (bool): True = 8 liên thông (hai ô chéo nhau luôn kề nhau), False = 4 liên thông.
+
+    Returns:
+        tuple: (labels, count) - labels là mảng int32 (rows, cols), -1 ở ô tường, 0..count-1 ở ô đi được.
+    """
+    rows, cols = walkable.shape
+    run_starts = walkable.copy()
+    run_starts[:, 1:] &= ~walkable[:, :-1]
+    run_ids = np.cumsum(run_starts.ravel(), dtype=np.int64).reshape(rows, cols) - 1
+    num_runs = int(run_ids[-1, -1]) + 1 if walkable.size else 0
+    if num_runs == 0:
+        return np.full((rows, cols), -1, dtype=np.int32), 0
+    # Cạnh giữa hai đoạn ở hàng r và r + 1 (ô (r, c) với ô (r + 1, c + shift)): tại cột đầu tiên
+    # của mỗi vùng chồng nhau.
+    edges_a, edges_b = [], []
+    for shift in ((-1, 0, 1) if corner_cutting else (0,)):
+        upper = run_ids[:-1, max(0, -shift):cols - max(0, shift)]
+        lower = run_ids[1:, max(0, shift):cols - max(0, -shift)]
+        overlap = (walkable[:-1, max(0, -shift):cols - max(0, shift)]
+                   & walkable[1:, max(0, shift):cols - max(0, -shift)])
+        overlap_start = overlap.copy()
+        overlap_start[:, 1:] &= ~overlap[:, :-1]
+        edges_a.append(upper[overlap_start])
+        edges_b.append(lower[overlap_start])
+    edge_a, edge_b = np.concatenate(edges_a), np.concatenate(edges_b)
+
+    parent = np.arange(num_runs)
+    roots = parent.copy() # Các gốc hiện tại
+    while len(edge_a):
+        root_a, root_b = parent[edge_a], parent[edge_b] # parent đã được nén: parent[x] là gốc của x
+        crossing = root_a != root_b
+        if not crossing.any():
+            break
+        edge_a, edge_b = edge_a[crossing], edge_b[crossing]
+        root_a, root_b = root_a[crossing], root_b[crossing]
+        # Gốc lớn móc vào một gốc nhỏ hơn kề nó (ghi trùng thì lấy lần ghi cuối): chỉ số giảm dần
+        # dọc mỗi chuỗi con trỏ nên không tạo chu trình.
+        parent[np.maximum(root_a, root_b)] = np.minimum(root_a, root_b)
+        # Nhảy con trỏ chỉ trên các gốc cũ (ít dần qua mỗi vòng), rồi một lượt gom cho mọi đoạn.
+        new_roots = _compress(parent, roots)
+        parent = parent[parent]
+        roots = roots[new_roots == roots]
+    # Đánh số lại các gốc thành 0..count-1 (roots đã tăng dần); ô tường nhận -1.
+    run_labels = np.empty(num_runs, dtype=np.int32)
+    run_labels[roots] = np.arange(len(roots), dtype=np.int32)
+    labels = np.where(walkable, run_labels[parent][run_ids], -1).astype(np.int32, copy=False)
+    return labels, len(roots)
+
+
+def _compress(parent, nodes):
+    """Nhảy con trỏ (nhân đôi bước mỗi lượt) cho các node `nodes` tới khi mỗi node trỏ thẳng tới gốc."""
+    while True:
+        targets = parent[nodes]
+        jumped = parent[targets]
+        if np.array_equal(jumped, targets):
+            return targets
+        parent[nodes] = jumped
+
+
+class ComponentIndex:
+    """
+    Nhãn thành phần liên thông của một GridModel, cập nhật tăng dần theo nhật ký thay đổi của lưới:
+    - ô trở thành đi được: gộp các thành phần kề nó bằng union-find trên nhãn, O(1);
+    - ô trở thành tường: chỉ có thể tách thành phần nếu các láng giềng của nó không còn nối với nhau
+      qua vòng 8 ô xung quanh; khi đó một lần duyệt cục bộ có giới hạn xác nhận chúng vẫn liên thông hoặc
+      gán nhãn mới cho phần nhỏ bị tách, nếu không kết luận được thì cả lưới được gán nhãn lại (bằng
+      `label_components`) ở lần truy vấn kế tiếp.
+    Đổi loại giữa các ô đi được (trống / bẫy / start / end) không ảnh hưởng.
+    """
+    # Vòng 8 ô quanh một ô theo chiều kim đồng hồ (hai ô liên tiếp luôn kề thẳng nhau); chỉ số chẵn là ô thẳng.
+    _RING = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+    # Các cặp vị trí kề nhau trên vòng (4 liên thông), thêm các cặp ô thẳng liên tiếp khi được cắt góc.
+    _RING_LINKS_4 = tuple((position, (position + 1) % 8) for position in range(8))
+    _RING_LINKS_8 = _RING_LINKS_4 + tuple((position, (position + 2) % 8) for position in range(0, 8, 2))
+
+    def __init__(self, grid_model, corner_cutting=False):
+        """
+        Gán nhãn toàn bộ lưới.
+
+        Args:
+            grid_model (GridModel): Mô hình lưới.
+            corner_cutting (bool): 8 liên thông (xem `label_components`).
+        """
+        self.grid_model = grid_model
+        self.corner_cutting = corner_cutting
+        self.rows, self.cols = grid_model.rows, grid_model.cols
+        # Vị trí trên _RING của các láng giềng: 8 ô khi được cắt góc, ngược lại chỉ 4 ô thẳng.
+        self._neighbor_positions = range(8) if corner_cutting else range(0, 8, 2)
+        self._relabel()
+
+    def _relabel(self):
+        """Gán nhãn lại toàn bộ lưới (vector hóa)."""
+        walkable = self.grid_model.walkable_mask()
+        labels, count = label_components(walkable, self.corner_cutting)
+        self.labels = labels.ravel()
+        self._walkable = bytearray(walkable.ravel().tobytes()) # Trạng thái đi được mà nhãn đang phản ánh
+        self._parent = list(range(count)) # Union-find trên nhãn (gộp khi mở ô)
+        self._needs_relabel = False
+        self.version = self.grid_model.version
+
+    def _find(self, label):
+        """Gốc union-find của một nhãn (nén đường đi một nửa)."""
+        parent = self._parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def sync(self):
+        """Đồng bộ với các thay đổi của lưới kể từ lần đồng bộ trước."""
+        if self.version == self.grid_model.version or self._needs_relabel: # Gán nhãn lại sẽ đọc lưới hiện tại
+            return
+        changed = self.grid_model.changes_since(self.version)
+        if changed is None: # Lưới vừa được ghi hàng loạt: gán nhãn lại
+            self._relabel()
+            return
+        cell_types = self.grid_model.cell_types.ravel()
+        for idx in changed.tolist():
+            walkable = bool(cell_types[idx] != CELL_OBSTACLE)
+            if walkable != bool(self._walkable[idx]):
+                self._walkable[idx] = walkable
+                if walkable:
+                    self._open_cell(idx)
+                else:
+                    self._close_cell(idx)
+        self.version = self.grid_model.version
+
+    def _ring_walkable(self, idx):
+        """Cờ đi được của 8 ô quanh ô `idx` (theo thứ tự _RING; ô ngoài biên là tường)."""
+        r, c = divmod(idx, self.cols)
+        return [0 <= r + dr < self.rows and 0 <= c + dc < self.cols and bool(self._walkable[idx + dr * self.cols + dc])
+                for dr, dc in self._RING]
+
+    def _open_cell(self, idx):
+        """Ô `idx` vừa trở thành đi được: nhận nhãn của (và gộp) các thành phần kề nó."""
+        ring = self._ring_walkable(idx)
+        roots = set()
+        for position in self._neighbor_positions:
+            if ring[position]:
+                dr, dc = self._RING[position]
+                roots.add(self._find(int(self.labels[idx + dr * self.cols + dc])))
+        if not roots:
+            label = len(self._parent)
+            self._parent.append(label)
+        else:
+            label = min(roots)
+            for root in roots:
+                self._parent[root] = label
+        self.labels[idx] = label
+
+    def _close_cell(self, idx):
+        """Ô `idx` vừa trở thành tường: kiểm tra xem thành phần của nó có bị tách không."""
+        self.labels[idx] = -1
+        ring = self._ring_walkable(idx)
+        # Nhóm các láng giềng còn nối với nhau ngay trên vòng: hai ô liên tiếp luôn kề nhau, và khi được
+        # cắt góc thì hai ô thẳng liên tiếp (ví dụ trên và phải) cũng kề nhau qua đường chéo.
+        # Vòng chỉ có 8 ô: gộp nhóm bằng cách lan nhãn nhỏ nhất tới khi ổn định.
+        links = self._RING_LINKS_8 if self.corner_cutting else self._RING_LINKS_4
+        group = list(range(8))
+        changed = True
+        while changed:
+            changed = False
+            for a, b in links:
+                if ring[a] and ring[b] and group[a] != group[b]:
+                    group[a] = group[b] = min(group[a], group[b])
+                    changed = True
+        representatives = {}
+        for position in self._neighbor_positions:
+            if ring[position]:
+                dr, dc = self._RING[position]
+                representatives.setdefault(group[position], idx + dr * self.cols + dc)
+        if len(representatives) > 1:
+            self._split_regions(list(representatives.values()))
+
+    def _split_regions(self, representatives):
+        """
+        Các ô `representatives` (láng giềng của ô vừa thành tường, không còn nối nhau qua vòng 8 ô) có thể đã
+        rời nhau. Lần lượt duyệt (BFS có giới hạn) từ từng ô: gặp một ô đại diện khác => vẫn liên thông; duyệt
+        hết vùng mà không gặp => vùng đó bị tách ra và nhận nhãn mới; vượt COMPONENT_SPLIT_SEARCH_CELLS ô =>
+        đánh dấu gán nhãn lại cả lưới ở lần truy vấn sau.
+        """
+        offsets = [self._RING[position] for position in self._neighbor_positions]
+        rows, cols, walkable = self.rows, self.cols, self._walkable
+        while len(representatives) > 1:
+            origin = representatives.pop()
+            targets = set(representatives)
+            region = [origin]
+            seen = {origin}
+            position = 0
+            while position < len(region):
+                current = region[position]
+                position += 1
+                r, c = divmod(current, cols)
+                for dr, dc in offsets:
+                    nr, nc = r + dr, c + dc
+                    neighbor = current + dr * cols + dc
+                    if 0 <= nr < rows and 0 <= nc < cols and walkable[neighbor] and neighbor not in seen:
+                        if neighbor in targets:
+                            break
+                        seen.add(neighbor)
+                        region.append(neighbor)
+                else:
+                    if len(region) <= COMPONENT_SPLIT_SEARCH_CELLS:
+                        continue
+                    self._needs_relabel = True # Vùng quá lớn để duyệt cục bộ
+                    return
+                break # Gặp một ô đại diện khác: origin vẫn thuộc thành phần của nó
+            else: # Duyệt hết vùng: tách thành thành phần mới
+                label = len(self._parent)
+                self._parent.append(label)
+                self.labels[region] = label
+
+    def component_of(self, rc):
+        """Mã thành phần của ô rc (gốc union-find), hoặc -1 nếu là tường / ngoài lưới."""
+        if self._needs_relabel:
+            self._relabel()
+        r, c = rc
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return -1
+        label = int(self.labels[r * self.cols + c])
+        return self._find(label) if label >= 0 else -1
+
+    def connected(self, start_rc, goal_rc):
+        """True nếu hai ô đều đi được và thuộc cùng một thành phần liên thông."""
+        start_component = self.component_of(start_rc)
+        return start_component >= 0 and start_component == self.component_of(goal_rc)
+
+
+def components_for(grid_model, corner_cutting=False):
+    """
+    Lấy chỉ mục thành phần liên thông của một GridModel (tạo ở lần đầu, đồng bộ ở những lần sau).
+
+    Args:
+        grid_model (GridModel): Mô hình lưới.
+        corner_cutting (bool): 8 liên thông (xem `label_components`).
+
+    Returns:
+        ComponentIndex: Chỉ mục đã đồng bộ với lưới.
+    """
+    indexes = _index_by_model.setdefault(grid_model.cache_key, {})
+    index = indexes.get(corner_cutting)
+    if index is None:
+        index = indexes[corner_cutting] = ComponentIndex(grid_model, corner_cutting)
+    else:
+        index.grid_model = grid_model # Bản chụp mới của cùng lưới: cập nhật tăng dần từ bản chụp trước
+        index.sync()
+    return index
+
+
+def is_unreachable(search_space, start_rc, goal_rc, corner_cutting=False):
+    """
+    Kiểm tra nhanh trước khi tìm kiếm: True nếu chắc chắn không có đường từ start tới goal
+    (một trong hai ô là tường, hoặc hai ô thuộc hai thành phần liên thông khác nhau).
+    Trả về False (không kết luận, cứ tìm kiếm như thường) khi không biết lưới nguồn của không gian tìm kiếm,
+    khi đồ thị chưa đồng bộ với lưới, hoặc khi start / goal nằm ngoài lưới.
+
+    Args:
+        search_space: CSRGraph (dùng `source_model`), GridModel hoặc GameGrid.
+        start_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_rc (tuple): Tọa độ (row, col) đích.
+        corner_cutting (bool): Thuật toán được đi chéo giữa hai bức tường (8 liên thông).
+
+    Returns:
+        bool: True nếu chắc chắn không có đường.
+    """
+    if isinstance(search_space, GridModel):
+        model = search_space
+    else:
+        model = getattr(search_space, "source_model", None)
+        if model is None:
+            model = getattr(search_space, "model", None)
+        elif getattr(search_space, "source_version", None) != model.version:
+            return False # Đồ thị cũ hơn lưới: nhãn có thể không khớp với các cạnh đồ thị
+        if not isinstance(model, GridModel):
+            return False
+    for r, c in (start_rc, goal_rc):
+        if not (0 <= r < model.rows and 0 <= c < model.cols):
+            return False
+    return not components_for(model, corner_cutting).connected(start_rc, goal_rc)
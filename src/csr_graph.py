@@ -0,0 +1,358 @@
+# src/csr_graph.py
+import math # Cần cho sqrt(2) - chi phí đường chéo
+import numpy as np # Xây dựng đồ thị bằng các phép toán mảng (vectorized)
+from src.grid_model import as_grid_model, CELL_OBSTACLE # Lưới dạng mảng (loại ô + chi phí)
+
+# Thứ tự hướng láng giềng, giống hệt thứ tự trong create_graph_from_grid
+# để các thuật toán duyệt láng giềng theo cùng một thứ tự trên cả hai loại đồ thị.
+CARDINAL_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIAGONAL_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+ALL_DIRECTIONS = CARDINAL_DIRECTIONS + DIAGONAL_DIRECTIONS
+# Số ô nhớ dự trữ sau các cạnh khi dựng đồ thị, dành cho các hàng bị chuyển xuống vùng tràn
+# khi vá (đủ cho khoảng 1000 node), để những lần sửa đầu tiên không phải cấp phát lại mảng.
+OVERFLOW_RESERVE = 8 * 1024
+
+
+class CSRGraph:
+    """
+    Đồ thị lưới lưu ở dạng CSR (Compressed Sparse Row):
+    - `offsets` (int64, N+1): láng giềng của node i nằm trong đoạn [offsets[i], offsets[i+1])
+      (bố cục lúc dựng; sau khi vá thì dùng `row_start`/`row_end`).
+    - `neighbors` (int32, E): chỉ số phẳng (row * cols + col) của node láng giềng.
+    - `weights` (float64, E): trọng số cạnh tương ứng.
+    Mỗi cạnh chỉ tốn 12 byte thay vì một entry dict lồng nhau với key là tuple.
+    Cung cấp cùng API `get_neighbors` / `get_edge_weight` như lớp `Graph` nên các thuật toán
+    tìm đường (A*, BFS, Greedy BFS, Bi-A*) chạy trên nó mà không cần sửa đổi.
+
+    Để có thể vá đồ thị khi lưới thay đổi (xem `update_csr_graph`), đoạn cạnh của node i
+    thực tế là [row_start[i], row_end[i]); ban đầu trùng với `offsets`. Một hàng được vá
+    ghi đè tại chỗ nếu vừa sức chứa cũ, ngược lại được chuyển xuống vùng tràn cuối mảng.
+    """
+    def __init__(self, rows, cols, offsets, neighbors, weights, node_mask):
+        """
+        Khởi tạo đồ thị CSR từ các mảng đã dựng sẵn (thường gọi qua `create_csr_graph_from_grid`).
+
+        Args:
+            rows (int): Số hàng của lưới.
+            cols (int): Số cột của lưới.
+            offsets (np.ndarray): Mảng offset (N+1 phần tử).
+            neighbors (np.ndarray): Mảng chỉ số phẳng của láng giềng (ít nhất E = offsets[-1] phần tử;
+                                    phần dư phía sau là vùng tràn dự trữ).
+            weights (np.ndarray): Mảng trọng số cạnh (cùng độ dài với `neighbors`).
+            node_mask (np.ndarray): Mảng bool (N phần tử), True nếu ô là một node (không phải tường).
+        """
+        self.rows = rows
+        self.cols = cols
+        self.offsets = offsets
+        self.row_start = offsets[:-1].copy() # Vị trí bắt đầu đoạn cạnh của từng node
+        self.row_end = offsets[1:].copy()    # Vị trí kết thúc (không bao gồm)
+        self.row_capacity = np.diff(offsets) # Số ô nhớ đã cấp cho đoạn cạnh của từng node
+        self.neighbors = neighbors
+        self.weights = weights
+        self.node_mask = node_mask
+        self._used_edges = int(offsets[-1]) # Phần đã dùng của mảng neighbors/weights (kể cả vùng tràn)
+        # Thông tin đồng bộ với lưới nguồn (được gán bởi create_csr_graph_from_grid).
+        self.source_model = None
+        self.source_version = None
+        self.allow_diagonal = True
+        self._refresh_views()
+
+    def _refresh_views(self):
+        """Tạo lại các memoryview (cần làm sau khi mảng cạnh được cấp phát lại)."""
+        # memoryview cho phép đọc từng phần tử/đoạn thành số Python mà không sao chép mảng,
+        # nhanh hơn so với việc index trực tiếp mảng NumPy trong vòng lặp Python.
+        self._row_start_view = memoryview(self.row_start)
+        self._row_end_view = memoryview(self.row_end)
+        self._neighbors_view = memoryview(self.neighbors)
+        self._weights_view = memoryview(self.weights)
+
+    @property
+    def num_nodes(self):
+        """Số node (ô không phải tường) trong đồ thị."""
+        return int(np.count_nonzero(self.node_mask))
+
+    @property
+    def num_edges(self):
+        """Số cạnh có hướng trong đồ thị."""
+        return int((self.row_end - self.row_start).sum())
+
+    def adjacency_views(self):
+        """
+        Trả về (row_start, row_end, neighbors, weights) dạng memoryview để các kernel tìm kiếm
+        theo chỉ số phẳng (src/fast_search.py) đọc trực tiếp, không sao chép.
+        Láng giềng của node i nằm trong đoạn [row_start[i], row_end[i]).
+        """
+        return self._row_start_view, self._row_end_view, self._neighbors_view, self._weights_view
+
+    def index_of(self, node_coord_rc):
+        """Chuyển tọa độ (row, col) sang chỉ số phẳng."""
+        return node_coord_rc[0] * self.cols + node_coord_rc[1]
+
+    def coord_of(self, node_idx):
+        """Chuyển chỉ số phẳng sang tọa độ (row, col)."""
+        return divmod(node_idx, self.cols)
+
+    def __contains__(self, node_coord_rc):
+        r, c = node_coord_rc
+        return 0 <= r < self.rows and 0 <= c < self.cols and bool(self.node_mask[r * self.cols + c])
+
+    def get_neighbors(self, node_coord_rc):
+        """
+        Lấy tất cả các node láng giềng và trọng số cạnh đến chúng từ một node cho trước.
+
+        Args:
+            node_coord_rc (tuple): Tọa độ (row, col) của node.
+
+        Returns:
+            list: Danh sách các tuple (neighbor_coord, weight).
+                  Trả về list rỗng nếu node không có láng giềng hoặc không tồn tại.
+        """
+        r, c = node_coord_rc
+        cols = self.cols
+        if not (0 <= r < self.rows and 0 <= c < cols):
+            return []
+        node_idx = r * cols + c
+        start, end = self._row_start_view[node_idx], self._row_end_view[node_idx]
+        return [(divmod(nb_idx, cols), weight) for nb_idx, weight in
+                zip(self._neighbors_view[start:end].tolist(), self._weights_view[start:end].tolist())]
+
+    def get_edge_weight(self, from_node_rc, to_node_rc):
+        """
+        Lấy trọng số của cạnh giữa hai node.
+
+        Args:
+            from_node_rc (tuple): Tọa độ (row, col) của node bắt đầu.
+            to_node_rc (tuple): Tọa độ (row, col) của node kết thúc.
+
+        Returns:
+            float: Trọng số của cạnh nếu tồn tại, ngược lại là float('inf').
+        """
+        r, c = from_node_rc
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return float("inf")
+        node_idx = r * self.cols + c
+        target_idx = to_node_rc[0] * self.cols + to_node_rc[1]
+        start, end = self._row_start_view[node_idx], self._row_end_view[node_idx]
+        for pos in range(start, end):
+            if self._neighbors_view[pos] == target_idx:
+                return self._weights_view[pos]
+        return float("inf")
+
+    def compact_arrays(self):
+        """
+        Trả về (offsets, neighbors, weights) ở dạng CSR liền mạch, bỏ các chỗ trống và vùng tràn
+        do `patch_rows` để lại (ví dụ để chia sẻ đồ thị sang tiến trình khác).
+        Nếu đồ thị chưa từng bị đổi bố cục thì trả về chính các mảng hiện có (không sao chép).
+        """
+        degrees = self.row_end - self.row_start
+        offsets = np.zeros(len(degrees) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+        num_edges = int(offsets[-1])
+        if np.array_equal(self.row_start, self.offsets[:-1]) and np.array_equal(offsets, self.offsets):
+            return self.offsets, self.neighbors[:num_edges], self.weights[:num_edges]
+        # Vị trí cũ của từng cạnh: row_start của node chứa nó + thứ tự của cạnh trong hàng.
+        positions = np.repeat(self.row_start - offsets[:-1], degrees) + np.arange(num_edges)
+        return offsets, self.neighbors[positions], self.weights[positions]
+
+    def reversed(self):
+        """
+        Đồ thị đảo chiều: mỗi cạnh u -> v (trọng số w) thành v -> u (cùng trọng số w).
+        Cần cho các tính toán "khoảng cách ĐẾN một node" (ví dụ bảng landmark), vì trọng số cạnh
+        lưới phụ thuộc ô đích nên đồ thị không đối xứng khi có ô bẫy.
+
+        Returns:
+            CSRGraph: Đồ thị mới (không có vùng tràn, không gắn với lưới nguồn).
+        """
+        offsets, neighbors, weights = self.compact_arrays()
+        num_cells = self.rows * self.cols
+        sources = np.repeat(np.arange(num_cells, dtype=np.int32), np.diff(offsets))
+        order = np.argsort(neighbors, kind="stable") # Gom các cạnh theo node đích (giữ thứ tự nguồn)
+        reversed_offsets = np.zeros(num_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(neighbors, minlength=num_cells), out=reversed_offsets[1:])
+        graph = CSRGraph(self.rows, self.cols, reversed_offsets, sources[order],
+                         weights[order].astype(np.float64), self.node_mask.copy())
+        graph.allow_diagonal = self.allow_diagonal
+        return graph
+
+    def patch_rows(self, node_indices, edge_masks, neighbor_idx, edge_weights, walkable):
+        """
+        Ghi lại đoạn cạnh đi ra của một số node (dùng khi lưới thay đổi cục bộ).
+
+        Args:
+            node_indices (np.ndarray): Chỉ số phẳng của các node cần ghi lại (K phần tử).
+            edge_masks (np.ndarray): Mảng bool (K, D), True nếu có cạnh theo hướng tương ứng.
+            neighbor_idx (np.ndarray): Mảng (K, D) chỉ số phẳng của láng giềng theo từng hướng.
+            edge_weights (np.ndarray): Mảng (K, D) trọng số cạnh theo từng hướng.
+            walkable (np.ndarray): Mảng bool (K), True nếu node đi được.
+        """
+        self.node_mask[node_indices] = walkable
+        degrees = edge_masks.sum(axis=1)
+        relocated = False
+        for k, node_idx in enumerate(node_indices.tolist()):
+            degree = int(degrees[k])
+            start = int(self.row_start[node_idx])
+            if degree > self.row_capacity[node_idx]:
+                # Không đủ chỗ tại vị trí cũ: cấp một đoạn mới (đủ cho mọi hướng) ở vùng tràn.
+                start = self._allocate_overflow(edge_masks.shape[1])
+                self.row_start[node_idx] = start
+                self.row_capacity[node_idx] = edge_masks.shape[1]
+                relocated = True
+            self.neighbors[start:start + degree] = neighbor_idx[k][edge_masks[k]]
+            self.weights[start:start + degree] = edge_weights[k][edge_masks[k]]
+            self.row_end[node_idx] = start + degree
+        if relocated:
+            self._refresh_views()
+
+    def _allocate_overflow(self, size):
+        """Cấp `size` ô nhớ ở cuối mảng cạnh, tăng gấp đôi dung lượng khi cần. Trả về vị trí bắt đầu."""
+        position = self._used_edges
+        needed = position + size
+        if needed > len(self.neighbors):
+            new_length = max(needed, 2 * len(self.neighbors), 16)
+            new_neighbors = np.empty(new_length, dtype=self.neighbors.dtype)
+            new_neighbors[:position] = self.neighbors[:position]
+            new_weights = np.empty(new_length, dtype=self.weights.dtype)
+            new_weights[:position] = self.weights[:position]
+            self.neighbors, self.weights = new_neighbors, new_weights
+        self._used_edges = needed
+        return position
+
+
+def _edges_for_nodes(grid_model, node_indices, directions):
+    """
+    Tính các cạnh đi ra của một tập node bất kỳ (không cần tính cho cả lưới).
+    Quy tắc giống hệt `create_csr_graph_from_grid`, kể cả quy tắc chống "cắt góc".
+
+    Args:
+        grid_model (GridModel): Mô hình lưới.
+        node_indices (np.ndarray): Chỉ số phẳng của các node (K phần tử).
+        directions (tuple): Danh sách hướng (dr, dc).
+
+    Returns:
+        tuple: (edge_masks, neighbor_idx, edge_weights, walkable) - các mảng (K, D), (K, D), (K, D), (K).
+    """
+    rows, cols = grid_model.rows, grid_model.cols
+    cell_types = grid_model.cell_types
+    node_r, node_c = np.divmod(node_indices, cols)
+    deltas = np.array(directions, dtype=np.int64)
+
+    def walkable_at(r, c):
+        # Ô ngoài biên được coi là tường (giống viền đệm khi dựng toàn bộ).
+        inside = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+        return inside & (cell_types[np.clip(r, 0, rows - 1), np.clip(c, 0, cols - 1)] != CELL_OBSTACLE)
+
+    neighbor_r = node_r[:, None] + deltas[None, :, 0]
+    neighbor_c = node_c[:, None] + deltas[None, :, 1]
+    walkable = cell_types[node_r, node_c] != CELL_OBSTACLE
+    edge_masks = walkable[:, None] & walkable_at(neighbor_r, neighbor_c)
+    edge_weights = grid_model.costs[np.clip(neighbor_r, 0, rows - 1), np.clip(neighbor_c, 0, cols - 1)].astype(np.float64)
+    is_diagonal = (deltas[:, 0] != 0) & (deltas[:, 1] != 0)
+    if is_diagonal.any():
+        # Ngăn "cắt góc": bỏ cạnh chéo nếu cả hai ô thẳng tạo thành góc đều là tường.
+        corner_open = walkable_at(neighbor_r, node_c[:, None]) | walkable_at(node_r[:, None], neighbor_c)
+        edge_masks &= corner_open | ~is_diagonal[None, :]
+        edge_weights[:, is_diagonal] *= math.sqrt(2)
+    neighbor_idx = neighbor_r * cols + neighbor_c
+    return edge_masks, neighbor_idx, edge_weights, walkable
+
+
+def update_csr_graph(graph, grid_data):
+    """
+    Đồng bộ đồ thị CSR với lưới sau khi người dùng sửa ô (đặt tường, bẫy, xóa ô...).
+    Chỉ các ô đã thay đổi và 8 ô láng giềng của chúng được tính lại cạnh đi ra: cạnh vào một ô
+    mang trọng số của chính ô đó, và cạnh chéo của láng giềng phụ thuộc vào ô đó qua quy tắc
+    chống "cắt góc". Chi phí vì thế tỉ lệ với số ô bị sửa thay vì kích thước bản đồ.
+    Dựng lại toàn bộ nếu đồ thị chưa có, thuộc lưới khác, hoặc lưới vừa được ghi hàng loạt. Đồ thị dựng từ một
+    bản chụp được vá để khớp bản chụp mới hơn của cùng lưới (cùng `GridModel.cache_key`).
+
+    Args:
+        graph (CSRGraph or None): Đồ thị từ lần chạy trước.
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới hiện tại.
+
+    Returns:
+        CSRGraph: Đồ thị đã đồng bộ (chính `graph` nếu vá được, hoặc một đồ thị mới).
+    """
+    grid_model = as_grid_model(grid_data)
+    if graph is None or graph.source_model is None or graph.source_model.cache_key is not grid_model.cache_key:
+        return create_csr_graph_from_grid(grid_model, graph.allow_diagonal if graph else True)
+    graph.source_model = grid_model
+    changed = grid_model.changes_since(graph.source_version)
+    if changed is None:
+        return create_csr_graph_from_grid(grid_model, graph.allow_diagonal)
+    if len(changed) == 0:
+        return graph
+
+    # Các node bị ảnh hưởng: ô đã đổi cùng 8 láng giềng (trong biên).
+    rows, cols = grid_model.rows, grid_model.cols
+    changed_r, changed_c = np.divmod(changed, cols)
+    offsets_rc = np.array([(0, 0)] + list(ALL_DIRECTIONS), dtype=np.int64)
+    affected_r = (changed_r[:, None] + offsets_rc[None, :, 0]).ravel()
+    affected_c = (changed_c[:, None] + offsets_rc[None, :, 1]).ravel()
+    inside = (affected_r >= 0) & (affected_r < rows) & (affected_c >= 0) & (affected_c < cols)
+    affected = np.unique(affected_r[inside] * cols + affected_c[inside])
+
+    directions = ALL_DIRECTIONS if graph.allow_diagonal else CARDINAL_DIRECTIONS
+    graph.patch_rows(affected, *_edges_for_nodes(grid_model, affected, directions))
+    graph.source_version = grid_model.version
+    return graph
+
+
+def create_csr_graph_from_grid(grid_data, allow_diagonal=True):
+    """
+    Tạo một CSRGraph từ dữ liệu lưới bằng các phép toán mảng.
+    Với mỗi hướng, mặt nạ cạnh hợp lệ (cả hai ô đi được, và với hướng chéo thì không
+    "cắt góc" giữa hai bức tường) được tính cho toàn bộ lưới cùng lúc, sau đó các mặt nạ
+    được gộp thành các mảng CSR. Quy tắc cạnh và trọng số giống hệt `create_graph_from_grid`.
+
+    Args:
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới.
+        allow_diagonal (bool): Cho phép di chuyển chéo (chi phí = cost * sqrt(2)).
+
+    Returns:
+        CSRGraph: Đồ thị CSR biểu diễn lưới.
+    """
+    grid_model = as_grid_model(grid_data)
+    rows, cols = grid_model.rows, grid_model.cols
+    num_cells = rows * cols
+    walkable = grid_model.walkable_mask()
+
+    # Đệm thêm một viền tường quanh lưới để phép dịch mảng không cần kiểm tra biên.
+    walkable_padded = np.zeros((rows + 2, cols + 2), dtype=bool)
+    walkable_padded[1:-1, 1:-1] = walkable
+    costs_padded = np.full((rows + 2, cols + 2), np.inf, dtype=np.float64)
+    costs_padded[1:-1, 1:-1] = grid_model.costs
+
+    directions = ALL_DIRECTIONS if allow_diagonal else CARDINAL_DIRECTIONS
+    edge_masks = np.empty((num_cells, len(directions)), dtype=bool) # (node, hướng) -> có cạnh?
+    edge_weights = np.empty((num_cells, len(directions)), dtype=np.float64)
+    for d_idx, (dr, dc) in enumerate(directions):
+        # Ô láng giềng theo hướng (dr, dc) của mọi ô, lấy bằng cách dịch mảng đệm.
+        neighbor_walkable = walkable_padded[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+        mask = walkable & neighbor_walkable
+        weight = costs_padded[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+        if dr != 0 and dc != 0:
+            # Ngăn "cắt góc": bỏ cạnh chéo nếu cả hai ô thẳng tạo thành góc đều là tường.
+            mask &= walkable_padded[1 + dr:rows + 1 + dr, 1:cols + 1] | \
+                    walkable_padded[1:rows + 1, 1 + dc:cols + 1 + dc]
+            weight = weight * math.sqrt(2) # Chi phí đường chéo là cost * căn 2.
+        edge_masks[:, d_idx] = mask.ravel()
+        edge_weights[:, d_idx] = weight.ravel()
+
+    # Chỉ số phẳng của láng giềng theo từng hướng: idx + dr * cols + dc.
+    direction_deltas = np.array([dr * cols + dc for dr, dc in directions], dtype=np.int32)
+    neighbor_idx = np.arange(num_cells, dtype=np.int32)[:, None] + direction_deltas[None, :]
+
+    # Lấy theo thứ tự hàng (node trước, hướng sau) => các cạnh của một node nằm liền nhau.
+    degree = edge_masks.sum(axis=1)
+    offsets = np.zeros(num_cells + 1, dtype=np.int64)
+    np.cumsum(degree, out=offsets[1:])
+    num_edges = int(offsets[-1])
+    neighbors = np.empty(num_edges + OVERFLOW_RESERVE, dtype=np.int32)
+    neighbors[:num_edges] = neighbor_idx[edge_masks]
+    weights = np.empty(num_edges + OVERFLOW_RESERVE, dtype=np.float64)
+    weights[:num_edges] = edge_weights[edge_masks]
+    graph = CSRGraph(rows, cols, offsets, neighbors, weights, walkable.ravel())
+    graph.source_model = grid_model # Ghi nhớ lưới nguồn và phiên bản để update_csr_graph vá tăng dần
+    graph.source_version = grid_model.version
+    graph.allow_diagonal = allow_diagonal
+    return graph
@@ -0,0 +1,275 @@
+# src/dstar_lite.py
+# D* Lite (Koenig & Likhachev): tìm đường tăng dần cho bản đồ thay đổi.
+# Tìm kiếm chạy NGƯỢC từ đích về điểm bắt đầu, nên g(s) là chi phí từ s đến đích và
+# vẫn đúng khi điểm bắt đầu (vị trí agent) di chuyển. Khi một số ô thay đổi, chỉ các node
+# có cạnh bị ảnh hưởng được cập nhật lại, và phần cây tìm kiếm còn đúng được giữ nguyên.
+import heapq  # Hàng đợi ưu tiên (với xóa "lười")
+import math # Cần cho sqrt(2) - chi phí đường chéo
+from array import array # Mảng g/rhs/chi phí dạng phẳng
+from src.algorithms import heuristic_euclidean
+from src.grid_model import as_grid_model, CELL_OBSTACLE
+from src.csr_graph import ALL_DIRECTIONS, CARDINAL_DIRECTIONS
+from src.components import is_unreachable
+
+INF = float("inf")
+# Phần thứ nhất của key được làm tròn đến số chữ số thập phân này: sai số khi cộng dồn chi phí căn 2 và km
+# có thể làm hai key lẽ ra bằng nhau lệch 1 ulp, khiến node nằm trên đường đi của start bị xếp sau start
+# (và không được mở rộng trước khi dừng); làm tròn đưa chúng về cùng giá trị để phần thứ hai phân định.
+KEY_DIGITS = 9
+
+
+class DStarLite:
+    """
+    Bộ lập kế hoạch D* Lite giữ trạng thái tìm kiếm giữa các lần truy vấn.
+    Quy tắc cạnh giống đồ thị lưới của project: trọng số = chi phí ô đích (nhân căn 2 nếu đi chéo),
+    không đi chéo khi cả hai ô thẳng tạo thành góc đều là tường.
+
+    Các agent cùng đích có thể dùng chung một bộ lập kế hoạch: g(s) là chi phí từ s đến đích, không phụ thuộc
+    điểm bắt đầu, nên `move_start` sang vị trí của agent khác chỉ mở rộng thêm phần cây còn thiếu.
+
+    Cách dùng điển hình:
+        planner = DStarLite(game_grid, start_rc, goal_rc)
+        path, cost, explored = planner.replan()     # Lần đầu: tìm từ đầu
+        ... người dùng sửa ô, agent đi đến (r, c) ...
+        planner.move_start((r, c))
+        path, cost, explored = planner.replan()     # Chỉ sửa phần cây bị ảnh hưởng
+    """
+    def __init__(self, grid_data, start_rc, goal_rc, heuristic_func=heuristic_euclidean, allow_diagonal=True):
+        """
+        Khởi tạo bộ lập kế hoạch (chưa tìm kiếm; gọi `replan()` để tính đường đi).
+
+        Args:
+            grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới.
+            start_rc (tuple): Tọa độ (row, col) điểm bắt đầu.
+            goal_rc (tuple): Tọa độ (row, col) điểm đích.
+            heuristic_func (function): Heuristic nhất quán (consistent), mặc định Euclidean.
+            allow_diagonal (bool): Cho phép đi chéo.
+        """
+        self.grid_model = as_grid_model(grid_data)
+        self.rows, self.cols = self.grid_model.rows, self.grid_model.cols
+        self.start_rc = tuple(start_rc)
+        self.goal_rc = tuple(goal_rc)
+        self.heuristic_func = heuristic_func
+        self.directions = ALL_DIRECTIONS if allow_diagonal else CARDINAL_DIRECTIONS
+        # Hệ số chi phí theo hướng (1 với hướng thẳng, căn 2 với hướng chéo).
+        self._direction_factors = [math.sqrt(2) if dr != 0 and dc != 0 else 1.0 for dr, dc in self.directions]
+        self.expanded_total = 0 # Tổng số node đã mở rộng qua mọi lần replan (để thống kê)
+        self._reset()
+
+    # --- Khởi tạo / đồng bộ với lưới ---
+    def _reset(self):
+        """Sao chép lưới và khởi tạo lại toàn bộ trạng thái tìm kiếm (tương đương tìm từ đầu)."""
+        num_cells = self.rows * self.cols
+        self._walkable = bytearray((self.grid_model.cell_types != CELL_OBSTACLE).ravel().tobytes())
+        self._cost = array("d", self.grid_model.costs.astype(float).ravel().tolist())
+        self._g = array("d", [INF]) * num_cells
+        self._rhs = array("d", [INF]) * num_cells
+        self._open_set = [] # Heap các entry (k1, k2, node_idx)
+        self._open_keys = {} # node_idx -> key hiện hành; entry trong heap có key khác là entry cũ
+        self._km = 0.0 # Độ dời của key khi điểm bắt đầu di chuyển
+        self._last_start_rc = self.start_rc
+        self._version = self.grid_model.version
+        goal_idx = self._index(self.goal_rc)
+        self._rhs[goal_idx] = 0.0
+        self._push(goal_idx, self._calculate_key(goal_idx))
+
+    def _index(self, node_rc):
+        return node_rc[0] * self.cols + node_rc[1]
+
+    def sync(self):
+        """
+        Đọc các ô đã thay đổi từ GridModel (qua `changes_since`) và áp dụng chúng.
+        Nếu lưới vừa được ghi hàng loạt (ví dụ tải mê cung), trạng thái được khởi tạo lại.
+        """
+        changed = self.grid_model.changes_since(self._version)
+        if changed is None:
+            self._reset()
+            return
+        self._version = self.grid_model.version
+        if len(changed):
+            self._update_indices(changed.tolist())
+
+    def update_cells(self, changed_cells):
+        """
+        Áp dụng một loạt ô đã thay đổi (đọc loại ô/chi phí mới từ GridModel).
+
+        Args:
+            changed_cells (iterable of tuple): Các tọa độ (row, col) đã thay đổi.
+        """
+        self._update_indices([self._index(cell_rc) for cell_rc in changed_cells])
+
+    def _update_indices(self, changed_indices):
+        """Cập nhật bản sao lưới tại các ô đã đổi, rồi tính lại rhs của các node có cạnh bị ảnh hưởng."""
+        cell_types = self.grid_model.cell_types
+        costs = self.grid_model.costs
+        affected = set()
+        for cell_idx in changed_indices:
+            r, c = divmod(cell_idx, self.cols)
+            self._walkable[cell_idx] = int(cell_types[r, c] != CELL_OBSTACLE)
+            self._cost[cell_idx] = float(costs[r, c])
+            # Cạnh đi ra của ô này và của 8 láng giềng (trọng số cạnh vào ô, quy tắc "cắt góc") có thể đã đổi.
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols:
+                        affected.add(cell_idx + dr * self.cols + dc)
+        for node_idx in affected:
+            self._update_vertex(node_idx)
+
+    def move_start(self, new_start_rc):
+        """
+        Dời điểm bắt đầu (ví dụ agent đã đi được một đoạn). Cây tìm kiếm được giữ nguyên;
+        chỉ độ dời key `km` tăng thêm để các key cũ trong hàng đợi vẫn là cận dưới hợp lệ.
+        """
+        new_start_rc = tuple(new_start_rc)
+        if new_start_rc == self.start_rc:
+            return
+        self._km += self.heuristic_func(self._last_start_rc, new_start_rc)
+        self._last_start_rc = new_start_rc
+        self.start_rc = new_start_rc
+
+    # --- Cạnh của lưới (tính trực tiếp, không cần dựng đồ thị) ---
+    def _edges(self, node_idx):
+        """
+        Liệt kê các cạnh (neighbor_idx, cost_to_neighbor, cost_from_neighbor) của một node.
+        Cạnh lưới luôn tồn tại theo cả hai chiều nên danh sách láng giềng dùng chung cho
+        successor và predecessor; chỉ trọng số khác nhau (theo chi phí ô đích).
+        """
+        walkable = self._walkable
+        if not walkable[node_idx]:
+            return []
+        rows, cols, cost = self.rows, self.cols, self._cost
+        r, c = divmod(node_idx, cols)
+        edges = []
+        for (dr, dc), factor in zip(self.directions, self._direction_factors):
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            neighbor_idx = nr * cols + nc
+            if not walkable[neighbor_idx]:
+                continue
+            if dr != 0 and dc != 0 and not walkable[nr * cols + c] and not walkable[r * cols + nc]:
+                continue # Không "cắt góc" giữa hai bức tường
+            edges.append((neighbor_idx, cost[neighbor_idx] * factor, cost[node_idx] * factor))
+        return edges
+
+    # --- Hàng đợi ưu tiên ---
+    def _calculate_key(self, node_idx):
+        best = min(self._g[node_idx], self._rhs[node_idx])
+        return (round(best + self.heuristic_func(self.start_rc, divmod(node_idx, self.cols)) + self._km, KEY_DIGITS), best)
+
+    def _push(self, node_idx, key):
+        self._open_keys[node_idx] = key
+        heapq.heappush(self._open_set, (key[0], key[1], node_idx))
+
+    def _top(self):
+        """Trả về (key, node_idx) nhỏ nhất còn hiệu lực, bỏ các entry cũ ở đỉnh heap."""
+        open_set, open_keys = self._open_set, self._open_keys
+        while open_set:
+            k1, k2, node_idx = open_set[0]
+            if open_keys.get(node_idx) == (k1, k2):
+                return (k1, k2), node_idx
+            heapq.heappop(open_set)
+        return (INF, INF), None
+
+    def _update_vertex(self, node_idx):
+        """Tính lại rhs của node và đưa node vào/ra hàng đợi tùy theo nó có nhất quán không."""
+        if node_idx != self._index(self.goal_rc):
+            g = self._g
+            self._rhs[node_idx] = min((g[nb] + cost_to for nb, cost_to, _ in self._edges(node_idx)), default=INF)
+        self._update_vertex_queue(node_idx)
+
+    def _compute_shortest_path(self):
+        """Mở rộng các node không nhất quán cho đến khi g(start) đúng. Trả về danh sách node đã mở rộng."""
+        g, rhs = self._g, self._rhs
+        start_idx = self._index(self.start_rc)
+        goal_idx = self._index(self.goal_rc)
+        expanded = []
+        while True:
+            key_old, node_idx = self._top()
+            if node_idx is None or (key_old >= self._calculate_key(start_idx) and rhs[start_idx] == g[start_idx]):
+                break
+            key_new = self._calculate_key(node_idx)
+            if key_old < key_new: # Key đã cũ (do km tăng) => đưa lại vào hàng đợi với key mới
+                self._push(node_idx, key_new)
+                continue
+            expanded.append(node_idx)
+            del self._open_keys[node_idx]
+            if g[node_idx] > rhs[node_idx]: # Node "dư thừa" (overconsistent): chốt giá trị g
+                g[node_idx] = rhs[node_idx]
+                g_node = g[node_idx]
+                for nb, _, cost_from in self._edges(node_idx):
+                    if nb != goal_idx and cost_from + g_node < rhs[nb]:
+                        rhs[nb] = cost_from + g_node
+                        self._update_vertex_queue(nb)
+            else: # Node "thiếu" (underconsistent): đặt g = inf rồi tính lại node và các predecessor
+                g[node_idx] = INF
+                self._update_vertex(node_idx)
+                for nb, _, _ in self._edges(node_idx):
+                    self._update_vertex(nb)
+        self.expanded_total += len(expanded)
+        return expanded
+
+    def _update_vertex_queue(self, node_idx):
+        """Đưa node vào/ra hàng đợi theo g và rhs hiện tại (rhs đã được tính sẵn)."""
+        if self._g[node_idx] != self._rhs[node_idx]:
+            self._push(node_idx, self._calculate_key(node_idx))
+        else:
+            self._open_keys.pop(node_idx, None)
+
+    # --- API chính ---
+    def extract_path(self):
+        """
+        Dựng đường đi từ điểm bắt đầu bằng cách luôn bước sang láng giềng có (chi phí cạnh + g) nhỏ nhất.
+
+        Returns:
+            tuple: (path, cost) - path là None và cost là inf nếu không có đường đi.
+        """
+        start_idx = self._index(self.start_rc)
+        goal_idx = self._index(self.goal_rc)
+        cost = self._g[start_idx] if start_idx != goal_idx else 0.0
+        if cost == INF:
+            return None, INF
+        path = [self.start_rc]
+        node_idx = start_idx
+        for _ in range(self.rows * self.cols): # Chặn vòng lặp vô hạn nếu trạng thái bất thường
+            if node_idx == goal_idx:
+                return path, cost
+            node_idx = min(self._edges(node_idx), key=lambda edge: edge[1] + self._g[edge[0]])[0]
+            path.append(divmod(node_idx, self.cols))
+        return None, INF
+
+    def replan(self):
+        """
+        Đồng bộ với lưới, sửa phần cây tìm kiếm bị ảnh hưởng và trả về đường đi hiện tại.
+
+        Returns:
+            tuple: (path, cost, explored_nodes) - giống `a_star_search`; explored_nodes chỉ gồm
+                   các node được mở rộng trong lần replan này.
+        """
+        self.sync()
+        start_rc = self.start_rc
+        if not (0 <= start_rc[0] < self.rows and 0 <= start_rc[1] < self.cols) or \
+                not self._walkable[self._index(start_rc)]:
+            return None, INF, []
+        expanded = self._compute_shortest_path()
+        path, cost = self.extract_path()
+        return path, cost, [divmod(node_idx, self.cols) for node_idx in expanded]
+
+
+def d_star_lite_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_euclidean):
+    """
+    Tìm đường một lần bằng D* Lite (tương đương một lần A* ngược từ đích).
+    Để tái sử dụng trạng thái giữa các lần sửa bản đồ, dùng trực tiếp lớp `DStarLite`.
+
+    Args:
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới.
+        start_rc (tuple): Tọa độ (row, col) điểm bắt đầu.
+        goal_rc (tuple): Tọa độ (row, col) điểm đích.
+        heuristic_func (function): Hàm heuristic.
+
+    Returns:
+        tuple: (path, cost, explored_nodes).
+    """
+    if is_unreachable(grid_data, start_rc, goal_rc):
+        return None, float("inf"), []
+    return DStarLite(grid_data, start_rc, goal_rc, heuristic_func).replan()
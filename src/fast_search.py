@@ -0,0 +1,390 @@
+# src/fast_search.py
+# Các "kernel" tìm đường làm việc trên chỉ số phẳng (row * cols + col) của CSRGraph.
+# Khác với các hàm trong algorithms.py, mỗi entry của hàng đợi chỉ chứa chỉ số node
+# (không mang theo bản sao `path + [neighbor]`). Trạng thái tìm kiếm được giữ trong các mảng
+# phẳng: g_cost (array 'd'), node cha (array 'l') và tập đã đóng (bytearray).
+# Đường đi chỉ được dựng lại một lần khi đến đích.
+# Các hàm trả về cùng dạng (path, cost, explored_nodes) với các hàm gốc.
+import heapq  # Hàng đợi ưu tiên cho A*, Dijkstra, Greedy BFS
+import collections # Hàng đợi FIFO cho BFS
+from array import array # Mảng số liệu gọn (8 byte/phần tử) thay cho dict {node: value}
+from src.algorithms import heuristic_manhattan, heuristic_zero, run_steps, flush_explored, STEP_EXPANSIONS
+from src.components import is_unreachable # Đích khác thành phần liên thông => trả về ngay
+from src.heuristic_tables import heuristic_deltas # |dr|, |dc| theo đích (thay cho lời gọi hàm mỗi lần push)
+from src.open_list import make_open_list # Các backend OPEN list có bộ đếm (heap, indexed, bucket, radix)
+
+INF = float("inf")
+
+
+def _reconstruct_path(parent, goal_idx, cols):
+    """
+    Dựng lại đường đi từ mảng node cha, đi ngược từ đích về điểm bắt đầu.
+
+    Args:
+        parent (array): Mảng node cha (-1 tại điểm bắt đầu).
+        goal_idx (int): Chỉ số phẳng của node đích.
+        cols (int): Số cột của lưới (để đổi chỉ số phẳng sang (row, col)).
+
+    Returns:
+        list of tuples: Đường đi (row, col) từ điểm bắt đầu đến đích.
+    """
+    path = []
+    node_idx = goal_idx
+    while node_idx != -1:
+        path.append(divmod(node_idx, cols))
+        node_idx = parent[node_idx]
+    path.reverse()
+    return path
+
+
+def _search_state(graph):
+    """Trả về (g_cost, parent, closed) khởi tạo cho một lần tìm kiếm trên `graph`."""
+    num_cells = graph.rows * graph.cols
+    return array("d", [INF]) * num_cells, array("l", [-1]) * num_cells, bytearray(num_cells)
+
+
+def a_star_search_flat(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan,
+                       open_list=None, stats=None):
+    """
+    Thuật toán A* trên CSRGraph, dùng chỉ số phẳng và mảng trạng thái.
+    Thứ tự mở rộng node giống `a_star_search` (cùng khóa (f, g, node) trong heap),
+    nhưng không sao chép đường đi ở mỗi lần push và kiểm tra "đã khám phá" bằng bytearray O(1).
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Tọa độ (row, col) của node bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) của node đích.
+        heuristic_func (function): Hàm heuristic để ước lượng chi phí.
+        open_list (str, optional): Backend OPEN list trong src/open_list.py ("heap", "indexed", "bucket",
+                                   "radix"); None = heapq viết liền trong vòng lặp (nhanh nhất, không đếm).
+        stats (dict, optional): Nhận "open_list", "pushes", "pops", "stale_pops" (dùng backend "heap" nếu
+                                `open_list` là None).
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - giống `a_star_search`.
+    """
+    return run_steps(a_star_steps_flat(graph, start_node_rc, goal_node_rc, heuristic_func, open_list, stats))
+
+
+def a_star_steps_flat(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan,
+                      open_list=None, stats=None, record_explored=True):
+    """
+    Generator của `a_star_search_flat`: cứ mỗi STEP_EXPANSIONS node được mở rộng thì yield list các node đó
+    (lô cuối có thể ít hơn); return (path, cost, explored_nodes). Với record_explored=False, explored_nodes
+    trả về là list rỗng: generator chỉ giữ lô đang gom, người gọi nhận mọi node qua các lần yield.
+    """
+    if open_list is not None or stats is not None:
+        return (yield from _a_star_steps_open_list(graph, start_node_rc, goal_node_rc, heuristic_func,
+                                                   open_list or "heap", stats, record_explored))
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    g_cost, parent, closed = _search_state(graph)
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+    use_heuristic = heuristic_func is not heuristic_zero # Dijkstra: bỏ qua lời gọi heuristic
+    # Manhattan và octile được tính tại chỗ từ |dr|, |dc| (src/heuristic_tables.py); các heuristic khác
+    # (ví dụ Euclidean, ALT) vẫn được gọi như hàm.
+    h_deltas = heuristic_deltas(graph, goal_node_rc, heuristic_func) if use_heuristic else None
+    if h_deltas is not None:
+        row_delta, col_delta, diagonal_factor = h_deltas
+
+    g_cost[start_idx] = 0
+    # Mỗi phần tử của heap: (f_cost, g_cost, node_idx) - không kèm đường đi.
+    open_set = [(heuristic_func(start_node_rc, goal_node_rc) if use_heuristic else 0, 0, start_idx)]
+    explored = [] # Thứ tự các node được mở rộng (cho visualization; rỗng nếu record_explored=False)
+    batch = [] # Các node mở rộng chưa yield
+
+    while open_set:
+        _, g_current, current_idx = heapq.heappop(open_set)
+        if g_current > g_cost[current_idx]: # Entry cũ (đã có đường tốt hơn) => bỏ qua
+            continue
+        if not closed[current_idx]: # Kiểm tra O(1) thay vì tìm trong list
+            closed[current_idx] = 1
+            batch.append(divmod(current_idx, cols))
+            if len(batch) == STEP_EXPANSIONS:
+                yield batch
+                if record_explored: explored += batch
+                batch = []
+
+        if current_idx == goal_idx:
+            yield from flush_explored(explored, batch, record_explored)
+            return _reconstruct_path(parent, goal_idx, cols), g_current, explored
+
+        start, end = row_start[current_idx], row_end[current_idx]
+        for neighbor_idx, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+            new_g = g_current + weight
+            if new_g < g_cost[neighbor_idx]:
+                g_cost[neighbor_idx] = new_g
+                parent[neighbor_idx] = current_idx
+                if h_deltas is not None:
+                    r_nb, c_nb = divmod(neighbor_idx, cols)
+                    dr, dc = row_delta[r_nb], col_delta[c_nb]
+                    priority = new_g + ((dr + dc) + diagonal_factor * (dr if dr < dc else dc))
+                elif use_heuristic:
+                    priority = new_g + heuristic_func(divmod(neighbor_idx, cols), goal_node_rc)
+                else:
+                    priority = new_g
+                heapq.heappush(open_set, (priority, new_g, neighbor_idx))
+
+    yield from flush_explored(explored, batch, record_explored)
+    return None, INF, explored
+
+
+def _a_star_steps_open_list(graph, start_node_rc, goal_node_rc, heuristic_func, open_list_name, stats,
+                            record_explored=True):
+    """
+    `a_star_steps_flat` trên một OPEN list của src/open_list.py (cùng khóa f, phá hòa theo g): giống hệt bản
+    viết liền nhưng có thể đổi backend và đếm số push / pop / pop bỏ entry cũ vào `stats`.
+    """
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        if stats is not None:
+            stats.update({"open_list": open_list_name, "pushes": 0, "pops": 0, "stale_pops": 0})
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    g_cost, parent, closed = _search_state(graph)
+    open_set = make_open_list(open_list_name, len(g_cost))
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+    use_heuristic = heuristic_func is not heuristic_zero
+    h_deltas = heuristic_deltas(graph, goal_node_rc, heuristic_func) if use_heuristic else None
+    if h_deltas is not None:
+        row_delta, col_delta, diagonal_factor = h_deltas
+
+    g_cost[start_idx] = 0
+    open_set.push(start_idx, heuristic_func(start_node_rc, goal_node_rc) if use_heuristic else 0, 0)
+    explored = []
+    batch = []
+    result = None, INF, explored
+
+    while open_set:
+        _, current_idx = open_set.pop() # Entry cũ đã được OPEN list bỏ qua
+        g_current = g_cost[current_idx]
+        if not closed[current_idx]:
+            closed[current_idx] = 1
+            batch.append(divmod(current_idx, cols))
+            if len(batch) == STEP_EXPANSIONS:
+                yield batch
+                if record_explored: explored += batch
+                batch = []
+
+        if current_idx == goal_idx:
+            result = _reconstruct_path(parent, goal_idx, cols), g_current, explored
+            break
+
+        start, end = row_start[current_idx], row_end[current_idx]
+        for neighbor_idx, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+            new_g = g_current + weight
+            if new_g < g_cost[neighbor_idx]:
+                g_cost[neighbor_idx] = new_g
+                parent[neighbor_idx] = current_idx
+                if h_deltas is not None:
+                    r_nb, c_nb = divmod(neighbor_idx, cols)
+                    dr, dc = row_delta[r_nb], col_delta[c_nb]
+                    priority = new_g + ((dr + dc) + diagonal_factor * (dr if dr < dc else dc))
+                elif use_heuristic:
+                    priority = new_g + heuristic_func(divmod(neighbor_idx, cols), goal_node_rc)
+                else:
+                    priority = new_g
+                open_set.push(neighbor_idx, priority, new_g)
+
+    yield from flush_explored(explored, batch, record_explored)
+    if stats is not None:
+        stats.update(open_set.stats())
+    return result
+
+
+def dijkstra_search_flat(graph, start_node_rc, goal_node_rc, open_list=None, stats=None):
+    """
+    Thuật toán Dijkstra trên CSRGraph (A* với heuristic bằng 0).
+
+    Args:
+        open_list (str, optional): Backend OPEN list (xem `a_star_search_flat`).
+        stats (dict, optional): Nhận các bộ đếm của OPEN list (xem `a_star_search_flat`).
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - giống `dijkstra_search`.
+    """
+    return a_star_search_flat(graph, start_node_rc, goal_node_rc, heuristic_zero, open_list, stats)
+
+
+def dijkstra_steps_flat(graph, start_node_rc, goal_node_rc, open_list=None, stats=None, record_explored=True):
+    """Generator của `dijkstra_search_flat` (xem `a_star_steps_flat`)."""
+    return a_star_steps_flat(graph, start_node_rc, goal_node_rc, heuristic_zero, open_list, stats, record_explored)
+
+
+def single_source_distances_flat(graph, source_node_rc):
+    """
+    Dijkstra đầy đủ từ một node: chi phí ngắn nhất đến MỌI node (không dừng ở đích).
+    Dùng cho các bước tiền xử lý như bảng khoảng cách landmark (src/landmarks.py).
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        source_node_rc (tuple): Tọa độ (row, col) của node nguồn.
+
+    Returns:
+        array: Mảng 'd' (rows * cols phần tử), inf tại các node không đến được.
+    """
+    return run_steps(single_source_distances_steps(graph, source_node_rc))
+
+
+def single_source_distances_steps(graph, source_node_rc):
+    """
+    Generator của `single_source_distances_flat`: cứ mỗi STEP_EXPANSIONS node được đóng thì yield list
+    các node (row, col) đó (theo thứ tự đóng); return mảng khoảng cách.
+    """
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    g_cost, _, closed = _search_state(graph)
+    source_idx = source_node_rc[0] * cols + source_node_rc[1]
+    g_cost[source_idx] = 0
+    open_set = [(0, source_idx)]
+    settled = []
+
+    while open_set:
+        g_current, current_idx = heapq.heappop(open_set)
+        if closed[current_idx]:
+            continue
+        closed[current_idx] = 1
+        settled.append(current_idx)
+        if len(settled) == STEP_EXPANSIONS:
+            yield [divmod(node_idx, cols) for node_idx in settled]
+            settled = []
+        start, end = row_start[current_idx], row_end[current_idx]
+        for neighbor_idx, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+            new_g = g_current + weight
+            if new_g < g_cost[neighbor_idx]:
+                g_cost[neighbor_idx] = new_g
+                heapq.heappush(open_set, (new_g, neighbor_idx))
+
+    if settled:
+        yield [divmod(node_idx, cols) for node_idx in settled]
+    return g_cost
+
+
+def greedy_bfs_search_flat(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan):
+    """
+    Greedy Best-First Search trên CSRGraph.
+    Node cha được lưu trong entry của heap và chỉ được ghi vào mảng `parent` khi node được
+    đóng lần đầu, nên đường đi trả về giống `greedy_bfs_search`.
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Node bắt đầu.
+        goal_node_rc (tuple): Node đích.
+        heuristic_func (function): Hàm heuristic.
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - giống `greedy_bfs_search`.
+    """
+    return run_steps(greedy_bfs_steps_flat(graph, start_node_rc, goal_node_rc, heuristic_func))
+
+
+def greedy_bfs_steps_flat(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_manhattan,
+                          record_explored=True):
+    """Generator của `greedy_bfs_search_flat` (xem `a_star_steps_flat`)."""
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    _, parent, closed = _search_state(graph)
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+
+    h_deltas = heuristic_deltas(graph, goal_node_rc, heuristic_func) # None => gọi hàm như cũ
+    if h_deltas is not None:
+        row_delta, col_delta, diagonal_factor = h_deltas
+
+    # (heuristic_to_goal, accumulated_g_cost, node_idx, parent_idx)
+    open_set = [(heuristic_func(start_node_rc, goal_node_rc), 0, start_idx, -1)]
+    explored = []
+    batch = []
+
+    while open_set:
+        _, g_accumulated, current_idx, parent_idx = heapq.heappop(open_set)
+        if closed[current_idx]: # Node đã được xử lý
+            continue
+        closed[current_idx] = 1
+        parent[current_idx] = parent_idx
+        batch.append(divmod(current_idx, cols))
+        if len(batch) == STEP_EXPANSIONS:
+            yield batch
+            if record_explored: explored += batch
+            batch = []
+
+        if current_idx == goal_idx:
+            yield from flush_explored(explored, batch, record_explored)
+            return _reconstruct_path(parent, goal_idx, cols), g_accumulated, explored
+
+        start, end = row_start[current_idx], row_end[current_idx]
+        for neighbor_idx, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+            if not closed[neighbor_idx]:
+                if h_deltas is not None:
+                    r_nb, c_nb = divmod(neighbor_idx, cols)
+                    dr, dc = row_delta[r_nb], col_delta[c_nb]
+                    heuristic_value = (dr + dc) + diagonal_factor * (dr if dr < dc else dc)
+                else:
+                    heuristic_value = heuristic_func(divmod(neighbor_idx, cols), goal_node_rc)
+                heapq.heappush(open_set, (heuristic_value, g_accumulated + weight, neighbor_idx, current_idx))
+
+    yield from flush_explored(explored, batch, record_explored)
+    return None, INF, explored
+
+
+def bfs_search_flat(graph, start_node_rc, goal_node_rc):
+    """
+    Breadth-First Search trên CSRGraph. Hàng đợi chỉ chứa chỉ số node;
+    chi phí thực tế tích lũy theo cây BFS được lưu trong mảng `g_cost`.
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Node bắt đầu.
+        goal_node_rc (tuple): Node đích.
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - giống `bfs_search`.
+    """
+    return run_steps(bfs_steps_flat(graph, start_node_rc, goal_node_rc))
+
+
+def bfs_steps_flat(graph, start_node_rc, goal_node_rc, record_explored=True):
+    """Generator của `bfs_search_flat` (xem `a_star_steps_flat`)."""
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    g_cost, parent, visited = _search_state(graph)
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+
+    g_cost[start_idx] = 0
+    visited[start_idx] = 1
+    queue = collections.deque([start_idx])
+    explored = []
+    batch = []
+
+    while queue:
+        current_idx = queue.popleft()
+        batch.append(divmod(current_idx, cols))
+        if len(batch) == STEP_EXPANSIONS:
+            yield batch
+            if record_explored: explored += batch
+            batch = []
+
+        if current_idx == goal_idx:
+            yield from flush_explored(explored, batch, record_explored)
+            return _reconstruct_path(parent, goal_idx, cols), g_cost[goal_idx], explored
+
+        current_cost = g_cost[current_idx]
+        start, end = row_start[current_idx], row_end[current_idx]
+        for neighbor_idx, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+            if not visited[neighbor_idx]:
+                visited[neighbor_idx] = 1
+                parent[neighbor_idx] = current_idx
+                g_cost[neighbor_idx] = current_cost + weight
+                queue.append(neighbor_idx)
+
+    yield from flush_explored(explored, batch, record_explored)
+    return None, INF, explored
@@ -0,0 +1,194 @@
+# src/flow_field.py
+# Trường hướng (flow field) cho nhiều agent cùng một đích.
+# Thay vì mỗi agent tự tìm đường, chạy MỘT lần Dijkstra ngược từ đích (trên đồ thị đảo chiều,
+# vì trọng số cạnh phụ thuộc ô đích) để có khoảng cách d(n, goal) của mọi ô; bước kế tiếp của ô n là
+# láng giềng v cực tiểu hóa w(n, v) + d(v, goal). Agent ở bất kỳ ô nào chỉ cần tra bảng để đi tiếp,
+# nên chi phí không tăng theo số agent. Trường tự tính lại (một lần, cho mọi agent dùng chung)
+# khi lưới thay đổi. `flow_field_steps` chạy từng bước (xem src/stepper.py): Dijkstra ngược dừng được giữa chừng.
+import weakref # Bộ nhớ đệm trường hướng theo GridModel, tự giải phóng khi lưới bị hủy
+import numpy as np
+from src.grid_model import as_grid_model
+from src.csr_graph import update_csr_graph
+from src.components import is_unreachable
+from src.algorithms import run_steps, STEP_EXPANSIONS
+from src.fast_search import single_source_distances_steps
+
+# Số đích tối đa được giữ trường hướng cho mỗi lưới (bỏ đích dùng lâu nhất khi vượt).
+MAX_FIELDS_PER_MODEL = 8
+
+_fields_by_model = weakref.WeakKeyDictionary()
+
+
+class FlowField:
+    """
+    Khoảng cách đến đích và bước đi kế tiếp cho mọi ô của một lưới.
+    - `distances`: mảng float64 (rows * cols), inf tại ô không đến được đích (và tường).
+    - `next_index`: mảng int64 (rows * cols), chỉ số phẳng của ô kế tiếp; -1 tại đích và ô không đến được.
+    """
+    def __init__(self, grid_data, goal_rc, lazy=False):
+        """
+        Args:
+            grid_data (GameGrid or GridModel): Lưới.
+            goal_rc (tuple): Tọa độ (row, col) của đích.
+            lazy (bool): True để chưa tính trường (lần refresh đầu tiên sẽ tính).
+        """
+        self.grid_model = as_grid_model(grid_data)
+        self.goal_rc = (int(goal_rc[0]), int(goal_rc[1]))
+        self.cols = self.grid_model.cols
+        self.graph = None
+        self.version = None # Phiên bản lưới mà trường đang phản ánh
+        self.rebuilds = 0 # Số lần đã tính (để theo dõi / benchmark)
+        if not lazy:
+            self.refresh()
+
+    def refresh(self):
+        """Tính lại trường nếu lưới đã thay đổi. Trả về True nếu có tính lại."""
+        return run_steps(self.refresh_steps())
+
+    def refresh_steps(self):
+        """
+        Generator của `refresh`: yield các ô (row, col) vừa được Dijkstra ngược đóng, theo từng lô;
+        return True nếu có tính lại. Trường cũ chỉ bị thay khi đã tính xong, nên bỏ dở giữa chừng
+        thì lần refresh sau tính lại từ đầu.
+        """
+        if self.version == self.grid_model.version:
+            return False
+        version = self.grid_model.version
+        # Đồ thị CSR được vá tăng dần theo các ô đã sửa (dựng mới ở lần đầu / sau ghi hàng loạt).
+        self.graph = update_csr_graph(self.graph, self.grid_model)
+        num_cells = self.grid_model.rows * self.cols
+        distances = np.full(num_cells, np.inf)
+        next_index = np.full(num_cells, -1, dtype=np.int64)
+        if self.goal_rc in self.graph:
+            distances = np.frombuffer((yield from single_source_distances_steps(self.graph.reversed(), self.goal_rc)))
+            # Với mọi cạnh u -> v: ứng viên w(u, v) + d(v); bước kế tiếp của u là ứng viên nhỏ nhất.
+            offsets, neighbors, weights = self.graph.compact_arrays()
+            sources = np.repeat(np.arange(num_cells), np.diff(offsets))
+            candidates = weights + distances[neighbors]
+            valid = np.isfinite(candidates)
+            sources, neighbors, candidates = sources[valid], neighbors[valid], candidates[valid]
+            # Sắp theo (node nguồn, ứng viên); sắp xếp ổn định nên khi hòa, hướng duyệt trước được chọn.
+            order = np.lexsort((candidates, sources))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = sources[order][1:] != sources[order][:-1]
+            best = order[first]
+            next_index[sources[best]] = neighbors[best]
+            next_index[self.goal_rc[0] * self.cols + self.goal_rc[1]] = -1 # Đã ở đích
+        self.distances, self.next_index = distances, next_index
+        self._distances_view = memoryview(self.distances)
+        self._next_view = memoryview(self.next_index)
+        self.version = version
+        self.rebuilds += 1
+        return True
+
+    def distance(self, node_rc):
+        """Chi phí ngắn nhất từ `node_rc` đến đích (inf nếu không đến được)."""
+        self.refresh()
+        return self._distances_view[node_rc[0] * self.cols + node_rc[1]]
+
+    def next_cell(self, node_rc):
+        """
+        Ô kế tiếp trên đường ngắn nhất từ `node_rc` đến đích.
+
+        Returns:
+            tuple or None: (row, col) kế tiếp, hoặc None nếu đã ở đích / không đến được.
+        """
+        self.refresh()
+        next_idx = self._next_view[node_rc[0] * self.cols + node_rc[1]]
+        return divmod(next_idx, self.cols) if next_idx >= 0 else None
+
+    def path_from(self, start_rc):
+        """
+        Đường đi từ `start_rc` đến đích bằng cách đi theo trường.
+
+        Returns:
+            list or None: Danh sách (row, col) từ start đến đích, hoặc None nếu không đến được.
+        """
+        self.refresh()
+        start_rc = (int(start_rc[0]), int(start_rc[1]))
+        if start_rc == self.goal_rc:
+            return [start_rc]
+        if not np.isfinite(self.distance(start_rc)):
+            return None
+        path = [start_rc]
+        current_idx = self._next_view[start_rc[0] * self.cols + start_rc[1]]
+        while current_idx >= 0:
+            path.append(divmod(current_idx, self.cols))
+            current_idx = self._next_view[current_idx]
+        return path
+
+
+def flow_field_for(grid_data, goal_rc):
+    """
+    Lấy trường hướng của một đích trên lưới (dùng chung cho mọi agent cùng đích).
+    Trường được tạo ở lần đầu và tự tính lại khi lưới thay đổi.
+
+    Args:
+        grid_data (GameGrid or GridModel): Lưới.
+        goal_rc (tuple): Tọa độ (row, col) của đích.
+
+    Returns:
+        FlowField: Trường hướng đã đồng bộ với lưới.
+    """
+    field = _cached_field(grid_data, goal_rc)
+    field.refresh()
+    return field
+
+
+def _cached_field(grid_data, goal_rc):
+    """Trường hướng của đích trong bộ nhớ đệm của lưới (tạo mới nếu chưa có), chưa refresh."""
+    model = as_grid_model(grid_data)
+    goal_rc = (int(goal_rc[0]), int(goal_rc[1]))
+    fields = _fields_by_model.setdefault(model.cache_key, {})
+    field = fields.pop(goal_rc, None) # Lấy ra rồi đưa lại vào cuối: dict giữ thứ tự dùng gần nhất
+    if field is None:
+        field = FlowField(model, goal_rc, lazy=True)
+        if len(fields) >= MAX_FIELDS_PER_MODEL:
+            fields.pop(next(iter(fields)))
+    else:
+        field.grid_model = model # Bản chụp mới của cùng lưới: đồ thị của trường được vá tăng dần
+    fields[goal_rc] = field
+    return field
+
+
+def flow_field_search(grid_data, start_node_rc, goal_node_rc):
+    """
+    "Tìm đường" bằng trường hướng: đi theo bảng bước kế tiếp từ start.
+    Có cùng dạng kết quả với các thuật toán khác để hiển thị trong danh sách thuật toán.
+
+    Args:
+        grid_data (GameGrid or GridModel): Lưới.
+        start_node_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) đích.
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - explored là mọi ô đến được đích, theo thứ tự khoảng cách tăng dần
+               (thứ tự Dijkstra ngược đóng các ô).
+    """
+    return run_steps(flow_field_steps(grid_data, start_node_rc, goal_node_rc))
+
+
+def flow_field_steps(grid_data, start_node_rc, goal_node_rc, record_explored=True):
+    """
+    Generator của `flow_field_search` (cùng tham số): yield các ô vừa được đóng khi trường phải tính lại
+    (hoặc, khi trường có sẵn, các ô theo thứ tự khoảng cách, từng lô STEP_EXPANSIONS ô);
+    return (path, cost, explored_nodes) - explored_nodes rỗng nếu record_explored=False.
+    """
+    if is_unreachable(grid_data, start_node_rc, goal_node_rc): # Không cần dựng trường cho đích này
+        return None, float("inf"), []
+    field = _cached_field(grid_data, goal_node_rc)
+    explored = []
+    streamed = 0 # Số ô đã yield trong lúc tính lại trường
+    for settled_nodes in field.refresh_steps():
+        if record_explored: explored += settled_nodes
+        streamed += len(settled_nodes)
+        yield settled_nodes
+    if not streamed: # Trường có sẵn: lấy lại thứ tự đóng từ khoảng cách
+        reachable = np.flatnonzero(np.isfinite(field.distances))
+        settled = reachable[np.argsort(field.distances[reachable], kind="stable")]
+        for begin in range(0, len(settled), STEP_EXPANSIONS):
+            batch = [divmod(node_idx, field.cols) for node_idx in settled[begin:begin + STEP_EXPANSIONS].tolist()]
+            if record_explored: explored += batch
+            yield batch
+    path = field.path_from(start_node_rc)
+    return path, (field.distance(start_node_rc) if path else float("inf")), explored
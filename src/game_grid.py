@@ -1,28 +1,36 @@
 # src/game_grid.py
-import pygame
-from config import (CELL_SIZE, GRID_ROWS, GRID_COLS, COST_NORMAL_CELL, COST_TRAP_CELL,
+# pygame và sprite_manager chỉ được import khi vẽ: các công cụ không giao diện (benchmark) dùng
+# create_grid() mà không phải khởi tạo pygame / SDL.
+from config import (CELL_SIZE, GRID_ROWS, GRID_COLS,
                     RED, GREEN, BLUE, BROWN, WHITE, ORANGE, GREY, COLOR_EXPLORED_NODE)
-from src.sprite_manager import get_sprite # Import hàm lấy sprite từ sprite_manager
+from src.grid_model import GridModel, CELL_OBSTACLE, CELL_START, CELL_END # Mô hình lưới dạng mảng, nơi lưu loại ô và chi phí
 
 class GridNode:
     """
     Đại diện cho một ô (node) đơn lẻ trong lưới game.
-    Mỗi node lưu trữ thông tin về vị trí, loại, chi phí, và trạng thái hiển thị.
+    Loại ô và chi phí được lưu trong GridModel (mảng NumPy); node chỉ là một "view" mỏng
+    trỏ vào ô (row, col) của mô hình, cộng thêm trạng thái hiển thị riêng của nó.
     """
-    def __init__(self, row, col):
+    def __init__(self, row, col, model=None):
         """
         Khởi tạo một GridNode.
 
         Args:
             row (int): Chỉ số hàng của node trong lưới.
             col (int): Chỉ số cột của node trong lưới.
+            model (GridModel, optional): Mô hình lưới chứa dữ liệu của node.
+                                         Nếu None, tạo một mô hình 1x1 riêng cho node.
         """
         self.row = row  # Chỉ số hàng (grid coordinate)
         self.col = col  # Chỉ số cột (grid coordinate)
         self.x_pixel = col * CELL_SIZE # Tọa độ x pixel trên màn hình (góc trên bên trái)
         self.y_pixel = row * CELL_SIZE # Tọa độ y pixel trên màn hình (góc trên bên trái)
-        self.type = "normal"  # Loại node: "normal", "obstacle", "trap", "start", "end"
-        self.cost = COST_NORMAL_CELL # Chi phí để đi qua node này (mặc định là chi phí ô thường)
+        if model is None: # Node đứng riêng lẻ: dùng mô hình 1x1, node trỏ vào ô (0, 0)
+            model = GridModel(1, 1)
+            self._model_rc = (0, 0)
+        else:
+            self._model_rc = (row, col)
+        self.model = model # Mô hình lưới chứa loại ô ("normal", "obstacle", ...) và chi phí
         
         # Thuộc tính này có thể được sử dụng để đánh dấu đường đi do người chơi vẽ (chưa dùng tới)
         self.is_player_path_node = False
@@ -40,6 +48,25 @@ class GridNode:
         self.is_explored = False # True nếu node này đã được thuật toán AI khám phá
         self.explored_color = COLOR_EXPLORED_NODE # Màu mặc định cho node đã khám phá
 
+    # --- Thuộc tính "view" vào GridModel ---
+    @property
+    def type(self):
+        """Loại node: "normal", "obstacle", "trap", "start", "end" (đọc từ GridModel)."""
+        return self.model.get_cell_type(*self._model_rc)
+
+    @type.setter
+    def type(self, type_name):
+        # Ghi loại ô vào mô hình; chi phí mặc định của loại ô cũng được cập nhật theo.
+        self.model.set_cell_type(*self._model_rc, type_name)
+
+    @property
+    def cost(self):
+        """Chi phí để đi qua node này (đọc từ GridModel)."""
+        return self.model.get_cost(*self._model_rc)
+
+    @cost.setter
+    def cost(self, value):
+        self.model.set_cost(*self._model_rc, value)
 
     def get_map_element_sprite(self):
         """
@@ -48,6 +75,7 @@ class GridNode:
         Returns:
             pygame.Surface or None: Sprite của node nếu có, ngược lại là None.
         """
+        from src.sprite_manager import get_sprite # Import muộn (xem đầu file)
         if self.type == "obstacle": return get_sprite("wall")
         if self.type == "trap": return get_sprite("trap")
         if self.type == "start": return get_sprite("start_flag")
@@ -83,6 +111,7 @@ class GridNode:
         Args:
             screen (pygame.Surface): Bề mặt màn hình để vẽ lên.
         """
+        import pygame # Import muộn (xem đầu file); các lần sau chỉ là tra sys.modules
         rect_to_draw = pygame.Rect(self.x_pixel, self.y_pixel, CELL_SIZE, CELL_SIZE)
         
         # --- Lớp 1: Vẽ trạng thái "explored" (nếu có) ---
@@ -135,36 +164,31 @@ class GridNode:
     # --- Các phương thức thay đổi trạng thái của Node ---
     def make_obstacle(self):
         """Chuyển node thành chướng ngại vật (wall)."""
-        self.type = "obstacle"
-        self.cost = float("inf") # Chi phí vô cực, không thể đi qua
+        self.type = "obstacle" # Chi phí vô cực (không thể đi qua) được đặt cùng loại ô trong GridModel
         self.pulsate_alpha = self.MAX_ALPHA # Obstacle không nhấp nháy
         self._reset_path_flags() # Xóa trạng thái path/explored cũ
 
     def make_start(self):
         """Chuyển node thành điểm bắt đầu."""
-        self.type = "start"
-        self.cost = COST_NORMAL_CELL # Điểm bắt đầu có chi phí như ô thường
+        self.type = "start" # Điểm bắt đầu có chi phí như ô thường
         self.pulsate_alpha = self.MAX_ALPHA # Reset alpha để bắt đầu hiệu ứng
         self._reset_path_flags()
 
     def make_end(self):
         """Chuyển node thành điểm kết thúc."""
-        self.type = "end"
-        self.cost = COST_NORMAL_CELL # Điểm kết thúc có chi phí như ô thường
+        self.type = "end" # Điểm kết thúc có chi phí như ô thường
         self.pulsate_alpha = self.MAX_ALPHA # Reset alpha
         self._reset_path_flags()
 
     def make_trap(self):
         """Chuyển node thành bẫy."""
-        self.type = "trap"
-        self.cost = COST_TRAP_CELL # Bẫy có chi phí cao hơn
+        self.type = "trap" # Bẫy có chi phí cao hơn (COST_TRAP_CELL)
         self.pulsate_alpha = self.MAX_ALPHA # Reset alpha
         self._reset_path_flags()
 
     def reset(self):
         """Reset node về trạng thái bình thường (ô trống)."""
-        self.type = "normal"
-        self.cost = COST_NORMAL_CELL
+        self.type = "normal" # Chi phí được đưa về COST_NORMAL_CELL
         self.is_player_path_node = False
         self.pulsate_alpha = self.MAX_ALPHA # Ô thường không nhấp nháy
         self._reset_path_flags() # Xóa trạng thái path/explored
@@ -178,31 +202,52 @@ class GridNode:
     # --- Các phương thức kiểm tra loại Node ---
     def is_obstacle_type(self):
         """Kiểm tra xem node có phải là chướng ngại vật không."""
-        return self.type == "obstacle"
+        return self.model.cell_types[self._model_rc] == CELL_OBSTACLE
 
     def is_start_type(self):
         """Kiểm tra xem node có phải là điểm bắt đầu không."""
-        return self.type == "start"
+        return self.model.cell_types[self._model_rc] == CELL_START
 
     def is_end_type(self):
         """Kiểm tra xem node có phải là điểm kết thúc không."""
-        return self.type == "end"
+        return self.model.cell_types[self._model_rc] == CELL_END
+
+class GameGrid:
+    """
+    Lưới game: một GridModel (mảng loại ô + chi phí) cùng các GridNode "view" để vẽ.
+    Hỗ trợ truy cập kiểu list 2 chiều (`grid[r][c]`, `for row in grid`, `len(grid)`)
+    để giữ tương thích với code cũ.
+    """
+    def __init__(self, rows=GRID_ROWS, cols=GRID_COLS):
+        """
+        Khởi tạo lưới game toàn ô trống.
+
+        Args:
+            rows (int): Số hàng.
+            cols (int): Số cột.
+        """
+        self.model = GridModel(rows, cols) # Nguồn dữ liệu duy nhất về loại ô và chi phí
+        # Các node view, mỗi node trỏ vào một ô của self.model
+        self.nodes = [[GridNode(r, c, self.model) for c in range(cols)] for r in range(rows)]
+
+    def __getitem__(self, row_idx):
+        return self.nodes[row_idx]
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
 
 # --- Các hàm tiện ích liên quan đến Grid ---
 def create_grid():
     """
-    Tạo một lưới game 2D mới, bao gồm các đối tượng GridNode.
+    Tạo một lưới game 2D mới, bao gồm GridModel và các đối tượng GridNode.
 
     Returns:
-        list of list of GridNode: Lưới game dưới dạng một list 2 chiều.
+        GameGrid: Lưới game, truy cập được như một list 2 chiều các GridNode.
     """
-    grid = []
-    for r in range(GRID_ROWS): # Duyệt qua từng hàng
-        row_nodes = []
-        for c in range(GRID_COLS): # Duyệt qua từng cột trong hàng đó
-            row_nodes.append(GridNode(r, c)) # Tạo một GridNode và thêm vào hàng hiện tại
-        grid.append(row_nodes) # Thêm hàng đã hoàn thành vào lưới
-    return grid
+    return GameGrid(GRID_ROWS, GRID_COLS)
 
 def draw_grid_lines(screen):
     """
@@ -211,6 +256,7 @@ def draw_grid_lines(screen):
     Args:
         screen (pygame.Surface): Bề mặt màn hình để vẽ lên.
     """
+    import pygame # Import muộn (xem đầu file)
     # Vẽ các đường kẻ ngang
     for r in range(GRID_ROWS + 1): # Cần GRID_ROWS + 1 đường kẻ ngang
         pygame.draw.line(screen, GREY, (0, r * CELL_SIZE), (GRID_COLS * CELL_SIZE, r * CELL_SIZE))
@@ -0,0 +1,316 @@
+# src/grid_model.py
+import functools # Bộ nhớ đệm bảng khóa Zobrist theo kích thước lưới
+import weakref # Bản chụp chỉ tham chiếu yếu tới khóa dòng bản chụp (xem GridModel.cache_key)
+import numpy as np  # Lưu trữ lưới dưới dạng mảng liên tục để xử lý hàng loạt (vectorized)
+from config import GRID_ROWS, GRID_COLS, COST_NORMAL_CELL, COST_TRAP_CELL
+
+# --- MÃ LOẠI Ô ---
+# Mỗi ô trong lưới được lưu bằng một mã số nguyên (uint8) thay vì chuỗi.
+CELL_NORMAL = 0    # Ô trống, đi qua được với chi phí thường.
+CELL_OBSTACLE = 1  # Chướng ngại vật (tường), không thể đi qua.
+CELL_TRAP = 2      # Ô bẫy, đi qua được nhưng chi phí cao.
+CELL_START = 3     # Điểm bắt đầu.
+CELL_END = 4       # Điểm kết thúc.
+
+# Tên loại ô tương ứng với từng mã (index = mã), dùng cho GridNode và UI.
+CELL_TYPE_NAMES = ("normal", "obstacle", "trap", "start", "end")
+# Ánh xạ ngược: tên loại ô -> mã.
+CELL_TYPE_CODES = {name: code for code, name in enumerate(CELL_TYPE_NAMES)}
+# Chi phí mặc định của từng loại ô (index = mã). Chướng ngại vật có chi phí vô cực.
+CELL_TYPE_COSTS = np.array(
+    [COST_NORMAL_CELL, np.inf, COST_TRAP_CELL, COST_NORMAL_CELL, COST_NORMAL_CELL], dtype=np.float32
+)
+# Số thay đổi từng ô tối đa được giữ trong nhật ký. Vượt quá ngưỡng này thì coi như
+# "thay đổi toàn bộ" (dựng lại đồ thị từ đầu rẻ hơn là vá từng ô).
+MAX_CHANGE_LOG = 4096
+# Seed cố định của bảng khóa Zobrist: hai lưới cùng kích thước và cùng nội dung luôn có cùng hash
+# (kể cả khi là hai đối tượng GridModel khác nhau, ví dụ sau khi tải lại một mê cung).
+ZOBRIST_SEED = 0x5EED
+_MASK64 = (1 << 64) - 1
+
+
+@functools.lru_cache(maxsize=4)
+def _zobrist_keys(rows, cols):
+    """
+    Bảng khóa Zobrist ngẫu nhiên (tái lập được) cho một kích thước lưới.
+
+    Returns:
+        tuple: (type_keys, cost_keys) - type_keys là mảng uint64 (số loại ô, rows * cols),
+               cost_keys là mảng uint64 lẻ (rows * cols) dùng để trộn chi phí của ô vào hash.
+    """
+    rng = np.random.default_rng(ZOBRIST_SEED)
+    type_keys = rng.integers(0, np.iinfo(np.uint64).max, size=(len(CELL_TYPE_NAMES), rows * cols),
+                             dtype=np.uint64, endpoint=True)
+    cost_keys = rng.integers(0, np.iinfo(np.uint64).max, size=rows * cols, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    return type_keys, cost_keys
+
+
+class _SnapshotLineage:
+    """Khóa bộ nhớ đệm chung của mọi bản chụp lấy từ cùng một lưới (xem GridModel.cache_key)."""
+
+
+class GridModel:
+    """
+    Mô hình lưới dựa trên mảng NumPy, là nguồn dữ liệu duy nhất về loại ô và chi phí.
+    - `cell_types`: mảng uint8 (rows, cols) chứa mã loại ô (CELL_*).
+    - `costs`: mảng float32 (rows, cols) chứa chi phí đi vào từng ô (inf với chướng ngại vật).
+    Các GridNode chỉ là "view" mỏng trỏ vào hai mảng này.
+    Mỗi lần ghi làm tăng `version`; các ô bị sửa từng ô một được ghi vào nhật ký thay đổi
+    để đồ thị có thể cập nhật tăng dần (xem `changes_since`).
+    """
+    def __init__(self, rows=GRID_ROWS, cols=GRID_COLS):
+        """
+        Khởi tạo một lưới toàn ô trống.
+
+        Args:
+            rows (int): Số hàng của lưới.
+            cols (int): Số cột của lưới.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.cell_types = np.full((rows, cols), CELL_NORMAL, dtype=np.uint8)
+        self.costs = np.full((rows, cols), COST_NORMAL_CELL, dtype=np.float32)
+        self.version = 0 # Tăng mỗi khi dữ liệu lưới thay đổi
+        self._full_change_version = 0 # Phiên bản của lần ghi hàng loạt gần nhất
+        self._change_log = [] # Chỉ số phẳng của các ô đã sửa, phần tử thứ i ứng với version _full_change_version + i + 1
+        self._zobrist = None # Hash Zobrist của nội dung lưới (None = chưa tính / cần tính lại sau ghi hàng loạt)
+        self._shared = False # True nếu hai mảng đang được dùng chung với một bản chụp (xem `snapshot`)
+        self._snapshot = None # Bản chụp gần nhất, dùng lại khi lưới chưa bị sửa kể từ đó
+        self._snapshot_lineage = None # Lưới gốc: khóa bộ nhớ đệm chung của các bản chụp (tạo ở bản chụp đầu tiên)
+        self._lineage_ref = None # Bản chụp: tham chiếu yếu tới _snapshot_lineage của lưới gốc
+
+    @classmethod
+    def from_arrays(cls, cell_types, costs):
+        """
+        Tạo GridModel dùng trực tiếp hai mảng có sẵn, không sao chép
+        (ví dụ mảng nằm trong shared memory, xem src/batch.py).
+
+        Args:
+            cell_types (np.ndarray): Mảng uint8 (rows, cols) mã loại ô.
+            costs (np.ndarray): Mảng float32 (rows, cols) chi phí.
+
+        Returns:
+            GridModel: Mô hình lưới trỏ vào hai mảng đã cho.
+        """
+        model = cls(0, 0)
+        model.rows, model.cols = cell_types.shape
+        model.cell_types = cell_types
+        model.costs = costs
+        return model
+
+    def snapshot(self):
+        """
+        Bản chụp chỉ đọc của lưới tại thời điểm hiện tại, chi phí O(1) (copy-on-write):
+        bản chụp dùng chung hai mảng với lưới gốc, và lưới gốc chỉ sao chép mảng của mình ở lần ghi
+        kế tiếp. Dùng cho các tìm kiếm chạy nền trong khi người dùng tiếp tục sửa lưới.
+
+        Lưới chưa bị sửa kể từ bản chụp trước thì trả lại đúng bản chụp đó. Bản chụp dùng chung nhật ký thay đổi
+        và dãy version với lưới gốc, và mọi bản chụp của một lưới có chung `cache_key`: các bảng tiền xử lý
+        (đồ thị CSR, JPS+, HPA*, vùng chi phí, thành phần liên thông, trường hướng) của bản chụp trước được chuyển
+        sang bản chụp mới và chỉ cập nhật các ô đã sửa giữa hai bản chụp, thay vì dựng lại từ đầu.
+
+        Returns:
+            GridModel: Lưới có mảng không ghi được (ghi vào sẽ báo lỗi ValueError).
+        """
+        if self._shared and self._snapshot is not None:
+            return self._snapshot
+        cell_types, costs = self.cell_types.view(), self.costs.view()
+        cell_types.flags.writeable = False
+        costs.flags.writeable = False
+        snapshot = GridModel.from_arrays(cell_types, costs)
+        # Dùng chung nhật ký (lưới gốc chỉ nối thêm vào cuối, hoặc thay list mới sau ghi hàng loạt), nên
+        # changes_since của bản chụp vẫn đúng tới version của nó.
+        snapshot.version = self.version
+        snapshot._full_change_version = self._full_change_version
+        snapshot._change_log = self._change_log
+        if self._snapshot_lineage is None:
+            self._snapshot_lineage = _SnapshotLineage()
+        snapshot._lineage_ref = weakref.ref(self._snapshot_lineage)
+        snapshot._zobrist = self._zobrist
+        self._shared = True
+        self._snapshot = snapshot
+        return snapshot
+
+    @property
+    def cache_key(self):
+        """
+        Khóa của các bộ nhớ đệm tiền xử lý theo lưới (WeakKeyDictionary trong src/jps_plus.py, src/hpa_star.py, ...).
+        Lưới thường dùng chính nó; mọi bản chụp của cùng một lưới dùng chung một khóa (khác khóa của lưới gốc, nên
+        luồng nền và luồng UI không bao giờ dùng chung một bảng). Bảng lấy theo khóa này có thể đang gắn với bản
+        chụp khác: người dùng gán lại `grid_model` rồi `sync()` (changes_since của bản chụp cũ hơn trả về None).
+        """
+        lineage = self._lineage_ref() if self._lineage_ref is not None else None
+        return lineage if lineage is not None else self
+
+    def _ensure_private(self):
+        """Sao chép hai mảng trước khi ghi nếu chúng đang được dùng chung với một bản chụp."""
+        if self._shared:
+            self.cell_types = self.cell_types.copy()
+            self.costs = self.costs.copy()
+            self._shared = False
+            self._snapshot = None
+
+    # --- Truy cập từng ô ---
+    def in_bounds(self, r, c):
+        """Kiểm tra (r, c) có nằm trong biên của lưới không."""
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_walkable(self, r, c):
+        """Kiểm tra ô (r, c) nằm trong biên và không phải là chướng ngại vật."""
+        return 0 <= r < self.rows and 0 <= c < self.cols and self.cell_types[r, c] != CELL_OBSTACLE
+
+    def get_cell_type(self, r, c):
+        """Trả về tên loại ô ("normal", "obstacle", ...) tại (r, c)."""
+        return CELL_TYPE_NAMES[self.cell_types[r, c]]
+
+    def get_cost(self, r, c):
+        """
+        Trả về chi phí của ô (r, c) dưới dạng số Python.
+        Chi phí nguyên được trả về dạng int để hiển thị giống như trước (ví dụ: 1, 10).
+        """
+        value = float(self.costs[r, c])
+        return int(value) if value.is_integer() else value
+
+    def set_cell_type(self, r, c, type_name):
+        """
+        Đặt loại cho ô (r, c) và cập nhật chi phí mặc định tương ứng.
+
+        Args:
+            r (int): Chỉ số hàng.
+            c (int): Chỉ số cột.
+            type_name (str): Tên loại ô ("normal", "obstacle", "trap", "start", "end").
+        """
+        code = CELL_TYPE_CODES[type_name]
+        if self.cell_types[r, c] == code and self.costs[r, c] == CELL_TYPE_COSTS[code]:
+            return # Không có gì thay đổi => không tăng version
+        self._ensure_private()
+        self._toggle_zobrist(r, c) # Bỏ khóa của nội dung cũ
+        self.cell_types[r, c] = code
+        self.costs[r, c] = CELL_TYPE_COSTS[code]
+        self._toggle_zobrist(r, c) # Thêm khóa của nội dung mới
+        self._record_change(r, c)
+
+    def set_cost(self, r, c, cost):
+        """Ghi đè chi phí của ô (r, c) mà không đổi loại ô."""
+        if self.costs[r, c] == cost:
+            return
+        self._ensure_private()
+        self._toggle_zobrist(r, c)
+        self.costs[r, c] = cost
+        self._toggle_zobrist(r, c)
+        self._record_change(r, c)
+
+    # --- Hash nội dung (Zobrist) ---
+    @property
+    def zobrist_hash(self):
+        """
+        Hash 64 bit của nội dung lưới (loại ô + chi phí từng ô), dùng làm khóa bộ nhớ đệm kết quả.
+        Được tính một lần bằng phép toán mảng, sau đó cập nhật O(1) mỗi lần sửa một ô
+        (XOR bỏ khóa của nội dung cũ, XOR thêm khóa của nội dung mới).
+        """
+        if self._zobrist is None:
+            type_keys, cost_keys = _zobrist_keys(self.rows, self.cols)
+            cells = np.arange(self.rows * self.cols)
+            cost_bits = np.ascontiguousarray(self.costs, dtype=np.float32).view(np.uint32).ravel().astype(np.uint64)
+            # Phép nhân uint64 tự quay vòng (mod 2^64), giống `& _MASK64` trong _cell_zobrist.
+            cell_keys = type_keys[self.cell_types.ravel(), cells] ^ (cost_keys * cost_bits)
+            self._zobrist = int(np.bitwise_xor.reduce(cell_keys)) if len(cell_keys) else 0
+        return self._zobrist
+
+    def _cell_zobrist(self, r, c):
+        """Khóa Zobrist của nội dung hiện tại của ô (r, c)."""
+        type_keys, cost_keys = _zobrist_keys(self.rows, self.cols)
+        idx = r * self.cols + c
+        cost_bits = int(np.float32(self.costs[r, c]).view(np.uint32))
+        return int(type_keys[self.cell_types[r, c], idx]) ^ ((int(cost_keys[idx]) * cost_bits) & _MASK64)
+
+    def _toggle_zobrist(self, r, c):
+        """XOR khóa của ô (r, c) vào hash (chỉ khi hash đang được theo dõi)."""
+        if self._zobrist is not None:
+            self._zobrist ^= self._cell_zobrist(r, c)
+
+    # --- Theo dõi thay đổi ---
+    def _record_change(self, r, c):
+        """Tăng version và ghi ô (r, c) vào nhật ký thay đổi."""
+        self.version += 1
+        if len(self._change_log) >= MAX_CHANGE_LOG:
+            self._mark_full_change() # Nhật ký quá dài: coi như thay đổi toàn bộ
+            return
+        self._change_log.append(r * self.cols + c)
+
+    def _mark_full_change(self):
+        """Đánh dấu toàn bộ lưới đã thay đổi (sau một lần ghi hàng loạt)."""
+        self._full_change_version = self.version
+        self._change_log = [] # List mới: các bản chụp vẫn giữ nhật ký cũ của chúng
+
+    def changes_since(self, version):
+        """
+        Lấy tập các ô đã thay đổi kể từ phiên bản `version`.
+
+        Args:
+            version (int): Phiên bản mà người gọi (ví dụ: một đồ thị) đã đồng bộ lần cuối.
+
+        Returns:
+            np.ndarray or None: Mảng chỉ số phẳng (không trùng lặp) của các ô đã thay đổi,
+                                hoặc None nếu có ghi hàng loạt sau `version` (cần dựng lại toàn bộ).
+        """
+        if version < self._full_change_version or version > self.version:
+            return None
+        log_start = self._full_change_version
+        return np.unique(np.array(self._change_log[version - log_start:self.version - log_start], dtype=np.int64))
+
+    # --- Thao tác hàng loạt ---
+    def walkable_mask(self):
+        """Trả về mảng bool (rows, cols): True tại các ô không phải chướng ngại vật."""
+        return self.cell_types != CELL_OBSTACLE
+
+    def set_types(self, cell_types):
+        """
+        Ghi toàn bộ lưới bằng một lần ghi mảng (thay cho việc gọi reset()/make_*() từng ô).
+        Chi phí được suy ra trực tiếp từ mã loại ô.
+
+        Args:
+            cell_types (np.ndarray): Mảng mã loại ô có cùng kích thước với lưới.
+        """
+        self._ensure_private()
+        self.cell_types[...] = cell_types
+        self.costs[...] = CELL_TYPE_COSTS[self.cell_types]
+        self.version += 1
+        self._mark_full_change()
+        self._zobrist = None # Tính lại (vectorized) ở lần truy cập kế tiếp
+
+    def reset_all(self):
+        """Đưa toàn bộ lưới về ô trống."""
+        self._ensure_private()
+        self.cell_types.fill(CELL_NORMAL)
+        self.costs.fill(COST_NORMAL_CELL)
+        self.version += 1
+        self._mark_full_change()
+        self._zobrist = None
+
+
+def as_grid_model(grid_data):
+    """
+    Lấy GridModel tương ứng với dữ liệu lưới truyền vào.
+    Chấp nhận trực tiếp một GridModel, một đối tượng có thuộc tính `model` (ví dụ GameGrid),
+    hoặc list 2 chiều các node có thuộc tính `type` và `cost` (khi đó sẽ tạo GridModel mới).
+
+    Args:
+        grid_data: Dữ liệu lưới.
+
+    Returns:
+        GridModel: Mô hình lưới dạng mảng.
+    """
+    if isinstance(grid_data, GridModel):
+        return grid_data
+    model = getattr(grid_data, "model", None)
+    if isinstance(model, GridModel):
+        return model
+
+    # Trường hợp list 2 chiều các node: sao chép loại ô và chi phí vào mảng.
+    rows = len(grid_data)
+    cols = len(grid_data[0]) if rows > 0 else 0
+    new_model = GridModel(rows, cols)
+    new_model.cell_types[...] = [[CELL_TYPE_CODES[node.type] for node in row] for row in grid_data]
+    new_model.costs[...] = [[node.cost for node in row] for row in grid_data]
+    return new_model
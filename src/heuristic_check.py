@@ -0,0 +1,92 @@
+# src/heuristic_check.py
+# Kiểm tra một heuristic theo đúng mô hình chi phí cạnh của đồ thị (trọng số = chi phí ô đích,
+# nhân sqrt(2) với đường chéo):
+# - Chấp nhận được (admissible): h(n) <= d(n, goal) với mọi node n đến được đích
+#   => A* trả về đường đi tối ưu.
+# - Nhất quán (consistent): h(u) <= w(u, v) + h(v) với mọi cạnh u -> v
+#   => A* không cần mở lại node đã đóng.
+# Khoảng cách thật d(n, goal) được tính bằng một lần Dijkstra trên đồ thị đảo chiều;
+# điều kiện nhất quán được kiểm tra cho mọi cạnh CSR bằng một phép toán mảng.
+import numpy as np
+from src.heuristic_tables import heuristic_table, TABLE_HEURISTICS
+from src.fast_search import single_source_distances_flat
+
+
+def _heuristic_array(graph, goal_rc, heuristic_func):
+    """Giá trị h của mọi ô đến `goal_rc` dạng mảng float64 (ô tường = 0)."""
+    kind = TABLE_HEURISTICS.get(heuristic_func)
+    if kind is not None:
+        return heuristic_table(graph.rows, graph.cols, goal_rc, kind)
+    # Heuristic không có dạng bảng (ví dụ ALT): gọi hàm cho từng node.
+    h = np.zeros(graph.rows * graph.cols)
+    for node_idx in np.flatnonzero(graph.node_mask).tolist():
+        h[node_idx] = heuristic_func(divmod(node_idx, graph.cols), goal_rc)
+    return h
+
+
+def check_heuristic(graph, heuristic_func, goals, tolerance=1e-9, max_examples=5):
+    """
+    Kiểm tra tính chấp nhận được và tính nhất quán của một heuristic với các đích cho trước.
+
+    Args:
+        graph (CSRGraph): Đồ thị cần kiểm tra.
+        heuristic_func (function): Hàm heuristic h(node_rc, goal_rc).
+        goals (iterable): Các tọa độ (row, col) đích (mỗi đích là một lần Dijkstra).
+        tolerance (float): Sai số làm tròn được bỏ qua khi so sánh.
+        max_examples (int): Số ví dụ vi phạm tối đa được lưu lại cho mỗi loại.
+
+    Returns:
+        dict: {
+            "goals": số đích đã kiểm tra,
+            "admissibility_violations": số cặp (node, đích) có h > khoảng cách thật,
+            "consistency_violations": số cặp (cạnh, đích) có h(u) > w(u, v) + h(v),
+            "max_overestimate": mức vượt lớn nhất của h so với khoảng cách thật (0 nếu không có),
+            "admissible": bool, "consistent": bool,
+            "admissibility_examples": [(node_rc, goal_rc, h, true_cost), ...],
+            "consistency_examples": [(from_rc, to_rc, goal_rc, h_from, weight, h_to), ...],
+        }
+    """
+    cols = graph.cols
+    reversed_graph = graph.reversed()
+    offsets, neighbors, weights = graph.compact_arrays()
+    sources = np.repeat(np.arange(graph.rows * cols), np.diff(offsets))
+    neighbors = np.asarray(neighbors, dtype=np.int64)
+
+    report = {
+        "goals": 0,
+        "admissibility_violations": 0,
+        "consistency_violations": 0,
+        "max_overestimate": 0.0,
+        "admissibility_examples": [],
+        "consistency_examples": [],
+    }
+    for goal_rc in goals:
+        goal_rc = (int(goal_rc[0]), int(goal_rc[1]))
+        if goal_rc not in graph:
+            continue # Đích là tường hoặc nằm ngoài lưới: không có gì để kiểm tra
+        report["goals"] += 1
+        h = _heuristic_array(graph, goal_rc, heuristic_func)
+        true_cost = np.frombuffer(single_source_distances_flat(reversed_graph, goal_rc))
+
+        # Chấp nhận được: chỉ xét các node đến được đích (khoảng cách hữu hạn).
+        reachable = graph.node_mask & np.isfinite(true_cost)
+        overestimate = np.where(reachable, h - np.where(reachable, true_cost, 0.0), 0.0)
+        bad_nodes = np.flatnonzero(overestimate > tolerance)
+        report["admissibility_violations"] += len(bad_nodes)
+        if len(bad_nodes):
+            report["max_overestimate"] = max(report["max_overestimate"], float(overestimate[bad_nodes].max()))
+        for node_idx in bad_nodes[:max_examples - len(report["admissibility_examples"])].tolist():
+            report["admissibility_examples"].append(
+                (divmod(node_idx, cols), goal_rc, float(h[node_idx]), float(true_cost[node_idx])))
+
+        # Nhất quán: mọi cạnh u -> v của đồ thị.
+        bad_edges = np.flatnonzero(h[sources] > weights + h[neighbors] + tolerance)
+        report["consistency_violations"] += len(bad_edges)
+        for edge in bad_edges[:max_examples - len(report["consistency_examples"])].tolist():
+            u, v = int(sources[edge]), int(neighbors[edge])
+            report["consistency_examples"].append(
+                (divmod(u, cols), divmod(v, cols), goal_rc, float(h[u]), float(weights[edge]), float(h[v])))
+
+    report["admissible"] = report["admissibility_violations"] == 0
+    report["consistent"] = report["consistency_violations"] == 0
+    return report
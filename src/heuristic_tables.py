@@ -0,0 +1,77 @@
+# src/heuristic_tables.py
+# Heuristic theo đích dạng bảng nhỏ, để các kernel tìm kiếm (src/fast_search.py, src/suboptimal.py)
+# không phải gọi hàm heuristic Python mỗi lần đẩy một node vào heap.
+# Manhattan và octile chỉ phụ thuộc |dr| và |dc|: h = (|dr| + |dc|) + hệ số chéo * min(|dr|, |dc|)
+# (hệ số 0 với Manhattan, sqrt(2) - 2 với octile). Vì vậy mỗi lần tìm chỉ cần hai list |dr| theo hàng và
+# |dc| theo cột - O(rows + cols) bộ nhớ, không phải bảng O(rows * cols) cho mỗi đích - và kernel tính h
+# ngay tại chỗ. Giá trị giống hệt giá trị hàm tương ứng (cùng công thức, cùng thứ tự phép tính), nên thứ tự
+# mở rộng node không đổi. Các heuristic khác (Euclidean, ALT, ...) vẫn được gọi như hàm.
+# `heuristic_table` tính h cho toàn bộ lưới (một phép toán mảng), chỉ dùng cho công cụ kiểm tra heuristic.
+import math # Cần cho sqrt(2)
+import numpy as np
+from src.algorithms import heuristic_manhattan, heuristic_euclidean, heuristic_octile, heuristic_zero
+
+# Các heuristic có thể tính dạng bảng toàn lưới: hàm -> tên loại.
+TABLE_HEURISTICS = {
+    heuristic_manhattan: "manhattan",
+    heuristic_euclidean: "euclidean",
+    heuristic_octile: "octile",
+    heuristic_zero: "zero",
+}
+
+# Các heuristic tính được từ |dr|, |dc| theo công thức chung: hàm -> hệ số chéo.
+DELTA_HEURISTICS = {
+    heuristic_manhattan: 0.0,
+    heuristic_octile: math.sqrt(2) - 2,
+}
+
+
+def heuristic_table(rows, cols, goal_rc, kind):
+    """
+    Tính heuristic từ mọi ô đến đích.
+
+    Args:
+        rows (int): Số hàng của lưới.
+        cols (int): Số cột của lưới.
+        goal_rc (tuple): Tọa độ (row, col) của đích.
+        kind (str): "manhattan", "euclidean", "octile" hoặc "zero".
+
+    Returns:
+        np.ndarray: Mảng float64 (rows * cols), phần tử thứ r * cols + c là h((r, c), goal).
+    """
+    dr = np.abs(np.arange(rows, dtype=np.float64) - goal_rc[0])[:, None]
+    dc = np.abs(np.arange(cols, dtype=np.float64) - goal_rc[1])[None, :]
+    if kind == "manhattan":
+        table = dr + dc
+    elif kind == "euclidean":
+        table = np.sqrt(dr * dr + dc * dc)
+    elif kind == "octile":
+        table = (dr + dc) + (math.sqrt(2) - 2) * np.minimum(dr, dc)
+    elif kind == "zero":
+        table = np.zeros((rows, cols))
+    else:
+        raise ValueError(f"Unknown heuristic table kind: {kind!r}")
+    return np.ascontiguousarray(np.broadcast_to(table, (rows, cols))).ravel()
+
+
+def heuristic_deltas(graph, goal_rc, heuristic_func):
+    """
+    Lấy |dr| theo hàng, |dc| theo cột và hệ số chéo cho một lần tìm kiếm.
+    Kernel tính h của ô (r, c) là (row_delta[r] + col_delta[c]) + diagonal_factor * min(row_delta[r], col_delta[c]).
+
+    Args:
+        graph (CSRGraph): Đồ thị (để biết kích thước lưới).
+        goal_rc (tuple): Tọa độ (row, col) của đích.
+        heuristic_func (function): Hàm heuristic người gọi truyền vào.
+
+    Returns:
+        tuple or None: (row_delta, col_delta, diagonal_factor), hoặc None nếu heuristic không có dạng này
+                       (ví dụ Euclidean, ALT) - khi đó người gọi dùng lời gọi hàm như cũ.
+    """
+    diagonal_factor = DELTA_HEURISTICS.get(heuristic_func)
+    if diagonal_factor is None:
+        return None
+    goal_r, goal_c = int(goal_rc[0]), int(goal_rc[1])
+    row_delta = [float(abs(r - goal_r)) for r in range(graph.rows)]
+    col_delta = [float(abs(c - goal_c)) for c in range(graph.cols)]
+    return row_delta, col_delta, diagonal_factor
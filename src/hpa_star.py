@@ -0,0 +1,451 @@
+# src/hpa_star.py
+# HPA* (Hierarchical Path-Finding A*, Botea và cộng sự): tìm đường phân cấp cho lưới lớn.
+# Lưới được chia thành các cụm (cluster) vuông. Trên cạnh chung của hai cụm kề nhau, mỗi đoạn
+# liên tiếp các ô đi được ở cả hai phía là một "lối vào" (entrance), sinh ra một hoặc hai cặp ô
+# chuyển tiếp. Đồ thị trừu tượng gồm các ô chuyển tiếp này, với:
+#   - cạnh liên cụm: một bước thẳng giữa hai ô của một cặp chuyển tiếp;
+#   - cạnh trong cụm: chi phí ngắn nhất giữa hai ô chuyển tiếp mà chỉ đi bên trong cụm (tính trước).
+# Một truy vấn chỉ tìm trên đồ thị trừu tượng nhỏ, rồi tinh chỉnh từng đoạn trong cụm bằng
+# `a_star_search` giới hạn trong cụm đó. Đường qua các ô chuyển tiếp có thể vòng xa (trên các mê cung mẫu
+# tới +97%), nên sau khi tinh chỉnh, A* được chạy lại trong "hành lang" gồm các cụm mà đường đã đi qua và
+# đường rẻ hơn được giữ. Kết quả vẫn KHÔNG đảm bảo tối ưu: đo bằng `python -m benchmarks.hpa_star` và trên
+# các mê cung mẫu, trung bình +0-2%, xấu nhất +50% (Trap Bridge) khi đường tối ưu đi qua cụm ngoài hành lang.
+# Khi ô thay đổi, chỉ các cụm chứa ô đó (và các cụm kề có lối vào bị đổi) được tính lại.
+# `hpa_star_steps` / `HPAStar.find_path_steps` chạy từng bước (xem src/stepper.py): lần dựng toàn bộ dừng được
+# sau mỗi cụm, truy vấn dừng được sau mỗi lô node trừu tượng và mỗi đoạn tinh chỉnh.
+import heapq  # Hàng đợi ưu tiên cho Dijkstra trong cụm và A* trên đồ thị trừu tượng
+import math # Cần cho sqrt(2) - chi phí đường chéo
+import weakref # Bộ nhớ đệm theo GridModel
+from config import HPA_CLUSTER_SIZE
+from src.algorithms import _a_star_search, heuristic_euclidean, run_steps, flush_explored, STEP_EXPANSIONS
+from src.grid_model import as_grid_model, CELL_OBSTACLE
+from src.csr_graph import update_csr_graph
+from src.components import is_unreachable
+
+SQRT2 = math.sqrt(2)
+# Lối vào dài hơn hoặc bằng ngưỡng này sinh hai cặp chuyển tiếp (ở hai đầu) thay vì một (ở giữa).
+ENTRANCE_SPLIT_LENGTH = 6
+
+# Bộ lập kế hoạch của từng GridModel (dựng ở lần dùng đầu tiên).
+_planners_by_model = weakref.WeakKeyDictionary()
+
+
+class _ClusterView:
+    """Một "đồ thị" chỉ gồm các cạnh nằm trọn trong một hình chữ nhật, dùng để tinh chỉnh bằng `_a_star_search`."""
+    def __init__(self, graph, bounds):
+        self.graph = graph
+        self.r0, self.r1, self.c0, self.c1 = bounds
+
+    def get_neighbors(self, node_coord_rc):
+        return [((r, c), weight) for (r, c), weight in self.graph.get_neighbors(node_coord_rc)
+                if self.r0 <= r < self.r1 and self.c0 <= c < self.c1]
+
+
+class _CorridorView:
+    """Một "đồ thị" chỉ gồm các cạnh nằm trọn trong một tập cụm (hành lang quanh đường đi đã tinh chỉnh)."""
+    def __init__(self, graph, cluster_size, clusters):
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.clusters = clusters
+
+    def get_neighbors(self, node_coord_rc):
+        size = self.cluster_size
+        return [((r, c), weight) for (r, c), weight in self.graph.get_neighbors(node_coord_rc)
+                if (r // size, c // size) in self.clusters]
+
+
+class HPAStar:
+    """
+    Bộ lập kế hoạch HPA* giữ đồ thị trừu tượng của một lưới giữa các truy vấn.
+
+    Cách dùng:
+        planner = HPAStar(game_grid)
+        path, cost, explored = planner.find_path(start_rc, goal_rc)
+        ... người dùng sửa ô ...
+        planner.sync()   # Chỉ tính lại các cụm bị ảnh hưởng (find_path cũng tự gọi)
+    """
+    def __init__(self, grid_data, cluster_size=HPA_CLUSTER_SIZE, lazy=False):
+        """
+        Args:
+            grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới.
+            cluster_size (int): Số ô mỗi cạnh của một cụm.
+            lazy (bool): True để chưa dựng đồ thị trừu tượng (lần sync / find_path đầu tiên sẽ dựng).
+        """
+        self.grid_model = as_grid_model(grid_data)
+        self.cluster_size = cluster_size
+        self.graph = None
+        self.version = None # None: chưa dựng, hoặc lần dựng gần nhất bị bỏ dở
+        if not lazy:
+            self.rebuild()
+
+    # --- Dựng đồ thị trừu tượng ---
+    def rebuild(self):
+        """Dựng lại toàn bộ đồ thị trừu tượng."""
+        run_steps(self.rebuild_steps())
+
+    def rebuild_steps(self):
+        """
+        Generator của `rebuild`: yield một list rỗng sau mỗi cụm. Nếu bị bỏ dở, `version` vẫn là None
+        nên lần sync sau dựng lại từ đầu.
+        """
+        self.version = None
+        version = self.grid_model.version # Các ô sửa trong lúc dựng sẽ được sync lần sau tính lại
+        self.rows, self.cols = self.grid_model.rows, self.grid_model.cols
+        self.cluster_rows = -(-self.rows // self.cluster_size)
+        self.cluster_cols = -(-self.cols // self.cluster_size)
+        self.graph = update_csr_graph(self.graph, self.grid_model)
+        self._borders = {} # (cụm A, cụm B) -> list cặp chuyển tiếp (ô phía A, ô phía B), B ở phải/dưới A
+        self._inter = {} # ô chuyển tiếp -> {ô chuyển tiếp bên kia: trọng số}
+        self._intra = {} # cụm -> {ô chuyển tiếp: {ô chuyển tiếp khác cùng cụm: chi phí}}
+        clusters = [(cr, cc) for cr in range(self.cluster_rows) for cc in range(self.cluster_cols)]
+        for cluster in clusters:
+            for neighbor_cluster in ((cluster[0], cluster[1] + 1), (cluster[0] + 1, cluster[1])):
+                if neighbor_cluster[0] < self.cluster_rows and neighbor_cluster[1] < self.cluster_cols:
+                    self._set_border(cluster, neighbor_cluster)
+            yield []
+        for cluster in clusters:
+            self._build_intra_edges(cluster)
+            yield []
+        self.version = version
+
+    def sync(self):
+        """Đồng bộ với lưới: chỉ tính lại các cụm có ô bị sửa (hoặc toàn bộ sau một lần ghi hàng loạt)."""
+        run_steps(self.sync_steps())
+
+    def sync_steps(self):
+        """Generator của `sync`: chỉ lần dựng lại toàn bộ dừng giữa chừng, cập nhật các cụm bị sửa chạy trọn."""
+        if self.version == self.grid_model.version:
+            return
+        changed = None if self.version is None else self.grid_model.changes_since(self.version)
+        if changed is None or (self.grid_model.rows, self.grid_model.cols) != (self.rows, self.cols):
+            yield from self.rebuild_steps()
+            return
+        self.graph = update_csr_graph(self.graph, self.grid_model)
+        dirty = {self.cluster_of(divmod(flat_idx, self.cols)) for flat_idx in changed.tolist()}
+        to_rebuild = set(dirty)
+        for cluster in dirty:
+            cr, cc = cluster
+            for cluster_a, cluster_b in (((cr, cc - 1), cluster), ((cr - 1, cc), cluster),
+                                         (cluster, (cr, cc + 1)), (cluster, (cr + 1, cc))):
+                if (cluster_a, cluster_b) in self._borders and self._set_border(cluster_a, cluster_b):
+                    to_rebuild.update((cluster_a, cluster_b)) # Cụm kề có tập ô chuyển tiếp mới
+        for cluster in to_rebuild:
+            self._build_intra_edges(cluster)
+        self.version = self.grid_model.version
+
+    def cluster_of(self, node_rc):
+        """Cụm (hàng cụm, cột cụm) chứa ô (r, c)."""
+        return (node_rc[0] // self.cluster_size, node_rc[1] // self.cluster_size)
+
+    def cluster_bounds(self, cluster):
+        """Hình chữ nhật (r0, r1, c0, c1) của cụm, r1/c1 không bao gồm."""
+        size = self.cluster_size
+        return (cluster[0] * size, min((cluster[0] + 1) * size, self.rows),
+                cluster[1] * size, min((cluster[1] + 1) * size, self.cols))
+
+    def _set_border(self, cluster_a, cluster_b):
+        """
+        Tính lại các cặp chuyển tiếp trên cạnh chung của cụm A và cụm B (B ở bên phải hoặc bên dưới A).
+
+        Returns:
+            bool: True nếu danh sách cặp chuyển tiếp thay đổi.
+        """
+        r0, r1, c0, c1 = self.cluster_bounds(cluster_a)
+        cols = self.cols
+        cell_types = self.grid_model.cell_types
+        if cluster_b[1] > cluster_a[1]: # B bên phải: ô A ở cột c1 - 1, ô B ở cột c1
+            pairs = [(r * cols + c1 - 1, r * cols + c1) for r in range(r0, r1)]
+        else: # B bên dưới: ô A ở hàng r1 - 1, ô B ở hàng r1
+            pairs = [((r1 - 1) * cols + c, r1 * cols + c) for c in range(c0, c1)]
+        open_pairs = [cell_types.flat[a] != CELL_OBSTACLE and cell_types.flat[b] != CELL_OBSTACLE for a, b in pairs]
+
+        transitions = []
+        run_start = None
+        for i, is_open in enumerate(open_pairs + [False]): # Phần tử cuối đóng đoạn đang mở
+            if is_open and run_start is None:
+                run_start = i
+            elif not is_open and run_start is not None:
+                run_end = i - 1
+                if run_end - run_start + 1 >= ENTRANCE_SPLIT_LENGTH:
+                    transitions += [pairs[run_start], pairs[run_end]]
+                else:
+                    transitions.append(pairs[(run_start + run_end) // 2])
+                run_start = None
+
+        key = (cluster_a, cluster_b)
+        old_transitions = self._borders.get(key, [])
+        if transitions == old_transitions and key in self._borders:
+            # Cùng vị trí nhưng chi phí ô có thể đã đổi: cập nhật trọng số.
+            self._add_inter_edges(transitions)
+            return False
+        for a, b in old_transitions:
+            for node, other in ((a, b), (b, a)):
+                edges = self._inter.get(node)
+                if edges is not None:
+                    edges.pop(other, None)
+                    if not edges:
+                        del self._inter[node] # Ô không còn là ô chuyển tiếp của cạnh nào
+        self._borders[key] = transitions
+        self._add_inter_edges(transitions)
+        return True
+
+    def _add_inter_edges(self, transitions):
+        """Ghi cạnh liên cụm (hai chiều, trọng số = chi phí ô đích) cho các cặp chuyển tiếp."""
+        costs = self.grid_model.costs
+        for a, b in transitions:
+            self._inter.setdefault(a, {})[b] = float(costs.flat[b])
+            self._inter.setdefault(b, {})[a] = float(costs.flat[a])
+
+    def _cluster_nodes(self, cluster):
+        """Các ô chuyển tiếp nằm trong cụm (lấy từ 4 cạnh của cụm)."""
+        cr, cc = cluster
+        nodes = set()
+        for key, side in ((((cr, cc - 1), cluster), 1), (((cr - 1, cc), cluster), 1),
+                          ((cluster, (cr, cc + 1)), 0), ((cluster, (cr + 1, cc)), 0)):
+            nodes.update(pair[side] for pair in self._borders.get(key, []))
+        return nodes
+
+    def _build_intra_edges(self, cluster):
+        """Tính chi phí ngắn nhất trong cụm giữa mọi cặp ô chuyển tiếp của cụm."""
+        nodes = self._cluster_nodes(cluster)
+        adjacency = self._local_adjacency(self.cluster_bounds(cluster))
+        self._intra[cluster] = {node: self._bounded_dijkstra(node, adjacency, nodes - {node}) for node in nodes}
+
+    def _local_adjacency(self, bounds, reverse=False):
+        """
+        Danh sách kề của các ô trong hình chữ nhật `bounds`, chỉ giữ cạnh nằm trọn bên trong.
+        Dựng một lần cho mỗi cụm rồi dùng lại cho mọi lần Dijkstra trong cụm đó.
+
+        Args:
+            bounds (tuple): (r0, r1, c0, c1).
+            reverse (bool): True để lấy cạnh ngược (node -> láng giềng mang trọng số của cạnh láng giềng -> node).
+
+        Returns:
+            dict: chỉ số phẳng -> list (láng giềng, trọng số).
+        """
+        r0, r1, c0, c1 = bounds
+        cols = self.cols
+        row_start, row_end, neighbors, weights = self.graph.adjacency_views()
+        costs = self.grid_model.costs
+        straight_steps = (1, -1, cols, -cols)
+        adjacency = {}
+        for r in range(r0, r1):
+            for node in range(r * cols + c0, r * cols + c1):
+                start, end = row_start[node], row_end[node]
+                node_cost = float(costs.flat[node]) if reverse else 0.0
+                edges = []
+                for neighbor, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+                    r_nb, c_nb = divmod(neighbor, cols)
+                    if not (r0 <= r_nb < r1 and c0 <= c_nb < c1):
+                        continue
+                    if reverse: # Cạnh neighbor -> node có trọng số bằng chi phí của node
+                        weight = node_cost if neighbor - node in straight_steps else node_cost * SQRT2
+                    edges.append((neighbor, weight))
+                adjacency[node] = edges
+        return adjacency
+
+    @staticmethod
+    def _bounded_dijkstra(source, adjacency, targets):
+        """
+        Dijkstra trên danh sách kề cục bộ, dừng khi đã đến mọi ô trong `targets`.
+
+        Args:
+            source (int): Chỉ số phẳng của ô xuất phát.
+            adjacency (dict): Kết quả của `_local_adjacency`.
+            targets (set): Các chỉ số phẳng cần biết chi phí.
+
+        Returns:
+            dict: target -> chi phí (chỉ các target đến được).
+        """
+        dist = {source: 0.0}
+        open_set = [(0.0, source)]
+        remaining = set(targets)
+        found = {}
+        while open_set and remaining:
+            d, node = heapq.heappop(open_set)
+            if d > dist[node]:
+                continue
+            if node in remaining:
+                remaining.discard(node)
+                found[node] = d
+            for neighbor, weight in adjacency[node]:
+                new_d = d + weight
+                if new_d < dist.get(neighbor, float("inf")):
+                    dist[neighbor] = new_d
+                    heapq.heappush(open_set, (new_d, neighbor))
+        return found
+
+    # --- Truy vấn ---
+    def find_path(self, start_rc, goal_rc, heuristic_func=heuristic_euclidean):
+        """
+        Tìm đường từ start đến goal: A* trên đồ thị trừu tượng rồi tinh chỉnh từng đoạn.
+
+        Args:
+            start_rc (tuple): Tọa độ (row, col) điểm bắt đầu.
+            goal_rc (tuple): Tọa độ (row, col) điểm đích.
+            heuristic_func (function): Heuristic dùng cho cả hai mức tìm kiếm.
+
+        Returns:
+            tuple: (path, cost, explored_nodes) - explored_nodes gồm các node trừu tượng đã mở rộng
+                   và các ô được mở rộng khi tinh chỉnh.
+        """
+        return run_steps(self.find_path_steps(start_rc, goal_rc, heuristic_func))
+
+    def find_path_steps(self, start_rc, goal_rc, heuristic_func=heuristic_euclidean, record_explored=True):
+        """
+        Generator của `find_path` (cùng tham số): yield khi đang đồng bộ đồ thị trừu tượng (list rỗng),
+        sau mỗi STEP_EXPANSIONS node trừu tượng và sau mỗi đoạn tinh chỉnh (list các node vừa mở rộng);
+        return (path, cost, explored_nodes) - explored_nodes rỗng nếu record_explored=False.
+        """
+        yield from self.sync_steps()
+        cols = self.cols
+        start_rc, goal_rc = tuple(start_rc), tuple(goal_rc)
+        cell_types = self.grid_model.cell_types
+        if cell_types[start_rc] == CELL_OBSTACLE or cell_types[goal_rc] == CELL_OBSTACLE:
+            return None, float("inf"), []
+        if start_rc == goal_rc:
+            yield [start_rc]
+            return [start_rc], 0, ([start_rc] if record_explored else [])
+        start_idx, goal_idx = start_rc[0] * cols + start_rc[1], goal_rc[0] * cols + goal_rc[1]
+
+        # Nối tạm start/goal vào đồ thị trừu tượng qua các ô chuyển tiếp trong cụm của chúng.
+        start_cluster, goal_cluster = self.cluster_of(start_rc), self.cluster_of(goal_rc)
+        start_targets = self._cluster_nodes(start_cluster)
+        if start_cluster == goal_cluster:
+            start_targets.add(goal_idx) # Có thể đi thẳng trong cụm
+        start_edges = self._bounded_dijkstra(start_idx, self._local_adjacency(self.cluster_bounds(start_cluster)),
+                                             start_targets)
+        goal_edges = self._bounded_dijkstra(goal_idx,
+                                            self._local_adjacency(self.cluster_bounds(goal_cluster), reverse=True),
+                                            self._cluster_nodes(goal_cluster))
+
+        # A* trên đồ thị trừu tượng.
+        g_costs = {start_idx: 0.0}
+        came_from = {start_idx: None}
+        open_set = [(heuristic_func(start_rc, goal_rc), 0.0, start_idx)]
+        closed = set()
+        explored = [] # Rỗng nếu record_explored=False
+        batch = [] # Các node trừu tượng chưa yield
+        while open_set:
+            _, g_current, node = heapq.heappop(open_set)
+            if node in closed:
+                continue
+            closed.add(node)
+            node_rc = divmod(node, cols)
+            batch.append(node_rc)
+            if len(batch) == STEP_EXPANSIONS:
+                yield batch
+                if record_explored: explored += batch
+                batch = []
+            if node == goal_idx:
+                break
+            edges = []
+            if node == start_idx:
+                edges.extend(start_edges.items())
+            edges.extend(self._intra[self.cluster_of(node_rc)].get(node, {}).items())
+            edges.extend(self._inter.get(node, {}).items())
+            if node in goal_edges:
+                edges.append((goal_idx, goal_edges[node]))
+            for neighbor, weight in edges:
+                new_g = g_current + weight
+                if new_g < g_costs.get(neighbor, float("inf")):
+                    g_costs[neighbor] = new_g
+                    came_from[neighbor] = node
+                    heapq.heappush(open_set, (new_g + heuristic_func(divmod(neighbor, cols), goal_rc), new_g, neighbor))
+        else:
+            yield from flush_explored(explored, batch, record_explored)
+            return None, float("inf"), explored
+        yield from flush_explored(explored, batch, record_explored) # Các node trừu tượng chưa yield
+
+        abstract_path = []
+        node = goal_idx
+        while node is not None:
+            abstract_path.append(divmod(node, cols))
+            node = came_from[node]
+        abstract_path.reverse()
+        path, cost = yield from self._refine_steps(abstract_path, heuristic_func, explored, record_explored)
+
+        # Đường qua ô chuyển tiếp có thể vòng xa: tìm lại trực tiếp trong các cụm mà đường đã đi qua
+        # (cộng hình chữ nhật bao start / goal nếu hai cụm kề nhau) và giữ đường rẻ hơn.
+        corridor = {self.cluster_of(node_rc) for node_rc in path}
+        if abs(start_cluster[0] - goal_cluster[0]) <= 1 and abs(start_cluster[1] - goal_cluster[1]) <= 1:
+            corridor.update((cr, cc) for cr in range(min(start_cluster[0], goal_cluster[0]),
+                                                     max(start_cluster[0], goal_cluster[0]) + 1)
+                            for cc in range(min(start_cluster[1], goal_cluster[1]),
+                                            max(start_cluster[1], goal_cluster[1]) + 1))
+        local_path, local_cost, local_explored = _a_star_search(
+            _CorridorView(self.graph, self.cluster_size, corridor), start_rc, goal_rc, heuristic_func)
+        if record_explored:
+            explored.extend(local_explored)
+        yield local_explored
+        if local_path is not None and local_cost < cost:
+            path, cost = local_path, local_cost
+        return path, cost, explored
+
+    def _refine_steps(self, abstract_path, heuristic_func, explored, record_explored=True):
+        """
+        Nối các đoạn của đường trừu tượng thành đường đi từng ô; yield các ô mở rộng của từng đoạn
+        (và nối vào `explored` nếu record_explored) rồi return (path, cost).
+        Cạnh liên cụm là một bước; đoạn trong cụm được tìm lại bằng `_a_star_search` giới hạn trong cụm.
+        """
+        path = [abstract_path[0]]
+        total_cost = 0.0
+        for node_a, node_b in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(node_a)
+            if cluster != self.cluster_of(node_b): # Cạnh liên cụm (hai ô kề nhau)
+                path.append(node_b)
+                total_cost += float(self.grid_model.costs[node_b])
+                continue
+            segment, segment_cost, segment_explored = _a_star_search(
+                _ClusterView(self.graph, self.cluster_bounds(cluster)), node_a, node_b, heuristic_func)
+            if record_explored:
+                explored.extend(segment_explored)
+            yield segment_explored
+            path.extend(segment[1:])
+            total_cost += segment_cost
+        return path, total_cost
+
+
+def hpa_planner_for(grid_model, cluster_size=HPA_CLUSTER_SIZE):
+    """
+    Lấy bộ lập kế hoạch HPA* của một GridModel (dựng ở lần đầu; lần sau chỉ đồng bộ các cụm bị sửa).
+
+    Args:
+        grid_model (GridModel): Mô hình lưới.
+        cluster_size (int): Kích thước cụm.
+
+    Returns:
+        HPAStar: Bộ lập kế hoạch.
+    """
+    planner = _planners_by_model.get(grid_model.cache_key)
+    if planner is None or planner.cluster_size != cluster_size:
+        planner = HPAStar(grid_model, cluster_size, lazy=True) # Dựng ở lần find_path đầu tiên
+        _planners_by_model[grid_model.cache_key] = planner
+    planner.grid_model = grid_model # Bản chụp mới của cùng lưới: find_path chỉ đồng bộ các cụm bị sửa
+    return planner
+
+
+def hpa_star_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_euclidean):
+    """
+    HPA* một lần gọi (cùng chữ ký với các thuật toán khác trong `defined_algorithms`).
+    Đồ thị trừu tượng được giữ lại cho lưới và chỉ cập nhật các cụm bị sửa giữa các lần gọi.
+
+    Args:
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới.
+        start_rc (tuple): Tọa độ (row, col) điểm bắt đầu.
+        goal_rc (tuple): Tọa độ (row, col) điểm đích.
+        heuristic_func (function): Heuristic (nên là Euclidean khi cho phép đi chéo).
+
+    Returns:
+        tuple: (path, cost, explored_nodes)
+    """
+    return run_steps(hpa_star_steps(grid_data, start_rc, goal_rc, heuristic_func))
+
+
+def hpa_star_steps(grid_data, start_rc, goal_rc, heuristic_func=heuristic_euclidean, record_explored=True):
+    """Generator của `hpa_star_search` (cùng tham số), xem `HPAStar.find_path_steps`."""
+    grid_model = as_grid_model(grid_data)
+    if is_unreachable(grid_model, start_rc, goal_rc): # Không cần dựng / cập nhật đồ thị trừu tượng
+        return None, float("inf"), []
+    return (yield from hpa_planner_for(grid_model).find_path_steps(start_rc, goal_rc, heuristic_func,
+                                                                   record_explored))
@@ -0,0 +1,212 @@
+# src/jps_plus.py
+# Bảng khoảng cách nhảy tính trước cho JPS+ (Jump Point Search Plus).
+# Với mỗi ô và mỗi hướng trong 8 hướng, bảng lưu khoảng cách đến jump point kế tiếp
+# (hoặc đến tường) theo ĐÚNG quy tắc của `_jps_jump` trong algorithms.py, khi chưa xét đích.
+# Trong lúc tìm kiếm, một bước nhảy chỉ còn là một lần tra bảng cộng với kiểm tra O(1) xem
+# đích có nằm trên đoạn nhảy không, thay vì quét từng ô.
+#
+# Quy ước giá trị của bảng tại ô X theo hướng d:
+#   k > 0  : jump point nằm cách X đúng k bước theo hướng d.
+#   k <= 0 : đi được |k| bước theo hướng d rồi gặp tường/biên, không có jump point.
+import weakref # Bộ nhớ đệm bảng theo GridModel, tự giải phóng khi lưới bị hủy
+import numpy as np
+from src.grid_model import CELL_OBSTACLE
+
+CARDINAL_JUMP_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIAGONAL_JUMP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# Bảng của từng GridModel (tạo ở lần dùng đầu tiên, cập nhật theo nhật ký thay đổi của lưới).
+_tables_by_model = weakref.WeakKeyDictionary()
+
+
+def _east_jump_distances(walkable_padded):
+    """
+    Bảng hướng đông (0, 1) cho các hàng bên trong của mảng `walkable_padded` (có viền 1 ô).
+    Các hướng thẳng khác được đưa về hướng đông bằng cách lật/chuyển vị mảng.
+
+    Args:
+        walkable_padded (np.ndarray): Mảng bool (R+2, C+2), viền là tường.
+
+    Returns:
+        np.ndarray: Mảng int32 (R, C).
+    """
+    num_rows, num_cols = walkable_padded.shape[0] - 2, walkable_padded.shape[1] - 2
+    walkable = walkable_padded[1:-1, 1:-1]
+    # Ô đích j là "forced" khi đi về đông: ô trên (hoặc dưới) là tường còn ô chéo phía trước đi được.
+    forced = (~walkable_padded[:-2, 1:-1] & walkable_padded[:-2, 2:]) | \
+             (~walkable_padded[2:, 1:-1] & walkable_padded[2:, 2:])
+    stop = ~walkable | forced # Các ô làm dừng bước nhảy (tường hoặc jump point)
+    col_idx = np.arange(num_cols)
+    # Với mỗi cột j: cột dừng đầu tiên ở j hoặc sau j (num_cols = ra khỏi biên).
+    stop_at_or_after = np.minimum.accumulate(np.where(stop, col_idx, num_cols)[:, ::-1], axis=1)[:, ::-1]
+    # Bước nhảy từ ô c bắt đầu xét từ ô c + 1.
+    next_stop = np.full((num_rows, num_cols), num_cols, dtype=np.int64)
+    next_stop[:, :-1] = stop_at_or_after[:, 1:]
+    steps = next_stop - col_idx
+    inside = next_stop < num_cols
+    is_jump_point = inside & np.take_along_axis(walkable & forced, np.minimum(next_stop, num_cols - 1), axis=1)
+    return np.where(is_jump_point, steps, -(steps - 1)).astype(np.int32)
+
+
+def _cardinal_table(walkable_padded, direction):
+    """Bảng cho một hướng thẳng bất kỳ, tính qua hướng đông trên mảng đã lật/chuyển vị."""
+    dr, dc = direction
+    if dr == 0:
+        if dc == 1:
+            return _east_jump_distances(walkable_padded)
+        return _east_jump_distances(walkable_padded[:, ::-1])[:, ::-1]
+    transposed = walkable_padded.T
+    if dr == 1:
+        return _east_jump_distances(transposed).T
+    return _east_jump_distances(transposed[:, ::-1])[:, ::-1].T
+
+
+class JumpTables:
+    """
+    Bảng khoảng cách nhảy của một GridModel cho 8 hướng.
+    `sync()` đọc nhật ký thay đổi của lưới và chỉ tính lại vùng bị ảnh hưởng:
+    các hàng/cột quanh ô đã đổi (bảng hướng thẳng) và phần đường chéo phía "thượng nguồn".
+    """
+    def __init__(self, grid_model):
+        self.grid_model = grid_model
+        self.rows, self.cols = grid_model.rows, grid_model.cols
+        self.version = None
+        self.rebuild()
+
+    def _walkable_padded(self):
+        walkable_padded = np.zeros((self.rows + 2, self.cols + 2), dtype=bool)
+        walkable_padded[1:-1, 1:-1] = self.grid_model.cell_types != CELL_OBSTACLE
+        return walkable_padded
+
+    def rebuild(self):
+        """Tính lại toàn bộ bảng."""
+        walkable_padded = self._walkable_padded()
+        # Bảng có viền 1 ô (giá trị 0) để tra láng giềng không cần kiểm tra biên.
+        self.tables = {direction: np.zeros((self.rows + 2, self.cols + 2), dtype=np.int32)
+                       for direction in CARDINAL_JUMP_DIRECTIONS + DIAGONAL_JUMP_DIRECTIONS}
+        for direction in CARDINAL_JUMP_DIRECTIONS:
+            self.tables[direction][1:-1, 1:-1] = _cardinal_table(walkable_padded, direction)
+        for direction in DIAGONAL_JUMP_DIRECTIONS:
+            self._sweep_diagonal(walkable_padded, direction, None)
+        self._views = {direction: memoryview(table.ravel()) for direction, table in self.tables.items()}
+        self.version = self.grid_model.version
+
+    def _sweep_diagonal(self, walkable_padded, direction, changed_rows):
+        """
+        Tính bảng chéo theo từng hàng, bắt đầu từ hàng xa nhất theo hướng đi (vì giá trị tại ô X
+        phụ thuộc vào ô X + d). Nếu có `changed_rows` (tập hàng có dữ liệu đầu vào thay đổi), chỉ quét
+        từ hàng thay đổi xa nhất và dừng sớm khi đã qua mọi hàng thay đổi mà kết quả không đổi nữa.
+        """
+        dr, dc = direction
+        table = self.tables[direction]
+        vertical = self.tables[(dr, 0)]
+        horizontal = self.tables[(0, dc)]
+        row_order = range(self.rows - 1, -1, -1) if dr == 1 else range(self.rows)
+        if changed_rows:
+            first_row = max(changed_rows) if dr == 1 else min(changed_rows)
+            last_changed = min(changed_rows) if dr == 1 else max(changed_rows)
+            row_order = [r for r in row_order if (r <= first_row if dr == 1 else r >= first_row)]
+        col_slice = slice(1, self.cols + 1)
+        next_col_slice = slice(1 + dc, self.cols + 1 + dc)
+        for r in row_order:
+            pr, next_pr = r + 1, r + 1 + dr # Chỉ số hàng trong mảng có viền
+            next_walkable = walkable_padded[next_pr, next_col_slice]
+            # Ô kế tiếp là jump point nếu bước nhảy thẳng từ nó (theo 2 thành phần của hướng chéo) gặp jump point.
+            next_is_jump_point = (vertical[next_pr, next_col_slice] > 0) | (horizontal[next_pr, next_col_slice] > 0)
+            # "Cắt góc" (như _jps_jump): một trong hai ô thẳng cạnh ô hiện tại bị chặn.
+            corner = ~walkable_padded[next_pr, col_slice] | ~walkable_padded[pr, next_col_slice]
+            next_value = table[next_pr, next_col_slice]
+            new_row = np.where(~next_walkable, 0,
+                               np.where(next_is_jump_point | corner, 1,
+                                        np.where(next_value > 0, next_value + 1, next_value - 1)))
+            if changed_rows and (r < last_changed if dr == 1 else r > last_changed) and \
+                    np.array_equal(new_row, table[pr, col_slice]):
+                break # Đã qua vùng thay đổi và giá trị không đổi => các hàng còn lại cũng không đổi
+            table[pr, col_slice] = new_row
+
+    def sync(self):
+        """Đồng bộ bảng với lưới: tính lại theo vùng nếu có thể, ngược lại tính lại toàn bộ."""
+        if self.version == self.grid_model.version:
+            return
+        changed = self.grid_model.changes_since(self.version)
+        if changed is None or self.grid_model.rows != self.rows or self.grid_model.cols != self.cols:
+            self.rows, self.cols = self.grid_model.rows, self.grid_model.cols
+            self.rebuild()
+            return
+        walkable_padded = self._walkable_padded()
+        changed_r, changed_c = np.divmod(changed, self.cols)
+        # Bảng hướng thẳng tại một hàng chỉ phụ thuộc hàng đó và hai hàng kề (điều kiện forced).
+        dirty_rows = np.unique(np.clip(np.concatenate([changed_r - 1, changed_r, changed_r + 1]), 0, self.rows - 1))
+        dirty_cols = np.unique(np.clip(np.concatenate([changed_c - 1, changed_c, changed_c + 1]), 0, self.cols - 1))
+        changed_rows = set(dirty_rows.tolist())
+        for direction in CARDINAL_JUMP_DIRECTIONS:
+            table = self.tables[direction]
+            if direction[0] == 0: # Ngang: tính lại các hàng bẩn
+                for r in dirty_rows.tolist():
+                    table[r + 1, 1:-1] = _cardinal_table(walkable_padded[r:r + 3], direction)[0]
+            else: # Dọc: tính lại các cột bẩn; ghi nhận các hàng có giá trị đổi cho bảng chéo
+                for c in dirty_cols.tolist():
+                    new_col = _cardinal_table(walkable_padded[:, c:c + 3], direction)[:, 0]
+                    changed_rows.update((np.flatnonzero(new_col != table[1:-1, c + 1])).tolist())
+                    table[1:-1, c + 1] = new_col
+        for direction in DIAGONAL_JUMP_DIRECTIONS:
+            self._sweep_diagonal(walkable_padded, direction, changed_rows)
+        self.version = self.grid_model.version
+
+    def jump(self, current_rc, dr, dc, goal_rc):
+        """
+        Bước nhảy JPS+ từ `current_rc` theo hướng (dr, dc): tra bảng rồi kiểm tra đích trong O(1).
+        Kết quả giống hệt `_jps_jump` (kể cả khi đích nằm trên đoạn nhảy).
+
+        Returns:
+            tuple or None: Jump point (row, col), hoặc None nếu không có.
+        """
+        r, c = current_rc
+        cols = self.cols + 2
+        value = self._views[(dr, dc)][(r + 1) * cols + c + 1]
+        reach = value if value > 0 else -value # Số bước đi được trong đoạn nhảy
+        best = value if value > 0 else None # Số bước đến jump point (nếu có)
+        goal_r, goal_c = goal_rc
+        if dr == 0 or dc == 0: # Hướng thẳng: đích nằm trên tia nhảy?
+            steps = (goal_c - c) * dc if dr == 0 else (goal_r - r) * dr
+            if (goal_r == r if dr == 0 else goal_c == c) and 0 < steps <= reach and (best is None or steps < best):
+                best = steps
+        else:
+            # Hướng chéo: tại bước i, ô (r + i*dr, c + i*dc) là jump point nếu nó là đích hoặc
+            # bước nhảy thẳng từ nó (theo dr hoặc dc) chạm đích. Chỉ có thể xảy ra ở bước mà
+            # đường chéo đi qua cột (hoặc hàng) của đích.
+            for steps, axis_direction in (((goal_c - c) * dc, (dr, 0)), ((goal_r - r) * dr, (0, dc))):
+                if not 0 < steps <= reach or (best is not None and steps >= best):
+                    continue
+                step_r, step_c = r + steps * dr, c + steps * dc
+                if (step_r, step_c) == goal_rc:
+                    best = steps
+                    continue
+                axis_value = self._views[axis_direction][(step_r + 1) * cols + step_c + 1]
+                axis_reach = axis_value if axis_value > 0 else -axis_value
+                distance_to_goal = (goal_r - step_r) * dr if axis_direction[1] == 0 else (goal_c - step_c) * dc
+                if 0 < distance_to_goal <= axis_reach:
+                    best = steps
+        if best is None:
+            return None
+        return (r + best * dr, c + best * dc)
+
+
+def jump_tables_for(grid_model):
+    """
+    Lấy bảng nhảy của một GridModel (tạo ở lần đầu, đồng bộ với các thay đổi ở những lần sau).
+
+    Args:
+        grid_model (GridModel): Mô hình lưới.
+
+    Returns:
+        JumpTables: Bảng nhảy đã đồng bộ với lưới.
+    """
+    tables = _tables_by_model.get(grid_model.cache_key)
+    if tables is None:
+        tables = JumpTables(grid_model)
+        _tables_by_model[grid_model.cache_key] = tables
+    else:
+        tables.grid_model = grid_model # Bản chụp mới của cùng lưới: cập nhật tăng dần từ bản chụp trước
+        tables.sync()
+    return tables
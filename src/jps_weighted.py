@@ -0,0 +1,270 @@
+# src/jps_weighted.py
+# Jump Point Search có tính chi phí ô (cho lưới có ô bẫy / chi phí khác nhau).
+# JPS thường giả định mọi ô có cùng chi phí nên có thể nhảy qua ô bẫy và trả về đường đắt hơn A*.
+# Ở đây, "biên vùng chi phí" (ô có một láng giềng đi được mang chi phí khác) được coi như một
+# điều kiện forced neighbor: bước nhảy dừng lại tại đó và ô đó được mở rộng đủ 8 hướng.
+# Bên trong một vùng cùng chi phí, quy tắc cắt tỉa của JPS giữ nguyên nên số node mở rộng gần
+# với JPS thường, còn chi phí đường đi bằng chi phí tối ưu của đồ thị lưới (cùng quy tắc cạnh
+# với create_csr_graph_from_grid: trọng số = chi phí ô đích, nhân căn 2 nếu đi chéo, không đi chéo
+# khi cả hai ô thẳng tạo góc đều là tường).
+# Mặt nạ biên vùng được tính trước bằng NumPy và chỉ tính lại quanh các ô đã sửa.
+import heapq  # Hàng đợi ưu tiên cho các jump point
+import math # Cần cho sqrt(2) - chi phí đường chéo
+import weakref # Bộ nhớ đệm theo GridModel
+from array import array # Chi phí dạng phẳng
+import numpy as np
+from src.algorithms import heuristic_euclidean, run_steps
+from src.grid_model import as_grid_model, CELL_OBSTACLE
+from src.csr_graph import ALL_DIRECTIONS
+from src.components import is_unreachable
+
+SQRT2 = math.sqrt(2)
+
+# Dữ liệu vùng chi phí của từng GridModel (tạo ở lần dùng đầu tiên).
+_regions_by_model = weakref.WeakKeyDictionary()
+
+
+def _boundary_mask(walkable_padded, costs_padded):
+    """
+    Mặt nạ biên vùng chi phí cho phần bên trong của hai mảng có viền 1 ô.
+
+    Args:
+        walkable_padded (np.ndarray): Mảng bool (R+2, C+2), viền là tường.
+        costs_padded (np.ndarray): Mảng chi phí (R+2, C+2) cùng kích thước.
+
+    Returns:
+        np.ndarray: Mảng bool (R, C), True tại ô đi được có láng giềng đi được với chi phí khác.
+    """
+    num_rows, num_cols = walkable_padded.shape[0] - 2, walkable_padded.shape[1] - 2
+    own_cost = costs_padded[1:-1, 1:-1]
+    boundary = np.zeros((num_rows, num_cols), dtype=bool)
+    for dr, dc in ALL_DIRECTIONS:
+        neighbor = (slice(1 + dr, 1 + dr + num_rows), slice(1 + dc, 1 + dc + num_cols))
+        boundary |= walkable_padded[neighbor] & (costs_padded[neighbor] != own_cost)
+    return boundary & walkable_padded[1:-1, 1:-1]
+
+
+class CostRegions:
+    """
+    Bản sao phẳng (có viền 1 ô) của lưới dùng cho Weighted JPS: cờ đi được, chi phí và mặt nạ biên
+    vùng chi phí. Chỉ số phẳng của ô (r, c) là (r + 1) * width + (c + 1), nên các phép dịch hướng
+    là cộng hằng số và không cần kiểm tra biên (viền là tường).
+    """
+    def __init__(self, grid_model):
+        self.grid_model = grid_model
+        self.rebuild()
+
+    def rebuild(self):
+        """Tính lại toàn bộ từ lưới."""
+        self.rows, self.cols = self.grid_model.rows, self.grid_model.cols
+        self.width = self.cols + 2
+        self._walkable_padded = np.zeros((self.rows + 2, self.cols + 2), dtype=bool)
+        self._walkable_padded[1:-1, 1:-1] = self.grid_model.cell_types != CELL_OBSTACLE
+        self._costs_padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.float64)
+        self._costs_padded[1:-1, 1:-1] = self.grid_model.costs
+        self.walkable = bytearray(self._walkable_padded.tobytes())
+        self.costs = array("d", self._costs_padded.ravel().tolist())
+        boundary_padded = np.zeros_like(self._walkable_padded)
+        boundary_padded[1:-1, 1:-1] = _boundary_mask(self._walkable_padded, self._costs_padded)
+        self.boundary = bytearray(boundary_padded.tobytes())
+        self.version = self.grid_model.version
+
+    def sync(self):
+        """Đồng bộ với lưới: chỉ tính lại cửa sổ 3x3 quanh mỗi ô đã đổi (hoặc toàn bộ sau ghi hàng loạt)."""
+        if self.version == self.grid_model.version:
+            return
+        changed = self.grid_model.changes_since(self.version)
+        if changed is None or (self.grid_model.rows, self.grid_model.cols) != (self.rows, self.cols):
+            self.rebuild()
+            return
+        for flat_idx in changed.tolist():
+            r, c = divmod(flat_idx, self.cols)
+            walkable = self.grid_model.cell_types[r, c] != CELL_OBSTACLE
+            self._walkable_padded[r + 1, c + 1] = walkable
+            self._costs_padded[r + 1, c + 1] = self.grid_model.costs[r, c]
+            self.walkable[(r + 1) * self.width + c + 1] = int(walkable)
+            self.costs[(r + 1) * self.width + c + 1] = float(self.grid_model.costs[r, c])
+        for flat_idx in changed.tolist():
+            r, c = divmod(flat_idx, self.cols)
+            # Biên vùng của ô chỉ phụ thuộc 8 láng giềng => chỉ các ô trong cửa sổ 3x3 có thể đổi.
+            r0, r1 = max(r - 1, 0), min(r + 1, self.rows - 1)
+            c0, c1 = max(c - 1, 0), min(c + 1, self.cols - 1)
+            window = _boundary_mask(self._walkable_padded[r0:r1 + 3, c0:c1 + 3],
+                                    self._costs_padded[r0:r1 + 3, c0:c1 + 3])
+            for wr, row in enumerate(window.tolist()):
+                start = (r0 + wr + 1) * self.width + c0 + 1
+                self.boundary[start:start + len(row)] = bytes(row)
+        self.version = self.grid_model.version
+
+    # --- Bước nhảy ---
+    def _is_jump_point(self, idx, dr, dc, goal_idx):
+        """Ô idx (vừa đi vào theo hướng (dr, dc)) có phải là jump point không (không xét nhảy con)."""
+        if idx == goal_idx or self.boundary[idx]:
+            return True
+        walkable, width = self.walkable, self.width
+        if dr == 0 or dc == 0: # Hướng thẳng: forced neighbor ở hai bên
+            side = 1 if dr != 0 else width
+            ahead = dr * width + dc
+            return (not walkable[idx - side] and walkable[idx - side + ahead]) or \
+                   (not walkable[idx + side] and walkable[idx + side + ahead])
+        # Hướng chéo: ô phía sau theo một thành phần bị chặn, ô chéo tương ứng phía trước đi được.
+        return (not walkable[idx - dr * width] and walkable[idx - dr * width + dc]) or \
+               (not walkable[idx - dc] and walkable[idx + dr * width - dc])
+
+    def jump(self, idx, dr, dc, goal_idx):
+        """
+        Nhảy từ ô idx theo hướng (dr, dc) đến jump point kế tiếp (vòng lặp, không đệ quy).
+
+        Returns:
+            tuple or None: (chỉ số jump point, số bước), hoặc None nếu gặp tường/biên.
+        """
+        walkable, width = self.walkable, self.width
+        step = dr * width + dc
+        steps = 0
+        diagonal = dr != 0 and dc != 0
+        while True:
+            # Không đi chéo khi cả hai ô thẳng tạo góc đều là tường.
+            if diagonal and not (walkable[idx + dr * width] or walkable[idx + dc]):
+                return None
+            idx += step
+            steps += 1
+            if not walkable[idx]:
+                return None
+            if self._is_jump_point(idx, dr, dc, goal_idx):
+                return idx, steps
+            # Đi chéo: ô là jump point nếu bước nhảy thẳng theo một thành phần tìm được jump point.
+            if diagonal and (self.jump(idx, dr, 0, goal_idx) or self.jump(idx, 0, dc, goal_idx)):
+                return idx, steps
+
+    def successor_directions(self, idx, dr, dc):
+        """
+        Các hướng cần nhảy từ jump point idx, biết hướng (dr, dc) đã đi vào nó.
+        Điểm bắt đầu và ô biên vùng chi phí được mở rộng đủ 8 hướng (cắt tỉa không còn đúng ở đó).
+        """
+        if (dr == 0 and dc == 0) or self.boundary[idx]:
+            return ALL_DIRECTIONS
+        walkable, width = self.walkable, self.width
+        if dr == 0 or dc == 0:
+            directions = [(dr, dc)]
+            side = 1 if dr != 0 else width
+            ahead = dr * width + dc
+            for sign in (-1, 1):
+                if not walkable[idx + sign * side] and walkable[idx + sign * side + ahead]:
+                    directions.append((dr + (sign if dr == 0 else 0), dc + (sign if dc == 0 else 0)))
+            return directions
+        directions = [(dr, 0), (0, dc), (dr, dc)]
+        if not walkable[idx - dr * width] and walkable[idx - dr * width + dc]:
+            directions.append((-dr, dc))
+        if not walkable[idx - dc] and walkable[idx + dr * width - dc]:
+            directions.append((dr, -dc))
+        return directions
+
+
+def cost_regions_for(grid_model):
+    """
+    Lấy dữ liệu vùng chi phí của một GridModel (tạo ở lần đầu, đồng bộ với các thay đổi ở những lần sau).
+
+    Args:
+        grid_model (GridModel): Mô hình lưới.
+
+    Returns:
+        CostRegions: Dữ liệu đã đồng bộ với lưới.
+    """
+    regions = _regions_by_model.get(grid_model.cache_key)
+    if regions is None:
+        regions = CostRegions(grid_model)
+        _regions_by_model[grid_model.cache_key] = regions
+    else:
+        regions.grid_model = grid_model # Bản chụp mới của cùng lưới: cập nhật tăng dần từ bản chụp trước
+        regions.sync()
+    return regions
+
+
+def weighted_jps_search(grid_data, start_rc, goal_rc, heuristic_func=heuristic_euclidean):
+    """
+    Jump Point Search có tính chi phí ô: bước nhảy dừng tại biên giữa các vùng chi phí,
+    nên đường đi trả về có chi phí tối ưu trên lưới có ô bẫy.
+
+    Args:
+        grid_data (GameGrid or GridModel or list of list of GridNode): Dữ liệu lưới game.
+        start_rc (tuple): Tọa độ (row, col) của điểm bắt đầu.
+        goal_rc (tuple): Tọa độ (row, col) của điểm đích.
+        heuristic_func (function): Heuristic chấp nhận được (admissible) khi đi chéo, mặc định Euclidean.
+
+    Returns:
+        tuple: (path, cost, explored_nodes)
+               - path (list of tuples or None): Đường đi chi tiết từng ô.
+               - cost (float): Chi phí đường đi (inf nếu không có).
+               - explored_nodes (list of tuples): Các jump point đã mở rộng.
+    """
+    return run_steps(weighted_jps_steps(grid_data, start_rc, goal_rc, heuristic_func))
+
+
+def weighted_jps_steps(grid_data, start_rc, goal_rc, heuristic_func=heuristic_euclidean, record_explored=True):
+    """
+    Generator của `weighted_jps_search`: yield [jump point] sau mỗi lần mở rộng,
+    return (path, cost, explored_nodes) - explored_nodes rỗng nếu record_explored=False.
+    """
+    grid_model = as_grid_model(grid_data)
+    if is_unreachable(grid_model, start_rc, goal_rc):
+        return None, float("inf"), []
+    regions = cost_regions_for(grid_model)
+    width = regions.width
+    start_idx = (start_rc[0] + 1) * width + start_rc[1] + 1
+    goal_idx = (goal_rc[0] + 1) * width + goal_rc[1] + 1
+    if not (regions.walkable[start_idx] and regions.walkable[goal_idx]):
+        return None, float("inf"), []
+
+    def to_rc(idx):
+        r, c = divmod(idx, width)
+        return (r - 1, c - 1)
+
+    # Mỗi entry: (f, g, idx). came_from lưu (jump point cha, hướng đi vào).
+    open_set = [(heuristic_func(start_rc, goal_rc), 0.0, start_idx)]
+    g_costs = {start_idx: 0.0}
+    came_from = {start_idx: (None, (0, 0))}
+    closed = set()
+    explored_nodes = []
+
+    while open_set:
+        _, g_current, current = heapq.heappop(open_set)
+        if current in closed:
+            continue
+        closed.add(current)
+        current_rc = to_rc(current)
+        if record_explored:
+            explored_nodes.append(current_rc)
+        yield [current_rc]
+
+        if current == goal_idx:
+            # Nội suy từng ô giữa các jump point (các đoạn là đường thẳng hoặc chéo 45 độ).
+            jump_points = []
+            node = current
+            while node is not None:
+                jump_points.append(to_rc(node))
+                node = came_from[node][0]
+            jump_points.reverse()
+            path = [jump_points[0]]
+            for (r1, c1), (r2, c2) in zip(jump_points, jump_points[1:]):
+                step_r, step_c = (r2 > r1) - (r2 < r1), (c2 > c1) - (c2 < c1)
+                for i in range(1, max(abs(r2 - r1), abs(c2 - c1)) + 1):
+                    path.append((r1 + i * step_r, c1 + i * step_c))
+            return path, g_current, explored_nodes
+
+        for dr, dc in regions.successor_directions(current, *came_from[current][1]):
+            result = regions.jump(current, dr, dc, goal_idx)
+            if result is None:
+                continue
+            successor, steps = result
+            if successor in closed:
+                continue
+            # Mọi ô trong đoạn nhảy có cùng chi phí (các ô đi qua không nằm trên biên vùng),
+            # nên chi phí đoạn = số bước * chi phí ô đầu tiên của đoạn.
+            step_cost = regions.costs[current + dr * width + dc]
+            new_g = g_current + steps * (step_cost * SQRT2 if dr != 0 and dc != 0 else step_cost)
+            if new_g < g_costs.get(successor, float("inf")):
+                g_costs[successor] = new_g
+                came_from[successor] = (current, (dr, dc))
+                heapq.heappush(open_set, (new_g + heuristic_func(to_rc(successor), goal_rc), new_g, successor))
+
+    return None, float("inf"), explored_nodes
@@ -0,0 +1,102 @@
+# src/landmarks.py
+# Heuristic ALT (A*, Landmarks, Triangle inequality).
+# Tiền xử lý: chọn K landmark trải đều trên bản đồ, chạy Dijkstra đầy đủ TỪ và ĐẾN mỗi landmark,
+# lưu khoảng cách dạng float32 (2 * K * số ô * 4 byte).
+# Theo bất đẳng thức tam giác, với mọi landmark L:
+#     d(a, b) >= d(L, b) - d(L, a)      và      d(a, b) >= d(a, L) - d(b, L)
+# nên max của các hiệu này là một heuristic chấp nhận được (admissible), thường sát hơn nhiều
+# so với Manhattan trên bản đồ có tường và bẫy (đường đi thật phải vòng qua chúng).
+# `LandmarkHeuristic` là một đối tượng gọi được `h(node_a_rc, node_b_rc)`, nên dùng được trực tiếp
+# với a_star_search, bidirectional_a_star_search, greedy_bfs_search và các kernel phẳng.
+import random # Chọn landmark đầu tiên (tái lập được theo seed)
+import numpy as np
+from src.grid_model import as_grid_model, GridModel
+from src.csr_graph import CSRGraph, create_csr_graph_from_grid
+from src.fast_search import single_source_distances_flat
+
+DEFAULT_NUM_LANDMARKS = 8
+# Giá trị thay cho inf trong bảng (ô không đến được): hiệu của nó với khoảng cách hữu hạn vẫn đúng
+# chiều bất đẳng thức, trong khi inf - inf sẽ cho nan.
+UNREACHABLE = np.float32(1e30)
+
+
+class LandmarkHeuristic:
+    """
+    Heuristic ALT dựa trên bảng khoảng cách landmark đã tính trước cho một đồ thị.
+    Bảng phản ánh bản đồ tại thời điểm dựng: sau khi sửa ô cần dựng lại (xem `is_stale`).
+    """
+    def __init__(self, grid_data, num_landmarks=DEFAULT_NUM_LANDMARKS, seed=0):
+        """
+        Chọn landmark và tính bảng khoảng cách.
+
+        Args:
+            grid_data (CSRGraph or GameGrid or GridModel): Đồ thị CSR, hoặc lưới (khi đó đồ thị được dựng mới).
+            num_landmarks (int): Số landmark K.
+            seed (int): Seed chọn landmark đầu tiên.
+        """
+        graph = grid_data if isinstance(grid_data, CSRGraph) else create_csr_graph_from_grid(as_grid_model(grid_data))
+        self.cols = graph.cols
+        self.source_model = graph.source_model
+        self.source_version = graph.source_version
+        reversed_graph = graph.reversed()
+
+        walkable = np.flatnonzero(graph.node_mask)
+        self.landmarks = [] # Tọa độ (row, col) của các landmark
+        from_tables, to_tables = [], []
+        if len(walkable):
+            # Chọn kiểu "điểm xa nhất": bắt đầu từ một ô ngẫu nhiên, landmark kế tiếp là ô (đến được)
+            # có khoảng cách nhỏ nhất tới các landmark đã chọn là lớn nhất.
+            seed_idx = int(random.Random(seed).choice(walkable.tolist()))
+            seed_distances = np.frombuffer(single_source_distances_flat(graph, divmod(seed_idx, self.cols)))
+            min_distance = np.where(np.isfinite(seed_distances), seed_distances, -1.0)
+            for _ in range(min(num_landmarks, len(walkable))):
+                landmark_idx = int(np.argmax(min_distance))
+                if min_distance[landmark_idx] <= 0 and self.landmarks:
+                    break # Không còn ô mới nào có ích (đã phủ hết thành phần liên thông)
+                landmark_rc = divmod(landmark_idx, self.cols)
+                self.landmarks.append(landmark_rc)
+                from_distances = np.frombuffer(single_source_distances_flat(graph, landmark_rc))
+                to_distances = np.frombuffer(single_source_distances_flat(reversed_graph, landmark_rc))
+                from_tables.append(from_distances)
+                to_tables.append(to_distances)
+                min_distance = np.minimum(min_distance, np.where(np.isfinite(from_distances), from_distances, -1.0))
+
+        # Lưu dạng float32 (nửa bộ nhớ so với float64), inf -> UNREACHABLE.
+        self.from_landmark = np.array([np.where(np.isfinite(t), t, UNREACHABLE) for t in from_tables],
+                                      dtype=np.float32).reshape(len(from_tables), -1)
+        self.to_landmark = np.array([np.where(np.isfinite(t), t, UNREACHABLE) for t in to_tables],
+                                    dtype=np.float32).reshape(len(to_tables), -1)
+        # Làm tròn float32 có thể làm hiệu hai khoảng cách lớn hơn giá trị thật một chút:
+        # trừ đi cận trên của sai số đó để heuristic vẫn chấp nhận được.
+        finite = np.concatenate([t[np.isfinite(t)] for t in from_tables + to_tables]) if from_tables else np.zeros(1)
+        self._rounding_slack = 2 * float(np.finfo(np.float32).eps) * float(finite.max(initial=0.0))
+        # memoryview: đọc từng phần tử thành float Python nhanh hơn index mảng NumPy.
+        self._views = [(memoryview(self.from_landmark[k]), memoryview(self.to_landmark[k]))
+                       for k in range(len(self.landmarks))]
+
+    def is_stale(self):
+        """True nếu lưới nguồn đã thay đổi kể từ khi dựng bảng (heuristic có thể không còn chấp nhận được)."""
+        return isinstance(self.source_model, GridModel) and self.source_model.version != self.source_version
+
+    def __call__(self, node_a_rc, node_b_rc):
+        """
+        Cận dưới của chi phí đi từ node_a đến node_b.
+
+        Args:
+            node_a_rc (tuple): Tọa độ (row, col) của node thứ nhất.
+            node_b_rc (tuple): Tọa độ (row, col) của node thứ hai.
+
+        Returns:
+            float: Giá trị heuristic (>= 0).
+        """
+        a = node_a_rc[0] * self.cols + node_a_rc[1]
+        b = node_b_rc[0] * self.cols + node_b_rc[1]
+        best = 0.0
+        for from_view, to_view in self._views:
+            estimate = from_view[b] - from_view[a] # d(L, b) - d(L, a)
+            if estimate > best:
+                best = estimate
+            estimate = to_view[a] - to_view[b] # d(a, L) - d(b, L)
+            if estimate > best:
+                best = estimate
+        return best - self._rounding_slack if best > self._rounding_slack else 0.0
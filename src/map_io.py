@@ -0,0 +1,314 @@
+# src/map_io.py
+# Đọc / ghi bản đồ dạng văn bản và file kịch bản (scenario) cho các công cụ không có giao diện
+# (benchmark, giải theo lô trên dòng lệnh).
+# Bản đồ văn bản: mỗi dòng là một hàng của lưới, mỗi ký tự là một ô:
+#   '.' ô trống, '#' tường, '~' bẫy, 'S' điểm bắt đầu, 'E' điểm kết thúc.
+# Dòng trống và dòng bắt đầu bằng ';' (chú thích) được bỏ qua.
+# File kịch bản (JSON): {"name": ..., "grid": [các dòng bản đồ] hoặc "map": "đường dẫn file bản đồ"
+# (tương đối so với file kịch bản), "queries": [[[sr, sc], [gr, gc]], ...]}. Không có "queries" thì dùng
+# cặp S/E của bản đồ.
+# Ngoài ra (chọn theo phần mở rộng của file, xem `load_map` / `load_scenario`):
+#   - '.map' / '.scen': định dạng văn bản của bộ benchmark MovingAI (https://movingai.com/benchmarks/formats.html),
+#   - '.gridpack': định dạng nhị phân nén bit (1 bit "đi được" mỗi ô + mặt phẳng chi phí float32 tùy chọn),
+#     đọc bằng memory map, không phải phân tích cú pháp.
+import json
+import os
+import struct
+import numpy as np
+from config import COST_TRAP_CELL
+from src.grid_model import (GridModel, CELL_NORMAL, CELL_OBSTACLE, CELL_TRAP, CELL_START, CELL_END,
+                            CELL_TYPE_COSTS)
+
+CELL_CHARS = {CELL_NORMAL: ".", CELL_OBSTACLE: "#", CELL_TRAP: "~", CELL_START: "S", CELL_END: "E"}
+CHAR_CELLS = {char: code for code, char in CELL_CHARS.items()}
+
+# Ký tự địa hình MovingAI -> mã loại ô. '.' và 'G' đi được; '@', 'O' (ngoài bản đồ) và 'T' (cây) không đi được;
+# 'S' (đầm lầy) đi được nhưng chậm -> ô bẫy; 'W' (nước) chỉ đi được từ ô nước khác -> coi là tường.
+MOVINGAI_CELLS = {".": CELL_NORMAL, "G": CELL_NORMAL, "@": CELL_OBSTACLE, "O": CELL_OBSTACLE,
+                  "T": CELL_OBSTACLE, "W": CELL_OBSTACLE, "S": CELL_TRAP}
+# Mã loại ô -> ký tự MovingAI khi ghi (ô start/end ghi như ô trống).
+MOVINGAI_CHARS = {CELL_NORMAL: ".", CELL_OBSTACLE: "@", CELL_TRAP: "S", CELL_START: ".", CELL_END: "."}
+
+# Định dạng nén bit: header 32 byte little-endian = magic, phiên bản, rows, cols, cờ, độ dài một hàng bit (byte),
+# vị trí mặt phẳng chi phí (0 nếu không có); sau đó là các hàng bit (bit 1 = đi được, np.packbits từng hàng),
+# rồi mặt phẳng chi phí float32 (rows, cols) căn lề 64 byte.
+PACKED_MAGIC = b"GRIDPAK"
+PACKED_VERSION = 1
+PACKED_FLAG_COSTS = 1
+_PACKED_HEADER = struct.Struct("<7sBIIIIQ")
+_PACKED_ALIGNMENT = 64
+
+
+def parse_grid_text(lines):
+    """
+    Dựng lưới từ các dòng bản đồ văn bản.
+
+    Args:
+        lines (iterable of str): Các dòng (ký tự xuống dòng ở cuối được bỏ qua).
+
+    Returns:
+        tuple: (GridModel, start_rc hoặc None, end_rc hoặc None).
+
+    Raises:
+        ValueError: Bản đồ rỗng, các hàng không cùng độ dài hoặc có ký tự không hợp lệ.
+    """
+    rows = [line.rstrip("\r\n") for line in lines]
+    rows = [line for line in rows if line and not line.startswith(";")]
+    if not rows:
+        raise ValueError("Map is empty")
+    width = len(rows[0])
+    for r, line in enumerate(rows):
+        if len(line) != width:
+            raise ValueError(f"Map row {r} has {len(line)} cells, expected {width}")
+        unknown = set(line) - CHAR_CELLS.keys()
+        if unknown:
+            raise ValueError(f"Map row {r} has unknown cell characters {''.join(sorted(unknown))!r}")
+    # Đổi cả bản đồ sang mã loại ô bằng một bảng tra 256 phần tử (không lặp từng ô trong Python).
+    lookup = np.zeros(256, dtype=np.uint8)
+    for char, code in CHAR_CELLS.items():
+        lookup[ord(char)] = code
+    cell_types = lookup[np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)].reshape(len(rows), width)
+    model = GridModel(len(rows), width)
+    model.set_types(cell_types)
+    return model, _find_cell(cell_types, CELL_START), _find_cell(cell_types, CELL_END)
+
+
+def _find_cell(cell_types, code):
+    """Tọa độ (row, col) của ô đầu tiên có mã `code`, hoặc None."""
+    found = np.argwhere(cell_types == code)
+    return tuple(int(v) for v in found[0]) if len(found) else None
+
+
+def format_grid_text(grid_model):
+    """
+    Chuyển lưới thành các dòng bản đồ văn bản (ngược với `parse_grid_text`).
+
+    Returns:
+        list of str: Mỗi hàng của lưới một dòng.
+    """
+    chars = np.array([CELL_CHARS[code] for code in range(len(CELL_CHARS))])
+    return ["".join(row) for row in chars[grid_model.cell_types].tolist()]
+
+
+def _char_lookup(char_cells):
+    """Bảng tra 256 phần tử: byte ASCII -> mã loại ô (255 với ký tự không hợp lệ)."""
+    lookup = np.full(256, 255, dtype=np.uint8)
+    for char, code in char_cells.items():
+        lookup[ord(char)] = code
+    return lookup
+
+
+def load_map(path):
+    """
+    Đọc một file bản đồ, chọn định dạng theo phần mở rộng: '.map' (MovingAI), '.gridpack' (nén bit),
+    còn lại là bản đồ văn bản của project.
+
+    Returns:
+        tuple: (GridModel, start_rc hoặc None, end_rc hoặc None).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".map":
+        return load_movingai_map(path), None, None
+    if extension == ".gridpack":
+        return load_packed_map(path), None, None
+    with open(path, encoding="utf-8") as map_file:
+        return parse_grid_text(map_file)
+
+
+def save_map(path, grid_model):
+    """Ghi lưới ra file bản đồ văn bản."""
+    with open(path, "w", encoding="utf-8") as map_file:
+        map_file.write("\n".join(format_grid_text(grid_model)) + "\n")
+
+
+def load_scenario(path):
+    """
+    Đọc một file kịch bản JSON (hoặc file '.scen' của MovingAI, xem `load_movingai_scenario`).
+
+    Returns:
+        dict: {"name": str, "model": GridModel, "queries": list các cặp ((sr, sc), (gr, gc))}.
+
+    Raises:
+        ValueError: Kịch bản thiếu bản đồ, hoặc không có truy vấn nào (và bản đồ không có S/E).
+    """
+    if path.lower().endswith(".scen"):
+        return load_movingai_scenario(path)
+    with open(path, encoding="utf-8") as scenario_file:
+        scenario = json.load(scenario_file)
+    if "grid" in scenario:
+        model, start_rc, end_rc = parse_grid_text(scenario["grid"])
+    elif "map" in scenario:
+        model, start_rc, end_rc = load_map(os.path.join(os.path.dirname(path), scenario["map"]))
+    else:
+        raise ValueError(f"Scenario {path} has neither 'grid' nor 'map'")
+    queries = [(tuple(start), tuple(goal)) for start, goal in scenario.get("queries", [])]
+    if not queries and start_rc and end_rc:
+        queries = [(start_rc, end_rc)]
+    if not queries:
+        raise ValueError(f"Scenario {path} has no queries and its map has no S/E cells")
+    name = scenario.get("name") or os.path.splitext(os.path.basename(path))[0]
+    return {"name": name, "model": model, "queries": queries}
+
+
+# --- MovingAI (.map / .scen) ---
+def load_movingai_map(path):
+    """
+    Đọc một bản đồ MovingAI: header ("type octile", "height H", "width W", "map") rồi H dòng W ký tự.
+    Cả phần bản đồ được đổi sang mã loại ô bằng một bảng tra trên mảng byte (không lặp từng dòng).
+
+    Returns:
+        GridModel: Lưới dùng trực tiếp hai mảng vừa dựng (không sao chép thêm).
+
+    Raises:
+        ValueError: Header thiếu / sai, kích thước không khớp hoặc có ký tự địa hình không hợp lệ.
+    """
+    with open(path, "rb") as map_file:
+        data = map_file.read()
+    header = {}
+    offset = 0
+    while True:
+        line_end = data.find(b"\n", offset)
+        if line_end < 0:
+            raise ValueError(f"{path}: missing 'map' line in MovingAI header")
+        line = data[offset:line_end].decode("ascii").strip()
+        offset = line_end + 1
+        if line.lower() == "map":
+            break
+        if line:
+            key, _, value = line.partition(" ")
+            header[key.lower()] = value.strip()
+    try:
+        rows, cols = int(header["height"]), int(header["width"])
+    except (KeyError, ValueError):
+        raise ValueError(f"{path}: MovingAI header needs integer 'height' and 'width'") from None
+
+    chars = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    if len(chars) == rows * (cols + 1) and (chars[cols::cols + 1] == ord("\n")).all():
+        chars = chars.reshape(rows, cols + 1)[:, :cols] # Mỗi hàng kết thúc bằng '\n': chỉ cần một view
+    else:
+        chars = chars[(chars != ord("\n")) & (chars != ord("\r"))] # Bỏ ký tự xuống dòng (kể cả kiểu Windows)
+        if len(chars) != rows * cols:
+            raise ValueError(f"{path}: expected {rows}x{cols} = {rows * cols} cells, found {len(chars)}")
+        chars = chars.reshape(rows, cols)
+    cell_types = _char_lookup(MOVINGAI_CELLS)[chars]
+    if (cell_types == 255).any():
+        bad = sorted({chr(b) for b in np.unique(chars[cell_types == 255])})
+        raise ValueError(f"{path}: unknown MovingAI terrain characters {''.join(bad)!r}")
+    return GridModel.from_arrays(cell_types, CELL_TYPE_COSTS[cell_types])
+
+
+def save_movingai_map(path, grid_model):
+    """Ghi lưới ra file bản đồ MovingAI (ô bẫy ghi là 'S', tường là '@')."""
+    chars = np.zeros(256, dtype=np.uint8)
+    for code, char in MOVINGAI_CHARS.items():
+        chars[code] = ord(char)
+    body = np.empty((grid_model.rows, grid_model.cols + 1), dtype=np.uint8)
+    body[:, :-1] = chars[grid_model.cell_types]
+    body[:, -1] = ord("\n")
+    with open(path, "wb") as map_file:
+        map_file.write(f"type octile\nheight {grid_model.rows}\nwidth {grid_model.cols}\nmap\n".encode("ascii"))
+        map_file.write(body.tobytes())
+
+
+def load_movingai_scenario(path):
+    """
+    Đọc một file '.scen' MovingAI ("version 1", rồi mỗi dòng: bucket, map, width, height,
+    start_x, start_y, goal_x, goal_y, optimal_length; x là cột, y là hàng). Bản đồ được tìm theo đường dẫn
+    ghi trong file, tương đối so với file kịch bản, rồi theo tên file trong cùng thư mục.
+
+    Returns:
+        dict: Như `load_scenario`, thêm "reference_costs": độ dài tối ưu theo MovingAI của từng truy vấn
+              (đường chéo sqrt(2), không cắt góc tường, không tính chi phí ô - chỉ để tham khảo).
+
+    Raises:
+        ValueError: File không có truy vấn, tham chiếu nhiều bản đồ hoặc kích thước không khớp bản đồ.
+    """
+    queries, reference_costs, map_names = [], [], set()
+    with open(path, encoding="utf-8") as scen_file:
+        for line in scen_file:
+            fields = line.split("\t") if "\t" in line else line.split()
+            if len(fields) < 9 or fields[0].lower() == "version":
+                continue
+            map_names.add(fields[1].strip())
+            width, height = int(fields[2]), int(fields[3])
+            start_x, start_y, goal_x, goal_y = (int(v) for v in fields[4:8])
+            queries.append(((start_y, start_x), (goal_y, goal_x)))
+            reference_costs.append(float(fields[8]))
+    if not queries:
+        raise ValueError(f"Scenario {path} has no queries")
+    if len(map_names) != 1:
+        raise ValueError(f"Scenario {path} references {len(map_names)} maps; expected exactly one")
+    map_name = map_names.pop()
+    base_dir = os.path.dirname(path)
+    map_path = os.path.join(base_dir, map_name)
+    if not os.path.exists(map_path):
+        map_path = os.path.join(base_dir, os.path.basename(map_name))
+    model = load_movingai_map(map_path)
+    if (model.cols, model.rows) != (width, height):
+        raise ValueError(f"Scenario {path} expects a {width}x{height} map, {map_path} is {model.cols}x{model.rows}")
+    name = os.path.splitext(os.path.basename(path))[0]
+    return {"name": name, "model": model, "queries": queries, "reference_costs": reference_costs}
+
+
+# --- Định dạng nhị phân nén bit (.gridpack) ---
+def save_packed_map(path, grid_model, include_costs=True):
+    """
+    Ghi lưới ra định dạng nén bit (xem đầu file).
+
+    Args:
+        path (str): File đích.
+        grid_model (GridModel): Lưới cần ghi.
+        include_costs (bool): Ghi cả mặt phẳng chi phí float32. Không có mặt phẳng này, khi đọc mọi ô
+            đi được có chi phí thường (COST_NORMAL_CELL).
+    """
+    rows, cols = grid_model.rows, grid_model.cols
+    bits = np.packbits(grid_model.walkable_mask(), axis=1) # Bit 1 = đi được; mỗi hàng làm tròn lên byte
+    row_bytes = bits.shape[1] if rows else 0
+    costs_offset = 0
+    if include_costs:
+        costs_offset = -(-(_PACKED_HEADER.size + bits.nbytes) // _PACKED_ALIGNMENT) * _PACKED_ALIGNMENT
+    flags = PACKED_FLAG_COSTS if include_costs else 0
+    with open(path, "wb") as packed_file:
+        packed_file.write(_PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, rows, cols, flags, row_bytes, costs_offset))
+        packed_file.write(bits.tobytes())
+        if include_costs:
+            packed_file.write(b"\0" * (costs_offset - _PACKED_HEADER.size - bits.nbytes))
+            packed_file.write(np.ascontiguousarray(grid_model.costs, dtype="<f4").tobytes())
+
+
+def load_packed_map(path, infer_traps=False):
+    """
+    Đọc file nén bit bằng memory map (chế độ copy-on-write: sửa lưới không ghi ngược vào file).
+    Mặt phẳng chi phí (nếu có) được dùng trực tiếp từ vùng nhớ ánh xạ, không sao chép và chỉ được đọc từ đĩa
+    khi thuật toán chạm tới; loại ô được giải nén từ các hàng bit (ô trống / tường).
+
+    Args:
+        path (str): File nén bit.
+        infer_traps (bool): Đánh dấu ô đi được có chi phí COST_TRAP_CELL là ô bẫy. Tìm đường chỉ đọc chi phí
+            nên không cần; bật khi cần loại ô để hiển thị (phải đọc cả mặt phẳng chi phí: ~10x chậm hơn).
+
+    Returns:
+        GridModel: Lưới đọc được (không có ô start/end).
+
+    Raises:
+        ValueError: Không phải file nén bit hoặc phiên bản không hỗ trợ.
+    """
+    mapped = np.memmap(path, dtype=np.uint8, mode="c")
+    if len(mapped) < _PACKED_HEADER.size:
+        raise ValueError(f"{path} is not a packed grid file")
+    magic, version, rows, cols, flags, row_bytes, costs_offset = _PACKED_HEADER.unpack_from(mapped)
+    if magic != PACKED_MAGIC:
+        raise ValueError(f"{path} is not a packed grid file")
+    if version != PACKED_VERSION:
+        raise ValueError(f"{path} has unsupported packed grid version {version}")
+    bits = mapped[_PACKED_HEADER.size:_PACKED_HEADER.size + rows * row_bytes].reshape(rows, row_bytes)
+    # CELL_OBSTACLE == 1, CELL_NORMAL == 0: loại ô = bit "đi được" đảo ngược.
+    cell_types = np.unpackbits(bits, axis=1, count=cols)
+    np.bitwise_xor(cell_types, 1, out=cell_types)
+    if flags & PACKED_FLAG_COSTS:
+        costs = np.ndarray((rows, cols), dtype="<f4", buffer=mapped, offset=costs_offset)
+        if infer_traps:
+            cell_types[(cell_types == CELL_NORMAL) & (costs == COST_TRAP_CELL)] = CELL_TRAP
+    else:
+        costs = CELL_TYPE_COSTS[cell_types] # Không có mặt phẳng chi phí: phải dựng mảng chi phí trong RAM
+    return GridModel.from_arrays(cell_types, costs)
@@ -0,0 +1,233 @@
+# src/maze_generators.py
+# Các bộ sinh mê cung / địa hình theo seed, cho lưới kích thước bất kỳ (ví dụ 2000x2000 để thử tải lớn).
+# Mỗi bộ sinh có dạng `generator(rows, cols, rng) -> (cell_types, start_rc, end_rc)`:
+#   - rng: np.random.Generator (cùng seed => cùng bản đồ),
+#   - cell_types: mảng uint8 (rows, cols) mã loại ô (chưa gồm ô start/end), ghi vào GridModel bằng `set_types`,
+#   - start_rc / end_rc: hai ô đi được, luôn có đường nối giữa chúng.
+# Các bộ sinh được đăng ký trong src/maze_loader.py (MAZE_GENERATORS) cạnh các mẫu viết tay.
+#
+# Mê cung "hoàn hảo" (backtracker, Prim) dùng lưới ô ở tọa độ lẻ: ô (i, j) của mê cung là ô (2i+1, 2j+1)
+# của lưới, tường giữa hai ô kề nhau là ô nằm giữa chúng.
+from array import array # Danh sách cạnh gọn của backtracker
+import numpy as np
+from src.grid_model import CELL_NORMAL, CELL_OBSTACLE, CELL_TRAP
+
+# Các hoán vị của 4 hướng (dùng để chọn ngẫu nhiên thứ tự thử hướng của từng ô trong backtracker).
+_DIRECTION_ORDERS = np.array([[a, b, c, d] for a in range(4) for b in range(4) for c in range(4) for d in range(4)
+                              if len({a, b, c, d}) == 4], dtype=np.int8)
+
+
+def _maze_cells(rows, cols):
+    """Số hàng / cột của lưới ô mê cung (ô ở tọa độ lẻ); báo lỗi nếu lưới quá nhỏ."""
+    height, width = (rows - 1) // 2, (cols - 1) // 2
+    if height < 1 or width < 1:
+        raise ValueError(f"Grid {rows}x{cols} is too small for a maze (needs at least 3x3)")
+    return height, width
+
+
+def _carve_tree(rows, cols, height, width, cells_a, cells_b):
+    """
+    Dựng lưới từ cây khung của lưới ô: mọi ô mê cung là ô trống, cộng với tường nằm giữa mỗi cặp
+    (cells_a[k], cells_b[k]) (chỉ số phẳng trong lưới ô) được đục thông.
+    """
+    cell_types = np.full((rows, cols), CELL_OBSTACLE, dtype=np.uint8)
+    cell_types[1:2 * height:2, 1:2 * width:2] = CELL_NORMAL
+    ra, ca = np.divmod(np.asarray(cells_a, dtype=np.int64), width)
+    rb, cb = np.divmod(np.asarray(cells_b, dtype=np.int64), width)
+    cell_types[ra + rb + 1, ca + cb + 1] = CELL_NORMAL # Trung điểm của (2ra+1, 2ca+1) và (2rb+1, 2cb+1)
+    return cell_types, (1, 1), (2 * height - 1, 2 * width - 1)
+
+
+def generate_recursive_backtracker(rows, cols, rng):
+    """
+    Mê cung hoàn hảo bằng DFS quay lui (hành lang dài, ít ngã rẽ).
+    DFS vốn tuần tự nên vòng lặp chạy trên list / bytearray phẳng; thứ tự thử hướng của từng ô được rút
+    ngẫu nhiên trước bằng NumPy, và các bức tường được đục bằng một lần ghi mảng ở cuối.
+    """
+    height, width = _maze_cells(rows, cols)
+    num_cells = height * width
+    # Lưới ô được bao bởi một viền ô "đã thăm" (rộng width + 2) nên không cần kiểm tra biên trong vòng lặp.
+    stride = width + 2
+    steps = (-stride, 1, stride, -1) # Lên, phải, xuống, trái (chỉ số phẳng trong lưới có viền)
+    visited = bytearray(b"\1") * ((height + 2) * stride)
+    for r in range(1, height + 1):
+        visited[r * stride + 1:r * stride + 1 + width] = bytes(width)
+    next_try = bytearray(len(visited)) # Hướng kế tiếp cần thử của mỗi ô (0..4)
+    # Mỗi ô một byte = chỉ số hoán vị hướng (rẻ hơn nhiều so với list 4 phần tử cho mỗi ô).
+    order_ids = rng.integers(0, len(_DIRECTION_ORDERS), size=len(visited), dtype=np.uint8).tobytes()
+    orders = [tuple(order) for order in _DIRECTION_ORDERS.tolist()]
+    from_cells, to_cells = array("q"), array("q") # Đọc lại bằng np.frombuffer, không sao chép
+    start_r, start_c = divmod(int(rng.integers(num_cells)), width)
+    start_cell = (start_r + 1) * stride + start_c + 1
+    visited[start_cell] = 1
+    stack = [start_cell]
+    while stack:
+        cell = stack[-1]
+        tried = next_try[cell]
+        order = orders[order_ids[cell]]
+        while tried < 4:
+            neighbor = cell + steps[order[tried]]
+            tried += 1
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                from_cells.append(cell)
+                to_cells.append(neighbor)
+                stack.append(neighbor)
+                break
+        else:
+            stack.pop() # Hết hướng: quay lui
+        next_try[cell] = tried
+    # Đổi chỉ số trong lưới có viền về chỉ số phẳng của lưới ô.
+    from_r, from_c = np.divmod(np.frombuffer(from_cells, dtype=np.int64), stride)
+    to_r, to_c = np.divmod(np.frombuffer(to_cells, dtype=np.int64), stride)
+    return _carve_tree(rows, cols, height, width, (from_r - 1) * width + from_c - 1, (to_r - 1) * width + to_c - 1)
+
+
+def generate_prim(rows, cols, rng):
+    """
+    Mê cung hoàn hảo kiểu Prim (nhiều ngã rẽ ngắn). Prim ngẫu nhiên trên trọng số cạnh ngẫu nhiên cho ra đúng
+    cây khung nhỏ nhất của các trọng số đó, nên ở đây cây được dựng bằng Borůvka vector hóa: mỗi vòng, mọi
+    thành phần chọn cạnh ra ngoài nhẹ nhất của mình (np.minimum.at) rồi gộp lại bằng nhảy con trỏ;
+    số thành phần giảm ít nhất một nửa mỗi vòng, nên chỉ cần O(log n) vòng thao tác mảng.
+    """
+    height, width = _maze_cells(rows, cols)
+    num_cells = height * width
+    cells = np.arange(num_cells).reshape(height, width)
+    edge_a = np.concatenate([cells[:, :-1].ravel(), cells[:-1, :].ravel()]) # Cạnh ngang rồi cạnh dọc
+    edge_b = np.concatenate([cells[:, 1:].ravel(), cells[1:, :].ravel()])
+    num_edges = len(edge_a)
+    # Trọng số = một hoán vị ngẫu nhiên (các trọng số khác nhau => cây khung nhỏ nhất duy nhất).
+    weights = rng.permutation(num_edges)
+    edge_by_weight = np.empty_like(weights)
+    edge_by_weight[weights] = np.arange(num_edges)
+
+    component = np.arange(num_cells) # Mã thành phần của mỗi ô = chỉ số ô gốc của thành phần
+    active = np.arange(num_edges) # Các cạnh có thể còn nối hai thành phần khác nhau
+    tree_edges = []
+    while True:
+        comp_a, comp_b = component[edge_a[active]], component[edge_b[active]]
+        crossing = comp_a != comp_b
+        active, comp_a, comp_b = active[crossing], comp_a[crossing], comp_b[crossing]
+        if not len(active):
+            break
+        active_weights = weights[active]
+        best = np.full(num_cells, num_edges, dtype=weights.dtype) # Trọng số cạnh ra ngoài nhẹ nhất
+        np.minimum.at(best, comp_a, active_weights)
+        np.minimum.at(best, comp_b, active_weights)
+        roots = np.flatnonzero(best < num_edges)
+        chosen = edge_by_weight[best[roots]]
+        tree_edges.append(chosen) # Hai thành phần có thể chọn cùng một cạnh: đục hai lần không sao
+        # Mỗi thành phần trỏ tới thành phần ở đầu kia cạnh đã chọn. Cặp trỏ lẫn nhau (cùng một cạnh) lấy
+        # thành phần có chỉ số nhỏ hơn làm gốc, rồi nhảy con trỏ cho tới khi mọi ô trỏ thẳng tới gốc.
+        ends_a, ends_b = component[edge_a[chosen]], component[edge_b[chosen]]
+        parent = np.arange(num_cells)
+        parent[roots] = np.where(ends_a == roots, ends_b, ends_a)
+        mutual = (parent[parent[roots]] == roots) & (roots < parent[roots])
+        parent[roots[mutual]] = roots[mutual]
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        component = parent[component]
+    chosen = np.concatenate(tree_edges) if tree_edges else np.empty(0, dtype=np.int64)
+    return _carve_tree(rows, cols, height, width, edge_a[chosen], edge_b[chosen])
+
+
+def _fill_rectangles(rows, cols, tops, lefts, bottoms, rights):
+    """
+    Mặt nạ bool (rows, cols) của hợp các hình chữ nhật [top, bottom) x [left, right), dựng bằng mảng hiệu
+    2 chiều + cộng dồn (không lặp từng hình trong Python).
+    """
+    diff = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    np.add.at(diff, (tops, lefts), 1)
+    np.add.at(diff, (tops, rights), -1)
+    np.add.at(diff, (bottoms, lefts), -1)
+    np.add.at(diff, (bottoms, rights), 1)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+
+
+def _open_l_corridor(cell_types, start_rc, end_rc):
+    """Bỏ tường trên hành lang hình chữ L từ start_rc tới end_rc (ngang trước, dọc sau) để hai ô luôn thông nhau."""
+    (sr, sc), (er, ec) = start_rc, end_rc
+    for segment in (cell_types[sr, min(sc, ec):max(sc, ec) + 1], cell_types[min(sr, er):max(sr, er) + 1, ec]):
+        segment[segment == CELL_OBSTACLE] = CELL_NORMAL
+
+
+def generate_rooms(rows, cols, rng):
+    """
+    Các phòng hình chữ nhật ngẫu nhiên (có thể chồng lên nhau) nối với nhau bằng hành lang chữ L.
+    Phòng được xếp theo từng dải hàng (đi zigzag) rồi nối phòng liền kề, nên mọi phòng thông nhau.
+    """
+    if rows < 5 or cols < 5:
+        raise ValueError(f"Grid {rows}x{cols} is too small for rooms (needs at least 5x5)")
+    max_size = max(3, min(rows, cols, 60) // 5)
+    num_rooms = max(2, rows * cols // (6 * max_size * max_size))
+    heights = rng.integers(2, max_size + 1, size=num_rooms)
+    widths = rng.integers(2, max_size + 1, size=num_rooms)
+    tops = (rng.random(num_rooms) * (rows - 1 - heights)).astype(np.int64) + 1 # Chừa viền tường ngoài cùng
+    lefts = (rng.random(num_rooms) * (cols - 1 - widths)).astype(np.int64) + 1
+    bottoms, rights = np.minimum(tops + heights, rows - 1), np.minimum(lefts + widths, cols - 1)
+    center_r, center_c = (tops + bottoms - 1) // 2, (lefts + rights - 1) // 2
+
+    # Thứ tự nối: theo dải hàng cao max_size, trong mỗi dải đi trái -> phải rồi phải -> trái (zigzag).
+    band = center_r // max_size
+    order = np.lexsort((np.where(band % 2 == 0, center_c, -center_c), band))
+    center_r, center_c = center_r[order], center_c[order]
+    # Hành lang từ phòng k tới phòng k + 1: đoạn ngang trên hàng của phòng k, đoạn dọc trên cột của phòng k + 1.
+    r0, c0, r1, c1 = center_r[:-1], center_c[:-1], center_r[1:], center_c[1:]
+    open_mask = _fill_rectangles(
+        rows, cols,
+        np.concatenate([tops, r0, np.minimum(r0, r1)]),
+        np.concatenate([lefts, np.minimum(c0, c1), c1]),
+        np.concatenate([bottoms, r0 + 1, np.maximum(r0, r1) + 1]),
+        np.concatenate([rights, np.maximum(c0, c1) + 1, c1 + 1]))
+    cell_types = np.where(open_mask, CELL_NORMAL, CELL_OBSTACLE).astype(np.uint8)
+    return cell_types, (int(center_r[0]), int(center_c[0])), (int(center_r[-1]), int(center_c[-1]))
+
+
+def generate_caves(rows, cols, rng, fill=0.45, iterations=4):
+    """
+    Hang động bằng automat tế bào: lấp tường ngẫu nhiên với tỉ lệ `fill`, rồi lặp `iterations` lần quy tắc
+    "ô là tường nếu >= 5 ô trong vùng 3x3 quanh nó (kể cả chính nó) là tường" (tổng 9 lát cắt mảng).
+    Hành lang chữ L giữa start và end bảo đảm hai điểm thông nhau dù hang bị chia thành nhiều vùng.
+    """
+    if rows < 3 or cols < 3:
+        raise ValueError(f"Grid {rows}x{cols} is too small for caves (needs at least 3x3)")
+    walls = rng.random((rows, cols)) < fill
+    for _ in range(iterations):
+        padded = np.pad(walls, 1, constant_values=True).astype(np.uint8) # Ngoài biên tính là tường
+        count = sum(padded[dr:dr + rows, dc:dc + cols] for dr in range(3) for dc in range(3))
+        walls = count >= 5
+    walls[[0, -1], :] = True
+    walls[:, [0, -1]] = True
+    cell_types = walls.astype(np.uint8) # CELL_OBSTACLE == 1, CELL_NORMAL == 0
+    start_rc, end_rc = (1, 1), (rows - 2, cols - 2)
+    _open_l_corridor(cell_types, start_rc, end_rc)
+    return cell_types, start_rc, end_rc
+
+
+def generate_trap_field(rows, cols, rng, trap_share=0.3, obstacle_density=0.08):
+    """
+    Cánh đồng bẫy: nhiễu ngẫu nhiên được làm mịn bằng bộ lọc hộp (ảnh tích phân) rồi lấy ngưỡng thành các
+    vùng bẫy liền khối chiếm khoảng `trap_share` diện tích, cộng với tường rải rác mật độ `obstacle_density`.
+    Thử heuristic / chi phí: đường ngắn nhất thường phải đi vòng qua các vùng bẫy.
+    """
+    if rows < 2 or cols < 2:
+        raise ValueError(f"Grid {rows}x{cols} is too small for a trap field (needs at least 2x2)")
+    radius = max(1, min(rows, cols) // 40)
+    noise = rng.random((rows, cols))
+    integral = np.pad(noise, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    r_lo = np.clip(np.arange(rows) - radius, 0, rows)[:, None]
+    r_hi = np.clip(np.arange(rows) + radius + 1, 0, rows)[:, None]
+    c_lo = np.clip(np.arange(cols) - radius, 0, cols)[None, :]
+    c_hi = np.clip(np.arange(cols) + radius + 1, 0, cols)[None, :]
+    box_sum = integral[r_hi, c_hi] - integral[r_lo, c_hi] - integral[r_hi, c_lo] + integral[r_lo, c_lo]
+    smoothed = box_sum / ((r_hi - r_lo) * (c_hi - c_lo))
+    cell_types = np.full((rows, cols), CELL_NORMAL, dtype=np.uint8)
+    cell_types[smoothed > np.quantile(smoothed, 1 - trap_share)] = CELL_TRAP
+    cell_types[rng.random((rows, cols)) < obstacle_density] = CELL_OBSTACLE
+    start_rc, end_rc = (0, 0), (rows - 1, cols - 1)
+    _open_l_corridor(cell_types, start_rc, end_rc)
+    cell_types[start_rc] = cell_types[end_rc] = CELL_NORMAL
+    return cell_types, start_rc, end_rc
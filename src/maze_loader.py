@@ -1,5 +1,10 @@
 # src/maze_loader.py
-from config import GRID_ROWS, GRID_COLS # Import kích thước lưới để định nghĩa maze
+import numpy as np # Dựng lưới maze dưới dạng mảng rồi ghi hàng loạt vào GridModel
+from config import GRID_ROWS, GRID_COLS, MAZE_GENERATOR_SEED # Import kích thước lưới để định nghĩa maze
+from src.grid_model import GridModel, as_grid_model, CELL_NORMAL, CELL_OBSTACLE, CELL_TRAP, CELL_START, CELL_END
+from src.maze_generators import (
+    generate_recursive_backtracker, generate_prim, generate_rooms, generate_caves, generate_trap_field
+)
 
 # --- ĐỊNH NGHĨA CÁC MẪU MÊ CUNG (MAZE PATTERNS) ---
 # MAZE_PATTERNS là một dictionary, trong đó mỗi key là tên của một mẫu maze,
@@ -62,24 +67,63 @@ MAZE_PATTERNS = {
     # Ví dụ: maze_patterns["My Awesome Maze"] = { ... }
 }
 
-# MAZE_NAMES là một list chứa tên của tất cả các mẫu maze đã được định nghĩa.
+# --- CÁC BỘ SINH MÊ CUNG THEO SEED ---
+# Tên -> hàm `generator(rows, cols, rng) -> (cell_types, start_rc, end_rc)` (xem src/maze_generators.py).
+# Khác với MAZE_PATTERNS, bản đồ được sinh theo kích thước của lưới đích.
+MAZE_GENERATORS = {
+    "Backtracker Maze": generate_recursive_backtracker,
+    "Prim's Maze": generate_prim,
+    "Random Rooms": generate_rooms,
+    "Caves": generate_caves,
+    "Trap Field": generate_trap_field,
+}
+
+# MAZE_NAMES là một list chứa tên của tất cả các mẫu maze đã được định nghĩa (mẫu viết tay rồi tới bộ sinh).
 # Được sử dụng để hiển thị trong dropdown menu trên UI.
-MAZE_NAMES = list(MAZE_PATTERNS.keys())
+MAZE_NAMES = list(MAZE_PATTERNS.keys()) + list(MAZE_GENERATORS)
 
-def apply_maze_to_grid(game_grid_ref, maze_name):
+def register_maze_generator(name, generator):
     """
-    Áp dụng một mẫu maze đã chọn lên đối tượng lưới game (`game_grid_ref`).
-    Hàm này sẽ:
-    1. Reset toàn bộ lưới về trạng thái mặc định (ô trống).
-    2. Đặt các ô chướng ngại vật (obstacles) theo mẫu maze.
-    3. Đặt các ô bẫy (traps) theo mẫu maze.
+    Đăng ký thêm một bộ sinh mê cung (gọi trước khi tạo UI để nó xuất hiện trong dropdown).
+
+    Args:
+        name (str): Tên hiển thị (không trùng với mẫu / bộ sinh đã có).
+        generator (callable): Hàm `generator(rows, cols, rng) -> (cell_types, start_rc, end_rc)`.
+
+    Raises:
+        ValueError: Tên đã được dùng.
+    """
+    if name in MAZE_PATTERNS or name in MAZE_GENERATORS:
+        raise ValueError(f"Maze name '{name}' is already registered")
+    MAZE_GENERATORS[name] = generator
+    MAZE_NAMES.append(name)
+
+def generate_maze(name, rows, cols, seed=MAZE_GENERATOR_SEED):
+    """
+    Sinh một bản đồ mới kích thước rows x cols bằng bộ sinh đã đăng ký (không cần lưới game).
+
+    Returns:
+        tuple: (GridModel, start_rc, end_rc) - hai ô start / end chưa được đánh dấu trên lưới.
+    """
+    cell_types, start_rc, end_rc = MAZE_GENERATORS[name](rows, cols, np.random.default_rng(seed))
+    model = GridModel(rows, cols)
+    model.set_types(cell_types)
+    return model, start_rc, end_rc
+
+def apply_maze_to_grid(game_grid_ref, maze_name, seed=None):
+    """
+    Áp dụng một mẫu maze đã chọn lên lưới game (`game_grid_ref`).
+    Toàn bộ lưới được dựng thành một mảng mã loại ô rồi ghi vào GridModel bằng một lần ghi
+    hàng loạt (thay vì gọi `reset()`/`make_*()` cho từng ô). Các bước:
+    1-3. Dựng mảng loại ô từ mẫu viết tay (xem `_pattern_cell_types`), hoặc bằng bộ sinh trong
+         `MAZE_GENERATORS` theo kích thước của lưới và `seed`.
     4. Đặt ô bắt đầu (start node) và ô kết thúc (end node) theo mẫu maze.
     Hàm sẽ kiểm tra tính hợp lệ của tọa độ và tránh đặt các thành phần chồng chéo không mong muốn.
 
     Args:
-        game_grid_ref (list of list of Node): Tham chiếu đến đối tượng lưới game,
-                                              là một_list 2 chiều chứa các đối tượng Node.
-        maze_name (str): Tên của mẫu maze cần áp dụng (phải là một key trong `MAZE_PATTERNS`).
+        game_grid_ref (GameGrid or GridModel or list of list of Node): Lưới game cần áp dụng maze.
+        maze_name (str): Tên của mẫu maze cần áp dụng (một key trong `MAZE_PATTERNS` hoặc `MAZE_GENERATORS`).
+        seed (int, optional): Seed cho bộ sinh mê cung (mặc định MAZE_GENERATOR_SEED).
 
     Returns:
         tuple (tuple or None, tuple or None): Một tuple chứa vị trí (row, col) mới của điểm bắt đầu
@@ -87,57 +131,37 @@ def apply_maze_to_grid(game_grid_ref, maze_name):
                                                hoặc nếu maze không hợp lệ.
     """
     # Kiểm tra xem tên maze có tồn tại trong danh sách các mẫu không.
-    if maze_name not in MAZE_PATTERNS:
+    if maze_name not in MAZE_PATTERNS and maze_name not in MAZE_GENERATORS:
         print(f"Error: Maze pattern '{maze_name}' not found.")
         return None, None # Trả về None nếu không tìm thấy mẫu.
 
-    pattern = MAZE_PATTERNS[maze_name] # Lấy thông tin chi tiết của mẫu maze đã chọn.
+    model = as_grid_model(game_grid_ref) # Mô hình mảng của lưới (GridModel).
+    rows, cols = model.rows, model.cols
     new_start_pos = None # Biến lưu vị trí điểm bắt đầu mới.
     new_end_pos = None   # Biến lưu vị trí điểm kết thúc mới.
 
-    # --- Bước 1: Reset toàn bộ lưới ---
-    # Duyệt qua tất cả các ô trong lưới và gọi phương thức `reset()`
-    # để đưa chúng về trạng thái "normal" (ô trống, không có thuộc tính đặc biệt).
-    for r_idx in range(GRID_ROWS):
-        for c_idx in range(GRID_COLS):
-            game_grid_ref[r_idx][c_idx].reset()
-
-    # --- Bước 2: Đặt các ô chướng ngại vật (Obstacles) ---
-    # Lấy danh sách tọa độ chướng ngại vật từ mẫu maze (mặc định là list rỗng nếu không có).
-    for r, c in pattern.get("obstacles", []):
-        # Kiểm tra xem tọa độ có nằm trong giới hạn của lưới không.
-        if 0 <= r < GRID_ROWS and 0 <= c < GRID_COLS:
-            game_grid_ref[r][c].make_obstacle() # Đặt ô làm chướng ngại vật.
-        else:
-            # In cảnh báo nếu tọa độ nằm ngoài giới hạn.
-            print(f"Warning: Obstacle ({r},{c}) in '{maze_name}' is out of bounds.")
-
-
-    # --- Bước 3: Đặt các ô bẫy (Traps) ---
-    # Lấy danh sách tọa độ bẫy từ mẫu maze.
-    for r, c in pattern.get("traps", []):
-        # Kiểm tra tọa độ hợp lệ.
-        if 0 <= r < GRID_ROWS and 0 <= c < GRID_COLS:
-            # Đảm bảo không đặt bẫy lên một ô đã là chướng ngại vật.
-            if not game_grid_ref[r][c].is_obstacle_type():
-                 game_grid_ref[r][c].make_trap() # Đặt ô làm bẫy.
-            else:
-                # In cảnh báo nếu cố gắng đặt bẫy lên chướng ngại vật.
-                print(f"Warning: Trap ({r},{c}) in '{maze_name}' on an obstacle. Skipped.")
-        else:
-            # In cảnh báo nếu tọa độ bẫy nằm ngoài giới hạn.
-            print(f"Warning: Trap ({r},{c}) in '{maze_name}' is out of bounds.")
-
+    if maze_name in MAZE_GENERATORS:
+        # --- Bộ sinh theo seed: mảng loại ô + start/end được sinh theo kích thước lưới ---
+        generator_rng = np.random.default_rng(MAZE_GENERATOR_SEED if seed is None else seed)
+        try:
+            cell_types, start_rc, end_rc = MAZE_GENERATORS[maze_name](rows, cols, generator_rng)
+        except ValueError as e:
+            print(f"Error: Cannot generate '{maze_name}': {e}")
+            return None, None
+        pattern = {"start": start_rc, "end": end_rc}
+    else:
+        pattern = MAZE_PATTERNS[maze_name] # Lấy thông tin chi tiết của mẫu maze đã chọn.
+        cell_types = _pattern_cell_types(pattern, rows, cols, maze_name)
 
     # --- Bước 4: Đặt ô bắt đầu (Start Node) ---
     # Lấy tọa độ điểm bắt đầu từ mẫu maze (mặc định là (None, None) nếu không có).
     sr, sc = pattern.get("start", (None,None))
     # Kiểm tra xem tọa độ có hợp lệ và nằm trong lưới không.
-    if sr is not None and 0 <= sr < GRID_ROWS and 0 <= sc < GRID_COLS:
+    if sr is not None and 0 <= sr < rows and 0 <= sc < cols:
         # Chỉ đặt điểm bắt đầu nếu ô đó là ô "normal" (trống).
         # Điều này tránh đặt điểm bắt đầu lên chướng ngại vật hoặc bẫy đã được đặt trước đó.
-        if game_grid_ref[sr][sc].type == "normal":
-            game_grid_ref[sr][sc].make_start() # Đặt ô làm điểm bắt đầu.
+        if cell_types[sr, sc] == CELL_NORMAL:
+            cell_types[sr, sc] = CELL_START # Đặt ô làm điểm bắt đầu.
             new_start_pos = (sr, sc) # Lưu vị trí điểm bắt đầu mới.
         else:
             # In cảnh báo nếu không thể đặt điểm bắt đầu.
@@ -151,10 +175,10 @@ def apply_maze_to_grid(game_grid_ref, maze_name):
     # Lấy tọa độ điểm kết thúc từ mẫu maze.
     er, ec = pattern.get("end", (None,None))
     # Kiểm tra tọa độ hợp lệ.
-    if er is not None and 0 <= er < GRID_ROWS and 0 <= ec < GRID_COLS:
+    if er is not None and 0 <= er < rows and 0 <= ec < cols:
         # Đảm bảo điểm kết thúc là một ô "normal" và không trùng với điểm bắt đầu đã đặt.
-        if game_grid_ref[er][ec].type == "normal" and (er,ec) != new_start_pos :
-            game_grid_ref[er][ec].make_end() # Đặt ô làm điểm kết thúc.
+        if cell_types[er, ec] == CELL_NORMAL and (er,ec) != new_start_pos :
+            cell_types[er, ec] = CELL_END # Đặt ô làm điểm kết thúc.
             new_end_pos = (er, ec) # Lưu vị trí điểm kết thúc mới.
         else:
             # In cảnh báo nếu không thể đặt điểm kết thúc.
@@ -163,5 +187,54 @@ def apply_maze_to_grid(game_grid_ref, maze_name):
         # In cảnh báo nếu tọa độ điểm kết thúc không hợp lệ hoặc ngoài giới hạn.
         print(f"Warning: End pos for '{maze_name}' invalid or out of bounds.")
 
+    # --- Bước 6: Ghi toàn bộ lưới vào GridModel bằng một lần ghi mảng ---
+    model.set_types(cell_types)
+
     print(f"Applied maze: {maze_name}") # Thông báo đã áp dụng maze thành công.
-    return new_start_pos, new_end_pos # Trả về vị trí điểm bắt đầu và kết thúc mới.
\ No newline at end of file
+    return new_start_pos, new_end_pos # Trả về vị trí điểm bắt đầu và kết thúc mới.
+
+def _pattern_cell_types(pattern, rows, cols, maze_name):
+    """
+    Mảng loại ô của một mẫu viết tay (chưa gồm start/end):
+    1. Khởi tạo mảng loại ô toàn ô trống (normal).
+    2. Đặt các ô chướng ngại vật (obstacles) theo mẫu maze.
+    3. Đặt các ô bẫy (traps) theo mẫu maze.
+    """
+    # --- Bước 1: Mảng loại ô mới, toàn ô trống ---
+    cell_types = np.full((rows, cols), CELL_NORMAL, dtype=np.uint8)
+
+    # --- Bước 2: Đặt các ô chướng ngại vật (Obstacles) ---
+    obstacle_r, obstacle_c = _coords_in_bounds(pattern.get("obstacles", []), rows, cols, maze_name, "Obstacle")
+    cell_types[obstacle_r, obstacle_c] = CELL_OBSTACLE # Ghi tất cả chướng ngại vật cùng lúc.
+
+    # --- Bước 3: Đặt các ô bẫy (Traps) ---
+    trap_r, trap_c = _coords_in_bounds(pattern.get("traps", []), rows, cols, maze_name, "Trap")
+    # Đảm bảo không đặt bẫy lên một ô đã là chướng ngại vật.
+    on_obstacle = cell_types[trap_r, trap_c] == CELL_OBSTACLE
+    for r, c in zip(trap_r[on_obstacle].tolist(), trap_c[on_obstacle].tolist()):
+        print(f"Warning: Trap ({r},{c}) in '{maze_name}' on an obstacle. Skipped.")
+    cell_types[trap_r[~on_obstacle], trap_c[~on_obstacle]] = CELL_TRAP
+    return cell_types
+
+def _coords_in_bounds(coords, rows, cols, maze_name, label):
+    """
+    Chuyển danh sách tọa độ (row, col) thành hai mảng chỉ số, loại bỏ (và cảnh báo)
+    các tọa độ nằm ngoài lưới.
+
+    Args:
+        coords (list of tuples): Danh sách tọa độ (row, col).
+        rows (int): Số hàng của lưới.
+        cols (int): Số cột của lưới.
+        maze_name (str): Tên maze (dùng trong thông báo cảnh báo).
+        label (str): Loại thành phần ("Obstacle", "Trap") dùng trong thông báo cảnh báo.
+
+    Returns:
+        tuple (np.ndarray, np.ndarray): Mảng chỉ số hàng và mảng chỉ số cột hợp lệ.
+    """
+    coords_arr = np.asarray(coords, dtype=np.int64).reshape(-1, 2)
+    r_arr, c_arr = coords_arr[:, 0], coords_arr[:, 1]
+    valid = (r_arr >= 0) & (r_arr < rows) & (c_arr >= 0) & (c_arr < cols)
+    for r, c in coords_arr[~valid].tolist():
+        # In cảnh báo nếu tọa độ nằm ngoài giới hạn.
+        print(f"Warning: {label} ({r},{c}) in '{maze_name}' is out of bounds.")
+    return r_arr[valid], c_arr[valid]
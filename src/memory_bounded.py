@@ -0,0 +1,340 @@
+# src/memory_bounded.py
+# Tìm kiếm tối ưu với bộ nhớ bị chặn trên CSRGraph, cho bản đồ mà A* (giữ mọi node trong OPEN/CLOSED)
+# dùng quá nhiều RAM:
+# - IDA*: tìm kiếm theo chiều sâu lặp với ngưỡng f tăng dần; chỉ giữ đường đi hiện tại (O(độ sâu)),
+#   đổi lại mở rộng lặp lại các node ở mỗi lần lặp. Với chi phí thực (đường chéo căn 2) số giá trị f khác nhau
+#   rất lớn, nên ngưỡng được tăng ít nhất theo hệ số IDA_STAR_THRESHOLD_GROWTH (kiểu IDA*_CR) và lần lặp tìm
+#   thấy đích được chạy hết theo nhánh-cận (branch and bound) để đường đi trả về vẫn tối ưu.
+# - SMA* (Simplified Memory-bounded A*, Russell): như A* cho tới khi đầy `max_nodes` node, sau đó bỏ lá
+#   tệ nhất (f lớn nhất, nông nhất) và ghi (ô, f) của nó lên node cha để tạo lại đúng con đó khi cần.
+# Cả hai có thể dùng bảng chuyển vị (transposition table) có giới hạn kích thước để cắt các đường đến
+# cùng một ô với chi phí không tốt hơn (tránh bùng nổ số đường đi bằng nhau trên lưới 8 hướng).
+# Số node tìm kiếm lưu trữ cao nhất, số mục lưu trữ cao nhất (node tìm kiếm + mục bảng chuyển vị + node explored
+# đang giữ) và số mục của bảng chuyển vị được ghi vào `stats`.
+import heapq
+import itertools
+from config import SMA_STAR_MAX_NODES, TRANSPOSITION_TABLE_MAX_ENTRIES, IDA_STAR_THRESHOLD_GROWTH
+from src.algorithms import heuristic_octile, run_steps, flush_explored
+from src.components import is_unreachable
+from src.fast_search import INF, STEP_EXPANSIONS
+from src.suboptimal import _heuristic_lookup
+
+
+def _fill_stats(stats, peak_nodes, peak_entries, expansions, iterations, transposition_entries):
+    """Ghi thống kê bộ nhớ / công việc của một lần tìm vào `stats` (nếu có)."""
+    if stats is not None:
+        stats.update({"peak_stored_nodes": peak_nodes, "peak_stored_entries": peak_entries, "expansions": expansions,
+                      "iterations": iterations, "transposition_entries": transposition_entries})
+
+
+def ida_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                    transposition_limit=TRANSPOSITION_TABLE_MAX_ENTRIES, threshold_growth=IDA_STAR_THRESHOLD_GROWTH,
+                    record_explored=True, stats=None):
+    """
+    IDA* trên CSRGraph (duyệt sâu không đệ quy). Ngưỡng của lần lặp sau là
+    max(f nhỏ nhất vượt ngưỡng, ngưỡng * threshold_growth). Khi một lần lặp gặp đích, lần lặp đó chạy tiếp
+    với cận là chi phí tốt nhất đã gặp; mọi nhánh bị cắt đều có f không nhỏ hơn chi phí này (hoặc vượt ngưỡng,
+    mà ngưỡng >= chi phí), nên đường đi tốt nhất của lần lặp là tối ưu.
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) đích.
+        heuristic_func (function): Heuristic chấp nhận được (đường đi trả về là tối ưu).
+        transposition_limit (int): Số mục tối đa của bảng chuyển vị (ô -> g nhỏ nhất trong lần lặp); 0 = tắt
+                                   (khi đó số đường đi bằng nhau trên lưới 8 hướng tăng theo hàm mũ).
+        threshold_growth (float): Hệ số tăng ngưỡng tối thiểu mỗi lần lặp (1 = IDA* cổ điển).
+        record_explored (bool): Ghi các node mở rộng (mọi lần lặp) vào explored_nodes; tắt khi cần tiết kiệm bộ nhớ.
+        stats (dict, optional): Nhận "peak_stored_nodes" (độ dài đường đi hiện tại lớn nhất), "peak_stored_entries"
+                                (cộng thêm các mục bảng chuyển vị và node explored đang giữ), "expansions",
+                                "iterations", "transposition_entries".
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - giống các thuật toán khác.
+    """
+    return run_steps(ida_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func, transposition_limit,
+                                    threshold_growth, record_explored, stats))
+
+
+def ida_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                   transposition_limit=TRANSPOSITION_TABLE_MAX_ENTRIES, threshold_growth=IDA_STAR_THRESHOLD_GROWTH,
+                   record_explored=True, stats=None):
+    """
+    Generator của `ida_star_search` (cùng tham số): cứ mỗi STEP_EXPANSIONS lần mở rộng thì yield list các node
+    vừa mở rộng (lô cuối có thể ít hơn); return (path, cost, explored_nodes) - explored_nodes rỗng nếu
+    record_explored=False (chỉ giữ lô đang gom).
+    """
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        _fill_stats(stats, 0, 0, 0, 0, 0)
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+    h = _heuristic_lookup(graph, goal_node_rc, heuristic_func)
+    explored = []
+    batch = [] # Các node mở rộng chưa yield
+    expansions = iterations = peak_nodes = peak_entries = 0
+    threshold = h(start_idx)
+
+    while threshold < INF:
+        iterations += 1
+        next_threshold = INF # f nhỏ nhất vượt ngưỡng trong lần lặp này
+        best_path, best_cost = None, INF # Đường đi tốt nhất của lần lặp (cận của nhánh-cận)
+        transposition = {} # Ô -> g nhỏ nhất đã duyệt trong lần lặp này
+        # Đường đi hiện tại: mỗi khung là (node_idx, g, vị trí láng giềng kế tiếp trong CSR).
+        path_nodes, path_g, path_next = [start_idx], [0.0], [row_start[start_idx]]
+        on_path = {start_idx}
+        while path_nodes:
+            current_idx, g_current, pos = path_nodes[-1], path_g[-1], path_next[-1]
+            if pos == row_start[current_idx]: # Lần đầu tới node này trong lần lặp
+                if current_idx == goal_idx:
+                    if g_current < best_cost:
+                        best_path = [divmod(node_idx, cols) for node_idx in path_nodes]
+                        best_cost = g_current
+                    on_path.discard(path_nodes.pop()); path_g.pop(); path_next.pop()
+                    continue
+                expansions += 1
+                batch.append(divmod(current_idx, cols))
+                if len(batch) == STEP_EXPANSIONS:
+                    yield batch
+                    if record_explored: explored += batch
+                    batch = []
+            if pos == row_end[current_idx]: # Đã duyệt hết láng giềng => quay lui
+                on_path.discard(path_nodes.pop()); path_g.pop(); path_next.pop()
+                continue
+            path_next[-1] = pos + 1
+            neighbor_idx = neighbors[pos]
+            if neighbor_idx in on_path:
+                continue
+            new_g = g_current + weights[pos]
+            f_cost = new_g + h(neighbor_idx)
+            if f_cost >= best_cost: # Không tốt hơn đường đã có
+                continue
+            if f_cost > threshold:
+                next_threshold = min(next_threshold, f_cost)
+                continue
+            if transposition_limit:
+                best_g = transposition.get(neighbor_idx)
+                if best_g is not None and new_g >= best_g: # Đã duyệt ô này với chi phí không lớn hơn
+                    continue
+                if best_g is not None or len(transposition) < transposition_limit:
+                    transposition[neighbor_idx] = new_g
+            path_nodes.append(neighbor_idx); path_g.append(new_g); path_next.append(row_start[neighbor_idx])
+            on_path.add(neighbor_idx)
+            peak_nodes = max(peak_nodes, len(path_nodes))
+            peak_entries = max(peak_entries, len(path_nodes) + len(transposition) + len(explored) + len(batch))
+        if best_path is not None:
+            _fill_stats(stats, peak_nodes, peak_entries, expansions, iterations, len(transposition))
+            yield from flush_explored(explored, batch, record_explored)
+            return best_path, best_cost, explored
+        threshold = max(next_threshold, threshold * threshold_growth)
+
+    _fill_stats(stats, peak_nodes, peak_entries, expansions, iterations, 0)
+    yield from flush_explored(explored, batch, record_explored)
+    return None, INF, explored
+
+
+class _SMANode:
+    """Một node của cây tìm kiếm SMA* (nhiều node có thể cùng một ô, qua các đường khác nhau)."""
+    __slots__ = ("idx", "g", "f", "depth", "parent", "pos", "children", "next_pos", "forgotten",
+                 "alive", "open_seq", "leaf_seq")
+
+    def __init__(self, idx, g, f, depth, parent, pos, first_pos):
+        self.idx, self.g, self.f, self.depth, self.parent = idx, g, f, depth, parent
+        self.pos = pos # Vị trí cạnh cha -> node trong mảng CSR (để tạo lại node sau khi bị bỏ)
+        self.children = [] # Các con đang nằm trong bộ nhớ
+        self.next_pos = first_pos # Vị trí láng giềng kế tiếp chưa sinh (trong mảng CSR)
+        self.forgotten = None # Các con đã bị bỏ khỏi bộ nhớ: ô -> (f đã ghi lại, vị trí cạnh); None = chưa có
+        self.alive = True
+        self.open_seq = self.leaf_seq = -1 # Số thứ tự của entry hợp lệ trong hai heap (-1 = không có)
+
+
+def sma_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                    max_nodes=SMA_STAR_MAX_NODES, transposition_limit=TRANSPOSITION_TABLE_MAX_ENTRIES,
+                    record_explored=True, stats=None):
+    """
+    SMA* trên CSRGraph: sinh từng con một, giữ tối đa `max_nodes` node tìm kiếm.
+    Node được mở rộng là node có f nhỏ nhất (sâu nhất nếu hòa), node bị bỏ là lá có f lớn nhất (nông nhất nếu
+    hòa), nên hai node này không bao giờ trùng nhau và mỗi vòng lặp đều tiến triển. Con bị bỏ được ghi lại
+    (ô, f) trên node cha và được tạo lại với đúng f đó (con có f nhỏ nhất trước) khi cha được chọn lại.
+    Đường đi trả về là tối ưu nếu đường tối ưu có ít hơn `max_nodes` node; nếu không, trả về không tìm thấy.
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) đích.
+        heuristic_func (function): Heuristic chấp nhận được.
+        max_nodes (int): Số node tìm kiếm tối đa được giữ cùng lúc.
+        transposition_limit (int): Số ô tối đa của bảng chuyển vị (ô -> các lần sinh (g, độ sâu, ô cha, node) không bị
+                                   trội); 0 = tắt (như IDA*, số đường đi bằng nhau trên lưới 8 hướng khi đó tăng theo
+                                   hàm mũ). Một con mới bị cắt nếu ô của nó đã được sinh với g và độ sâu không lớn
+                                   hơn, trừ khi đó chính là lần tạo lại node đã bị bỏ (cùng g, độ sâu và ô cha).
+        record_explored (bool): Ghi các node mở rộng vào explored_nodes.
+        stats (dict, optional): Nhận "peak_stored_nodes", "peak_stored_entries" (cộng thêm các mục bảng chuyển vị
+                                và node explored đang giữ), "expansions", "iterations" (số node bị bỏ),
+                                "transposition_entries".
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - giống các thuật toán khác.
+    """
+    return run_steps(sma_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func, max_nodes,
+                                    transposition_limit, record_explored, stats))
+
+
+def sma_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                   max_nodes=SMA_STAR_MAX_NODES, transposition_limit=TRANSPOSITION_TABLE_MAX_ENTRIES,
+                   record_explored=True, stats=None):
+    """
+    Generator của `sma_star_search` (cùng tham số): cứ mỗi STEP_EXPANSIONS lần mở rộng thì yield list các node
+    vừa mở rộng (lô cuối có thể ít hơn); return (path, cost, explored_nodes) - explored_nodes rỗng nếu
+    record_explored=False (chỉ giữ lô đang gom).
+    """
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        _fill_stats(stats, 0, 0, 0, 0, 0)
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+    h = _heuristic_lookup(graph, goal_node_rc, heuristic_func)
+    max_nodes = max(2, max_nodes)
+    explored = []
+    transposition = {} # Ô -> list các lần sinh (g, độ sâu, ô cha, node) không bị trội
+    table_entries = 0 # Tổng số mục trong bảng chuyển vị
+    open_heap = [] # (f, -depth, seq, node): f nhỏ nhất, sâu nhất được chọn trước
+    leaf_heap = [] # (-f, depth, seq, node): lá có f lớn nhất, nông nhất bị bỏ trước
+    sequence = itertools.count()
+
+    def push_open(node):
+        node.open_seq = next(sequence)
+        heapq.heappush(open_heap, (node.f, -node.depth, node.open_seq, node))
+
+    def push_leaf(node):
+        node.leaf_seq = next(sequence)
+        heapq.heappush(leaf_heap, (-node.f, node.depth, node.leaf_seq, node))
+
+    def backup(node):
+        """Cập nhật f của node đã sinh hết láng giềng = min f của các con (kể cả con đã quên), lan lên cha."""
+        while node is not None and node.next_pos == row_end[node.idx]:
+            new_f = min((child.f for child in node.children), default=INF)
+            if node.forgotten:
+                new_f = min(new_f, min(f_cost for f_cost, _ in node.forgotten.values()))
+            if new_f == node.f:
+                return
+            node.f = new_f
+            if node.open_seq >= 0: push_open(node)
+            if not node.children: push_leaf(node)
+            node = node.parent
+
+    def make_child(node, pos, f_cost):
+        """Tạo con của node qua cạnh `pos` (f_cost: f đã ghi lại khi tạo lại con đã quên); None nếu bị cắt."""
+        nonlocal table_entries
+        neighbor_idx = neighbors[pos]
+        ancestor = node.parent
+        while ancestor is not None and ancestor.idx != neighbor_idx:
+            ancestor = ancestor.parent
+        if ancestor is not None:
+            return None # Tạo chu trình
+        new_g, depth = node.g + weights[pos], node.depth + 1
+        entries = transposition.get(neighbor_idx) if transposition_limit else None
+        if entries:
+            for best_g, best_depth, best_parent, best_node in entries:
+                if (best_g <= new_g and best_depth <= depth
+                        and (best_node.alive or (best_g, best_depth, best_parent) != (new_g, depth, node.idx))):
+                    return None # Đã có đường tới ô này với g và độ sâu không lớn hơn: đường đó bao mọi đường của con này
+        if f_cost is None:
+            f_cost = max(node.f, new_g + h(neighbor_idx))
+        if neighbor_idx != goal_idx and depth >= max_nodes - 1:
+            f_cost = INF # Không còn chỗ cho đường đi dài hơn: nhánh này không tới được đích
+        child = _SMANode(neighbor_idx, new_g, f_cost, depth, node, pos, row_start[neighbor_idx])
+        if entries is not None or (transposition_limit and len(transposition) < transposition_limit):
+            # Giữ các mục không bị trội (g nhỏ hơn hoặc đường ngắn hơn), thay các mục mà con mới trội hơn.
+            entries = [entry for entry in entries or () if entry[0] < new_g or entry[1] < depth]
+            entries.append((new_g, depth, node.idx, child))
+            table_entries += len(entries) - len(transposition.get(neighbor_idx, ()))
+            transposition[neighbor_idx] = entries
+        return child
+
+    root = _SMANode(start_idx, 0.0, h(start_idx), 0, None, -1, row_start[start_idx])
+    push_open(root)
+    stored = peak_nodes = peak_entries = 1
+    expansions = dropped = 0
+    batch = [] # Các node mở rộng chưa yield
+
+    while open_heap:
+        _, _, seq, node = open_heap[0]
+        if not node.alive or seq != node.open_seq:
+            heapq.heappop(open_heap) # Entry cũ
+            continue
+        if node.f == INF: # Mọi nhánh còn lại đều không tới được đích trong giới hạn bộ nhớ
+            break
+        if node.idx == goal_idx:
+            cost, path = node.g, []
+            while node is not None:
+                path.append(divmod(node.idx, cols))
+                node = node.parent
+            path.reverse()
+            _fill_stats(stats, peak_nodes, peak_entries, expansions, dropped, table_entries)
+            yield from flush_explored(explored, batch, record_explored)
+            return path, cost, explored
+
+        # --- Sinh con kế tiếp: láng giềng chưa sinh, rồi tới con đã quên có f nhỏ nhất ---
+        if node.next_pos == row_start[node.idx]:
+            expansions += 1
+            batch.append(divmod(node.idx, cols))
+            if len(batch) == STEP_EXPANSIONS:
+                yield batch
+                if record_explored: explored += batch
+                batch = []
+        child = None
+        while child is None and node.next_pos < row_end[node.idx]:
+            node.next_pos += 1
+            child = make_child(node, node.next_pos - 1, None)
+        while child is None and node.forgotten:
+            forgotten_idx = min(node.forgotten, key=node.forgotten.get)
+            f_cost, pos = node.forgotten.pop(forgotten_idx)
+            child = make_child(node, pos, f_cost)
+
+        if child is not None:
+            node.children.append(child)
+            push_open(child); push_leaf(child)
+            stored += 1
+        if node.next_pos == row_end[node.idx]:
+            if not node.forgotten:
+                node.open_seq = -1 # Mọi con đều trong bộ nhớ: rời OPEN cho tới khi quên một con
+            backup(node)
+            if not node.children:
+                push_leaf(node) # Ngõ cụt (f = inf) hoặc chỉ còn con đã quên
+        peak_nodes = max(peak_nodes, stored)
+        peak_entries = max(peak_entries, stored + table_entries + len(explored) + len(batch))
+
+        # --- Bộ nhớ đầy: bỏ lá tệ nhất, ghi f của nó lên node cha ---
+        while stored > max_nodes and leaf_heap:
+            _, _, seq, leaf = heapq.heappop(leaf_heap)
+            if not leaf.alive or seq != leaf.leaf_seq or leaf.children or leaf.parent is None:
+                continue
+            leaf.alive = False
+            stored -= 1
+            dropped += 1
+            parent, leaf.parent = leaf.parent, None # Node bị bỏ (có thể còn trong bảng chuyển vị) không giữ cha
+            parent.children.remove(leaf)
+            if leaf.f < INF: # Nhánh f = inf không bao giờ tới được đích: không cần tạo lại
+                if parent.forgotten is None:
+                    parent.forgotten = {}
+                parent.forgotten[leaf.idx] = (leaf.f, leaf.pos)
+                if parent.open_seq < 0:
+                    push_open(parent) # Cha phải tạo lại con đã quên khi được chọn
+            if not parent.children:
+                push_leaf(parent)
+            backup(parent)
+
+        # Hai heap dùng xóa lười: dựng lại khi entry cũ chiếm quá nửa, để bộ nhớ vẫn tỉ lệ với số node lưu trữ.
+        if len(open_heap) + len(leaf_heap) > 4 * stored + 64:
+            open_heap[:] = [entry for entry in open_heap if entry[3].alive and entry[2] == entry[3].open_seq]
+            leaf_heap[:] = [entry for entry in leaf_heap if entry[3].alive and entry[2] == entry[3].leaf_seq]
+            heapq.heapify(open_heap); heapq.heapify(leaf_heap)
+
+    _fill_stats(stats, peak_nodes, peak_entries, expansions, dropped, table_entries)
+    yield from flush_explored(explored, batch, record_explored)
+    return None, INF, explored
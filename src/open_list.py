@@ -0,0 +1,275 @@
+# src/open_list.py
+# Các cài đặt hàng đợi ưu tiên (OPEN list) có thể thay thế nhau cho các kernel A* / Dijkstra
+# (src/fast_search.py, tham số `open_list`). Mọi backend có cùng giao diện:
+#   push(node, key, g)  - đặt (hoặc giảm) khóa của node; g chỉ dùng để phá hòa như heap (f, g, node) gốc,
+#   pop()               - lấy node có khóa nhỏ nhất, trả về (key, node),
+#   len(open_list)      - số node đang nằm trong OPEN (không tính các entry cũ),
+# và đếm số lần push, pop và pop phải bỏ qua entry cũ (stale) để so sánh các backend trên từng bản đồ.
+# - "heap": heapq với xóa "lười" (mỗi lần giảm khóa đẩy thêm một entry, entry cũ bị bỏ khi pop) - như hiện tại.
+# - "indexed": heap nhị phân có chỉ mục vị trí của từng node, giảm khóa tại chỗ => không có entry cũ.
+# - "bucket": hàng đợi theo thùng của Dial trên khóa nguyên (khóa thực * OPEN_LIST_KEY_SCALE, làm tròn xuống).
+# - "radix": radix heap trên cùng khóa nguyên.
+# Hai backend khóa nguyên chỉ đúng khi khóa lấy ra không giảm (Dijkstra, A* với heuristic nhất quán); khóa nhỏ
+# hơn khóa vừa lấy được coi như bằng nó. Các node có khóa nguyên bằng nhau được lấy theo thứ tự bất kỳ,
+# nên chi phí đường đi A* có thể lớn hơn tối ưu không quá 1 / OPEN_LIST_KEY_SCALE.
+import heapq
+from array import array
+from config import OPEN_LIST_KEY_SCALE
+
+INF = float("inf")
+
+
+class _OpenListBase:
+    """Phần chung: khóa hiện tại của từng node (INF = không nằm trong OPEN) và các bộ đếm."""
+    name = None
+
+    def __init__(self, num_nodes):
+        """
+        Args:
+            num_nodes (int): Số node của đồ thị (chỉ số node là 0..num_nodes-1).
+        """
+        self.keys = array("d", [INF]) * num_nodes
+        self.size = 0 # Số node đang trong OPEN
+        self.pushes = self.pops = self.stale_pops = 0
+
+    def __len__(self):
+        return self.size
+
+    def _set_key(self, node, key):
+        """Ghi khóa mới của node; trả về True nếu node vừa được thêm vào OPEN."""
+        added = self.keys[node] == INF
+        if added:
+            self.size += 1
+        self.keys[node] = key
+        self.pushes += 1
+        return added
+
+    def _take(self, node):
+        """Đánh dấu node đã rời OPEN."""
+        self.keys[node] = INF
+        self.size -= 1
+        self.pops += 1
+
+    def stats(self):
+        """Các bộ đếm của lần tìm: {"open_list", "pushes", "pops", "stale_pops"}."""
+        return {"open_list": self.name, "pushes": self.pushes, "pops": self.pops, "stale_pops": self.stale_pops}
+
+
+class HeapOpenList(_OpenListBase):
+    """heapq với xóa lười: entry (key, g, node) cũ bị bỏ qua khi khóa đã đổi hoặc node đã rời OPEN."""
+    name = "heap"
+
+    def __init__(self, num_nodes):
+        super().__init__(num_nodes)
+        self._heap = []
+
+    def push(self, node, key, g):
+        self._set_key(node, key)
+        heapq.heappush(self._heap, (key, g, node))
+
+    def pop(self):
+        heap, keys = self._heap, self.keys
+        while True:
+            key, _, node = heapq.heappop(heap)
+            if keys[node] == key:
+                self._take(node)
+                return key, node
+            self.stale_pops += 1
+
+
+class IndexedHeapOpenList(_OpenListBase):
+    """
+    Heap nhị phân với vị trí của từng node (giảm khóa bằng sift-up tại chỗ): mỗi node có đúng một entry,
+    heap không lớn hơn số node trong OPEN. Thứ tự lấy ra giống "heap" (so sánh (key, g, node)).
+    """
+    name = "indexed"
+
+    def __init__(self, num_nodes):
+        super().__init__(num_nodes)
+        self._heap = [] # Các node, heap[0] có khóa nhỏ nhất
+        self._position = array("l", [-1]) * num_nodes # Vị trí của node trong heap (-1 = không có)
+        self._ties = array("d", [0.0]) * num_nodes # g của node (phá hòa)
+
+    def _less(self, node_a, node_b):
+        """(key, g, node) của node_a nhỏ hơn của node_b."""
+        key_a, key_b = self.keys[node_a], self.keys[node_b]
+        if key_a != key_b:
+            return key_a < key_b
+        tie_a, tie_b = self._ties[node_a], self._ties[node_b]
+        if tie_a != tie_b:
+            return tie_a < tie_b
+        return node_a < node_b
+
+    def _sift_up(self, index):
+        heap, position, less = self._heap, self._position, self._less
+        node = heap[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent_node = heap[parent_index]
+            if not less(node, parent_node):
+                break
+            heap[index] = parent_node
+            position[parent_node] = index
+            index = parent_index
+        heap[index] = node
+        position[node] = index
+
+    def _sift_down(self, index):
+        heap, position, less = self._heap, self._position, self._less
+        size = len(heap)
+        node = heap[index]
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            if child_index + 1 < size and less(heap[child_index + 1], heap[child_index]):
+                child_index += 1
+            child_node = heap[child_index]
+            if not less(child_node, node):
+                break
+            heap[index] = child_node
+            position[child_node] = index
+            index = child_index
+        heap[index] = node
+        position[node] = index
+
+    def push(self, node, key, g):
+        old_key = self.keys[node]
+        self._set_key(node, key)
+        self._ties[node] = g
+        index = self._position[node]
+        if index < 0:
+            self._heap.append(node)
+            self._sift_up(len(self._heap) - 1)
+        elif key <= old_key:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        key = self.keys[top]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        self._position[top] = -1
+        self._take(top)
+        return key, top
+
+
+class BucketOpenList(_OpenListBase):
+    """
+    Hàng đợi theo thùng (Dial): thùng thứ k chứa các node có khóa nguyên k = floor(key * scale); con trỏ thùng
+    hiện tại chỉ tăng. Thùng kế tiếp được tìm bằng cách thử vài khóa liền sau (thường gặp ngay), nếu không thì
+    lấy khóa nhỏ nhất trong các thùng còn lại. Push O(1), pop O(1) khấu hao khi khóa tăng dần đều.
+    """
+    name = "bucket"
+    _SCAN = 64 # Số khóa liền sau được thử trước khi tìm khóa nhỏ nhất trong mọi thùng
+
+    def __init__(self, num_nodes, scale=OPEN_LIST_KEY_SCALE):
+        super().__init__(num_nodes)
+        self.scale = scale
+        self._buckets = {} # Khóa nguyên -> list các entry (key, node)
+        self._current = None # Thùng nhỏ nhất có thể còn entry
+
+    def push(self, node, key, g):
+        self._set_key(node, key)
+        bucket_key = int(key * self.scale)
+        if self._current is None:
+            self._current = bucket_key
+        elif bucket_key < self._current: # Khóa giảm (heuristic không nhất quán): xếp vào thùng hiện tại
+            bucket_key = self._current
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            self._buckets[bucket_key] = [(key, node)]
+        else:
+            bucket.append((key, node))
+
+    def pop(self):
+        buckets, keys = self._buckets, self.keys
+        while True:
+            bucket = buckets.get(self._current)
+            if not bucket:
+                if bucket is not None:
+                    del buckets[self._current]
+                # Thùng kế tiếp: quét tiếp vài khóa liền sau, nếu vẫn rỗng thì nhảy tới khóa nhỏ nhất còn lại.
+                for bucket_key in range(self._current + 1, self._current + 1 + self._SCAN):
+                    if bucket_key in buckets:
+                        self._current = bucket_key
+                        break
+                else:
+                    self._current = min(buckets)
+                continue
+            key, node = bucket.pop()
+            if keys[node] == key:
+                self._take(node)
+                return key, node
+            self.stale_pops += 1
+
+
+class RadixOpenList(_OpenListBase):
+    """
+    Radix heap trên khóa nguyên k = floor(key * scale): thùng i chứa các entry có bit cao nhất khác với khóa vừa
+    lấy (last) là bit i - 1 (thùng 0: bằng last). Khi thùng 0 rỗng, thùng khác rỗng đầu tiên được chia lại
+    theo khóa nhỏ nhất của nó; mỗi entry chỉ đi xuống, nên chi phí khấu hao O(log C) mỗi entry.
+    Entry cũ gặp trong lúc chia lại bị bỏ ngay (tính vào stale_pops).
+    """
+    name = "radix"
+
+    def __init__(self, num_nodes, scale=OPEN_LIST_KEY_SCALE):
+        super().__init__(num_nodes)
+        self.scale = scale
+        self._buckets = [[] for _ in range(65)]
+        self._last = 0 # Khóa nguyên của lần pop gần nhất
+
+    def push(self, node, key, g):
+        self._set_key(node, key)
+        bucket_key = max(int(key * self.scale), self._last)
+        self._buckets[(bucket_key ^ self._last).bit_length()].append((bucket_key, key, node))
+
+    def pop(self):
+        buckets, keys = self._buckets, self.keys
+        while True:
+            if not buckets[0]:
+                index = 1
+                while not buckets[index]:
+                    index += 1
+                entries = [entry for entry in buckets[index] if keys[entry[2]] == entry[1]]
+                self.stale_pops += len(buckets[index]) - len(entries)
+                buckets[index] = []
+                if not entries:
+                    continue
+                last = self._last = min(entries)[0]
+                for entry in entries:
+                    buckets[(entry[0] ^ last).bit_length()].append(entry)
+            _, key, node = buckets[0].pop()
+            if keys[node] == key:
+                self._take(node)
+                return key, node
+            self.stale_pops += 1
+
+
+OPEN_LISTS = {backend.name: backend for backend in (HeapOpenList, IndexedHeapOpenList, BucketOpenList, RadixOpenList)}
+OPEN_LIST_NAMES = list(OPEN_LISTS)
+
+
+def make_open_list(name, num_nodes):
+    """
+    Tạo một OPEN list theo tên backend.
+
+    Args:
+        name (str): Một trong OPEN_LIST_NAMES ("heap", "indexed", "bucket", "radix").
+        num_nodes (int): Số node của đồ thị.
+
+    Returns:
+        OPEN list rỗng.
+
+    Raises:
+        ValueError: Tên backend không tồn tại.
+    """
+    backend = OPEN_LISTS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown open list '{name}', expected one of: {', '.join(OPEN_LIST_NAMES)}")
+    return backend(num_nodes)
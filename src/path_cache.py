@@ -0,0 +1,138 @@
+# src/path_cache.py
+# Bộ nhớ đệm kết quả tìm đường theo nội dung bản đồ.
+# Khóa gồm hash Zobrist của lưới (GridModel.zobrist_hash, cập nhật O(1) mỗi lần sửa ô), kích thước
+# lưới, start, goal, thuật toán và heuristic. Vì khóa phụ thuộc NỘI DUNG chứ không phụ thuộc đối tượng,
+# nhấn "Run" lại trên bản đồ chưa sửa, hoặc quay lại một mê cung đã chạy trước đó, đều trúng bộ nhớ đệm.
+# Giới hạn theo số kết quả và theo dung lượng ước tính; kết quả dùng lâu nhất bị bỏ trước (LRU).
+import sys
+from collections import OrderedDict
+from config import PATH_CACHE_MAX_ENTRIES, PATH_CACHE_MAX_BYTES
+from src.grid_model import as_grid_model
+
+# Dung lượng ước tính của một tọa độ (row, col) trong kết quả: tuple 2 phần tử + 1 con trỏ trong list.
+_COORD_BYTES = sys.getsizeof((0, 0)) + 8
+# Phần cố định của mỗi kết quả (khóa, tuple kết quả, entry trong OrderedDict).
+_ENTRY_OVERHEAD_BYTES = 512
+
+
+def callable_cache_name(func):
+    """
+    Tên ổn định của một thuật toán/heuristic để đưa vào khóa.
+    Hàm cấp module -> "module.qualname"; đối tượng gọi được (ví dụ LandmarkHeuristic) -> kèm id
+    của đối tượng vì mỗi đối tượng mang bảng dữ liệu riêng.
+    """
+    if func is None:
+        return None
+    qualname = getattr(func, "__qualname__", None)
+    if qualname is not None:
+        return f"{getattr(func, '__module__', '')}.{qualname}"
+    return f"{type(func).__module__}.{type(func).__qualname__}@{id(func):x}"
+
+
+def _result_nbytes(result):
+    """Ước tính dung lượng bộ nhớ của một kết quả (path, cost, explored)."""
+    path, _, explored = result
+    return _ENTRY_OVERHEAD_BYTES + _COORD_BYTES * ((len(path) if path else 0) + len(explored))
+
+
+class PathCache:
+    """
+    Bộ nhớ đệm LRU cho kết quả (path, cost, explored) của các thuật toán tìm đường.
+    Thống kê trúng/trượt nằm trong `hits`, `misses`, `evictions` (xem `stats`).
+    """
+    def __init__(self, max_entries=PATH_CACHE_MAX_ENTRIES, max_bytes=PATH_CACHE_MAX_BYTES):
+        """
+        Args:
+            max_entries (int): Số kết quả tối đa được giữ.
+            max_bytes (int): Tổng dung lượng ước tính tối đa (byte).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # Khóa -> (kết quả đã đóng băng, số byte, số liệu lần chạy); cuối = dùng gần nhất
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(grid_data, start_rc, goal_rc, algorithm, heuristic=None):
+        """
+        Tạo khóa cho một truy vấn.
+
+        Args:
+            grid_data (GameGrid or GridModel): Lưới tại thời điểm truy vấn.
+            start_rc (tuple): Tọa độ (row, col) bắt đầu.
+            goal_rc (tuple): Tọa độ (row, col) đích.
+            algorithm (function): Hàm tìm đường.
+            heuristic (function, optional): Heuristic truyền cho thuật toán.
+
+        Returns:
+            tuple: Khóa (hashable).
+        """
+        model = as_grid_model(grid_data)
+        return (model.zobrist_hash, model.rows, model.cols, tuple(start_rc), tuple(goal_rc),
+                callable_cache_name(algorithm), callable_cache_name(heuristic))
+
+    def get(self, key):
+        """
+        Lấy kết quả đã lưu cho `key`.
+
+        Returns:
+            tuple or None: (path, cost, explored) - path/explored là list mới (người gọi được phép sửa),
+                           hoặc None nếu chưa có.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        path, cost, explored = entry[0]
+        return (list(path) if path is not None else None), cost, list(explored)
+
+    def search_stats(self, key):
+        """
+        Số liệu của lần chạy đã tạo kết quả cho `key` (ví dụ "suboptimality_bound"), không tính vào trúng/trượt.
+
+        Returns:
+            dict: Bản sao số liệu đã lưu cùng kết quả ({} nếu không có).
+        """
+        entry = self._entries.get(key)
+        return dict(entry[2]) if entry is not None else {}
+
+    def put(self, key, result, search_stats=None):
+        """
+        Lưu kết quả (path, cost, explored) cho `key`, bỏ bớt kết quả cũ nếu vượt giới hạn.
+        Kết quả lớn hơn cả giới hạn dung lượng thì không được lưu.
+        `search_stats` (dict, tùy chọn) là số liệu của lần chạy, lấy lại bằng `search_stats(key)`.
+        """
+        path, cost, explored = result
+        nbytes = _result_nbytes(result)
+        if nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        # Lưu dạng tuple để kết quả trong bộ nhớ đệm không bị sửa qua tham chiếu.
+        frozen = (tuple(path) if path is not None else None, cost, tuple(explored))
+        self._entries[key] = (frozen, nbytes, dict(search_stats or {}))
+        self.total_bytes += nbytes
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def clear(self):
+        """Xóa mọi kết quả (giữ nguyên bộ đếm thống kê)."""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self):
+        """Thống kê: số kết quả, dung lượng ước tính, số lần trúng/trượt/bị bỏ."""
+        return {"entries": len(self._entries), "bytes": self.total_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,85 @@
+# src/registry.py
+# Danh sách các thuật toán tìm đường của project (không phụ thuộc giao diện), dùng chung cho
+# main.py (thêm màu / độ dày nét vẽ), công cụ benchmark và công cụ giải theo lô trên dòng lệnh.
+# Mỗi thuật toán:
+#   - "func": hàm tìm đường (search_space, start_rc, goal_rc[, heuristic]) -> (path, cost, explored_nodes),
+#   - "is_graph_based": True nếu chạy trên CSRGraph, False nếu chạy trực tiếp trên lưới (GridModel),
+#   - "heuristic": heuristic truyền cho thuật toán (None nếu không dùng),
+#   - các khóa tùy chọn: "suboptimality_bound" (chi phí <= bound * tối ưu, luôn đúng), "reports_bound" (hàm nhận
+#     `stats=dict` và ghi giới hạn thực tế của lần chạy vào stats["suboptimality_bound"]), "optimal" (False nếu
+#     đường đi không đảm bảo ngắn nhất và không có giới hạn), "follows_flow_field".
+from config import WEIGHTED_ASTAR_EPSILON
+from src.algorithms import (
+    heuristic_manhattan, heuristic_euclidean, heuristic_octile,
+    jps_search, jps_plus_search, bidirectional_a_star_search
+)
+from src.fast_search import a_star_search_flat, dijkstra_search_flat, bfs_search_flat, greedy_bfs_search_flat
+from src.jps_weighted import weighted_jps_search
+from src.hpa_star import hpa_star_search
+from src.suboptimal import weighted_a_star_search, ara_star_search
+from src.memory_bounded import ida_star_search, sma_star_search
+from src.flow_field import flow_field_search
+
+ALGORITHMS = {
+    "A*": {"func": a_star_search_flat, "is_graph_based": True, "heuristic": heuristic_octile},
+    "Dijkstra": {"func": dijkstra_search_flat, "is_graph_based": True, "heuristic": None},
+    "BFS": {"func": bfs_search_flat, "is_graph_based": True, "heuristic": None, "optimal": False},
+    "Greedy BFS": {"func": greedy_bfs_search_flat, "is_graph_based": True, "heuristic": heuristic_octile,
+                   "optimal": False},
+    "JPS": {"func": jps_search, "is_graph_based": False, "heuristic": heuristic_manhattan},
+    "JPS+": {"func": jps_plus_search, "is_graph_based": False, "heuristic": heuristic_manhattan},
+    "Weighted JPS": {"func": weighted_jps_search, "is_graph_based": False, "heuristic": heuristic_euclidean},
+    # HPA* không đảm bảo tối ưu (xem src/hpa_star.py: trung bình +0-2%, xấu nhất +50% trên các mê cung mẫu).
+    "HPA*": {"func": hpa_star_search, "is_graph_based": False, "heuristic": heuristic_euclidean, "optimal": False},
+    # Giới hạn hiển thị là giới hạn thực tế của từng lần chạy (ARA* thường giảm tới 1 trong ngân sách thời gian,
+    # hoặc dừng ở epsilon khác khi hết giờ); epsilon của Weighted A* chỉ dùng khi không có số liệu của lần chạy.
+    "Weighted A*": {"func": weighted_a_star_search, "is_graph_based": True, "heuristic": heuristic_octile,
+                    "suboptimality_bound": WEIGHTED_ASTAR_EPSILON, "reports_bound": True},
+    "ARA*": {"func": ara_star_search, "is_graph_based": True, "heuristic": heuristic_octile, "reports_bound": True},
+    "IDA*": {"func": ida_star_search, "is_graph_based": True, "heuristic": heuristic_octile},
+    "SMA*": {"func": sma_star_search, "is_graph_based": True, "heuristic": heuristic_octile},
+    "Bi-A*": {"func": bidirectional_a_star_search, "is_graph_based": True, "heuristic": heuristic_octile},
+    # Agent của Flow Field đi theo trường hướng (tự tính lại khi bản đồ đổi) thay vì replan D* Lite.
+    "Flow Field": {"func": flow_field_search, "is_graph_based": False, "heuristic": None, "follows_flow_field": True},
+}
+
+ALGORITHM_NAMES = list(ALGORITHMS)
+
+
+def search_stats_for(algo_config):
+    """Dict nhận số liệu của một lần chạy nếu thuật toán ghi được giới hạn thực tế ("reports_bound"), ngược lại None."""
+    return {} if algo_config.get("reports_bound") else None
+
+
+def suboptimality_bound(algo_config, search_stats=None):
+    """
+    Giới hạn cost / tối ưu của một lần chạy: giá trị thực tế trong `search_stats` nếu có,
+    ngược lại giới hạn cố định trong cấu hình (None nếu thuật toán không có giới hạn).
+    """
+    if search_stats and "suboptimality_bound" in search_stats:
+        return search_stats["suboptimality_bound"]
+    return algo_config.get("suboptimality_bound")
+
+
+def run_algorithm(name, grid_model, graph, start_rc, goal_rc, stats=None):
+    """
+    Chạy một thuật toán đã đăng ký theo tên (giống cách main.py gọi).
+
+    Args:
+        name (str): Tên trong ALGORITHMS.
+        grid_model (GridModel): Lưới (cho các thuật toán chạy trên lưới).
+        graph (CSRGraph): Đồ thị CSR của lưới (cho các thuật toán dựa trên đồ thị).
+        start_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_rc (tuple): Tọa độ (row, col) đích.
+        stats (dict, optional): Nhận số liệu của lần chạy (ví dụ "suboptimality_bound") nếu thuật toán
+                                có "reports_bound"; bỏ qua với các thuật toán khác.
+
+    Returns:
+        tuple: (path, cost, explored_nodes).
+    """
+    spec = ALGORITHMS[name]
+    search_space = graph if spec["is_graph_based"] else grid_model
+    kwargs = {"stats": stats} if stats is not None and spec.get("reports_bound") else {}
+    if spec["heuristic"]:
+        return spec["func"](search_space, start_rc, goal_rc, spec["heuristic"], **kwargs)
+    return spec["func"](search_space, start_rc, goal_rc, **kwargs)
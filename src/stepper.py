@@ -0,0 +1,123 @@
+# src/stepper.py
+# Chạy một thuật toán tìm đường theo từng lát thời gian (time-budgeted stepping).
+# Thay vì chạy hết rồi mới trả về, `SearchStepper.step(budget_ms)` chạy tiếp tìm kiếm trong tối đa
+# `budget_ms` mili giây rồi trả về các node vừa được mở rộng, để vòng lặp chính dành một phần cố định
+# của mỗi frame cho tìm kiếm và hiển thị ngay các node mới - cửa sổ vẫn giữ 60 FPS dù tìm kiếm dài.
+# Mọi thuật toán trong src/registry.py có generator "*_steps" nên dừng được giữa chừng. Hàm không có trong
+# STEP_FUNCTIONS được bọc chung: chạy trọn trong lần step đầu tiên rồi trả toàn bộ các node đã mở rộng.
+# Người gọi chỉ cần các node được stream (không cần danh sách explored đầy đủ trong `result`) truyền
+# keep_explored=False: generator được gọi với record_explored=False nên chỉ giữ lô đang gom (không giữ danh
+# sách đầy đủ trong suốt lần tìm), và stepper chỉ đếm số node đã trả (`explored_count`).
+import time
+from src.algorithms import (
+    jps_steps, jps_plus_steps, jps_search, jps_plus_search, bidirectional_a_star_search, bidirectional_a_star_steps
+)
+from src.fast_search import (
+    a_star_search_flat, a_star_steps_flat, dijkstra_search_flat, dijkstra_steps_flat,
+    bfs_search_flat, bfs_steps_flat, greedy_bfs_search_flat, greedy_bfs_steps_flat
+)
+from src.jps_weighted import weighted_jps_search, weighted_jps_steps
+from src.suboptimal import weighted_a_star_search, weighted_a_star_steps, ara_star_search, ara_star_steps
+from src.memory_bounded import ida_star_search, ida_star_steps, sma_star_search, sma_star_steps
+from src.hpa_star import hpa_star_search, hpa_star_steps
+from src.flow_field import flow_field_search, flow_field_steps
+
+# Hàm tìm đường -> generator chạy từng bước tương ứng (cùng tham số).
+STEP_FUNCTIONS = {
+    a_star_search_flat: a_star_steps_flat,
+    dijkstra_search_flat: dijkstra_steps_flat,
+    bfs_search_flat: bfs_steps_flat,
+    greedy_bfs_search_flat: greedy_bfs_steps_flat,
+    jps_search: jps_steps,
+    jps_plus_search: jps_plus_steps,
+    weighted_jps_search: weighted_jps_steps,
+    weighted_a_star_search: weighted_a_star_steps,
+    ara_star_search: ara_star_steps,
+    ida_star_search: ida_star_steps,
+    sma_star_search: sma_star_steps,
+    bidirectional_a_star_search: bidirectional_a_star_steps,
+    hpa_star_search: hpa_star_steps,
+    flow_field_search: flow_field_steps,
+}
+
+
+def _run_whole(algorithm, args, kwargs):
+    """Generator bọc một thuật toán không có bản "*_steps": chạy trọn ở lần next() đầu tiên."""
+    yield from () # Biến hàm thành generator (không yield gì)
+    return algorithm(*args, **kwargs)
+
+
+class SearchStepper:
+    """
+    Một lần tìm kiếm có thể tạm dừng và chạy tiếp.
+    Sau khi `done` là True, `result` chứa (path, cost, explored_nodes) giống hệt khi gọi thẳng thuật toán.
+    `elapsed_ms` / `cpu_ms` là tổng thời gian thực sự dành cho tìm kiếm (không tính thời gian giữa các frame).
+    Với keep_explored=False, explored_nodes trong `result` là list rỗng; `explored_count` luôn là số node đã trả.
+    """
+    def __init__(self, algorithm, search_space, start_rc, goal_rc, heuristic=None, keep_explored=True, stats=None):
+        """
+        Args:
+            algorithm (function): Hàm tìm đường (như trong `defined_algorithms` của main.py).
+            search_space (CSRGraph or GameGrid or GridModel): Đồ thị hoặc lưới truyền cho thuật toán.
+            start_rc (tuple): Tọa độ (row, col) bắt đầu.
+            goal_rc (tuple): Tọa độ (row, col) đích.
+            heuristic (function, optional): Heuristic (None nếu thuật toán không dùng).
+            keep_explored (bool): False để không giữ danh sách explored đầy đủ (người gọi nhận từng phần
+                                  qua `step`); thuật toán không có trong STEP_FUNCTIONS vẫn tạo danh sách,
+                                  stepper bỏ nó khi xong.
+            stats (dict, optional): Truyền cho thuật toán dạng `stats=...` (chỉ dùng với hàm có tham số này,
+                                    xem "reports_bound" trong src/registry.py); được điền khi tìm kiếm xong.
+        """
+        args = (search_space, start_rc, goal_rc) + ((heuristic,) if heuristic else ())
+        kwargs = {"stats": stats} if stats is not None else {}
+        step_function = STEP_FUNCTIONS.get(algorithm)
+        if step_function:
+            if not keep_explored:
+                kwargs["record_explored"] = False
+            self._steps = step_function(*args, **kwargs)
+        else:
+            self._steps = _run_whole(algorithm, args, kwargs)
+        self.is_incremental = step_function is not None # False: thuật toán chạy trọn trong một lần step
+        self.keep_explored = keep_explored
+        self.stats = stats
+        self.explored_count = 0 # Số node đã trả cho người gọi (bằng len(result[2]) khi xong, nếu keep_explored)
+        self.done = False
+        self.result = None
+        self.elapsed_ms = 0.0
+        self.cpu_ms = 0.0
+
+    def step(self, budget_ms):
+        """
+        Chạy tiếp tìm kiếm trong khoảng `budget_ms` mili giây (ít nhất một bước).
+
+        Args:
+            budget_ms (float): Thời gian tối đa cho lần gọi này.
+
+        Returns:
+            tuple: (new_nodes, done) - list các node (row, col) vừa được mở rộng, và True nếu tìm kiếm đã xong.
+        """
+        if self.done:
+            return [], True
+        start_time = time.perf_counter(); cpu_start_time = time.process_time()
+        deadline = start_time + budget_ms / 1000
+        new_nodes = []
+        try:
+            while True:
+                new_nodes.extend(next(self._steps))
+                if time.perf_counter() >= deadline:
+                    break
+        except StopIteration as stop:
+            self.done = True
+            self.result = stop.value
+        self.elapsed_ms += (time.perf_counter() - start_time) * 1000
+        self.cpu_ms += (time.process_time() - cpu_start_time) * 1000
+        self.explored_count += len(new_nodes)
+        if self.done:
+            # Generator "*_steps" đã yield mọi node; chỉ thuật toán chạy trọn một lần còn node chưa trả.
+            remaining = self.result[2][self.explored_count:]
+            new_nodes.extend(remaining)
+            self.explored_count += len(remaining)
+            self._steps = None # Giải phóng trạng thái của generator
+            if not self.keep_explored:
+                self.result = (self.result[0], self.result[1], [])
+        return new_nodes, self.done
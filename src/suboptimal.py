@@ -0,0 +1,206 @@
+# src/suboptimal.py
+# Tìm kiếm dưới tối ưu có giới hạn (bounded-suboptimal) trên CSRGraph: đổi chất lượng đường đi lấy tốc độ.
+# - Weighted A*: mở rộng theo khóa g + epsilon * h. Với heuristic nhất quán (ví dụ octile), chi phí tìm được
+#   không vượt quá epsilon lần chi phí tối ưu, trong khi số node mở rộng thường ít hơn A* rất nhiều.
+# - ARA* (Anytime Repairing A*, Likhachev và cộng sự): chạy Weighted A* với epsilon lớn để có đường đi ngay,
+#   rồi giảm dần epsilon và sửa lại đường đi, DÙNG LẠI g-cost của các vòng trước: mỗi vòng chỉ mở rộng lại
+#   các node còn trong OPEN hoặc có g giảm sau khi đã đóng (danh sách INCONS), không tìm lại từ đầu.
+# Sau mỗi đường đi, giới hạn dưới tối ưu thực tế là min(epsilon, g(goal) / min(g + h trên OPEN và INCONS)),
+# thường chặt hơn epsilon. Giới hạn này cùng các đường đi trung gian được ghi vào `stats` (nếu truyền vào).
+import heapq
+import time
+from array import array
+from config import (
+    WEIGHTED_ASTAR_EPSILON, ARA_STAR_INITIAL_EPSILON, ARA_STAR_EPSILON_STEP, ARA_STAR_TIME_BUDGET_MS
+)
+from src.algorithms import heuristic_octile, run_steps, flush_explored
+from src.components import is_unreachable
+from src.fast_search import INF, STEP_EXPANSIONS, _reconstruct_path, _search_state
+from src.heuristic_tables import heuristic_deltas
+
+
+def weighted_a_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                           epsilon=WEIGHTED_ASTAR_EPSILON, stats=None):
+    """
+    Weighted A* trên CSRGraph (một vòng của ARA* với epsilon cố định).
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) đích.
+        heuristic_func (function): Heuristic; giới hạn chi phí chỉ được đảm bảo nếu heuristic nhất quán.
+        epsilon (float): Trọng số của heuristic (>= 1; 1 = A* tối ưu).
+        stats (dict, optional): Nhận các thông tin của lần tìm (xem `ara_star_steps`).
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - cost <= epsilon * chi phí tối ưu.
+    """
+    return run_steps(weighted_a_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func, epsilon, stats))
+
+
+def weighted_a_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                          epsilon=WEIGHTED_ASTAR_EPSILON, stats=None, record_explored=True):
+    """Generator của `weighted_a_star_search` (xem `ara_star_steps`)."""
+    return ara_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func, initial_epsilon=epsilon,
+                          epsilon_step=0, time_budget_ms=None, stats=stats, record_explored=record_explored)
+
+
+def ara_star_search(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                    initial_epsilon=ARA_STAR_INITIAL_EPSILON, epsilon_step=ARA_STAR_EPSILON_STEP,
+                    time_budget_ms=ARA_STAR_TIME_BUDGET_MS, stats=None):
+    """
+    ARA* trên CSRGraph: đường đi đầu tiên với `initial_epsilon`, sau đó giảm epsilon từng `epsilon_step`
+    và sửa đường đi cho tới khi đạt tối ưu (giới hạn 1) hoặc hết `time_budget_ms`.
+
+    Args:
+        graph (CSRGraph): Đồ thị CSR.
+        start_node_rc (tuple): Tọa độ (row, col) bắt đầu.
+        goal_node_rc (tuple): Tọa độ (row, col) đích.
+        heuristic_func (function): Heuristic (nên nhất quán, ví dụ octile).
+        initial_epsilon (float): Epsilon của vòng đầu tiên.
+        epsilon_step (float): Lượng giảm epsilon sau mỗi đường đi.
+        time_budget_ms (float or None): Thời gian tối đa; đường đi đầu tiên luôn được tìm trọn. None = không giới hạn.
+        stats (dict, optional): Nhận các thông tin của lần tìm (xem `ara_star_steps`).
+
+    Returns:
+        tuple: (path, cost, explored_nodes) - đường đi tốt nhất tìm được; explored gồm các node mở rộng
+               của mọi vòng (một node có thể xuất hiện ở nhiều vòng).
+    """
+    return run_steps(ara_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func,
+                                    initial_epsilon, epsilon_step, time_budget_ms, stats))
+
+
+def ara_star_steps(graph, start_node_rc, goal_node_rc, heuristic_func=heuristic_octile,
+                   initial_epsilon=ARA_STAR_INITIAL_EPSILON, epsilon_step=ARA_STAR_EPSILON_STEP,
+                   time_budget_ms=ARA_STAR_TIME_BUDGET_MS, stats=None, record_explored=True):
+    """
+    Generator của `ara_star_search`: cứ mỗi STEP_EXPANSIONS node được mở rộng thì yield list các node đó
+    (lô cuối có thể ít hơn); return (path, cost, explored_nodes). Thời gian tạm dừng giữa các lần yield không
+    tính vào ngân sách. Với record_explored=False, explored_nodes trả về là list rỗng.
+
+    Nếu `stats` là dict, khi kết thúc nó nhận:
+        "epsilon": epsilon của vòng cho đường đi cuối cùng (None nếu không có đường),
+        "suboptimality_bound": giới hạn thực tế cost / tối ưu của đường đi trả về (None nếu không có đường),
+        "solutions": list (epsilon, cost, bound, elapsed_ms) của từng đường đi đã tìm được,
+        "expansions": tổng số lần mở rộng node.
+    """
+    if is_unreachable(graph, start_node_rc, goal_node_rc):
+        if stats is not None:
+            stats.update({"epsilon": None, "suboptimality_bound": None, "solutions": [], "expansions": 0})
+        return None, INF, []
+    cols = graph.cols
+    row_start, row_end, neighbors, weights = graph.adjacency_views()
+    g_cost, parent, _ = _search_state(graph)
+    num_cells = len(g_cost)
+    closed_round = array("l", [-1]) * num_cells # Vòng mà node được đóng (-1 = chưa); đổi vòng = xóa CLOSED trong O(1)
+    in_incons = bytearray(num_cells)
+    incons = [] # Node có g giảm sau khi đã đóng trong vòng hiện tại: mở lại ở vòng sau
+    start_idx = start_node_rc[0] * cols + start_node_rc[1]
+    goal_idx = goal_node_rc[0] * cols + goal_node_rc[1]
+    h = _heuristic_lookup(graph, goal_node_rc, heuristic_func)
+
+    epsilon = max(1.0, initial_epsilon)
+    search_round = 0
+    g_cost[start_idx] = 0
+    open_set = [(epsilon * h(start_idx), 0, start_idx)] # (g + epsilon * h, g lúc push, node_idx)
+    explored = [] # Rỗng nếu record_explored=False
+    batch = [] # Các node mở rộng chưa yield
+    expansions = 0 # Số node đã yield
+    best_path, best_cost, best_epsilon, bound = None, INF, None, None
+    solutions = []
+    start_time = time.perf_counter()
+    deadline = start_time + time_budget_ms / 1000 if time_budget_ms is not None else INF
+
+    while True:
+        # --- ImprovePath: mở rộng cho tới khi không node nào trong OPEN có khóa nhỏ hơn g(goal) ---
+        timed_out = False
+        while open_set:
+            key, g_pushed, current_idx = open_set[0]
+            if g_pushed > g_cost[current_idx] or closed_round[current_idx] == search_round:
+                heapq.heappop(open_set) # Entry cũ, hoặc node đã đóng trong vòng này
+                continue
+            if key >= g_cost[goal_idx]:
+                break
+            heapq.heappop(open_set)
+            closed_round[current_idx] = search_round
+            batch.append(divmod(current_idx, cols))
+            if len(batch) == STEP_EXPANSIONS:
+                pause_start = time.perf_counter()
+                yield batch
+                deadline += time.perf_counter() - pause_start # Không tính thời gian tạm dừng
+                expansions += STEP_EXPANSIONS
+                if record_explored: explored += batch
+                batch = []
+                if best_path is not None and time.perf_counter() > deadline:
+                    timed_out = True # Giữ đường đi của vòng trước
+                    break
+
+            start, end = row_start[current_idx], row_end[current_idx]
+            for neighbor_idx, weight in zip(neighbors[start:end].tolist(), weights[start:end].tolist()):
+                new_g = g_pushed + weight
+                if new_g < g_cost[neighbor_idx]:
+                    g_cost[neighbor_idx] = new_g
+                    parent[neighbor_idx] = current_idx
+                    if closed_round[neighbor_idx] != search_round:
+                        heapq.heappush(open_set, (new_g + epsilon * h(neighbor_idx), new_g, neighbor_idx))
+                    elif not in_incons[neighbor_idx]:
+                        in_incons[neighbor_idx] = 1
+                        incons.append(neighbor_idx)
+
+        if timed_out or g_cost[goal_idx] == INF: # Hết giờ, hoặc OPEN rỗng mà không đến được đích
+            break
+
+        # --- Ghi nhận đường đi và giới hạn thực tế của nó ---
+        goal_g = g_cost[goal_idx]
+        frontier = [idx for _, g_pushed, idx in open_set
+                    if g_pushed == g_cost[idx] and closed_round[idx] != search_round]
+        frontier.extend(incons)
+        min_f = min((g_cost[idx] + h(idx) for idx in frontier), default=INF)
+        bound = 1.0 if min_f >= goal_g else min(epsilon, goal_g / min_f)
+        best_path, best_epsilon = _reconstruct_path(parent, goal_idx, cols), epsilon
+        # Node trên đường có thể đã được sửa g (qua INCONS) sau khi đích nhận g, nên chi phí thật của
+        # đường theo node cha có thể nhỏ hơn g(goal): tính lại theo cạnh (giới hạn vẫn đúng vì nhỏ hơn).
+        best_cost = sum(graph.get_edge_weight(a, b) for a, b in zip(best_path, best_path[1:]))
+        solutions.append((epsilon, best_cost, bound, (time.perf_counter() - start_time) * 1000))
+        if bound <= 1.0 or epsilon_step <= 0 or time.perf_counter() > deadline:
+            break
+
+        # --- Vòng mới: giảm epsilon, OPEN = OPEN ∪ INCONS với khóa mới, xóa CLOSED ---
+        epsilon = max(1.0, epsilon - epsilon_step)
+        search_round += 1
+        open_set = [(g_cost[idx] + epsilon * h(idx), g_cost[idx], idx) for idx in set(frontier)]
+        heapq.heapify(open_set)
+        for idx in incons:
+            in_incons[idx] = 0
+        incons.clear()
+
+    expansions += len(batch)
+    yield from flush_explored(explored, batch, record_explored)
+    if stats is not None:
+        stats.update({"epsilon": best_epsilon, "suboptimality_bound": bound if best_path else None,
+                      "solutions": solutions, "expansions": expansions})
+    return best_path, best_cost, explored
+
+
+def _heuristic_lookup(graph, goal_node_rc, heuristic_func):
+    """
+    Hàm idx -> h(idx): tính từ |dr|, |dc| nếu được (Manhattan, octile), nếu không thì gọi
+    `heuristic_func` và nhớ kết quả (mỗi node có thể được đặt khóa lại ở mỗi vòng của ARA*).
+    """
+    cols = graph.cols
+    h_deltas = heuristic_deltas(graph, goal_node_rc, heuristic_func)
+    if h_deltas is not None:
+        row_delta, col_delta, diagonal_factor = h_deltas
+
+        def h_from_deltas(node_idx):
+            dr, dc = row_delta[node_idx // cols], col_delta[node_idx % cols]
+            return (dr + dc) + diagonal_factor * (dr if dr < dc else dc)
+        return h_from_deltas
+    h_cache = {}
+
+    def h(node_idx):
+        value = h_cache.get(node_idx)
+        if value is None:
+            value = h_cache[node_idx] = heuristic_func(divmod(node_idx, cols), goal_node_rc)
+        return value
+    return h
@@ -447,9 +447,14 @@ class UIPanelManager:
             for algo_name, data in sorted_results:
                 cost_val = data.get('cost', float('inf'))
                 cost_str = f"{cost_val:.1f}" if isinstance(cost_val, (int, float)) and cost_val != float('inf') else "N/A"
+                # Đánh dấu thuật toán không đảm bảo đường đi ngắn nhất (kèm giới hạn nếu có)
+                if cost_str != "N/A" and data.get('suboptimality_bound') is not None:
+                    cost_str += f" (<={data['suboptimality_bound']:.2f}x)"
+                elif cost_str != "N/A" and not data.get('optimal', True):
+                    cost_str += " (not optimal)"
                 
-                explored_val = data.get('explored', [])
-                explored_str = str(len(explored_val)) if isinstance(explored_val, list) else "N/A"
+                explored_val = data.get('explored_count')
+                explored_str = str(explored_val) if isinstance(explored_val, int) else "N/A"
                 
                 time_val = data.get('time_ms', float('inf'))
                 time_str = f"{time_val:.1f}" if isinstance(time_val, (int, float)) else "N/A"